@@ -1,7 +1,6 @@
 import uvicorn
 import sqlite3
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -29,8 +28,15 @@ from repo import (
     chamado_repo,
     chamado_interacao_repo,
     indices_repo,
+    chat_sala_repo,
+    chat_participante_repo,
+    chat_mensagem_repo,
+    chat_evento_repo,
+    email_pendente_repo,
+    categoria_repo,
+    artigo_repo,
+    conteudo_versao_repo,
 )
-from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, categoria_repo, artigo_repo
 
 # Rotas
 from routes.auth_routes import router as auth_router
@@ -49,9 +55,29 @@ from routes.examples_routes import router as examples_router
 # Seeds
 from util.seed_data import inicializar_dados
 
+# Banco de dados
+from util.db_util import fechar_pools
+from util.db_async import executor_banco
+
+# Tarefas em background
+from util.reconciliacao_chat import iniciar_reconciliacao_periodica
+from util.config_cache import iniciar_sincronizacao_periodica
+from util.pagina_cache import iniciar_sincronizacao_periodica as iniciar_sincronizacao_paginas
+from util.chat_manager import gerenciador_chat
+from util.senha_service import servico_senha
+from util.email_fila import processador_emails
+from util.foto_util import encerrar_processamento_fotos
+from util.email_templates import precompilar as precompilar_templates_email
+
+# Arquivos estáticos com URLs versionadas
+from util.asset_util import ArquivosEstaticos, manifesto_assets, iniciar_precompressao
+
 # CSRF Protection
 from util.csrf_protection import MiddlewareProtecaoCSRF
 
+# Compressão de respostas
+from util.compressao_middleware import COMPRESSAO_ATIVA, MiddlewareCompressao
+
 # Criar aplicação FastAPI
 app = FastAPI(title=APP_NAME, version=VERSION)
 
@@ -62,6 +88,11 @@ app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 app.add_middleware(MiddlewareProtecaoCSRF)
 logger.info("CSRF Protection habilitado")
 
+# Compressão gzip/brotli (mais externo: comprime a resposta final; SSE excluído)
+if COMPRESSAO_ATIVA:
+    app.add_middleware(MiddlewareCompressao)
+    logger.info("Compressão de respostas habilitada")
+
 # Registrar Exception Handlers
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -72,8 +103,8 @@ logger.info("Exception handlers registrados")
 # Montar arquivos estáticos
 static_path = Path("static")
 if static_path.exists():
-    app.mount("/static", StaticFiles(directory="static"), name="static")
-    logger.info("Arquivos estáticos montados em /static")
+    app.mount("/static", ArquivosEstaticos(directory="static"), name="static")
+    logger.info("Arquivos estáticos montados em /static (cache por versão do conteúdo)")
 
 # Definir repositórios e nomes das tabelas
 TABELAS = [
@@ -84,8 +115,12 @@ TABELAS = [
     (chat_sala_repo, "chat_sala"),
     (chat_participante_repo, "chat_participante"),
     (chat_mensagem_repo, "chat_mensagem"),
+    (chat_evento_repo, "chat_evento"),
+    (email_pendente_repo, "email_pendente"),
     (categoria_repo, "categoria"),
     (artigo_repo, "artigo"),
+    # Triggers em artigo e categoria: depois das duas tabelas
+    (conteudo_versao_repo, "conteudo_versao"),
 ]
 
 # Criar tabelas do banco de dados
@@ -139,6 +174,50 @@ for router, tags, nome in ROUTERS:
     logger.info(f"Router de {nome} incluído")
 
 
+# Tarefas periódicas iniciadas no startup (canceladas no shutdown)
+tarefas_background = []
+
+
+@app.on_event("startup")
+async def iniciar_tarefas_background():
+    """Agenda as tarefas periódicas de manutenção"""
+    for tarefa in (
+        iniciar_reconciliacao_periodica(),
+        iniciar_sincronizacao_periodica(),
+        iniciar_sincronizacao_paginas(),
+        processador_emails.iniciar(),
+        iniciar_precompressao(),
+    ):
+        if tarefa:
+            tarefas_background.append(tarefa)
+
+
+@app.on_event("startup")
+async def precompilar_templates():
+    """Compila os templates de e-mail antes da primeira requisição"""
+    logger.info(f"{precompilar_templates_email()} templates de e-mail compilados")
+
+
+@app.on_event("startup")
+async def construir_manifesto_assets():
+    """Calcula as versões dos arquivos estáticos antes da primeira requisição"""
+    manifesto_assets.construir()
+
+
+@app.on_event("shutdown")
+async def fechar_conexoes_banco():
+    """Conclui escritas pendentes, fecha as conexões pooled do banco e o pool de senhas"""
+    for tarefa in tarefas_background:
+        tarefa.cancel()
+    tarefas_background.clear()
+    await gerenciador_chat.encerrar()
+    executor_banco.encerrar()
+    servico_senha.encerrar()
+    encerrar_processamento_fotos()
+    fechar_pools()
+    logger.info("Conexões do banco de dados encerradas")
+
+
 @app.get("/health")
 async def health_check():
     """Endpoint de health check"""
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class ChatConversa:
+    """
+    Resumo de uma conversa para a listagem do usuário.
+
+    Agrega em um único objeto a sala, o outro participante, a última
+    mensagem e o contador de não lidas (resultado de uma única query).
+
+    Attributes:
+        sala_id: ID da sala de chat
+        ultima_atividade: Timestamp da última atividade da sala
+        outro_usuario_id: ID do outro participante
+        outro_usuario_nome: Nome do outro participante
+        outro_usuario_email: E-mail do outro participante
+        nao_lidas: Quantidade de mensagens não lidas pelo usuário
+        ultima_mensagem: Texto da última mensagem (None se a sala está vazia)
+        ultima_mensagem_data_envio: Timestamp da última mensagem
+        ultima_mensagem_usuario_id: ID do autor da última mensagem
+    """
+    sala_id: str
+    ultima_atividade: datetime
+    outro_usuario_id: int
+    outro_usuario_nome: str
+    outro_usuario_email: str
+    nao_lidas: int = 0
+    ultima_mensagem: Optional[str] = None
+    ultima_mensagem_data_envio: Optional[datetime] = None
+    ultima_mensagem_usuario_id: Optional[int] = None
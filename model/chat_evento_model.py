@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ChatEvento:
+    """
+    Evento do chat publicado no log compartilhado entre workers.
+
+    Attributes:
+        id: ID sequencial do evento
+        sala_id: ID da sala de destino
+        payload: Evento serializado em JSON
+        origem: Identificador do worker que publicou
+        publicado_em: Timestamp Unix (segundos) da publicação
+    """
+    id: int
+    sala_id: str
+    payload: str
+    origem: str
+    publicado_em: float
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from util.enum_base import EnumEntidade
+
+
+class StatusEmail(EnumEntidade):
+    """
+    Enum para status dos e-mails da fila de saída.
+
+    Herda de EnumEntidade que fornece métodos úteis:
+        - valores(): Lista todos os valores
+        - existe(valor): Verifica se valor existe
+        - from_valor(valor): Converte string para enum
+        - validar(valor): Valida e retorna ou levanta ValueError
+    """
+
+    PENDENTE = "pendente"
+    ENVIADO = "enviado"
+    FALHOU = "falhou"
+
+
+@dataclass
+class EmailPendente:
+    """
+    E-mail na fila de saída (tabela email_pendente).
+
+    Attributes:
+        id: ID sequencial do e-mail
+        para_email: E-mail do destinatário
+        para_nome: Nome do destinatário
+        assunto: Assunto
+        html: Corpo em HTML
+        texto: Corpo em texto puro (opcional)
+        status: pendente, enviado ou falhou
+        tentativas: Tentativas de envio que falharam
+        proxima_tentativa: Timestamp Unix a partir do qual pode ser enviado
+        ultimo_erro: Mensagem da última falha
+        criado_em: Timestamp Unix da criação
+        enviado_em: Timestamp Unix do envio
+    """
+    id: int
+    para_email: str
+    para_nome: str
+    assunto: str
+    html: str
+    texto: Optional[str] = None
+    status: str = StatusEmail.PENDENTE.value
+    tentativas: int = 0
+    proxima_tentativa: float = 0.0
+    ultimo_erro: Optional[str] = None
+    criado_em: Optional[float] = None
+    enviado_em: Optional[float] = None
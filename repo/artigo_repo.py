@@ -1,4 +1,5 @@
 import sqlite3
+from concurrent.futures import Future
 from model.artigo_model import Artigo
 from sql.artigo_sql import (
     CRIAR_TABELA,
@@ -12,6 +13,8 @@ from sql.artigo_sql import (
     OBTER_PUBLICADOS,
 )
 from util.config import DATABASE_PATH
+from util.db_util import obter_fila_escrita
+from util.pagina_cache import cache_paginas
 
 
 def criar_tabela():
@@ -46,6 +49,7 @@ def inserir(artigo: Artigo) -> int:
             artigo.data_atualizacao,
         ))
         conn.commit()
+        cache_paginas.invalidar()
         return cur.lastrowid
     finally:
         conn.close()
@@ -66,6 +70,7 @@ def alterar(artigo: Artigo) -> None:
             artigo.id,
         ))
         conn.commit()
+        cache_paginas.invalidar()
     finally:
         conn.close()
 
@@ -76,6 +81,7 @@ def excluir(artigo_id: int) -> None:
         cur = conn.cursor()
         cur.execute(EXCLUIR, (artigo_id,))
         conn.commit()
+        cache_paginas.invalidar()
     finally:
         conn.close()
 
@@ -164,18 +170,19 @@ def obter_publicados(offset: int = 0, limite: int = 20, categoria_id: int | None
         conn.close()
 
 
-def incrementar_visualizacoes(artigo_id: int) -> None:
-    """Incrementa o contador de visualizações do artigo, adicionando a coluna se necessário."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    try:
-        cur = conn.cursor()
-        # tenta criar a coluna caso não exista (ignore se já existir)
-        try:
-            cur.execute("ALTER TABLE artigo ADD COLUMN visualizacoes INTEGER DEFAULT 0")
-        except Exception:
-            pass
+def incrementar_visualizacoes(artigo_id: int) -> Future:
+    """Incrementa o contador de visualizações do artigo sem aguardar o commit.
 
-        cur.execute("UPDATE artigo SET visualizacoes = COALESCE(visualizacoes, 0) + 1 WHERE id = ?", (artigo_id,))
-        conn.commit()
-    finally:
-        conn.close()
+    A operação só é enfileirada na fila de escrita: quem atende a requisição
+    não espera a thread escritora, e visualizações simultâneas são agrupadas
+    em uma única transação. A coluna é garantida por `criar_tabela`.
+
+    Returns:
+        Future resolvido após o commit (quem precisar do valor gravado aguarda)
+    """
+    return obter_fila_escrita(DATABASE_PATH).submeter(
+        lambda conn: conn.execute(
+            "UPDATE artigo SET visualizacoes = COALESCE(visualizacoes, 0) + 1 WHERE id = ?",
+            (artigo_id,),
+        )
+    )
@@ -0,0 +1,34 @@
+"""
+Fachadas assíncronas dos repositórios.
+
+Cada atributo expõe as mesmas funções do repositório síncrono de mesmo
+nome, executadas no pool de threads de `util.db_async` para não bloquear
+o event loop.
+
+Uso:
+    from repo import async_repo
+
+    sala = await async_repo.chat_sala_repo.obter_por_id(sala_id)
+"""
+from repo import (
+    artigo_repo as _artigo_repo,
+    categoria_repo as _categoria_repo,
+    chamado_interacao_repo as _chamado_interacao_repo,
+    chamado_repo as _chamado_repo,
+    chat_mensagem_repo as _chat_mensagem_repo,
+    chat_participante_repo as _chat_participante_repo,
+    chat_sala_repo as _chat_sala_repo,
+    configuracao_repo as _configuracao_repo,
+    usuario_repo as _usuario_repo,
+)
+from util.db_async import RepositorioAsync, executor_banco
+
+artigo_repo = RepositorioAsync(_artigo_repo, executor_banco)
+categoria_repo = RepositorioAsync(_categoria_repo, executor_banco)
+chamado_interacao_repo = RepositorioAsync(_chamado_interacao_repo, executor_banco)
+chamado_repo = RepositorioAsync(_chamado_repo, executor_banco)
+chat_mensagem_repo = RepositorioAsync(_chat_mensagem_repo, executor_banco)
+chat_participante_repo = RepositorioAsync(_chat_participante_repo, executor_banco)
+chat_sala_repo = RepositorioAsync(_chat_sala_repo, executor_banco)
+configuracao_repo = RepositorioAsync(_configuracao_repo, executor_banco)
+usuario_repo = RepositorioAsync(_usuario_repo, executor_banco)
@@ -2,6 +2,7 @@ from typing import Optional
 from model.categoria_model import Categoria
 from sql.categoria_sql import *
 from util.db_util import obter_conexao
+from util.pagina_cache import cache_paginas
 
 
 def _row_to_categoria(row) -> Categoria:
@@ -31,10 +32,11 @@ def inserir(categoria: Categoria) -> Optional[Categoria]:
             cursor = conn.cursor()
             cursor.execute(INSERIR, (categoria.nome, categoria.descricao))
 
-            if cursor.lastrowid:
-                categoria.id = cursor.lastrowid
-                return categoria
-            return None
+            if not cursor.lastrowid:
+                return None
+            categoria.id = cursor.lastrowid
+        cache_paginas.invalidar()
+        return categoria
     except Exception as e:
         print(f"Erro ao inserir categoria: {e}")
         return None
@@ -49,7 +51,10 @@ def alterar(categoria: Categoria) -> bool:
                 ALTERAR,
                 (categoria.nome, categoria.descricao, categoria.id)
             )
-            return cursor.rowcount > 0
+            alterada = cursor.rowcount > 0
+        if alterada:
+            cache_paginas.invalidar()
+        return alterada
     except Exception as e:
         print(f"Erro ao alterar categoria: {e}")
         return False
@@ -61,7 +66,10 @@ def excluir(id: int) -> bool:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(EXCLUIR, (id,))
-            return cursor.rowcount > 0
+            excluida = cursor.rowcount > 0
+        if excluida:
+            cache_paginas.invalidar()
+        return excluida
     except Exception as e:
         print(f"Erro ao excluir categoria: {e}")
         return False
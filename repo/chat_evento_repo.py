@@ -0,0 +1,97 @@
+"""
+Repositório para operações com a tabela chat_evento.
+"""
+from typing import List
+from sqlite3 import Row
+
+from model.chat_evento_model import ChatEvento
+from sql.chat_evento_sql import (
+    CRIAR_TABELA,
+    INSERIR,
+    OBTER_ULTIMO_ID,
+    LISTAR_POSTERIORES,
+    EXCLUIR_ANTERIORES
+)
+from util.db_util import obter_conexao, executar_escrita
+
+
+def _row_to_evento(row: Row) -> ChatEvento:
+    """Converte uma row do banco em objeto ChatEvento."""
+    return ChatEvento(
+        id=row["id"],
+        sala_id=row["sala_id"],
+        payload=row["payload"],
+        origem=row["origem"],
+        publicado_em=row["publicado_em"]
+    )
+
+
+def criar_tabela():
+    """Cria a tabela chat_evento se não existir."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+
+
+def inserir(sala_id: str, payload: str, origem: str, publicado_em: float) -> int:
+    """
+    Publica um evento no log compartilhado.
+
+    Args:
+        sala_id: ID da sala de destino
+        payload: Evento serializado em JSON
+        origem: Identificador do worker que publica
+        publicado_em: Timestamp Unix da publicação
+
+    Returns:
+        ID do evento inserido
+    """
+    return executar_escrita(
+        lambda conn: conn.execute(INSERIR, (sala_id, payload, origem, publicado_em)).lastrowid
+    )
+
+
+def obter_ultimo_id() -> int:
+    """
+    Obtém o ID do evento mais recente.
+
+    Returns:
+        ID do último evento (0 se vazio)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_ULTIMO_ID)
+        return cursor.fetchone()["ultimo_id"]
+
+
+def listar_posteriores(ultimo_id: int, origem: str, limite: int = 500) -> List[ChatEvento]:
+    """
+    Lista eventos de outros workers publicados após um ID.
+
+    Args:
+        ultimo_id: ID do último evento já consumido
+        origem: Identificador do worker consumidor (seus eventos são ignorados)
+        limite: Número máximo de eventos
+
+    Returns:
+        Lista de ChatEvento em ordem de publicação
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_POSTERIORES, (ultimo_id, origem, limite))
+        return [_row_to_evento(row) for row in cursor.fetchall()]
+
+
+def excluir_anteriores(publicado_antes_de: float) -> int:
+    """
+    Remove eventos antigos do log.
+
+    Args:
+        publicado_antes_de: Timestamp Unix limite
+
+    Returns:
+        Quantidade de eventos removidos
+    """
+    return executar_escrita(
+        lambda conn: conn.execute(EXCLUIR_ANTERIORES, (publicado_antes_de,)).rowcount
+    )
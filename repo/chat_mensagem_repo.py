@@ -10,12 +10,18 @@ from sql.chat_mensagem_sql import (
     INSERIR,
     OBTER_POR_ID,
     LISTAR_POR_SALA,
+    LISTAR_ULTIMAS_POR_SALA,
+    LISTAR_POR_SALA_ANTES_DE,
+    LISTAR_POR_SALA_DEPOIS_DE,
+    LISTAR_POR_USUARIO_DEPOIS_DE,
+    OBTER_ULTIMO_ID,
     CONTAR_POR_SALA,
     MARCAR_COMO_LIDAS,
     OBTER_ULTIMA_MENSAGEM_SALA,
     EXCLUIR
 )
-from util.db_util import obter_conexao
+from sql.chat_participante_sql import INCREMENTAR_NAO_LIDAS, ZERAR_NAO_LIDAS
+from util.db_util import obter_conexao, executar_escrita
 from util.datetime_util import agora
 
 
@@ -61,10 +67,14 @@ def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
     """
     data_envio = agora()
 
-    with obter_conexao() as conn:
-        cursor = conn.cursor()
-        cursor.execute(INSERIR, (sala_id, usuario_id, mensagem, data_envio, None))
-        mensagem_id = cursor.lastrowid
+    def _inserir(conn) -> int:
+        cursor = conn.execute(INSERIR, (sala_id, usuario_id, mensagem, data_envio, None))
+        # Mesma transação: contador de não lidas dos demais participantes
+        conn.execute(INCREMENTAR_NAO_LIDAS, (sala_id, usuario_id))
+        return cursor.lastrowid
+
+    # Escrita frequente e concorrente: passa pela fila de escrita
+    mensagem_id = executar_escrita(_inserir)
 
     return ChatMensagem(
         id=mensagem_id,
@@ -116,6 +126,81 @@ def listar_por_sala(sala_id: str, limit: int = 50, offset: int = 0) -> List[Chat
         return [_row_to_mensagem(row) for row in rows]
 
 
+def listar_por_sala_cursor(
+    sala_id: str,
+    limit: int = 50,
+    antes_id: Optional[int] = None,
+    depois_id: Optional[int] = None
+) -> List[ChatMensagem]:
+    """
+    Lista mensagens de uma sala com paginação por cursor (keyset).
+
+    Sem cursor, retorna as mensagens mais recentes. Com `antes_id`, a página
+    imediatamente anterior a essa mensagem (rolagem para o histórico). Com
+    `depois_id`, as mensagens posteriores (ex: recuperar após reconexão).
+    O custo não cresce com a profundidade, ao contrário de OFFSET.
+
+    Args:
+        sala_id: ID da sala
+        limit: Número máximo de mensagens a retornar
+        antes_id: Retornar mensagens com ID menor que este
+        depois_id: Retornar mensagens com ID maior que este
+
+    Returns:
+        Lista de objetos ChatMensagem (ordenadas por ID crescente - mais antigas primeiro)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        if depois_id is not None:
+            cursor.execute(LISTAR_POR_SALA_DEPOIS_DE, (sala_id, depois_id, limit))
+            return [_row_to_mensagem(row) for row in cursor.fetchall()]
+
+        if antes_id is not None:
+            cursor.execute(LISTAR_POR_SALA_ANTES_DE, (sala_id, antes_id, limit))
+        else:
+            cursor.execute(LISTAR_ULTIMAS_POR_SALA, (sala_id, limit))
+        rows = cursor.fetchall()
+
+        # Query lê da mais recente para a mais antiga; devolver em ordem cronológica
+        return [_row_to_mensagem(row) for row in reversed(rows)]
+
+
+def listar_por_usuario_depois_de(usuario_id: int, mensagem_id: int, limit: int = 100) -> List[ChatMensagem]:
+    """
+    Lista mensagens das salas de um usuário com ID maior que o informado.
+
+    Usado para reenviar eventos perdidos quando uma conexão SSE reconecta
+    e o buffer em memória não cobre o intervalo. O cursor é o ID da última
+    mensagem entregue (não o instante de envio): uma mensagem gravada antes
+    e entregue depois de outra não é perdida.
+
+    Args:
+        usuario_id: ID do usuário participante
+        mensagem_id: ID da última mensagem entregue (exclusivo)
+        limit: Número máximo de mensagens a retornar
+
+    Returns:
+        Lista de objetos ChatMensagem (ordenadas por ID crescente)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_POR_USUARIO_DEPOIS_DE, (usuario_id, mensagem_id, limit))
+        return [_row_to_mensagem(row) for row in cursor.fetchall()]
+
+
+def obter_ultimo_id() -> int:
+    """
+    Obtém o maior ID de mensagem (cursor inicial do reenvio de uma conexão SSE).
+
+    Returns:
+        ID da mensagem mais recente (0 se não há mensagens)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_ULTIMO_ID)
+        return cursor.fetchone()[0]
+
+
 def contar_por_sala(sala_id: str) -> int:
     """
     Conta o total de mensagens em uma sala.
@@ -138,6 +223,8 @@ def marcar_como_lidas(sala_id: str, usuario_id: int) -> bool:
     """
     Marca como lidas todas as mensagens não lidas de outros usuários em uma sala.
 
+    Também zera o contador de não lidas do participante.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário que está marcando como lidas
@@ -145,10 +232,15 @@ def marcar_como_lidas(sala_id: str, usuario_id: int) -> bool:
     Returns:
         True se marcadas com sucesso, False caso contrário
     """
-    with obter_conexao() as conn:
-        cursor = conn.cursor()
-        cursor.execute(MARCAR_COMO_LIDAS, (agora(), sala_id, usuario_id))
-        return cursor.rowcount >= 0  # Retorna True mesmo se nenhuma mensagem foi marcada
+    momento = agora()
+
+    def _marcar(conn) -> int:
+        rowcount = conn.execute(MARCAR_COMO_LIDAS, (momento, sala_id, usuario_id)).rowcount
+        conn.execute(ZERAR_NAO_LIDAS, (sala_id, usuario_id))
+        return rowcount
+
+    rowcount = executar_escrita(_marcar)
+    return rowcount >= 0  # Retorna True mesmo se nenhuma mensagem foi marcada
 
 
 def obter_ultima_mensagem_sala(sala_id: str) -> Optional[ChatMensagem]:
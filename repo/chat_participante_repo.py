@@ -7,15 +7,18 @@ from sqlite3 import Row
 from model.chat_participante_model import ChatParticipante
 from sql.chat_participante_sql import (
     CRIAR_TABELA,
+    ADICIONAR_COLUNA_NAO_LIDAS,
     INSERIR,
     OBTER_POR_SALA_E_USUARIO,
     LISTAR_POR_SALA,
     LISTAR_POR_USUARIO,
     ATUALIZAR_ULTIMA_LEITURA,
     CONTAR_MENSAGENS_NAO_LIDAS,
+    SOMAR_NAO_LIDAS_POR_USUARIO,
+    RECONSTRUIR_NAO_LIDAS,
     EXCLUIR
 )
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, executar_escrita
 from util.datetime_util import agora
 
 
@@ -26,18 +29,33 @@ def _row_to_participante(row: Row) -> ChatParticipante:
     if "ultima_leitura" in row.keys():
         ultima_leitura = row["ultima_leitura"]
 
+    nao_lidas = 0
+    if "nao_lidas" in row.keys():
+        nao_lidas = row["nao_lidas"]
+
     return ChatParticipante(
         sala_id=row["sala_id"],
         usuario_id=row["usuario_id"],
-        ultima_leitura=ultima_leitura
+        ultima_leitura=ultima_leitura,
+        nao_lidas=nao_lidas
     )
 
 
 def criar_tabela():
-    """Cria a tabela chat_participante se não existir."""
+    """
+    Cria a tabela chat_participante se não existir.
+
+    Em bancos criados antes do contador `nao_lidas`, adiciona a coluna e
+    reconstrói os contadores a partir das mensagens existentes.
+    """
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        colunas = [col["name"] for col in cursor.execute("PRAGMA table_info(chat_participante)")]
+        if "nao_lidas" in colunas:
+            return
+        cursor.execute(ADICIONAR_COLUNA_NAO_LIDAS)
+        cursor.execute(RECONSTRUIR_NAO_LIDAS)
 
 
 def adicionar_participante(sala_id: str, usuario_id: int) -> ChatParticipante:
@@ -121,7 +139,8 @@ def listar_por_usuario(usuario_id: int) -> List[ChatParticipante]:
 
 def atualizar_ultima_leitura(sala_id: str, usuario_id: int) -> bool:
     """
-    Atualiza o timestamp de última leitura do participante.
+    Atualiza o timestamp de última leitura do participante e zera seu
+    contador de não lidas.
 
     Args:
         sala_id: ID da sala
@@ -130,16 +149,19 @@ def atualizar_ultima_leitura(sala_id: str, usuario_id: int) -> bool:
     Returns:
         True se atualizado com sucesso, False caso contrário
     """
-    with obter_conexao() as conn:
-        cursor = conn.cursor()
-        cursor.execute(ATUALIZAR_ULTIMA_LEITURA, (agora(), sala_id, usuario_id))
-        return cursor.rowcount > 0
+    momento = agora()
+    rowcount = executar_escrita(
+        lambda conn: conn.execute(ATUALIZAR_ULTIMA_LEITURA, (momento, sala_id, usuario_id)).rowcount
+    )
+    return rowcount > 0
 
 
 def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     """
     Conta quantas mensagens não lidas existem para um usuário em uma sala.
 
+    Lê o contador desnormalizado do participante (sem varrer mensagens).
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário
@@ -149,13 +171,43 @@ def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     """
     with obter_conexao() as conn:
         cursor = conn.cursor()
-        # Passar usuario_id 3 vezes: para sala_id, usuario_id != ?, e duas vezes na subquery
-        cursor.execute(CONTAR_MENSAGENS_NAO_LIDAS, (sala_id, usuario_id, usuario_id, usuario_id))
+        cursor.execute(CONTAR_MENSAGENS_NAO_LIDAS, (sala_id, usuario_id))
+        row = cursor.fetchone()
+
+        return row["total"] if row else 0
+
+
+def contar_total_nao_lidas(usuario_id: int) -> int:
+    """
+    Soma as mensagens não lidas de um usuário em todas as suas salas.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        Total de mensagens não lidas
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SOMAR_NAO_LIDAS_POR_USUARIO, (usuario_id,))
         row = cursor.fetchone()
 
         return row["total"] if row else 0
 
 
+def reconstruir_contadores_nao_lidas() -> int:
+    """
+    Recalcula os contadores de não lidas a partir das mensagens.
+
+    Corrige divergências do contador desnormalizado (ex: mensagens
+    excluídas ou escritas feitas fora dos repositórios).
+
+    Returns:
+        Quantidade de participações cujo contador foi corrigido
+    """
+    return executar_escrita(lambda conn: conn.execute(RECONSTRUIR_NAO_LIDAS).rowcount)
+
+
 def excluir(sala_id: str, usuario_id: int) -> bool:
     """
     Remove um participante de uma sala.
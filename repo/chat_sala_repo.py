@@ -1,18 +1,21 @@
 """
 Repositório para operações com a tabela chat_sala.
 """
+from datetime import datetime
 from typing import Optional
 from sqlite3 import Row
 
+from model.chat_conversa_model import ChatConversa
 from model.chat_sala_model import ChatSala
 from sql.chat_sala_sql import (
     CRIAR_TABELA,
     INSERIR,
     OBTER_POR_ID,
     ATUALIZAR_ULTIMA_ATIVIDADE,
-    EXCLUIR
+    EXCLUIR,
+    LISTAR_CONVERSAS_POR_USUARIO
 )
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, executar_escrita
 from util.datetime_util import agora
 
 
@@ -34,6 +37,21 @@ def _row_to_sala(row: Row) -> ChatSala:
     )
 
 
+def _row_to_conversa(row: Row) -> ChatConversa:
+    """Converte uma row do resumo de conversas em objeto ChatConversa."""
+    return ChatConversa(
+        sala_id=row["sala_id"],
+        ultima_atividade=row["ultima_atividade"],
+        outro_usuario_id=row["outro_usuario_id"],
+        outro_usuario_nome=row["outro_usuario_nome"],
+        outro_usuario_email=row["outro_usuario_email"],
+        nao_lidas=row["nao_lidas"],
+        ultima_mensagem=row["ultima_mensagem"],
+        ultima_mensagem_data_envio=row["ultima_mensagem_data_envio"],
+        ultima_mensagem_usuario_id=row["ultima_mensagem_usuario_id"]
+    )
+
+
 def criar_tabela():
     """Cria a tabela chat_sala se não existir."""
     with obter_conexao() as conn:
@@ -127,10 +145,11 @@ def atualizar_ultima_atividade(sala_id: str) -> bool:
     Returns:
         True se atualizado com sucesso, False caso contrário
     """
-    with obter_conexao() as conn:
-        cursor = conn.cursor()
-        cursor.execute(ATUALIZAR_ULTIMA_ATIVIDADE, (agora(), sala_id))
-        return cursor.rowcount > 0
+    momento = agora()
+    rowcount = executar_escrita(
+        lambda conn: conn.execute(ATUALIZAR_ULTIMA_ATIVIDADE, (momento, sala_id)).rowcount
+    )
+    return rowcount > 0
 
 
 def excluir(sala_id: str) -> bool:
@@ -147,3 +166,37 @@ def excluir(sala_id: str) -> bool:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR, (sala_id,))
         return cursor.rowcount > 0
+
+
+def listar_conversas(
+    usuario_id: int,
+    limit: int = 12,
+    offset: int = 0,
+    antes_atividade: Optional[datetime] = None,
+    antes_sala_id: Optional[str] = None
+) -> list[ChatConversa]:
+    """
+    Lista o resumo das conversas de um usuário em uma única query.
+
+    Ordena por última atividade (mais recente primeiro). Para paginar,
+    informe como cursor a ultima_atividade e o sala_id da última conversa
+    da página anterior (keyset); `offset` é mantido por compatibilidade.
+
+    Args:
+        usuario_id: ID do usuário
+        limit: Quantidade máxima de conversas
+        offset: Deslocamento (use 0 ao paginar por cursor)
+        antes_atividade: ultima_atividade da última conversa já exibida
+        antes_sala_id: sala_id da última conversa já exibida
+
+    Returns:
+        Lista de ChatConversa
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            LISTAR_CONVERSAS_POR_USUARIO,
+            (usuario_id, antes_atividade, antes_atividade, antes_atividade,
+             antes_sala_id, limit, offset)
+        )
+        return [_row_to_conversa(row) for row in cursor.fetchall()]
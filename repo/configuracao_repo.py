@@ -7,6 +7,10 @@ from sql.configuracao_sql import (
     OBTER_POR_CHAVE,
     OBTER_TODOS,
     ATUALIZAR,
+    CRIAR_TABELA_VERSAO,
+    INICIALIZAR_VERSAO,
+    CRIAR_TRIGGERS_VERSAO,
+    OBTER_VERSAO,
 )
 from util.db_util import obter_conexao
 from util.logger_config import logger
@@ -34,9 +38,30 @@ def criar_tabela() -> bool:
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        cursor.execute(CRIAR_TABELA_VERSAO)
+        cursor.execute(INICIALIZAR_VERSAO)
+        for trigger in CRIAR_TRIGGERS_VERSAO:
+            cursor.execute(trigger)
         return True
 
 
+def obter_versao() -> int:
+    """
+    Obtém a versão global das configurações.
+
+    A versão é incrementada por triggers a cada inserção, atualização ou
+    exclusão na tabela configuracao, em qualquer processo.
+
+    Returns:
+        Versão atual (0 se a tabela de versão não foi inicializada)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VERSAO)
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+
 def obter_por_chave(chave: str) -> Optional[Configuracao]:
     with obter_conexao() as conn:
         cursor = conn.cursor()
@@ -0,0 +1,39 @@
+from sql.conteudo_versao_sql import (
+    CRIAR_TABELA,
+    INICIALIZAR_VERSAO,
+    CRIAR_TRIGGERS,
+    OBTER_VERSAO,
+)
+from util.db_util import obter_conexao
+
+
+def criar_tabela() -> bool:
+    """
+    Cria a tabela de versão do conteúdo e os triggers em artigo e categoria.
+
+    Deve ser chamada depois da criação das tabelas artigo e categoria.
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+        cursor.execute(INICIALIZAR_VERSAO)
+        for trigger in CRIAR_TRIGGERS:
+            cursor.execute(trigger)
+        return True
+
+
+def obter_versao() -> int:
+    """
+    Obtém a versão global do conteúdo público.
+
+    A versão é incrementada por triggers a cada inserção, alteração ou
+    exclusão de artigos e categorias, em qualquer processo.
+
+    Returns:
+        Versão atual (0 se a tabela de versão não foi inicializada)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VERSAO)
+        row = cursor.fetchone()
+        return row[0] if row else 0
@@ -0,0 +1,182 @@
+"""
+Repositório para operações com a tabela email_pendente (fila de saída de e-mails).
+"""
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlite3 import Row
+
+from model.email_pendente_model import EmailPendente, StatusEmail
+from sql.email_pendente_sql import (
+    CRIAR_TABELA,
+    CRIAR_INDICE_PRONTOS,
+    INSERIR,
+    OBTER_POR_ID,
+    REIVINDICAR_PRONTOS,
+    MARCAR_ENVIADO,
+    REAGENDAR,
+    MARCAR_FALHA,
+    EXCLUIR_ENVIADOS_ANTERIORES,
+    CONTAR_POR_STATUS,
+)
+from util.db_util import obter_conexao, executar_escrita
+
+
+def _row_to_email(row: Row) -> EmailPendente:
+    """Converte uma row do banco em objeto EmailPendente."""
+    return EmailPendente(
+        id=row["id"],
+        para_email=row["para_email"],
+        para_nome=row["para_nome"],
+        assunto=row["assunto"],
+        html=row["html"],
+        texto=row["texto"],
+        status=row["status"],
+        tentativas=row["tentativas"],
+        proxima_tentativa=row["proxima_tentativa"],
+        ultimo_erro=row["ultimo_erro"],
+        criado_em=row["criado_em"],
+        enviado_em=row["enviado_em"],
+    )
+
+
+def criar_tabela():
+    """Cria a tabela email_pendente e seu índice se não existirem."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+        cursor.execute(CRIAR_INDICE_PRONTOS)
+
+
+def inserir(para_email: str, para_nome: str, assunto: str, html: str, texto: Optional[str] = None) -> int:
+    """
+    Enfileira um e-mail para envio imediato.
+
+    Args:
+        para_email: E-mail do destinatário
+        para_nome: Nome do destinatário
+        assunto: Assunto
+        html: Corpo em HTML
+        texto: Corpo em texto puro (opcional)
+
+    Returns:
+        ID do e-mail enfileirado
+    """
+    criado_em = time.time()
+    return executar_escrita(
+        lambda conn: conn.execute(
+            INSERIR, (para_email, para_nome, assunto, html, texto, StatusEmail.PENDENTE.value, criado_em, criado_em)
+        ).lastrowid
+    )
+
+
+def inserir_lote(emails: Sequence[Tuple[str, str, str, str]]) -> List[int]:
+    """
+    Enfileira vários e-mails em uma única transação.
+
+    Args:
+        emails: Tuplas (para_email, para_nome, assunto, html)
+
+    Returns:
+        IDs dos e-mails enfileirados, na ordem recebida
+    """
+    criado_em = time.time()
+
+    def operacao(conn):
+        return [
+            conn.execute(
+                INSERIR,
+                (para_email, para_nome, assunto, html, None, StatusEmail.PENDENTE.value, criado_em, criado_em),
+            ).lastrowid
+            for para_email, para_nome, assunto, html in emails
+        ]
+
+    return executar_escrita(operacao)
+
+
+def obter_por_id(id: int) -> Optional[EmailPendente]:
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_POR_ID, (id,))
+        row = cursor.fetchone()
+        return _row_to_email(row) if row else None
+
+
+def reivindicar_prontos(agora: float, limite: int, reserva_segundos: float) -> List[EmailPendente]:
+    """
+    Reserva um lote de e-mails prontos para envio (operação atômica).
+
+    Os e-mails reservados só voltam a ficar prontos após `reserva_segundos`,
+    então workers concorrentes não enviam o mesmo e-mail.
+
+    Args:
+        agora: Timestamp Unix atual
+        limite: Tamanho máximo do lote
+        reserva_segundos: Duração da reserva
+
+    Returns:
+        Lista de EmailPendente em ordem de criação
+    """
+    parametros = {
+        "status": StatusEmail.PENDENTE.value,
+        "agora": agora,
+        "limite": limite,
+        "reservado_ate": agora + reserva_segundos,
+    }
+    rows = executar_escrita(lambda conn: conn.execute(REIVINDICAR_PRONTOS, parametros).fetchall())
+    return sorted((_row_to_email(row) for row in rows), key=lambda email: email.id)
+
+
+def registrar_resultados(
+    enviados: Sequence[int],
+    reagendados: Sequence[Tuple[int, float, str]],
+    falhas: Sequence[Tuple[int, str]],
+    enviado_em: float
+) -> None:
+    """
+    Registra o resultado de um lote de envios em uma única transação.
+
+    Os enviados têm o corpo (html/texto) descartado: só os metadados
+    permanecem durante a retenção.
+
+    Args:
+        enviados: IDs enviados com sucesso
+        reagendados: Tuplas (id, proxima_tentativa, erro) de falhas temporárias
+        falhas: Tuplas (id, erro) de e-mails que esgotaram as tentativas
+        enviado_em: Timestamp Unix do envio
+    """
+    def operacao(conn):
+        conn.executemany(MARCAR_ENVIADO, [(StatusEmail.ENVIADO.value, enviado_em, id) for id in enviados])
+        conn.executemany(REAGENDAR, [(proxima, erro, id) for id, proxima, erro in reagendados])
+        conn.executemany(MARCAR_FALHA, [(StatusEmail.FALHOU.value, erro, id) for id, erro in falhas])
+
+    executar_escrita(operacao)
+
+
+def excluir_enviados_anteriores(enviado_antes_de: float) -> int:
+    """
+    Remove e-mails já enviados antes de um instante.
+
+    Args:
+        enviado_antes_de: Timestamp Unix limite
+
+    Returns:
+        Quantidade de e-mails removidos
+    """
+    return executar_escrita(
+        lambda conn: conn.execute(
+            EXCLUIR_ENVIADOS_ANTERIORES, (StatusEmail.ENVIADO.value, enviado_antes_de)
+        ).rowcount
+    )
+
+
+def contar_por_status() -> Dict[str, int]:
+    """
+    Conta os e-mails da fila por status.
+
+    Returns:
+        Dicionário {status: quantidade}
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONTAR_POR_STATUS)
+        return {row["status"]: row["quantidade"] for row in cursor.fetchall()}
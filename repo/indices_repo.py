@@ -13,12 +13,16 @@ def criar_indices() -> None:
     Cria todos os índices do banco de dados.
 
     Deve ser chamado no startup da aplicação após criar todas as tabelas.
-    Índices melhoram performance de queries frequentes.
+    Índices melhoram performance de queries frequentes. Índices obsoletos
+    (substituídos por compostos) são removidos antes.
     """
     try:
         with obter_conexao() as conn:
             cursor = conn.cursor()
 
+            for remocao_sql in indices_sql.INDICES_OBSOLETOS:
+                cursor.execute(remocao_sql)
+
             for indice_sql in indices_sql.TODOS_INDICES:
                 try:
                     cursor.execute(indice_sql)
@@ -32,3 +36,23 @@ def criar_indices() -> None:
     except sqlite3.Error as e:
         logger.error(f"Erro ao criar índices: {e}")
         # Não lançar exceção - índices são otimização, não críticos
+
+
+def obter_plano_consulta(sql: str, parametros: tuple = ()) -> list[str]:
+    """
+    Retorna o plano de execução (EXPLAIN QUERY PLAN) de uma consulta.
+
+    Útil para verificar se as consultas críticas usam os índices esperados
+    e não recorrem a B-trees temporárias para ORDER BY/GROUP BY.
+
+    Args:
+        sql: Consulta a analisar
+        parametros: Valores para os placeholders (qualquer valor do tipo certo)
+
+    Returns:
+        Lista com o detalhe de cada passo do plano
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parametros)
+        return [row["detail"] for row in cursor.fetchall()]
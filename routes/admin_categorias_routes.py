@@ -10,7 +10,7 @@ from model.categoria_model import Categoria
 from model.usuario_logado_model import UsuarioLogado
 
 # Repositório
-from repo import categoria_repo
+from repo.async_repo import categoria_repo
 
 # Utilitários
 from util.auth_decorator import requer_autenticacao
@@ -64,7 +64,7 @@ async def listar(
     Lista todas as categorias.
     Acessível em: GET /admin/categorias/listar
     """
-    categorias = categoria_repo.obter_todos()
+    categorias = await categoria_repo.obter_todos()
 
     return templates.TemplateResponse(
         "admin/categorias/listar.html",
@@ -121,7 +121,7 @@ async def post_cadastrar(
         dto = CriarCategoriaDTO(nome=nome, descricao=descricao)
 
         # Verifica duplicidade
-        categoria_existente = categoria_repo.obter_por_nome(dto.nome)
+        categoria_existente = await categoria_repo.obter_por_nome(dto.nome)
         if categoria_existente:
             informar_erro(request, "Já existe uma categoria com este nome.")
             return RedirectResponse(
@@ -130,7 +130,7 @@ async def post_cadastrar(
             )
 
         nova_categoria = Categoria(nome=dto.nome, descricao=dto.descricao)
-        categoria_inserida = categoria_repo.inserir(nova_categoria)
+        categoria_inserida = await categoria_repo.inserir(nova_categoria)
 
         if categoria_inserida:
             informar_sucesso(request, "Categoria cadastrada com sucesso!")
@@ -165,7 +165,7 @@ async def get_editar(
     Exibe o formulário de edição de uma categoria.
     Acessível em: GET /admin/categorias/editar/<id>
     """
-    categoria = categoria_repo.obter_por_id(id)
+    categoria = await categoria_repo.obter_por_id(id)
 
     if not categoria:
         informar_erro(request, "Categoria não encontrada.")
@@ -210,7 +210,7 @@ async def post_editar(
         )
 
     # Busca a categoria
-    categoria_atual = categoria_repo.obter_por_id(id)
+    categoria_atual = await categoria_repo.obter_por_id(id)
     if not categoria_atual:
         informar_erro(request, "Categoria não encontrada.")
         return RedirectResponse(
@@ -223,7 +223,7 @@ async def post_editar(
 
         # Se o nome mudou, verifica duplicidade
         if dto.nome != categoria_atual.nome:
-            categoria_existente = categoria_repo.obter_por_nome(dto.nome)
+            categoria_existente = await categoria_repo.obter_por_nome(dto.nome)
             if categoria_existente:
                 informar_erro(request, "Já existe uma categoria com este nome.")
                 return RedirectResponse(
@@ -235,7 +235,7 @@ async def post_editar(
         categoria_atual.nome = dto.nome
         categoria_atual.descricao = dto.descricao
 
-        if categoria_repo.alterar(categoria_atual):
+        if await categoria_repo.alterar(categoria_atual):
             informar_sucesso(request, "Categoria alterada com sucesso!")
             return RedirectResponse(
                 url="/admin/categorias/listar",
@@ -288,7 +288,7 @@ async def post_excluir(
         )
 
     # Busca a categoria
-    categoria = categoria_repo.obter_por_id(id)
+    categoria = await categoria_repo.obter_por_id(id)
     if not categoria:
         informar_erro(request, "Categoria não encontrada.")
         return RedirectResponse(
@@ -297,7 +297,7 @@ async def post_excluir(
         )
 
     # Exclui do banco
-    if categoria_repo.excluir(id):
+    if await categoria_repo.excluir(id):
         informar_sucesso(request, f"Categoria '{categoria.nome}' excluída com sucesso!")
     else:
         informar_erro(request, "Erro ao excluir categoria.")
@@ -30,7 +30,7 @@ from model.chamado_interacao_model import ChamadoInteracao, TipoInteracao
 from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
-from repo import chamado_repo, chamado_interacao_repo
+from repo.async_repo import chamado_repo, chamado_interacao_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
@@ -70,7 +70,7 @@ async def listar(request: Request, usuario_logado: Optional[UsuarioLogado] = Non
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     # Passa ID do admin para contar apenas mensagens de OUTROS usuários
-    chamados = chamado_repo.obter_todos(usuario_logado.id)
+    chamados = await chamado_repo.obter_todos(usuario_logado.id)
     return templates.TemplateResponse(
         "admin/chamados/listar.html",
         {"request": request, "chamados": chamados, "usuario_logado": usuario_logado}
@@ -86,7 +86,7 @@ async def get_responder(request: Request, id: int, usuario_logado: Optional[Usua
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await chamado_repo.obter_por_id(id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -95,10 +95,10 @@ async def get_responder(request: Request, id: int, usuario_logado: Optional[Usua
         return chamado
 
     # Marcar mensagens como lidas (apenas as de outros usuários)
-    chamado_interacao_repo.marcar_como_lidas(id, usuario_logado.id)
+    await chamado_interacao_repo.marcar_como_lidas(id, usuario_logado.id)
 
     # Obter histórico de interações
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await chamado_interacao_repo.obter_por_chamado(id)
 
     return templates.TemplateResponse(
         "admin/chamados/responder.html",
@@ -131,7 +131,7 @@ async def post_responder(
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await chamado_repo.obter_por_id(id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -140,7 +140,7 @@ async def post_responder(
         return chamado
 
     # Obter interações para reexibir em caso de erro
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await chamado_interacao_repo.obter_por_chamado(id)
 
     # Armazena os dados do formulário para reexibição em caso de erro
     dados_formulario: dict = {
@@ -165,11 +165,11 @@ async def post_responder(
             data_interacao=agora(),
             status_resultante=dto_status.status
         )
-        chamado_interacao_repo.inserir(interacao)
+        await chamado_interacao_repo.inserir(interacao)
 
         # Atualizar status do chamado
         fechar = (dto_status.status == StatusChamado.FECHADO.value)
-        sucesso = chamado_repo.atualizar_status(
+        sucesso = await chamado_repo.atualizar_status(
             id=id,
             status=dto_status.status,
             fechar=fechar
@@ -203,7 +203,7 @@ async def fechar(request: Request, id: int, usuario_logado: Optional[UsuarioLoga
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await chamado_repo.obter_por_id(id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -211,7 +211,7 @@ async def fechar(request: Request, id: int, usuario_logado: Optional[UsuarioLoga
     if isinstance(chamado, RedirectResponse):
         return chamado
 
-    sucesso = chamado_repo.atualizar_status(
+    sucesso = await chamado_repo.atualizar_status(
         id=id,
         status=StatusChamado.FECHADO.value,
         fechar=True
@@ -235,7 +235,7 @@ async def reabrir(request: Request, id: int, usuario_logado: Optional[UsuarioLog
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await chamado_repo.obter_por_id(id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -248,7 +248,7 @@ async def reabrir(request: Request, id: int, usuario_logado: Optional[UsuarioLog
         informar_erro(request, "Apenas chamados fechados podem ser reabertos")
         return RedirectResponse("/admin/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    sucesso = chamado_repo.atualizar_status(
+    sucesso = await chamado_repo.atualizar_status(
         id=id,
         status=StatusChamado.EM_ANALISE.value,
         fechar=False
@@ -20,14 +20,18 @@ from dtos.configuracao_dto import SalvarConfiguracaoLoteDTO
 from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
-from repo import configuracao_repo
+from repo.async_repo import configuracao_repo
 
 # Utilities
+from util.asset_util import manifesto_assets
 from util.auth_decorator import requer_autenticacao
+from util.compressao_util import precomprimir_arquivo
 from util.config_cache import config
 from util.datetime_util import agora
+from util.db_async import executar_em_thread
 from util.flash_messages import informar_sucesso, informar_erro, informar_aviso
 from util.logger_config import logger
+from util.pagina_cache import cache_paginas
 from util.perfis import Perfil
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.template_util import criar_templates
@@ -74,7 +78,7 @@ async def get_listar_configuracoes(request: Request, usuario_logado: Optional[Us
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     try:
         # Obter configurações agrupadas por categoria
-        configs_por_categoria = configuracao_repo.obter_por_categoria()
+        configs_por_categoria = await configuracao_repo.obter_por_categoria()
 
         # Calcular total de configurações
         total_configs = sum(len(configs) for configs in configs_por_categoria.values())
@@ -147,10 +151,10 @@ async def post_salvar_lote_configuracoes(
         dto = SalvarConfiguracaoLoteDTO(configs=configs)
 
         # Atualizar configurações no banco
-        quantidade_atualizada, chaves_nao_encontradas = configuracao_repo.atualizar_multiplas(dto.configs)
+        quantidade_atualizada, chaves_nao_encontradas = await configuracao_repo.atualizar_multiplas(dto.configs)
 
-        # Limpar cache de configurações
-        config.limpar()
+        # Publicar novo snapshot de configurações (uma consulta, troca atômica)
+        await executar_em_thread(config.recarregar)
 
         # Log de auditoria
         logger.info(
@@ -214,7 +218,7 @@ async def get_tema(request: Request, usuario_logado: Optional[UsuarioLogado] = N
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     # Obter tema atual do banco de dados
-    config_tema = configuracao_repo.obter_por_chave("theme")
+    config_tema = await configuracao_repo.obter_por_chave("theme")
     tema_atual = config_tema.valor if config_tema else "original"
 
     # Listar todos os arquivos PNG na pasta de imagens dos temas
@@ -269,7 +273,7 @@ async def post_aplicar_tema(
 
     try:
         # Obter tema anterior para o log
-        config_existente = configuracao_repo.obter_por_chave("theme")
+        config_existente = await configuracao_repo.obter_por_chave("theme")
 
         # Validar tema contra whitelist (prevenção de Path Traversal)
         tema_normalizado = tema.lower().strip()
@@ -289,19 +293,27 @@ async def post_aplicar_tema(
             return RedirectResponse("/admin/tema", status_code=status.HTTP_303_SEE_OTHER)
 
         # Copiar arquivo CSS do tema para bootstrap.min.css
+        # (copy, não copy2: o mtime novo muda a versão da URL em todos os workers)
         css_destino = Path("static/css/bootstrap.min.css")
-        shutil.copy2(css_origem, css_destino)
+        shutil.copy(css_origem, css_destino)
+        # Os .gz/.br antigos ficam mais velhos que o CSS e deixam de ser servidos:
+        # gerar os novos (fora do event loop: brotli máximo leva ~1 s) mantém o CSS comprimido
+        await executar_em_thread(precomprimir_arquivo, css_destino)
+        # Registrar o hash novo no manifesto aqui: a renderização só faz stat
+        await executar_em_thread(manifesto_assets.atualizar, "css/bootstrap.min.css")
+        # Páginas públicas em cache apontam para a versão anterior do CSS
+        cache_paginas.invalidar()
 
         # Atualizar ou inserir configuração no banco (upsert)
-        sucesso = configuracao_repo.inserir_ou_atualizar(
+        sucesso = await configuracao_repo.inserir_ou_atualizar(
             chave="theme",
             valor=tema_normalizado,
             descricao="Tema visual da aplicação (Bootswatch)"
         )
 
         if sucesso:
-            # Limpar cache de configurações
-            config.limpar()
+            # Publicar novo snapshot de configurações (uma consulta, troca atômica)
+            await executar_em_thread(config.recarregar)
 
             logger.info(
                 f"Tema alterado para '{tema_normalizado}' por admin {usuario_logado.id} "
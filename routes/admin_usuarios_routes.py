@@ -18,17 +18,18 @@ from model.usuario_model import Usuario
 from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
-from repo import usuario_repo
+from repo.async_repo import usuario_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
+from util.db_async import executar_em_thread
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.perfis import Perfil
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.repository_helpers import obter_ou_404
-from util.security import criar_hash_senha
+from util.senha_service import servico_senha
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 
@@ -67,7 +68,7 @@ async def listar(request: Request, usuario_logado: Optional[UsuarioLogado] = Non
     """Lista todos os usuários do sistema"""
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
-    usuarios = usuario_repo.obter_todos()
+    usuarios = await usuario_repo.obter_todos()
     return templates.TemplateResponse(
         "admin/usuarios/listar.html",
         {"request": request, "usuarios": usuarios, "usuario_logado": usuario_logado}
@@ -120,7 +121,7 @@ async def post_cadastrar(
         )
 
         # Verificar se e-mail já existe
-        disponivel, mensagem_erro = verificar_email_disponivel(dto.email)
+        disponivel, mensagem_erro = await executar_em_thread(verificar_email_disponivel, dto.email)
         if not disponivel:
             informar_erro(request, mensagem_erro)
             perfis = Perfil.valores()
@@ -135,7 +136,7 @@ async def post_cadastrar(
             )
 
         # Criar hash da senha
-        senha_hash = criar_hash_senha(dto.senha)
+        senha_hash = await servico_senha.gerar_hash(dto.senha)
 
         # Criar usuário
         usuario = Usuario(
@@ -146,7 +147,7 @@ async def post_cadastrar(
             perfil=dto.perfil
         )
 
-        usuario_repo.inserir(usuario)
+        await usuario_repo.inserir(usuario)
         logger.info(f"Usuário '{dto.email}' cadastrado por admin {usuario_logado.id}")
 
         informar_sucesso(request, "Usuário cadastrado com sucesso!")
@@ -171,7 +172,7 @@ async def get_editar(request: Request, id: int, usuario_logado: Optional[Usuario
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     # Obter usuário ou retornar 404
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await usuario_repo.obter_por_id(id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar"
@@ -218,7 +219,7 @@ async def post_editar(
 
     # Obter usuário ou retornar 404
     usuario_atual = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await usuario_repo.obter_por_id(id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar"
@@ -239,7 +240,7 @@ async def post_editar(
         )
 
         # Verificar se e-mail já existe em outro usuário
-        disponivel, mensagem_erro = verificar_email_disponivel(dto.email, id)
+        disponivel, mensagem_erro = await executar_em_thread(verificar_email_disponivel, dto.email, id)
         if not disponivel:
             informar_erro(request, mensagem_erro)
             perfis = Perfil.valores()
@@ -263,7 +264,7 @@ async def post_editar(
             perfil=dto.perfil
         )
 
-        usuario_repo.alterar(usuario_atualizado)
+        await usuario_repo.alterar(usuario_atualizado)
         logger.info(f"Usuário {id} alterado por admin {usuario_logado.id}")
 
         informar_sucesso(request, "Usuário alterado com sucesso!")
@@ -272,7 +273,7 @@ async def post_editar(
     except ValidationError as e:
         # Adicionar perfis e usuario aos dados para renderizar o template
         dados_formulario["perfis"] = Perfil.valores()
-        dados_formulario["usuario"] = usuario_repo.obter_por_id(id)
+        dados_formulario["usuario"] = await usuario_repo.obter_por_id(id)
         raise ErroValidacaoFormulario(
             validation_error=e,
             template_path="admin/usuarios/editar.html",
@@ -296,7 +297,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
 
     # Obter usuário ou retornar 404
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await usuario_repo.obter_por_id(id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar"
@@ -310,7 +311,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
         logger.warning(f"Admin {usuario_logado.id} tentou excluir a si mesmo")
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    usuario_repo.excluir(id)
+    await usuario_repo.excluir(id)
     logger.info(f"Usuário {id} ({usuario.email}) excluído por admin {usuario_logado.id}")
     informar_sucesso(request, "Usuário excluído com sucesso!")
     return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
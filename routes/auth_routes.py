@@ -17,22 +17,22 @@ from dtos.auth_dto import LoginDTO, CadastroDTO, EsqueciSenhaDTO, RedefinirSenha
 from model.usuario_model import Usuario
 
 # Repositories
-from repo import usuario_repo
+from repo.async_repo import usuario_repo
 
 # Utilities
 from util.auth_decorator import criar_sessao
 from util.datetime_util import agora
+from util.db_async import executar_em_thread
 from util.email_service import servico_email
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.security import (
-    criar_hash_senha,
-    verificar_senha,
     gerar_token_redefinicao,
     obter_data_expiracao_token,
 )
+from util.senha_service import servico_senha
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 from model.usuario_logado_model import UsuarioLogado
@@ -172,10 +172,14 @@ async def post_login(
         dto = LoginDTO(email=email, senha=senha)
 
         # Buscar usuário
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await usuario_repo.obter_por_email(dto.email)
 
-        # Verificar credenciais
-        if not usuario or not verificar_senha(dto.senha, usuario.senha):
+        # Verificar credenciais (bcrypt no pool de senhas, fora do event loop)
+        senha_correta, novo_hash = False, None
+        if usuario:
+            senha_correta, novo_hash = await servico_senha.verificar_e_atualizar(dto.senha, usuario.senha)
+
+        if not senha_correta:
             informar_erro(request, "E-mail ou senha inválidos")
             logger.warning(f"Tentativa de login falhou para: {dto.email}")
             erros = {"geral": "E-mail ou senha inválidos"}
@@ -189,6 +193,11 @@ async def post_login(
                 },
             )
 
+        # Parâmetros do bcrypt mudaram: gravar o hash regerado no login
+        if novo_hash:
+            await usuario_repo.atualizar_senha(usuario.id, novo_hash)
+            logger.info(f"Hash de senha atualizado para os parâmetros atuais: {usuario.email}")
+
         # Salvar sessão
         usuario_logado = UsuarioLogado.from_usuario(usuario)
         criar_sessao(request, usuario_logado)
@@ -260,7 +269,7 @@ async def post_cadastrar(
         )
 
         # Verificar se e-mail já existe
-        disponivel, mensagem_erro = verificar_email_disponivel(dto.email)
+        disponivel, mensagem_erro = await executar_em_thread(verificar_email_disponivel, dto.email)
         if not disponivel:
             informar_erro(request, mensagem_erro)
             return templates.TemplateResponse(
@@ -272,18 +281,18 @@ async def post_cadastrar(
             id=0,
             nome=dto.nome,
             email=dto.email,
-            senha=criar_hash_senha(dto.senha),
+            senha=await servico_senha.gerar_hash(dto.senha),
             perfil=dto.perfil,
         )
 
         # Inserir no banco
-        usuario_id = usuario_repo.inserir(usuario)
+        usuario_id = await usuario_repo.inserir(usuario)
 
         if usuario_id:
             logger.info(f"Novo usuário cadastrado: {usuario.email}")
 
-            # Enviar e-mail de boas-vindas
-            servico_email.enviar_boas_vindas(usuario.email, usuario.nome)
+            # Enfileirar e-mail de boas-vindas (enviado em background)
+            await executar_em_thread(servico_email.enfileirar_boas_vindas, usuario.email, usuario.nome)
 
             informar_sucesso(
                 request, "Cadastro realizado com sucesso! Faça login para continuar."
@@ -333,7 +342,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
         dto = EsqueciSenhaDTO(email=email)
 
         # Buscar usuário
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await usuario_repo.obter_por_email(dto.email)
 
         if usuario:
             # Gerar token de redefinição
@@ -341,19 +350,11 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
             data_expiracao = obter_data_expiracao_token(horas=TOKEN_EXPIRACAO_HORAS)
 
             # Salvar token no banco
-            usuario_repo.atualizar_token(usuario.email, token, data_expiracao)
+            await usuario_repo.atualizar_token(usuario.email, token, data_expiracao)
 
-            # Enviar e-mail com link de recuperação
-            email_enviado = servico_email.enviar_recuperacao_senha(
-                usuario.email, usuario.nome, token
-            )
-
-            if email_enviado:
-                logger.info(f"E-mail de recuperação enviado para: {usuario.email}")
-            else:
-                logger.error(
-                    f"Falha ao enviar e-mail de recuperação para: {usuario.email}"
-                )
+            # Enfileirar e-mail com link de recuperação (enviado em background)
+            await executar_em_thread(servico_email.enfileirar_recuperacao_senha, usuario.email, usuario.nome, token)
+            logger.info(f"E-mail de recuperação enfileirado para: {usuario.email}")
 
         # Sempre retornar mesma mensagem (segurança)
         informar_sucesso(
@@ -375,7 +376,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
 async def get_redefinir_senha(request: Request, token: str):
     """Exibe formulário de redefinição de senha"""
     # Validar token
-    usuario = usuario_repo.obter_por_token(token)
+    usuario = await usuario_repo.obter_por_token(token)
 
     if not usuario or not usuario.data_token:
         informar_erro(request, "Token inválido ou expirado")
@@ -420,7 +421,7 @@ async def post_redefinir_senha(
         )
 
         # Validar token e expiração
-        usuario = usuario_repo.obter_por_token(dto.token)
+        usuario = await usuario_repo.obter_por_token(dto.token)
 
         if not usuario or not usuario.data_token:
             informar_erro(request, "Token inválido")
@@ -444,11 +445,11 @@ async def post_redefinir_senha(
             )
 
         # Atualizar senha
-        senha_hash = criar_hash_senha(dto.senha)
-        usuario_repo.atualizar_senha(usuario.id, senha_hash)
+        senha_hash = await servico_senha.gerar_hash(dto.senha)
+        await usuario_repo.atualizar_senha(usuario.id, senha_hash)
 
         # Limpar token
-        usuario_repo.limpar_token(usuario.id)
+        await usuario_repo.limpar_token(usuario.id)
 
         logger.info(f"Senha redefinida com sucesso para usuário: {usuario.email}")
         informar_sucesso(
@@ -30,7 +30,7 @@ from model.chamado_interacao_model import ChamadoInteracao, TipoInteracao
 from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
-from repo import chamado_repo, chamado_interacao_repo
+from repo.async_repo import chamado_repo, chamado_interacao_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
@@ -78,7 +78,7 @@ async def listar(request: Request, usuario_logado: Optional[UsuarioLogado] = Non
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     # Passa usuario_id para obter_por_usuario - a função já usa esse ID
     # para contar apenas mensagens de OUTROS usuários
-    chamados = chamado_repo.obter_por_usuario(usuario_logado.id)
+    chamados = await chamado_repo.obter_por_usuario(usuario_logado.id)
     return templates.TemplateResponse(
         "chamados/listar.html",
         {"request": request, "chamados": chamados, "usuario_logado": usuario_logado}
@@ -153,7 +153,7 @@ async def post_cadastrar(
             usuario_id=usuario_logado.id
         )
 
-        chamado_id = chamado_repo.inserir(chamado)
+        chamado_id = await chamado_repo.inserir(chamado)
 
         # Criar interação inicial com a descrição do chamado
         interacao = ChamadoInteracao(
@@ -165,7 +165,7 @@ async def post_cadastrar(
             data_interacao=agora(),
             status_resultante=StatusChamado.ABERTO.value
         )
-        chamado_interacao_repo.inserir(interacao)
+        await chamado_interacao_repo.inserir(interacao)
 
         logger.info(
             f"Chamado #{chamado_id} '{dto.titulo}' criado por usuário {usuario_logado.id}"
@@ -192,7 +192,7 @@ async def visualizar(request: Request, id: int, usuario_logado: Optional[Usuario
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await chamado_repo.obter_por_id(id),
         request,
         "Chamado não encontrado",
         "/chamados/listar"
@@ -211,10 +211,10 @@ async def visualizar(request: Request, id: int, usuario_logado: Optional[Usuario
         return RedirectResponse("/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Marcar mensagens como lidas (apenas as de outros usuários)
-    chamado_interacao_repo.marcar_como_lidas(id, usuario_logado.id)
+    await chamado_interacao_repo.marcar_como_lidas(id, usuario_logado.id)
 
     # Obter histórico de interações
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await chamado_interacao_repo.obter_por_chamado(id)
 
     return templates.TemplateResponse(
         "chamados/visualizar.html",
@@ -246,7 +246,7 @@ async def post_responder(
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await chamado_repo.obter_por_id(id),
         request,
         "Chamado não encontrado",
         "/chamados/listar"
@@ -265,7 +265,7 @@ async def post_responder(
         return RedirectResponse("/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Armazena os dados do formulário para reexibição em caso de erro
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await chamado_interacao_repo.obter_por_chamado(id)
     dados_formulario: dict = {
         "mensagem": mensagem,
         "chamado": chamado,
@@ -286,7 +286,7 @@ async def post_responder(
             data_interacao=agora(),
             status_resultante=chamado.status.value  # Mantém status atual
         )
-        chamado_interacao_repo.inserir(interacao)
+        await chamado_interacao_repo.inserir(interacao)
 
         logger.info(
             f"Usuário {usuario_logado.id} respondeu ao chamado {id}"
@@ -313,7 +313,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await chamado_repo.obter_por_id(id),
         request,
         "Chamado não encontrado",
         "/chamados/listar"
@@ -340,7 +340,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
         return RedirectResponse("/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Verificar se há respostas de administrador
-    if chamado_interacao_repo.tem_resposta_admin(id):
+    if await chamado_interacao_repo.tem_resposta_admin(id):
         informar_erro(request, "Não é possível excluir chamados que já possuem resposta do administrador")
         logger.warning(
             f"Usuário {usuario_logado.id} tentou excluir chamado {id} que possui respostas de admin"
@@ -348,7 +348,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
         return RedirectResponse("/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Tudo OK, pode excluir
-    chamado_repo.excluir(id)
+    await chamado_repo.excluir(id)
     logger.info(f"Chamado {id} excluído por usuário {usuario_logado.id}")
     informar_sucesso(request, "Chamado excluído com sucesso!")
 
@@ -9,7 +9,8 @@ Rotas para o sistema de chat em tempo real.
 # Standard library
 import json
 import asyncio
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
 
 # Third-party
 from fastapi import APIRouter, Request, status, HTTPException, Form
@@ -20,14 +21,15 @@ from pydantic import ValidationError
 from dtos.chat_dto import CriarSalaDTO, EnviarMensagemDTO
 
 # Models
+from model.chat_mensagem_model import ChatMensagem
 from model.usuario_logado_model import UsuarioLogado
 
-# Repositories
-from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, usuario_repo
+# Repositories (fachadas assíncronas: queries rodam fora do event loop)
+from repo.async_repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, usuario_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
-from util.chat_manager import gerenciador_chat
+from util.chat_manager import CHAT_SSE_HEARTBEAT_SEGUNDOS, EventoChat, gerenciador_chat
 from util.datetime_util import agora
 from util.foto_util import obter_caminho_foto_usuario
 from util.logger_config import logger
@@ -74,36 +76,175 @@ chat_listagem_limiter = DynamicRateLimiter(
 )
 
 
+# =============================================================================
+# Eventos SSE
+# =============================================================================
+
+# Máximo de mensagens reenviadas do banco em uma reconexão
+CHAT_REENVIO_MAXIMO = 100
+
+# Tamanho pedido para as fotos do widget (avatares de 40px)
+CHAT_TAMANHO_FOTO = 64
+
+
+def _evento_nova_mensagem(mensagem: ChatMensagem) -> dict:
+    """Monta o evento SSE "nova_mensagem" de uma mensagem."""
+    return {
+        "tipo": "nova_mensagem",
+        "sala_id": mensagem.sala_id,
+        "mensagem": {
+            "id": mensagem.id,
+            "sala_id": mensagem.sala_id,
+            "usuario_id": mensagem.usuario_id,
+            "mensagem": mensagem.mensagem,
+            "data_envio": mensagem.data_envio.isoformat() if mensagem.data_envio else None,
+            "lida_em": mensagem.lida_em.isoformat() if mensagem.lida_em else None
+        }
+    }
+
+
+def _formatar_evento_sse(evento: dict, ultima_mensagem_id: Optional[int] = None) -> str:
+    """
+    Serializa um evento no formato SSE (com "id:" quando o evento tem ID).
+
+    Com `ultima_mensagem_id`, o "id:" leva também o ID da última mensagem
+    entregue na conexão ("<evento>-<mensagem>"), cursor do reenvio do banco.
+    """
+    evento_id = getattr(evento, "id", None)
+    if evento_id is None:
+        prefixo = ""
+    elif ultima_mensagem_id is None:
+        prefixo = f"id: {evento_id}\n"
+    else:
+        prefixo = f"id: {evento_id}-{ultima_mensagem_id}\n"
+    return f"{prefixo}data: {json.dumps(evento)}\n\n"
+
+
+def _formatar_lote_sse(eventos: List[dict], ultima_mensagem_id: int) -> Tuple[str, int]:
+    """
+    Serializa eventos em uma única escrita, avançando o cursor de mensagens.
+
+    Args:
+        eventos: Eventos a enviar
+        ultima_mensagem_id: ID da última mensagem entregue na conexão
+
+    Returns:
+        Tupla (texto SSE, ID da última mensagem entregue após o lote)
+    """
+    partes = []
+    for evento in eventos:
+        if evento.get("tipo") == "nova_mensagem":
+            ultima_mensagem_id = max(ultima_mensagem_id, evento["mensagem"]["id"])
+        partes.append(_formatar_evento_sse(evento, ultima_mensagem_id))
+    return "".join(partes), ultima_mensagem_id
+
+
+def _obter_ultimo_evento_id(request: Request) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Lê o Last-Event-ID enviado pelo EventSource ao reconectar.
+
+    Returns:
+        Tupla (ID do evento, ID da última mensagem entregue); o ID da
+        mensagem é None no formato antigo, só com o ID do evento
+    """
+    valor = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    if not valor:
+        return None, None
+    evento, _, mensagem = valor.partition("-")
+    try:
+        return int(evento), int(mensagem) if mensagem else None
+    except ValueError:
+        return None, None
+
+
+async def _eventos_perdidos_do_banco(
+    usuario_id: int, ultima_mensagem_id: Optional[int], evento_id: int
+) -> List[dict]:
+    """
+    Reconstrói do banco os eventos perdidos desde a última mensagem entregue.
+
+    O cursor é o ID da mensagem (keyset `m.id > ?`), não o instante de envio:
+    uma mensagem gravada antes e publicada depois de outra já entregue
+    continua sendo reenviada. Mensagens posteriores viram eventos
+    "nova_mensagem" e um "atualizar_contador" final atualiza os contadores
+    (recibos de leitura não são reconstruídos). Sem cursor (Last-Event-ID
+    no formato antigo), só os contadores são atualizados.
+
+    Args:
+        usuario_id: ID do usuário reconectando
+        ultima_mensagem_id: ID da última mensagem entregue ao cliente
+        evento_id: ID de evento dos eventos reenviados (o último gerado no
+            registro da conexão, para que uma nova reconexão não os repita)
+
+    Returns:
+        Lista de eventos a enviar antes dos eventos ao vivo
+    """
+    eventos: List[dict] = []
+    if ultima_mensagem_id is not None:
+        mensagens = await chat_mensagem_repo.listar_por_usuario_depois_de(
+            usuario_id, ultima_mensagem_id, CHAT_REENVIO_MAXIMO
+        )
+        eventos = [EventoChat(_evento_nova_mensagem(mensagem), evento_id) for mensagem in mensagens]
+    eventos.append({"tipo": "atualizar_contador"})
+    return eventos
+
+
 @router.get("/stream")
 @requer_autenticacao()
 async def stream_mensagens(request: Request, usuario_logado: Optional[UsuarioLogado] = None):
     """
     Endpoint SSE para receber mensagens em tempo real.
-    Cada usuário mantém UMA conexão que recebe mensagens de TODAS as suas salas.
+    Cada conexão (aba) recebe mensagens de TODAS as salas do usuário.
+
+    Eventos levam "id:" crescente com o ID da última mensagem entregue; ao
+    reconectar, o EventSource envia o Last-Event-ID e os eventos perdidos são
+    reenviados (do buffer em memória ou, se ele não cobre o intervalo, das
+    mensagens com ID maior no banco). Sem eventos,
+    um comentário de heartbeat é enviado a cada CHAT_SSE_HEARTBEAT_SEGUNDOS.
     """
     if not usuario_logado:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
     usuario_id = usuario_logado.id
+    ultimo_evento_id, ultima_mensagem_id = _obter_ultimo_evento_id(request)
 
     async def event_generator():
-        # Conectar usuário ao GerenciadorChat
-        queue = await gerenciador_chat.conectar(usuario_id)
-        try:
-            while True:
-                # Aguardar mensagem na fila
-                evento = await queue.get()
-
-                # Formatar como SSE
-                sse_data = f"data: {json.dumps(evento)}\n\n"
-                yield sse_data
+        # Cursor do reenvio: mensagens já existentes na primeira conexão não são reenviadas
+        cursor_mensagem = ultima_mensagem_id
+        if cursor_mensagem is None:
+            cursor_mensagem = await chat_mensagem_repo.obter_ultimo_id()
 
-                # Pequeno delay para não sobrecarregar
-                await asyncio.sleep(0.1)
+        # Conectar usuário ao GerenciadorChat (uma conexão por aba)
+        conexao = await gerenciador_chat.conectar(usuario_id, ultimo_evento_id)
+        try:
+            # IDs de mensagens reenviadas do banco (podem chegar de novo ao vivo)
+            reenviadas: Set[int] = set()
+            if conexao.reenviar_do_banco_desde is not None:
+                perdidos = await _eventos_perdidos_do_banco(
+                    usuario_id, ultima_mensagem_id, conexao.evento_id_inicial
+                )
+                reenviadas = {evento["mensagem"]["id"] for evento in perdidos if "mensagem" in evento}
+                texto, cursor_mensagem = _formatar_lote_sse(perdidos, cursor_mensagem)
+                yield texto
+
+            while not conexao.encerrada:
+                # Aguardar o próximo evento e drenar todos os pendentes em uma escrita
+                eventos = await conexao.obter_lote(CHAT_SSE_HEARTBEAT_SEGUNDOS)
+                if reenviadas:
+                    eventos = [
+                        evento for evento in eventos
+                        if evento.get("mensagem", {}).get("id") not in reenviadas
+                    ]
+                if eventos:
+                    texto, cursor_mensagem = _formatar_lote_sse(eventos, cursor_mensagem)
+                    yield texto
+                elif not conexao.encerrada:
+                    # Comentário SSE: mantém a conexão viva sem disparar onmessage
+                    yield ": heartbeat\n\n"
         except asyncio.CancelledError:
             logger.info(f"[SSE] Conexão cancelada para usuário {usuario_id}")
         finally:
             # Desconectar ao fechar stream
-            await gerenciador_chat.desconectar(usuario_id)
+            await gerenciador_chat.desconectar(usuario_id, conexao.id)
 
     return StreamingResponse(
         event_generator(),
@@ -150,7 +291,7 @@ async def criar_ou_obter_sala(
             )
 
         # Verificar se outro usuário existe
-        outro_usuario = usuario_repo.obter_por_id(dto.outro_usuario_id)
+        outro_usuario = await usuario_repo.obter_por_id(dto.outro_usuario_id)
         if not outro_usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -158,16 +299,16 @@ async def criar_ou_obter_sala(
             )
 
         # Criar ou obter sala
-        sala = chat_sala_repo.criar_ou_obter_sala(usuario_logado.id, dto.outro_usuario_id)
+        sala = await chat_sala_repo.criar_ou_obter_sala(usuario_logado.id, dto.outro_usuario_id)
 
         # Adicionar participantes se sala foi recém-criada
-        participante1 = chat_participante_repo.obter_por_sala_e_usuario(sala.id, usuario_logado.id)
+        participante1 = await chat_participante_repo.obter_por_sala_e_usuario(sala.id, usuario_logado.id)
         if not participante1:
-            chat_participante_repo.adicionar_participante(sala.id, usuario_logado.id)
+            await chat_participante_repo.adicionar_participante(sala.id, usuario_logado.id)
 
-        participante2 = chat_participante_repo.obter_por_sala_e_usuario(sala.id, dto.outro_usuario_id)
+        participante2 = await chat_participante_repo.obter_por_sala_e_usuario(sala.id, dto.outro_usuario_id)
         if not participante2:
-            chat_participante_repo.adicionar_participante(sala.id, dto.outro_usuario_id)
+            await chat_participante_repo.adicionar_participante(sala.id, dto.outro_usuario_id)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -187,10 +328,16 @@ async def listar_conversas(
     request: Request,
     limit: int = 12,
     offset: int = 0,
+    antes_atividade: Optional[datetime] = None,
+    antes_sala_id: Optional[str] = None,
     usuario_logado: Optional[UsuarioLogado] = None
 ):
     """
     Lista conversas do usuário (salas com última mensagem e contador de não lidas).
+
+    Paginação por cursor: envie `antes_atividade` e `antes_sala_id` com os
+    valores de `ultima_atividade` e `sala_id` da última conversa recebida.
+    `offset` continua aceito para compatibilidade.
     """
     if not usuario_logado:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
@@ -204,65 +351,41 @@ async def listar_conversas(
             detail="Muitas requisições de listagem. Aguarde alguns minutos."
         )
 
-    usuario_id = usuario_logado.id
-
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    conversas = []
-    for participacao in participacoes:
-        sala = chat_sala_repo.obter_por_id(participacao.sala_id)
-        if not sala:
-            continue
-
-        # Obter o outro participante da sala
-        participantes = chat_participante_repo.listar_por_sala(sala.id)
-        outro_participante = next(
-            (p for p in participantes if p.usuario_id != usuario_id),
-            None
-        )
-
-        if not outro_participante:
-            continue
-
-        # Obter dados do outro usuário
-        outro_usuario = usuario_repo.obter_por_id(outro_participante.usuario_id)
-        if not outro_usuario:
-            continue
-
-        # Obter última mensagem
-        ultima_mensagem = chat_mensagem_repo.obter_ultima_mensagem_sala(sala.id)
-
-        # Contar não lidas
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(sala.id, usuario_id)
+    # Resumo completo (sala, outro usuário, última mensagem, não lidas) em uma query
+    resumo = await chat_sala_repo.listar_conversas(
+        usuario_logado.id,
+        limit=limit,
+        offset=offset,
+        antes_atividade=antes_atividade,
+        antes_sala_id=antes_sala_id
+    )
 
-        conversa = {
-            "sala_id": sala.id,
+    conversas = [
+        {
+            "sala_id": conversa.sala_id,
             "outro_usuario": {
-                "id": outro_usuario.id,
-                "nome": outro_usuario.nome,
-                "email": outro_usuario.email,
-                "foto_url": obter_caminho_foto_usuario(outro_usuario.id)
+                "id": conversa.outro_usuario_id,
+                "nome": conversa.outro_usuario_nome,
+                "email": conversa.outro_usuario_email,
+                "foto_url": obter_caminho_foto_usuario(conversa.outro_usuario_id, CHAT_TAMANHO_FOTO)
             },
             "ultima_mensagem": {
-                "mensagem": ultima_mensagem.mensagem,
-                "data_envio": ultima_mensagem.data_envio.isoformat() if ultima_mensagem.data_envio else None,
-                "usuario_id": ultima_mensagem.usuario_id
-            } if ultima_mensagem else None,
-            "nao_lidas": nao_lidas,
-            "ultima_atividade": sala.ultima_atividade.isoformat() if sala.ultima_atividade else ""
+                "mensagem": conversa.ultima_mensagem,
+                "data_envio": (
+                    conversa.ultima_mensagem_data_envio.isoformat()
+                    if conversa.ultima_mensagem_data_envio else None
+                ),
+                "usuario_id": conversa.ultima_mensagem_usuario_id
+            } if conversa.ultima_mensagem is not None else None,
+            "nao_lidas": conversa.nao_lidas,
+            "ultima_atividade": conversa.ultima_atividade.isoformat() if conversa.ultima_atividade else ""
         }
-        conversas.append(conversa)
-
-    # Ordenar por última atividade (mais recente primeiro)
-    conversas.sort(key=lambda c: c["ultima_atividade"], reverse=True)
-
-    # Aplicar paginação
-    conversas_paginadas = conversas[offset:offset + limit]
+        for conversa in resumo
+    ]
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
-        content=conversas_paginadas
+        content=conversas
     )
 
 
@@ -273,10 +396,18 @@ async def listar_mensagens(
     sala_id: str,
     limit: int = 50,
     offset: int = 0,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    latest: bool = False,
     usuario_logado: Optional[UsuarioLogado] = None
 ):
     """
     Lista mensagens de uma sala específica com paginação.
+
+    Paginação por cursor (recomendada): `latest=true` retorna a página mais
+    recente; `before_id` a página anterior à mensagem informada (use o ID
+    da mais antiga já exibida); `after_id` as mensagens posteriores.
+    Sem cursor, mantém a paginação por `offset` (mais antigas primeiro).
     """
     if not usuario_logado:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
@@ -293,7 +424,7 @@ async def listar_mensagens(
     usuario_id = usuario_logado.id
 
     # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
+    participante = await chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
     if not participante:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -301,7 +432,12 @@ async def listar_mensagens(
         )
 
     # Obter mensagens
-    mensagens = chat_mensagem_repo.listar_por_sala(sala_id, limit, offset)
+    if latest or before_id is not None or after_id is not None:
+        mensagens = await chat_mensagem_repo.listar_por_sala_cursor(
+            sala_id, limit, antes_id=before_id, depois_id=after_id
+        )
+    else:
+        mensagens = await chat_mensagem_repo.listar_por_sala(sala_id, limit, offset)
 
     mensagens_json = [
         {
@@ -351,7 +487,7 @@ async def enviar_mensagem(
         usuario_id = usuario_logado.id
 
         # Verificar se usuário participa da sala
-        participante = chat_participante_repo.obter_por_sala_e_usuario(dto.sala_id, usuario_id)
+        participante = await chat_participante_repo.obter_por_sala_e_usuario(dto.sala_id, usuario_id)
         if not participante:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -359,7 +495,7 @@ async def enviar_mensagem(
             )
 
         # Verificar se sala existe
-        sala = chat_sala_repo.obter_por_id(dto.sala_id)
+        sala = await chat_sala_repo.obter_por_id(dto.sala_id)
         if not sala:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -367,25 +503,13 @@ async def enviar_mensagem(
             )
 
         # Inserir mensagem
-        nova_mensagem = chat_mensagem_repo.inserir(dto.sala_id, usuario_id, dto.mensagem)
+        nova_mensagem = await chat_mensagem_repo.inserir(dto.sala_id, usuario_id, dto.mensagem)
 
         # Atualizar última atividade da sala
-        chat_sala_repo.atualizar_ultima_atividade(dto.sala_id)
+        await chat_sala_repo.atualizar_ultima_atividade(dto.sala_id)
 
         # Broadcast via SSE para ambos participantes
-        mensagem_sse = {
-            "tipo": "nova_mensagem",
-            "sala_id": nova_mensagem.sala_id,
-            "mensagem": {
-                "id": nova_mensagem.id,
-                "sala_id": nova_mensagem.sala_id,
-                "usuario_id": nova_mensagem.usuario_id,
-                "mensagem": nova_mensagem.mensagem,
-                "data_envio": nova_mensagem.data_envio.isoformat() if nova_mensagem.data_envio else None,
-                "lida_em": None
-            }
-        }
-        await gerenciador_chat.broadcast_para_sala(dto.sala_id, mensagem_sse)
+        await gerenciador_chat.broadcast_para_sala(dto.sala_id, _evento_nova_mensagem(nova_mensagem))
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -421,7 +545,7 @@ async def marcar_como_lidas(
     usuario_id = usuario_logado.id
 
     # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
+    participante = await chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
     if not participante:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -429,10 +553,10 @@ async def marcar_como_lidas(
         )
 
     # Marcar mensagens como lidas
-    chat_mensagem_repo.marcar_como_lidas(sala_id, usuario_id)
+    await chat_mensagem_repo.marcar_como_lidas(sala_id, usuario_id)
 
     # Atualizar última leitura do participante
-    chat_participante_repo.atualizar_ultima_leitura(sala_id, usuario_id)
+    await chat_participante_repo.atualizar_ultima_leitura(sala_id, usuario_id)
 
     # Notificar via SSE para atualizar contador
     await gerenciador_chat.broadcast_para_sala(sala_id, {
@@ -477,7 +601,7 @@ async def buscar_usuarios(
         )
 
     # Buscar usuários
-    usuarios = usuario_repo.buscar_por_termo(q, limit=10)
+    usuarios = await usuario_repo.buscar_por_termo(q, limit=10)
 
     # Excluir o próprio usuário e administradores dos resultados
     usuarios_filtrados = [
@@ -490,7 +614,7 @@ async def buscar_usuarios(
             "id": u.id,
             "nome": u.nome,
             "email": u.email,
-            "foto_url": obter_caminho_foto_usuario(u.id)
+            "foto_url": obter_caminho_foto_usuario(u.id, CHAT_TAMANHO_FOTO)
         }
         for u in usuarios_filtrados
     ]
@@ -514,16 +638,8 @@ async def contar_nao_lidas_total(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
     usuario_id = usuario_logado.id
 
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    total_nao_lidas = 0
-    for participacao in participacoes:
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(
-            participacao.sala_id,
-            usuario_id
-        )
-        total_nao_lidas += nao_lidas
+    # Soma dos contadores desnormalizados de todas as salas
+    total_nao_lidas = await chat_participante_repo.contar_total_nao_lidas(usuario_id)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -1,10 +1,15 @@
+from concurrent.futures import Future
+from typing import Optional
+
 from fastapi import APIRouter, Request, status
+from fastapi.responses import HTMLResponse
 
 from util.template_util import criar_templates
 from util.auth_decorator import obter_usuario_logado
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.flash_messages import informar_erro
 from util.logger_config import logger
+from util.pagina_cache import cache_paginas, chave_pagina
 from repo import artigo_repo, categoria_repo
 
 router = APIRouter()
@@ -20,6 +25,46 @@ public_limiter = DynamicRateLimiter(
 )
 
 
+def _obter_categorias():
+    """Categorias exibidas nas páginas públicas (do cache de páginas)."""
+    return cache_paginas.obter_ou_carregar(("categorias",), categoria_repo.obter_todos)
+
+
+def _obter_ultimos_publicados():
+    """Os 6 últimos artigos publicados (do cache de páginas)."""
+    return cache_paginas.obter_ou_carregar(
+        ("ultimos_publicados", 6), lambda: artigo_repo.obter_ultimos_publicados(6)
+    )
+
+
+def _visualizacao_concluida(artigo_id: int, futuro: Future) -> None:
+    """Registra no log a falha do incremento de visualizações (thread escritora)."""
+    erro = None if futuro.cancelled() else futuro.exception()
+    if erro is not None:
+        logger.warning(f"Erro ao incrementar visualizações do artigo {artigo_id}: {erro}")
+
+
+def _pagina_em_cache(chave: Optional[tuple]) -> Optional[HTMLResponse]:
+    """Resposta com o HTML em cache para a chave, se houver."""
+    if chave is None:
+        return None
+    html = cache_paginas.obter(chave)
+    return HTMLResponse(html) if html is not None else None
+
+
+def _renderizar(request: Request, chave: Optional[tuple], geracao: int, template: str, contexto: dict):
+    """
+    Renderiza a página e, se cacheável, armazena o HTML.
+
+    `geracao` deve ser capturada antes de consultar os dados: se o conteúdo
+    mudou durante a renderização, a página não é armazenada.
+    """
+    response = templates_public.TemplateResponse(template, {"request": request, **contexto})
+    if chave is not None and response.status_code == status.HTTP_200_OK:
+        cache_paginas.armazenar(chave, response.body, geracao)
+    return response
+
+
 @router.get("/")
 async def home(request: Request):
     """
@@ -36,15 +81,24 @@ async def home(request: Request):
             status_code=status.HTTP_429_TOO_MANY_REQUESTS
         )
 
+    # Visitantes anônimos recebem o HTML do cache
+    chave = chave_pagina(request)
+    em_cache = _pagina_em_cache(chave)
+    if em_cache is not None:
+        return em_cache
+    geracao = cache_paginas.geracao
+
     # Obtém os 6 últimos artigos publicados
-    ultimos_artigos = artigo_repo.obter_ultimos_publicados(6)
-    categorias = categoria_repo.obter_todos()
+    ultimos_artigos = _obter_ultimos_publicados()
+    categorias = _obter_categorias()
     usuario_logado = obter_usuario_logado(request)
 
-    return templates_public.TemplateResponse(
+    return _renderizar(
+        request,
+        chave,
+        geracao,
         "index.html",
         {
-            "request": request,
             "usuario_logado": usuario_logado,
             "ultimos_artigos": ultimos_artigos,
             "categorias": categorias,
@@ -69,15 +123,24 @@ async def index(request: Request):
             status_code=status.HTTP_429_TOO_MANY_REQUESTS
         )
 
+    # Visitantes anônimos recebem o HTML do cache
+    chave = chave_pagina(request)
+    em_cache = _pagina_em_cache(chave)
+    if em_cache is not None:
+        return em_cache
+    geracao = cache_paginas.geracao
+
     # Obtém os 6 últimos artigos publicados
-    ultimos_artigos = artigo_repo.obter_ultimos_publicados(6)
-    categorias = categoria_repo.obter_todos()
+    ultimos_artigos = _obter_ultimos_publicados()
+    categorias = _obter_categorias()
     usuario_logado = obter_usuario_logado(request)
 
-    return templates_public.TemplateResponse(
+    return _renderizar(
+        request,
+        chave,
+        geracao,
         "index.html",
         {
-            "request": request,
             "usuario_logado": usuario_logado,
             "ultimos_artigos": ultimos_artigos,
             "categorias": categorias,
@@ -129,15 +192,26 @@ async def listar_artigos(request: Request, page: int = 1, categoria: int | None
             categoria_id = int(categoria)
         except (ValueError, TypeError):
             categoria_id = None
-    
-    artigos = artigo_repo.obter_publicados(offset=offset, limite=limite, categoria_id=categoria_id)
-    categorias = categoria_repo.obter_todos()
+
+    chave = chave_pagina(request, page=page, categoria=categoria_id)
+    em_cache = _pagina_em_cache(chave)
+    if em_cache is not None:
+        return em_cache
+    geracao = cache_paginas.geracao
+
+    artigos = cache_paginas.obter_ou_carregar(
+        ("publicados", offset, limite, categoria_id),
+        lambda: artigo_repo.obter_publicados(offset=offset, limite=limite, categoria_id=categoria_id),
+    )
+    categorias = _obter_categorias()
     usuario_logado = obter_usuario_logado(request)
 
-    return templates_public.TemplateResponse(
+    return _renderizar(
+        request,
+        chave,
+        geracao,
         "artigos/listar.html",
         {
-            "request": request,
             "usuario_logado": usuario_logado,
             "artigos": artigos,
             "categorias": categorias,
@@ -159,14 +233,25 @@ async def ler_artigo(request: Request, artigo_id: int):
             status_code=status.HTTP_429_TOO_MANY_REQUESTS
         )
 
-    # incrementa contador de visualizacoes e refaz o fetch para exibir o novo valor
+    # incrementa contador de visualizacoes (também nas páginas servidas do
+    # cache): só enfileira na fila de escrita, sem aguardar o commit
+    # (falhas são só registradas: não bloqueiam a visualização)
     try:
-        artigo_repo.incrementar_visualizacoes(artigo_id)
-    except Exception:
-        # não bloquear a visualização se incremento falhar
-        pass
+        futuro = artigo_repo.incrementar_visualizacoes(artigo_id)
+    except Exception as e:
+        logger.warning(f"Erro ao enfileirar visualização do artigo {artigo_id}: {e}")
+    else:
+        futuro.add_done_callback(lambda f: _visualizacao_concluida(artigo_id, f))
+
+    # O contador exibido é o da renderização em cache (atualizado a cada
+    # PAGINA_CACHE_TTL_SEGUNDOS ou quando o conteúdo muda)
+    chave = chave_pagina(request)
+    em_cache = _pagina_em_cache(chave)
+    if em_cache is not None:
+        return em_cache
+    geracao = cache_paginas.geracao
 
-    artigo = artigo_repo.obter_por_id(artigo_id)
+    artigo = cache_paginas.obter_ou_carregar(("artigo", artigo_id), lambda: artigo_repo.obter_por_id(artigo_id))
     if not artigo or artigo.status != 'Publicado':
         return templates_public.TemplateResponse(
             "errors/404.html",
@@ -175,12 +260,14 @@ async def ler_artigo(request: Request, artigo_id: int):
         )
 
     usuario_logado = obter_usuario_logado(request)
-    categorias = categoria_repo.obter_todos()
+    categorias = _obter_categorias()
 
-    return templates_public.TemplateResponse(
+    return _renderizar(
+        request,
+        chave,
+        geracao,
         "artigos/ler.html",
         {
-            "request": request,
             "usuario_logado": usuario_logado,
             "artigo": artigo,
             "categorias": categorias,
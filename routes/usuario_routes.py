@@ -17,17 +17,18 @@ from dtos.perfil_dto import EditarPerfilDTO, AlterarSenhaDTO
 from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
-from repo import usuario_repo, chamado_repo
+from repo.async_repo import usuario_repo, chamado_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
+from util.db_async import executar_em_thread
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
-from util.foto_util import salvar_foto_cropada_usuario
+from util.foto_util import salvar_foto_cropada_usuario_async
 from util.logger_config import logger
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.repository_helpers import obter_ou_404
-from util.security import criar_hash_senha, verificar_senha
+from util.senha_service import servico_senha
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 
@@ -84,10 +85,10 @@ async def dashboard(request: Request, usuario_logado: Optional[UsuarioLogado] =
     # Adicionar contador de chamados conforme perfil
     if usuario_logado.is_admin():
         # Admin vê total de chamados pendentes no sistema
-        context["chamados_pendentes"] = chamado_repo.contar_pendentes()
+        context["chamados_pendentes"] = await chamado_repo.contar_pendentes()
     else:
         # Usuário comum vê seus próprios chamados em aberto
-        context["chamados_abertos"] = chamado_repo.contar_abertos_por_usuario(usuario_logado.id)
+        context["chamados_abertos"] = await chamado_repo.contar_abertos_por_usuario(usuario_logado.id)
 
     return templates_usuario.TemplateResponse("dashboard.html", context)
 
@@ -101,7 +102,7 @@ async def get_visualizar_perfil(request: Request, usuario_logado: Optional[Usuar
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await usuario_repo.obter_por_id(usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout"
@@ -130,7 +131,7 @@ async def get_editar_perfil(request: Request, usuario_logado: Optional[UsuarioLo
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await usuario_repo.obter_por_id(usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout"
@@ -157,7 +158,7 @@ async def post_editar_perfil(
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await usuario_repo.obter_por_id(usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout"
@@ -172,7 +173,7 @@ async def post_editar_perfil(
         dto = EditarPerfilDTO(nome=nome, email=email)
 
         # Verificar se o e-mail já está em uso por outro usuário
-        disponivel, mensagem_erro = verificar_email_disponivel(dto.email, usuario_logado.id)
+        disponivel, mensagem_erro = await executar_em_thread(verificar_email_disponivel, dto.email, usuario_logado.id)
         if not disponivel:
             informar_erro(request, mensagem_erro)
             return templates_usuario.TemplateResponse(
@@ -192,7 +193,7 @@ async def post_editar_perfil(
         usuario.email = dto.email
 
         # Salvar no banco
-        if usuario_repo.alterar(usuario):
+        if await usuario_repo.alterar(usuario):
             # Atualizar sessão
             request.session["usuario_logado"]["nome"] = usuario.nome
             request.session["usuario_logado"]["email"] = usuario.email
@@ -287,7 +288,7 @@ async def post_alterar_senha(
 
         # Obter usuário ou redirecionar para logout
         usuario = obter_ou_404(
-            usuario_repo.obter_por_id(usuario_logado.id),
+            await usuario_repo.obter_por_id(usuario_logado.id),
             request,
             "Usuário não encontrado!",
             "/logout"
@@ -296,7 +297,7 @@ async def post_alterar_senha(
             return usuario
 
         # Validar senha atual
-        if not verificar_senha(dto.senha_atual, usuario.senha):
+        if not await servico_senha.verificar(dto.senha_atual, usuario.senha):
             informar_erro(request, "Senha atual está incorreta")
             logger.warning(
                 f"Tentativa de alteração de senha com senha atual incorreta - Usuário ID: {usuario.id}"
@@ -311,7 +312,7 @@ async def post_alterar_senha(
             )
 
         # Verificar se a nova senha é diferente da atual
-        if verificar_senha(dto.senha_nova, usuario.senha):
+        if await servico_senha.verificar(dto.senha_nova, usuario.senha):
             informar_erro(request, "A nova senha deve ser diferente da senha atual.")
             return templates_usuario.TemplateResponse(
                 "perfil/alterar-senha.html",
@@ -325,8 +326,8 @@ async def post_alterar_senha(
             )
 
         # Atualizar senha
-        senha_hash = criar_hash_senha(dto.senha_nova)
-        if usuario_repo.atualizar_senha(usuario.id, senha_hash):
+        senha_hash = await servico_senha.gerar_hash(dto.senha_nova)
+        if await usuario_repo.atualizar_senha(usuario.id, senha_hash):
             logger.info(f"Senha alterada com sucesso - Usuário ID: {usuario.id}")
             informar_sucesso(request, "Senha alterada com sucesso!")
             return RedirectResponse(
@@ -398,8 +399,8 @@ async def post_atualizar_foto(
                 "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
             )
 
-        # Salvar foto cropada
-        if salvar_foto_cropada_usuario(usuario_id, foto_base64):
+        # Salvar foto cropada (processamento da imagem fora do event loop)
+        if await salvar_foto_cropada_usuario_async(usuario_id, foto_base64):
             logger.info(f"Foto de perfil atualizada - Usuário ID: {usuario_id}")
             informar_sucesso(request, "Foto de perfil atualizada com sucesso!")
         else:
@@ -0,0 +1,38 @@
+"""
+SQL statements para a tabela chat_evento.
+Log de eventos do chat compartilhado entre workers (pub/sub via SQLite).
+"""
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS chat_evento (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sala_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    origem TEXT NOT NULL,
+    publicado_em REAL NOT NULL
+)
+"""
+
+INSERIR = """
+INSERT INTO chat_evento (sala_id, payload, origem, publicado_em)
+VALUES (?, ?, ?, ?)
+"""
+
+OBTER_ULTIMO_ID = """
+SELECT COALESCE(MAX(id), 0) as ultimo_id
+FROM chat_evento
+"""
+
+# Eventos publicados por outros workers após o último já consumido
+LISTAR_POSTERIORES = """
+SELECT id, sala_id, payload, origem, publicado_em
+FROM chat_evento
+WHERE id > ? AND origem != ?
+ORDER BY id ASC
+LIMIT ?
+"""
+
+EXCLUIR_ANTERIORES = """
+DELETE FROM chat_evento
+WHERE publicado_em < ?
+"""
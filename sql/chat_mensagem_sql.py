@@ -35,6 +35,52 @@ ORDER BY id ASC
 LIMIT ? OFFSET ?
 """
 
+# Paginação por cursor (keyset): custo constante independente da
+# profundidade, via índice (sala_id, id). Páginas "antes de" vêm da mais
+# recente para a mais antiga (o repositório devolve em ordem cronológica).
+LISTAR_ULTIMAS_POR_SALA = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], lida_em[timestamp]
+FROM chat_mensagem
+WHERE sala_id = ?
+ORDER BY id DESC
+LIMIT ?
+"""
+
+LISTAR_POR_SALA_ANTES_DE = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], lida_em[timestamp]
+FROM chat_mensagem
+WHERE sala_id = ? AND id < ?
+ORDER BY id DESC
+LIMIT ?
+"""
+
+LISTAR_POR_SALA_DEPOIS_DE = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], lida_em[timestamp]
+FROM chat_mensagem
+WHERE sala_id = ? AND id > ?
+ORDER BY id ASC
+LIMIT ?
+"""
+
+# Reenvio após reconexão SSE: mensagens das salas do usuário com ID maior
+# que o da última mensagem entregue (keyset por id, como
+# LISTAR_POR_SALA_DEPOIS_DE; cada sala é um intervalo de idx_chat_mensagem_sala_id_id)
+LISTAR_POR_USUARIO_DEPOIS_DE = """
+SELECT m.id, m.sala_id, m.usuario_id, m.mensagem,
+       m.data_envio AS "data_envio [timestamp]", m.lida_em AS "lida_em [timestamp]"
+FROM chat_participante cp
+INNER JOIN chat_mensagem m ON m.sala_id = cp.sala_id
+WHERE cp.usuario_id = ?
+  AND m.id > ?
+ORDER BY m.id ASC
+LIMIT ?
+"""
+
+OBTER_ULTIMO_ID = """
+SELECT COALESCE(MAX(id), 0) as ultimo_id
+FROM chat_mensagem
+"""
+
 CONTAR_POR_SALA = """
 SELECT COUNT(*) as total
 FROM chat_mensagem
@@ -32,3 +32,36 @@ EXCLUIR = """
 DELETE FROM chat_sala
 WHERE id = ?
 """
+
+# Resumo das conversas de um usuário em uma única query: sala, outro
+# participante, última mensagem e contador de não lidas.
+# Paginação por keyset em (ultima_atividade, id): o cursor é a última
+# conversa da página anterior (NULL na primeira página).
+# Parâmetros: usuario_id, antes_atividade (3x), antes_sala_id, limit, offset
+LISTAR_CONVERSAS_POR_USUARIO = """
+SELECT
+    s.id AS sala_id,
+    s.ultima_atividade AS "ultima_atividade [timestamp]",
+    u.id AS outro_usuario_id,
+    u.nome AS outro_usuario_nome,
+    u.email AS outro_usuario_email,
+    m.mensagem AS ultima_mensagem,
+    m.data_envio AS "ultima_mensagem_data_envio [timestamp]",
+    m.usuario_id AS ultima_mensagem_usuario_id,
+    cp.nao_lidas AS nao_lidas
+FROM chat_participante cp
+INNER JOIN chat_sala s ON s.id = cp.sala_id
+INNER JOIN chat_participante outro
+    ON outro.sala_id = cp.sala_id AND outro.usuario_id != cp.usuario_id
+INNER JOIN usuario u ON u.id = outro.usuario_id
+LEFT JOIN chat_mensagem m
+    ON m.id = (SELECT MAX(id) FROM chat_mensagem WHERE sala_id = s.id)
+WHERE cp.usuario_id = ?
+  AND (
+    ? IS NULL
+    OR s.ultima_atividade < ?
+    OR (s.ultima_atividade = ? AND s.id < ?)
+  )
+ORDER BY s.ultima_atividade DESC, s.id DESC
+LIMIT ? OFFSET ?
+"""
@@ -14,3 +14,28 @@ OBTER_POR_CHAVE = "SELECT * FROM configuracao WHERE chave = ?"
 OBTER_TODOS = "SELECT * FROM configuracao ORDER BY chave"
 
 ATUALIZAR = "UPDATE configuracao SET valor = ? WHERE chave = ?"
+
+# Versão global das configurações: incrementada por triggers a cada escrita
+# na tabela configuracao, consultada periodicamente por cada worker para
+# recarregar seu cache quando outro processo altera configurações.
+CRIAR_TABELA_VERSAO = """
+CREATE TABLE IF NOT EXISTS config_versao (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    versao INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+INICIALIZAR_VERSAO = "INSERT OR IGNORE INTO config_versao (id, versao) VALUES (1, 0)"
+
+CRIAR_TRIGGERS_VERSAO = [
+    f"""
+CREATE TRIGGER IF NOT EXISTS trg_configuracao_versao_{operacao.lower()}
+AFTER {operacao} ON configuracao
+BEGIN
+    UPDATE config_versao SET versao = versao + 1 WHERE id = 1;
+END
+"""
+    for operacao in ("INSERT", "UPDATE", "DELETE")
+]
+
+OBTER_VERSAO = "SELECT versao FROM config_versao WHERE id = 1"
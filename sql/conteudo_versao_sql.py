@@ -0,0 +1,32 @@
+# Queries SQL da versão global do conteúdo público (artigos e categorias)
+
+# Linha única com a versão, incrementada por triggers a cada alteração
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS conteudo_versao (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    versao INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+INICIALIZAR_VERSAO = "INSERT OR IGNORE INTO conteudo_versao (id, versao) VALUES (1, 0)"
+
+# Colunas de artigo exibidas nas páginas públicas (visualizacoes fica de
+# fora: é incrementada a cada leitura e não deve invalidar o cache)
+COLUNAS_ARTIGO = "titulo, conteudo, status, categoria_id, autor_id, data_atualizacao"
+
+CRIAR_TRIGGERS = [
+    f"""
+CREATE TRIGGER IF NOT EXISTS trg_{tabela}_conteudo_versao_{operacao.split()[0].lower()}
+AFTER {operacao} ON {tabela}
+BEGIN
+    UPDATE conteudo_versao SET versao = versao + 1 WHERE id = 1;
+END
+"""
+    for tabela, operacoes in (
+        ("artigo", ("INSERT", f"UPDATE OF {COLUNAS_ARTIGO}", "DELETE")),
+        ("categoria", ("INSERT", "UPDATE", "DELETE")),
+    )
+    for operacao in operacoes
+]
+
+OBTER_VERSAO = "SELECT versao FROM conteudo_versao WHERE id = 1"
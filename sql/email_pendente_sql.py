@@ -0,0 +1,79 @@
+"""
+SQL statements para a tabela email_pendente.
+Fila de saída de e-mails (outbox) consumida pelo processador em background.
+"""
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS email_pendente (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    para_email TEXT NOT NULL,
+    para_nome TEXT NOT NULL,
+    assunto TEXT NOT NULL,
+    html TEXT NOT NULL,
+    texto TEXT,
+    status TEXT NOT NULL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa REAL NOT NULL,
+    ultimo_erro TEXT,
+    criado_em REAL NOT NULL,
+    enviado_em REAL
+)
+"""
+
+CRIAR_INDICE_PRONTOS = """
+CREATE INDEX IF NOT EXISTS idx_email_pendente_status_proxima
+ON email_pendente(status, proxima_tentativa)
+"""
+
+INSERIR = """
+INSERT INTO email_pendente (para_email, para_nome, assunto, html, texto, status, proxima_tentativa, criado_em)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+OBTER_POR_ID = "SELECT * FROM email_pendente WHERE id = ?"
+
+# Reivindica um lote de e-mails prontos adiando a próxima tentativa pelo
+# tempo de reserva: outro worker não os pega enquanto este envia, e um
+# worker que morrer no meio do envio os devolve à fila ao fim da reserva.
+REIVINDICAR_PRONTOS = """
+UPDATE email_pendente
+SET proxima_tentativa = :reservado_ate
+WHERE id IN (
+    SELECT id FROM email_pendente
+    WHERE status = :status AND proxima_tentativa <= :agora
+    ORDER BY proxima_tentativa, id
+    LIMIT :limite
+)
+RETURNING *
+"""
+
+# O corpo é descartado após o envio: e-mails de recuperação de senha
+# contêm o token e não devem permanecer no banco durante a retenção
+MARCAR_ENVIADO = """
+UPDATE email_pendente
+SET status = ?, enviado_em = ?, ultimo_erro = NULL, html = '', texto = NULL
+WHERE id = ?
+"""
+
+REAGENDAR = """
+UPDATE email_pendente
+SET tentativas = tentativas + 1, proxima_tentativa = ?, ultimo_erro = ?
+WHERE id = ?
+"""
+
+MARCAR_FALHA = """
+UPDATE email_pendente
+SET status = ?, tentativas = tentativas + 1, ultimo_erro = ?
+WHERE id = ?
+"""
+
+EXCLUIR_ENVIADOS_ANTERIORES = """
+DELETE FROM email_pendente
+WHERE status = ? AND enviado_em < ?
+"""
+
+CONTAR_POR_STATUS = """
+SELECT status, COUNT(*) as quantidade
+FROM email_pendente
+GROUP BY status
+"""
@@ -22,23 +22,44 @@ ON chamado(status)
 """
 
 # Índices da tabela chamado_interacao
-CRIAR_INDICE_INTERACAO_CHAMADO = """
-CREATE INDEX IF NOT EXISTS idx_chamado_interacao_chamado_id
-ON chamado_interacao(chamado_id)
+# Composto: OBTER_POR_CHAMADO filtra por chamado_id e ordena por
+# data_interacao (sem B-tree temporária para o ORDER BY)
+CRIAR_INDICE_INTERACAO_CHAMADO_DATA = """
+CREATE INDEX IF NOT EXISTS idx_chamado_interacao_chamado_data
+ON chamado_interacao(chamado_id, data_interacao)
+"""
+
+# Parcial (só não lidas) e cobrindo: MARCAR_COMO_LIDAS e
+# CONTAR_NAO_LIDAS_POR_CHAMADO (GROUP BY chamado_id na ordem do índice)
+CRIAR_INDICE_INTERACAO_NAO_LIDAS = """
+CREATE INDEX IF NOT EXISTS idx_chamado_interacao_nao_lidas
+ON chamado_interacao(chamado_id, usuario_id)
+WHERE data_leitura IS NULL
 """
 
 # Índices da tabela chat_mensagem
-CRIAR_INDICE_CHAT_MENSAGEM_SALA = """
-CREATE INDEX IF NOT EXISTS idx_chat_mensagem_sala_id
-ON chat_mensagem(sala_id)
+# Composto: LISTAR_POR_SALA e OBTER_ULTIMA_MENSAGEM_SALA filtram por sala_id
+# e ordenam por id; também atende MAX(id) da listagem de conversas
+CRIAR_INDICE_CHAT_MENSAGEM_SALA_ID = """
+CREATE INDEX IF NOT EXISTS idx_chat_mensagem_sala_id_id
+ON chat_mensagem(sala_id, id)
+"""
+
+# Parcial (só não lidas): MARCAR_COMO_LIDAS toca apenas mensagens sem lida_em
+CRIAR_INDICE_CHAT_MENSAGEM_NAO_LIDAS = """
+CREATE INDEX IF NOT EXISTS idx_chat_mensagem_nao_lidas
+ON chat_mensagem(sala_id, usuario_id)
+WHERE lida_em IS NULL
 """
 
 # Índices da tabela chat_participante
 # Nota: PRIMARY KEY (sala_id, usuario_id) já cria índice composto
-# Mas precisamos de índice em usuario_id para LISTAR_POR_USUARIO
+# LISTAR_POR_USUARIO, SOMAR_NAO_LIDAS_POR_USUARIO e a listagem de conversas
+# buscam por usuario_id. nao_lidas fica fora da chave: é reescrita a cada
+# mensagem inserida e, indexada, cada INSERT também moveria a entrada
 CRIAR_INDICE_CHAT_PARTICIPANTE_USUARIO = """
-CREATE INDEX IF NOT EXISTS idx_chat_participante_usuario_id
-ON chat_participante(usuario_id)
+CREATE INDEX IF NOT EXISTS idx_chat_participante_usuario_sala
+ON chat_participante(usuario_id, sala_id)
 """
 
 # Lista de todos os índices para criação
@@ -50,8 +71,17 @@ TODOS_INDICES = [
     CRIAR_INDICE_CHAMADO_USUARIO,
     CRIAR_INDICE_CHAMADO_STATUS,
     # Chamado Interação
-    CRIAR_INDICE_INTERACAO_CHAMADO,
+    CRIAR_INDICE_INTERACAO_CHAMADO_DATA,
+    CRIAR_INDICE_INTERACAO_NAO_LIDAS,
     # Chat
-    CRIAR_INDICE_CHAT_MENSAGEM_SALA,
+    CRIAR_INDICE_CHAT_MENSAGEM_SALA_ID,
+    CRIAR_INDICE_CHAT_MENSAGEM_NAO_LIDAS,
     CRIAR_INDICE_CHAT_PARTICIPANTE_USUARIO,
 ]
+
+# Índices substituídos pelos acima (prefixos redundantes ou chaves alteradas)
+INDICES_OBSOLETOS = [
+    "DROP INDEX IF EXISTS idx_chamado_interacao_chamado_id",
+    "DROP INDEX IF EXISTS idx_chat_mensagem_sala_id",
+    "DROP INDEX IF EXISTS idx_chat_participante_usuario_id",
+]
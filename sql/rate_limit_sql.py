@@ -0,0 +1,70 @@
+"""
+SQL statements para a tabela rate_limit_tentativa.
+Estado do rate limiting compartilhado entre workers (BackendSQLite).
+Cada linha é uma tentativa permitida de um identificador em um limiter;
+tentativas mais antigas que a janela são removidas periodicamente.
+"""
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS rate_limit_tentativa (
+    limiter TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    instante REAL NOT NULL
+)
+"""
+
+CRIAR_INDICE = """
+CREATE INDEX IF NOT EXISTS idx_rate_limit_tentativa
+ON rate_limit_tentativa (limiter, chave, instante)
+"""
+
+# Verificação e registro atômicos em um único comando (o lock de escrita é
+# adquirido antes da contagem): a tentativa só é registrada se houver menos
+# de max_tentativas na janela. Sem linha inserida, a tentativa foi bloqueada.
+# Parâmetros: limiter, chave, agora, max_tentativas, janela
+CONSUMIR = """
+INSERT INTO rate_limit_tentativa (limiter, chave, instante)
+SELECT ?1, ?2, ?3
+WHERE (
+    SELECT COUNT(*)
+    FROM rate_limit_tentativa
+    WHERE limiter = ?1 AND chave = ?2 AND instante > ?3 - ?5
+) < ?4
+"""
+
+# Parâmetros: limiter, chave, inicio da janela
+OBTER_INSTANTES = """
+SELECT instante
+FROM rate_limit_tentativa
+WHERE limiter = ? AND chave = ? AND instante > ?
+ORDER BY instante
+"""
+
+OBTER_POR_CHAVE = """
+SELECT 1
+FROM rate_limit_tentativa
+WHERE limiter = ? AND chave = ?
+LIMIT 1
+"""
+
+EXCLUIR = """
+DELETE FROM rate_limit_tentativa
+WHERE limiter = ? AND chave = ?
+"""
+
+EXCLUIR_POR_LIMITER = """
+DELETE FROM rate_limit_tentativa
+WHERE limiter = ?
+"""
+
+# Parâmetros: limiter, inicio da janela
+EXCLUIR_EXPIRADAS = """
+DELETE FROM rate_limit_tentativa
+WHERE limiter = ? AND instante <= ?
+"""
+
+CONTAR_POR_LIMITER = """
+SELECT COUNT(DISTINCT chave) as total
+FROM rate_limit_tentativa
+WHERE limiter = ?
+"""
@@ -8,10 +8,12 @@ const chatWidget = (() => {
     let eventSource = null;
     let conversaAtual = null;
     let conversasOffset = 0;
+    let conversasCursor = null; // {ultima_atividade, sala_id} da última conversa carregada
     let debounceTimer = null;
-    let mensagensOffset = 0;
+    let mensagensCursor = null; // ID da mensagem mais antiga carregada
     let carregandoMensagens = false;
     let todasMensagensCarregadas = false;
+    let atualizacaoPendente = { timer: null, conversas: false }; // eventos SSE agrupados
 
     // Elementos do DOM
     const elementos = {
@@ -89,32 +91,59 @@ const chatWidget = (() => {
                 marcarComoLidas(mensagem.sala_id);
             }
 
-            // Atualizar lista de conversas
-            carregarConversas(0);
-
-            // Atualizar contador
-            atualizarContadorNaoLidas();
+            // Atualizar lista de conversas e contador (agrupado: a reconexão
+            // reenvia vários eventos em sequência)
+            agendarAtualizacao(true);
         } else if (mensagem.tipo === 'atualizar_contador') {
             // Atualizar contador de não lidas
-            atualizarContadorNaoLidas();
+            agendarAtualizacao(false);
         }
     }
 
+    /**
+     * Agrupa atualizações da lista e do contador disparadas por eventos
+     * SSE próximos em uma única requisição de cada
+     */
+    function agendarAtualizacao(recarregarConversas) {
+        atualizacaoPendente.conversas = atualizacaoPendente.conversas || recarregarConversas;
+        if (atualizacaoPendente.timer) {
+            return;
+        }
+        atualizacaoPendente.timer = setTimeout(() => {
+            if (atualizacaoPendente.conversas) {
+                carregarConversas(0);
+            }
+            atualizarContadorNaoLidas();
+            atualizacaoPendente = { timer: null, conversas: false };
+        }, 100);
+    }
+
     /**
      * Carrega lista de conversas
      */
     async function carregarConversas(offset) {
         try {
-            const response = await fetch(`/chat/conversas?limit=12&offset=${offset}`);
+            // Primeira página sem cursor; demais paginam por keyset
+            let url = '/chat/conversas?limit=12';
+            if (offset !== 0 && conversasCursor) {
+                url += `&antes_atividade=${encodeURIComponent(conversasCursor.ultima_atividade)}`
+                    + `&antes_sala_id=${encodeURIComponent(conversasCursor.sala_id)}`;
+            }
+            const response = await fetch(url);
             const conversas = await response.json();
 
             if (offset === 0) {
                 elementos.conversationsList.innerHTML = '';
                 conversasOffset = 0;
+                conversasCursor = null;
             }
 
             renderizarConversas(conversas);
             conversasOffset += conversas.length;
+            if (conversas.length > 0) {
+                const ultima = conversas[conversas.length - 1];
+                conversasCursor = { ultima_atividade: ultima.ultima_atividade, sala_id: ultima.sala_id };
+            }
 
         } catch (error) {
             console.error('[Chat] Erro ao carregar conversas:', error);
@@ -315,7 +344,7 @@ const chatWidget = (() => {
         conversaAtual = conversa;
 
         // Resetar estado de paginação
-        mensagensOffset = 0;
+        mensagensCursor = null;
         todasMensagensCarregadas = false;
 
         // Marcar como ativa na lista
@@ -351,7 +380,11 @@ const chatWidget = (() => {
 
         try {
             const limit = 24;
-            const response = await fetch(`/chat/mensagens/${salaId}?limit=${limit}&offset=${mensagensOffset}`);
+            // Paginação por cursor: página mais recente e depois anteriores à mais antiga exibida
+            const cursor = (inicial || mensagensCursor === null)
+                ? 'latest=true'
+                : `before_id=${mensagensCursor}`;
+            const response = await fetch(`/chat/mensagens/${salaId}?limit=${limit}&${cursor}`);
             const mensagens = await response.json();
 
             // Se retornou menos que o limite, não há mais mensagens
@@ -361,7 +394,7 @@ const chatWidget = (() => {
 
             if (inicial) {
                 elementos.messagesContainer.innerHTML = '';
-                mensagensOffset = 0;
+                mensagensCursor = null;
             }
 
             // Salvar posição de scroll antes de adicionar
@@ -387,7 +420,9 @@ const chatWidget = (() => {
                 elementos.messagesContainer.scrollTop = scrollAntes + (alturaDepois - alturaAntes);
             }
 
-            mensagensOffset += mensagens.length;
+            if (mensagens.length > 0) {
+                mensagensCursor = mensagens[0].id;
+            }
 
         } catch (error) {
             console.error('[Chat] Erro ao carregar mensagens:', error);
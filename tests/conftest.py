@@ -115,6 +115,18 @@ def limpar_config_cache():
     config.limpar()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def limpar_cache_paginas():
+    """Limpa o cache de páginas públicas antes e depois de cada teste"""
+    from util.pagina_cache import cache_paginas
+
+    cache_paginas.limpar()
+
+    yield
+
+    cache_paginas.limpar()
+
+
 @pytest.fixture(scope="function", autouse=True)
 def limpar_chat_manager():
     """Limpa o gerenciador de chat antes de cada teste para evitar interferência"""
@@ -123,12 +135,16 @@ def limpar_chat_manager():
     # Limpar antes do teste
     gerenciador_chat._connections.clear()
     gerenciador_chat._active_connections.clear()
+    gerenciador_chat._historicos.clear()
+    gerenciador_chat._historicos_ociosos.clear()
 
     yield
 
     # Limpar depois do teste também
     gerenciador_chat._connections.clear()
     gerenciador_chat._active_connections.clear()
+    gerenciador_chat._historicos.clear()
+    gerenciador_chat._historicos_ociosos.clear()
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -144,7 +160,7 @@ def limpar_banco_dados():
             # Verificar se tabelas existem antes de limpar
             cursor.execute(
                 "SELECT name FROM sqlite_master WHERE type='table' "
-                "AND name IN ('chamado', 'chamado_interacao', 'usuario', 'configuracao')"
+                "AND name IN ('chamado', 'chamado_interacao', 'usuario', 'configuracao', 'email_pendente')"
             )
             tabelas_existentes = [row[0] for row in cursor.fetchall()]
 
@@ -158,6 +174,8 @@ def limpar_banco_dados():
                 cursor.execute("DELETE FROM usuario")
             if 'configuracao' in tabelas_existentes:
                 cursor.execute("DELETE FROM configuracao")
+            if 'email_pendente' in tabelas_existentes:
+                cursor.execute("DELETE FROM email_pendente")
 
             # Resetar autoincrement (limpar sqlite_sequence se existir)
             cursor.execute(
@@ -36,6 +36,10 @@ def criar_tabelas_integracao():
         chat_sala_repo,
         chat_participante_repo,
         chat_mensagem_repo,
+        email_pendente_repo,
+        categoria_repo,
+        artigo_repo,
+        conteudo_versao_repo,
     )
 
     # Criar tabelas na ordem correta (respeitando dependencias)
@@ -47,5 +51,9 @@ def criar_tabelas_integracao():
     chat_sala_repo.criar_tabela()
     chat_participante_repo.criar_tabela()
     chat_mensagem_repo.criar_tabela()
+    email_pendente_repo.criar_tabela()
+    categoria_repo.criar_tabela()
+    artigo_repo.criar_tabela()
+    conteudo_versao_repo.criar_tabela()
 
     yield
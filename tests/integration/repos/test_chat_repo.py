@@ -9,6 +9,7 @@ Testa os módulos:
 Esses testes usam banco de dados real para validar integração.
 """
 import pytest
+from datetime import datetime
 
 from repo import chat_sala_repo
 from repo import chat_mensagem_repo
@@ -17,6 +18,7 @@ from repo import usuario_repo
 from model.usuario_model import Usuario
 from util.security import criar_hash_senha
 from util.perfis import Perfil
+from util.db_util import obter_conexao
 
 
 # =============================================================================
@@ -254,6 +256,91 @@ class TestChatSalaRepoExcluir:
         assert resultado is False
 
 
+class TestChatSalaRepoListarConversas:
+    """Testes para a função listar_conversas (resumo em uma única query)."""
+
+    @pytest.fixture
+    def conversas(self):
+        """Cria um usuário com três conversas em atividades distintas."""
+        ids = []
+        for i in range(4):
+            ids.append(usuario_repo.inserir(Usuario(
+                id=0,
+                nome=f"Usuario Conversa {i}",
+                email=f"conversa{i}@example.com",
+                senha=criar_hash_senha("Senha@123"),
+                perfil=Perfil.CLIENTE.value
+            )))
+        usuario_id, outros = ids[0], ids[1:]
+
+        salas = []
+        for hora, outro_id in zip((10, 12, 11), outros):
+            sala = chat_sala_repo.criar_ou_obter_sala(usuario_id, outro_id)
+            chat_participante_repo.adicionar_participante(sala.id, usuario_id)
+            chat_participante_repo.adicionar_participante(sala.id, outro_id)
+            with obter_conexao() as conn:
+                conn.execute(
+                    "UPDATE chat_sala SET ultima_atividade = ? WHERE id = ?",
+                    (datetime(2025, 1, 1, hora, 0, 0), sala.id)
+                )
+            salas.append(sala.id)
+
+        return {"usuario_id": usuario_id, "outros": outros, "salas": salas}
+
+    def test_listar_conversas_ordenadas_por_atividade(self, conversas):
+        """Deve retornar conversas da mais recente para a mais antiga."""
+        resultado = chat_sala_repo.listar_conversas(conversas["usuario_id"])
+
+        salas = conversas["salas"]
+        assert [c.sala_id for c in resultado] == [salas[1], salas[2], salas[0]]
+        assert resultado[0].outro_usuario_id == conversas["outros"][1]
+        assert resultado[0].outro_usuario_nome == "Usuario Conversa 2"
+
+    def test_listar_conversas_ultima_mensagem_e_nao_lidas(self, conversas):
+        """Deve trazer última mensagem e não lidas na mesma linha."""
+        sala_id = conversas["salas"][0]
+        outro_id = conversas["outros"][0]
+        chat_mensagem_repo.inserir(sala_id, outro_id, "Primeira")
+        chat_mensagem_repo.inserir(sala_id, outro_id, "Segunda")
+        chat_mensagem_repo.inserir(sala_id, conversas["usuario_id"], "Minha")
+
+        resultado = chat_sala_repo.listar_conversas(conversas["usuario_id"])
+        conversa = next(c for c in resultado if c.sala_id == sala_id)
+
+        assert conversa.ultima_mensagem == "Minha"
+        assert conversa.ultima_mensagem_usuario_id == conversas["usuario_id"]
+        assert conversa.ultima_mensagem_data_envio is not None
+        assert conversa.nao_lidas == 2
+        vazia = next(c for c in resultado if c.sala_id != sala_id)
+        assert vazia.ultima_mensagem is None
+        assert vazia.nao_lidas == 0
+
+    def test_listar_conversas_paginacao_keyset(self, conversas):
+        """Cursor da última conversa deve retornar a página seguinte."""
+        usuario_id = conversas["usuario_id"]
+        primeira = chat_sala_repo.listar_conversas(usuario_id, limit=2)
+        ultima = primeira[-1]
+
+        segunda = chat_sala_repo.listar_conversas(
+            usuario_id,
+            limit=2,
+            antes_atividade=ultima.ultima_atividade,
+            antes_sala_id=ultima.sala_id
+        )
+
+        assert len(primeira) == 2
+        assert [c.sala_id for c in segunda] == [conversas["salas"][0]]
+
+    def test_listar_conversas_ignora_sala_sem_outro_participante(self, conversas):
+        """Salas cujo outro participante foi excluído não devem aparecer."""
+        usuario_repo.excluir(conversas["outros"][1])
+
+        resultado = chat_sala_repo.listar_conversas(conversas["usuario_id"])
+
+        assert conversas["salas"][1] not in [c.sala_id for c in resultado]
+        assert len(resultado) == 2
+
+
 class TestChatSalaRepoCriarTabela:
     """Testes para a função criar_tabela."""
 
@@ -458,6 +545,99 @@ class TestChatMensagemRepoListar:
 
         assert len(mensagens) == 3
 
+    @pytest.fixture
+    def sala_com_historico(self):
+        """Cria sala com 10 mensagens e retorna (sala_id, ids em ordem)."""
+        ids_usuarios = [
+            usuario_repo.inserir(Usuario(
+                id=0,
+                nome=f"Usuario Cursor {i}",
+                email=f"cursor_repo{i}@example.com",
+                senha=criar_hash_senha("Senha@123"),
+                perfil=Perfil.CLIENTE.value
+            ))
+            for i in range(2)
+        ]
+        sala = chat_sala_repo.criar_ou_obter_sala(*ids_usuarios)
+        ids = [chat_mensagem_repo.inserir(sala.id, ids_usuarios[0], f"Msg {i}").id for i in range(10)]
+        return sala.id, ids
+
+    def test_listar_por_sala_cursor_mais_recentes(self, sala_com_historico):
+        """Sem cursor deve retornar a página mais recente em ordem cronológica."""
+        sala_id, ids = sala_com_historico
+
+        mensagens = chat_mensagem_repo.listar_por_sala_cursor(sala_id, limit=3)
+
+        assert [m.id for m in mensagens] == ids[-3:]
+
+    def test_listar_por_sala_cursor_antes_de(self, sala_com_historico):
+        """Cursor antes_id deve percorrer o histórico sem repetir mensagens."""
+        sala_id, ids = sala_com_historico
+
+        paginas = []
+        cursor = None
+        while True:
+            pagina = chat_mensagem_repo.listar_por_sala_cursor(sala_id, limit=4, antes_id=cursor)
+            if not pagina:
+                break
+            paginas.append([m.id for m in pagina])
+            cursor = pagina[0].id
+
+        assert paginas == [ids[6:], ids[2:6], ids[:2]]
+
+    def test_listar_por_sala_cursor_depois_de(self, sala_com_historico):
+        """Cursor depois_id deve retornar as mensagens posteriores."""
+        sala_id, ids = sala_com_historico
+
+        mensagens = chat_mensagem_repo.listar_por_sala_cursor(sala_id, limit=50, depois_id=ids[7])
+
+        assert [m.id for m in mensagens] == ids[8:]
+
+    def test_listar_por_usuario_depois_de(self, sala_com_historico):
+        """Deve retornar mensagens das salas do usuário com ID maior que o cursor."""
+        sala_id, ids = sala_com_historico
+        usuario_id = int(sala_id.split("_")[1])
+        chat_participante_repo.adicionar_participante(sala_id, usuario_id)
+
+        todas = chat_mensagem_repo.listar_por_usuario_depois_de(usuario_id, 0)
+        mensagens = chat_mensagem_repo.listar_por_usuario_depois_de(usuario_id, ids[6])
+
+        assert [m.id for m in todas] == ids
+        assert [m.id for m in mensagens] == ids[7:]
+
+    def test_listar_por_usuario_depois_de_independe_do_instante(self, sala_com_historico):
+        """Mensagem com data_envio anterior à última entregue (gravada tarde) não deve ser perdida."""
+        sala_id, ids = sala_com_historico
+        usuario_id = int(sala_id.split("_")[1])
+        chat_participante_repo.adicionar_participante(sala_id, usuario_id)
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE chat_mensagem SET data_envio = ? WHERE id = ?",
+                (datetime(2000, 1, 1), ids[9])
+            )
+
+        mensagens = chat_mensagem_repo.listar_por_usuario_depois_de(usuario_id, ids[8])
+
+        assert [m.id for m in mensagens] == [ids[9]]
+
+    def test_listar_por_usuario_depois_de_ignora_outras_salas(self, sala_com_historico):
+        """Usuário que não participa da sala não deve receber suas mensagens."""
+        outro_id = usuario_repo.inserir(Usuario(
+            id=0,
+            nome="Usuario Fora",
+            email="fora_repo@example.com",
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.CLIENTE.value
+        ))
+
+        assert chat_mensagem_repo.listar_por_usuario_depois_de(outro_id, 0) == []
+
+    def test_obter_ultimo_id(self, sala_com_historico):
+        """Deve retornar o maior ID de mensagem."""
+        _, ids = sala_com_historico
+
+        assert chat_mensagem_repo.obter_ultimo_id() == ids[-1]
+
 
 class TestChatMensagemRepoContar:
     """Testes para a função contar_por_sala."""
@@ -900,6 +1080,87 @@ class TestChatParticipanteRepoContar:
         # Deve contar as mensagens do usuario 1 como não lidas para usuario 2
         assert total >= 0  # Valor depende da implementação
 
+    @pytest.fixture
+    def sala_com_participantes(self):
+        """Cria dois usuários em uma sala com ambos participando."""
+        ids = [
+            usuario_repo.inserir(Usuario(
+                id=0,
+                nome=f"Usuario Contador {i}",
+                email=f"contador{i}@example.com",
+                senha=criar_hash_senha("Senha@123"),
+                perfil=Perfil.CLIENTE.value
+            ))
+            for i in range(2)
+        ]
+        sala = chat_sala_repo.criar_ou_obter_sala(ids[0], ids[1])
+        chat_participante_repo.adicionar_participante(sala.id, ids[0])
+        chat_participante_repo.adicionar_participante(sala.id, ids[1])
+        return sala.id, ids[0], ids[1]
+
+    def test_inserir_incrementa_contador_do_outro_participante(self, sala_com_participantes):
+        """Inserir mensagem deve incrementar apenas o contador do destinatário."""
+        sala_id, remetente_id, destinatario_id = sala_com_participantes
+
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 1")
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 2")
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, destinatario_id) == 2
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, remetente_id) == 0
+        assert chat_participante_repo.obter_por_sala_e_usuario(sala_id, destinatario_id).nao_lidas == 2
+
+    def test_marcar_como_lidas_zera_contador(self, sala_com_participantes):
+        """Marcar como lidas deve zerar o contador do participante."""
+        sala_id, remetente_id, destinatario_id = sala_com_participantes
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 1")
+
+        chat_mensagem_repo.marcar_como_lidas(sala_id, destinatario_id)
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, destinatario_id) == 0
+
+    def test_atualizar_ultima_leitura_zera_contador(self, sala_com_participantes):
+        """Atualizar última leitura deve zerar o contador do participante."""
+        sala_id, remetente_id, destinatario_id = sala_com_participantes
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 1")
+
+        chat_participante_repo.atualizar_ultima_leitura(sala_id, destinatario_id)
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, destinatario_id) == 0
+
+    def test_contar_total_nao_lidas(self, sala_com_participantes):
+        """Total deve somar os contadores de todas as salas do usuário."""
+        sala_id, remetente_id, destinatario_id = sala_com_participantes
+        terceiro_id = usuario_repo.inserir(Usuario(
+            id=0,
+            nome="Usuario Contador 3",
+            email="contador3@example.com",
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.CLIENTE.value
+        ))
+        outra_sala = chat_sala_repo.criar_ou_obter_sala(destinatario_id, terceiro_id)
+        chat_participante_repo.adicionar_participante(outra_sala.id, destinatario_id)
+        chat_participante_repo.adicionar_participante(outra_sala.id, terceiro_id)
+
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 1")
+        chat_mensagem_repo.inserir(outra_sala.id, terceiro_id, "Msg 2")
+        chat_mensagem_repo.inserir(outra_sala.id, terceiro_id, "Msg 3")
+
+        assert chat_participante_repo.contar_total_nao_lidas(destinatario_id) == 3
+        assert chat_participante_repo.contar_total_nao_lidas(remetente_id) == 0
+
+    def test_reconstruir_contadores_corrige_divergencia(self, sala_com_participantes):
+        """Reconstrução deve recalcular contadores divergentes a partir das mensagens."""
+        sala_id, remetente_id, destinatario_id = sala_com_participantes
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 1")
+        mensagem = chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 2")
+        chat_mensagem_repo.excluir(mensagem.id)  # contador fica em 2
+
+        corrigidos = chat_participante_repo.reconstruir_contadores_nao_lidas()
+
+        assert corrigidos == 1
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, destinatario_id) == 1
+        assert chat_participante_repo.reconstruir_contadores_nao_lidas() == 0
+
 
 class TestChatParticipanteRepoExcluir:
     """Testes para a função excluir."""
@@ -521,6 +521,40 @@ class TestIntegracao:
         assert resultado["nao_existe"] is None
 
 
+class TestVersaoGlobal:
+    """Testes da versão global incrementada pelos triggers"""
+
+    @pytest.fixture(autouse=True)
+    def tabela_versao(self, configuracao_db):
+        """A fixture cria só a tabela configuracao; criar_tabela adiciona versão e triggers"""
+        configuracao_repo.criar_tabela()
+
+    def test_versao_inicial(self, configuracao_db):
+        assert configuracao_repo.obter_versao() == 0
+
+    def test_escritas_incrementam_versao(self, configuracao_db):
+        """Inserção, atualização e atualização em lote devem mudar a versão"""
+        configuracao_repo.inserir_ou_atualizar("tema", "claro")
+        apos_inserir = configuracao_repo.obter_versao()
+
+        configuracao_repo.atualizar("tema", "escuro")
+        apos_atualizar = configuracao_repo.obter_versao()
+
+        configuracao_repo.atualizar_multiplas({"tema": "claro"})
+        apos_lote = configuracao_repo.obter_versao()
+
+        assert 0 < apos_inserir < apos_atualizar < apos_lote
+
+    def test_leituras_nao_alteram_versao(self, configuracao_db):
+        configuracao_repo.inserir_ou_atualizar("tema", "claro")
+        versao = configuracao_repo.obter_versao()
+
+        configuracao_repo.obter_todos()
+        configuracao_repo.obter_por_chave("tema")
+
+        assert configuracao_repo.obter_versao() == versao
+
+
 # Fixture para banco de dados de teste
 @pytest.fixture
 def configuracao_db(tmp_path):
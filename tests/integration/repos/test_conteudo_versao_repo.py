@@ -0,0 +1,50 @@
+"""
+Testes para o módulo repo/conteudo_versao_repo.py
+
+Testa os triggers que incrementam a versão do conteúdo público.
+"""
+
+from model.artigo_model import Artigo
+from model.categoria_model import Categoria
+from repo import artigo_repo, categoria_repo, conteudo_versao_repo
+
+
+class TestVersaoConteudo:
+    """Testes da versão global de artigos e categorias"""
+
+    def test_criar_tabela_idempotente(self):
+        versao = conteudo_versao_repo.obter_versao()
+        assert conteudo_versao_repo.criar_tabela() is True
+        assert conteudo_versao_repo.obter_versao() == versao
+
+    def test_alteracoes_de_artigo_incrementam_versao(self):
+        inicial = conteudo_versao_repo.obter_versao()
+
+        artigo_id = artigo_repo.inserir(Artigo(titulo="Versionado", conteudo="Texto"))
+        assert conteudo_versao_repo.obter_versao() == inicial + 1
+
+        artigo = artigo_repo.obter_por_id(artigo_id)
+        artigo.status = "Publicado"
+        artigo_repo.alterar(artigo)
+        assert conteudo_versao_repo.obter_versao() == inicial + 2
+
+        artigo_repo.excluir(artigo_id)
+        assert conteudo_versao_repo.obter_versao() == inicial + 3
+
+    def test_visualizacoes_nao_incrementam_versao(self):
+        artigo_id = artigo_repo.inserir(Artigo(titulo="Lido", conteudo="Texto"))
+        versao = conteudo_versao_repo.obter_versao()
+
+        artigo_repo.incrementar_visualizacoes(artigo_id).result()
+
+        assert conteudo_versao_repo.obter_versao() == versao
+        artigo_repo.excluir(artigo_id)
+
+    def test_alteracoes_de_categoria_incrementam_versao(self):
+        inicial = conteudo_versao_repo.obter_versao()
+
+        categoria = categoria_repo.inserir(Categoria(nome="Versionada", descricao="Teste"))
+        assert conteudo_versao_repo.obter_versao() == inicial + 1
+
+        categoria_repo.excluir(categoria.id)
+        assert conteudo_versao_repo.obter_versao() == inicial + 2
@@ -90,3 +90,117 @@ class TestCriarIndices:
                     mock_cursor.execute.assert_not_called()
                     # Deve logar sucesso mesmo assim
                     mock_logger.info.assert_called_once()
+
+
+class TestPlanosConsultasCriticas:
+    """
+    Benchmark de planos: as consultas quentes de chat e chamados devem usar
+    os índices compostos/parciais sem B-tree temporária.
+
+    O banco é populado e analisado (ANALYZE) para que o planner decida com
+    estatísticas reais em vez de heurísticas de tabela vazia.
+    """
+
+    @pytest.fixture
+    def banco_populado(self, tmp_path):
+        """Cria banco isolado com volume de dados e estatísticas."""
+        from repo import (
+            usuario_repo, chamado_repo, chamado_interacao_repo,
+            chat_sala_repo, chat_participante_repo, chat_mensagem_repo,
+        )
+        from util.db_util import obter_conexao, fechar_pools
+
+        caminho = str(tmp_path / "planos.db")
+        with patch('util.db_util.DATABASE_PATH', caminho):
+            for repo in (usuario_repo, chamado_repo, chamado_interacao_repo,
+                         chat_sala_repo, chat_participante_repo, chat_mensagem_repo):
+                repo.criar_tabela()
+            indices_repo.criar_indices()
+
+            with obter_conexao() as conn:
+                conn.executemany(
+                    "INSERT INTO usuario (id, nome, email, senha, perfil) VALUES (?, ?, ?, 'x', 'Cliente')",
+                    [(i, f"U{i}", f"u{i}@teste.com") for i in range(1, 51)]
+                )
+                salas = [(f"{i}_{i + 1}", "2025-01-01 00:00:00", f"2025-01-01 00:{i:02d}:00") for i in range(1, 50)]
+                conn.executemany("INSERT INTO chat_sala (id, criada_em, ultima_atividade) VALUES (?, ?, ?)", salas)
+                conn.executemany(
+                    "INSERT INTO chat_participante (sala_id, usuario_id) VALUES (?, ?)",
+                    [(f"{i}_{i + 1}", u) for i in range(1, 50) for u in (i, i + 1)]
+                )
+                conn.executemany(
+                    "INSERT INTO chat_mensagem (sala_id, usuario_id, mensagem, data_envio, lida_em) "
+                    "VALUES (?, ?, 'm', '2025-01-01 00:00:00', ?)",
+                    [(f"{i % 49 + 1}_{i % 49 + 2}", i % 49 + 1, None if i % 3 else "2025-01-01")
+                     for i in range(5000)]
+                )
+                conn.executemany(
+                    "INSERT INTO chamado (id, titulo, status, prioridade, usuario_id) "
+                    "VALUES (?, 't', 'Aberto', 'Média', ?)",
+                    [(i, i % 50 + 1) for i in range(1, 201)]
+                )
+                conn.executemany(
+                    "INSERT INTO chamado_interacao (chamado_id, usuario_id, mensagem, tipo, data_leitura) "
+                    "VALUES (?, ?, 'm', 'Resposta do Usuário', ?)",
+                    [(i % 200 + 1, i % 50 + 1, None if i % 4 else "2025-01-01") for i in range(4000)]
+                )
+                conn.execute("ANALYZE")
+
+            yield
+            fechar_pools()
+
+    def _plano(self, sql, parametros):
+        return indices_repo.obter_plano_consulta(sql, parametros)
+
+    def _assert_sem_temp_btree(self, plano, indice):
+        texto = " | ".join(plano)
+        assert "TEMP B-TREE" not in texto, texto
+        assert indice in texto, texto
+
+    def test_chat_mensagem_listar_por_sala(self, banco_populado):
+        from sql.chat_mensagem_sql import LISTAR_POR_SALA
+        plano = self._plano(LISTAR_POR_SALA, ("1_2", 50, 0))
+        self._assert_sem_temp_btree(plano, "idx_chat_mensagem_sala_id_id")
+
+    def test_chat_mensagem_listar_por_cursor(self, banco_populado):
+        from sql.chat_mensagem_sql import LISTAR_POR_SALA_ANTES_DE
+        plano = self._plano(LISTAR_POR_SALA_ANTES_DE, ("1_2", 1000, 50))
+        self._assert_sem_temp_btree(plano, "idx_chat_mensagem_sala_id_id (sala_id=? AND id<?)")
+
+    def test_chat_mensagem_ultima_da_sala(self, banco_populado):
+        from sql.chat_mensagem_sql import OBTER_ULTIMA_MENSAGEM_SALA
+        plano = self._plano(OBTER_ULTIMA_MENSAGEM_SALA, ("1_2",))
+        self._assert_sem_temp_btree(plano, "idx_chat_mensagem_sala_id_id")
+
+    def test_chat_mensagem_marcar_como_lidas(self, banco_populado):
+        from sql.chat_mensagem_sql import MARCAR_COMO_LIDAS
+        plano = self._plano(MARCAR_COMO_LIDAS, ("2025-01-01", "1_2", 1))
+        self._assert_sem_temp_btree(plano, "idx_chat_mensagem_nao_lidas")
+
+    def test_chat_participante_total_nao_lidas(self, banco_populado):
+        from sql.chat_participante_sql import SOMAR_NAO_LIDAS_POR_USUARIO
+        plano = self._plano(SOMAR_NAO_LIDAS_POR_USUARIO, (1,))
+        self._assert_sem_temp_btree(plano, "idx_chat_participante_usuario_sala (usuario_id=?)")
+
+    def test_chamado_interacao_por_chamado(self, banco_populado):
+        from sql.chamado_interacao_sql import OBTER_POR_CHAMADO
+        plano = self._plano(OBTER_POR_CHAMADO, (1,))
+        self._assert_sem_temp_btree(plano, "idx_chamado_interacao_chamado_data")
+
+    def test_chamado_interacao_marcar_como_lidas(self, banco_populado):
+        from sql.chamado_interacao_sql import MARCAR_COMO_LIDAS
+        plano = self._plano(MARCAR_COMO_LIDAS, ("2025-01-01", 1, 1))
+        self._assert_sem_temp_btree(plano, "idx_chamado_interacao_nao_lidas")
+
+    def test_chamado_interacao_contar_nao_lidas(self, banco_populado):
+        from sql.chamado_interacao_sql import CONTAR_NAO_LIDAS_POR_CHAMADO
+        plano = self._plano(CONTAR_NAO_LIDAS_POR_CHAMADO, (1,))
+        self._assert_sem_temp_btree(plano, "idx_chamado_interacao_nao_lidas")
+
+    def test_indices_obsoletos_removidos(self, banco_populado):
+        from util.db_util import obter_conexao
+        with obter_conexao() as conn:
+            nomes = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_chat_mensagem_sala_id" not in nomes
+        assert "idx_chamado_interacao_chamado_id" not in nomes
+        assert "idx_chat_participante_usuario_id" not in nomes
@@ -4,7 +4,7 @@ Testa seleção de temas visuais e sistema de auditoria de logs
 """
 from fastapi import status
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 import pytest
 import sqlite3
 
@@ -45,6 +45,16 @@ class TestTema:
             assert response.status_code == status.HTTP_303_SEE_OTHER
             assert response.headers["location"] == "/admin/tema"
 
+    def test_aplicar_tema_precomprime_css(self, admin_autenticado):
+        """O CSS trocado deve ganhar novos irmãos .gz/.br"""
+        css_original = Path("static/css/bootswatch/original.bootstrap.min.css")
+
+        if css_original.exists():
+            with patch("routes.admin_configuracoes_routes.precomprimir_arquivo") as mock_precomprimir:
+                admin_autenticado.post("/admin/tema/aplicar", data={"tema": "original"})
+
+            mock_precomprimir.assert_called_once_with(Path("static/css/bootstrap.min.css"))
+
     def test_aplicar_tema_inexistente(self, admin_autenticado):
         """Deve rejeitar tema inexistente"""
         response = admin_autenticado.post("/admin/tema/aplicar", data={
@@ -263,7 +273,7 @@ class TestListarConfiguracoes:
 
     def test_listar_configuracoes_erro_banco(self, admin_autenticado):
         """Erro de banco deve redirecionar com mensagem"""
-        with patch('routes.admin_configuracoes_routes.configuracao_repo') as mock_repo:
+        with patch('routes.admin_configuracoes_routes.configuracao_repo', new_callable=AsyncMock) as mock_repo:
             mock_repo.obter_por_categoria.side_effect = sqlite3.Error("Database error")
 
             response = admin_autenticado.get(
@@ -309,7 +319,7 @@ class TestAplicarTemaErros:
         css_original = Path("static/css/bootswatch/original.bootstrap.min.css")
 
         if css_original.exists():
-            with patch('routes.admin_configuracoes_routes.configuracao_repo') as mock_repo:
+            with patch('routes.admin_configuracoes_routes.configuracao_repo', new_callable=AsyncMock) as mock_repo:
                 mock_repo.obter_por_chave.return_value = MagicMock(valor="original")
                 mock_repo.inserir_ou_atualizar.return_value = False
 
@@ -430,7 +440,7 @@ class TestSalvarLoteConfiguracoes:
 
         request = self._criar_request_mock({"toast_delay": "5000"})
 
-        with patch('routes.admin_configuracoes_routes.configuracao_repo') as mock_repo:
+        with patch('routes.admin_configuracoes_routes.configuracao_repo', new_callable=AsyncMock) as mock_repo:
             mock_repo.atualizar_multiplas.return_value = (1, [])
 
             response = await post_salvar_lote_configuracoes(request)
@@ -447,7 +457,7 @@ class TestSalvarLoteConfiguracoes:
             "chave_inexistente": "valor"
         })
 
-        with patch('routes.admin_configuracoes_routes.configuracao_repo') as mock_repo:
+        with patch('routes.admin_configuracoes_routes.configuracao_repo', new_callable=AsyncMock) as mock_repo:
             mock_repo.atualizar_multiplas.return_value = (1, ["chave_inexistente"])
 
             response = await post_salvar_lote_configuracoes(request)
@@ -461,7 +471,7 @@ class TestSalvarLoteConfiguracoes:
 
         request = self._criar_request_mock({"toast_delay": "5000"})
 
-        with patch('routes.admin_configuracoes_routes.configuracao_repo') as mock_repo:
+        with patch('routes.admin_configuracoes_routes.configuracao_repo', new_callable=AsyncMock) as mock_repo:
             mock_repo.atualizar_multiplas.return_value = (0, [])
 
             response = await post_salvar_lote_configuracoes(request)
@@ -533,7 +543,7 @@ class TestSalvarLoteConfiguracoes:
 
         request = self._criar_request_mock({"toast_delay": "5000"})
 
-        with patch('routes.admin_configuracoes_routes.configuracao_repo') as mock_repo:
+        with patch('routes.admin_configuracoes_routes.configuracao_repo', new_callable=AsyncMock) as mock_repo:
             mock_repo.atualizar_multiplas.side_effect = sqlite3.Error("Database error")
 
             response = await post_salvar_lote_configuracoes(request)
@@ -2,6 +2,8 @@
 Testes de autenticação e autorização
 Testa login, cadastro, logout e recuperação de senha
 """
+import time
+
 from fastapi import status
 from util.perfis import Perfil
 from tests.test_helpers import assert_redirects_to, assert_permission_denied, assert_contains_text
@@ -34,6 +36,33 @@ class TestLogin:
         # Deve redirecionar após login bem-sucedido
         assert_redirects_to(response, "/usuario")
 
+    def test_login_regera_hash_com_parametros_antigos(self, client, usuario_teste):
+        """Login com hash de custo antigo deve gravar hash com os parâmetros atuais"""
+        from passlib.context import CryptContext
+        from model.usuario_model import Usuario
+        from repo import usuario_repo
+        from util.security import pwd_context
+
+        hash_antigo = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(usuario_teste["senha"])
+        usuario_repo.inserir(Usuario(
+            id=0,
+            nome=usuario_teste["nome"],
+            email=usuario_teste["email"],
+            senha=hash_antigo,
+            perfil=Perfil.CLIENTE.value
+        ))
+
+        response = client.post("/login", data={
+            "email": usuario_teste["email"],
+            "senha": usuario_teste["senha"]
+        }, follow_redirects=False)
+
+        assert_redirects_to(response, "/usuario")
+        novo_hash = usuario_repo.obter_por_email(usuario_teste["email"]).senha
+        assert novo_hash != hash_antigo
+        assert pwd_context.verify(usuario_teste["senha"], novo_hash)
+        assert not pwd_context.needs_update(novo_hash)
+
     def test_login_com_email_invalido(self, client):
         """Deve rejeitar login com e-mail inexistente"""
         response = client.post("/login", data={
@@ -464,10 +493,10 @@ class TestCadastroAdicional:
 
     def test_cadastro_erro_ao_inserir(self, client):
         """Deve mostrar erro quando inserção falha"""
-        from unittest.mock import patch
+        from unittest.mock import AsyncMock, patch
 
         with patch('routes.auth_routes.verificar_email_disponivel', return_value=(True, None)):
-            with patch('routes.auth_routes.usuario_repo.inserir', return_value=None):
+            with patch('routes.auth_routes.usuario_repo.inserir', new_callable=AsyncMock, return_value=None):
                 response = client.post("/cadastrar", data={
                     "perfil": "Cliente",
                     "nome": "Usuario Teste",
@@ -491,8 +520,8 @@ class TestEsqueciSenhaAdicional:
         assert response.status_code == status.HTTP_200_OK
 
     def test_email_enviado_com_sucesso(self, client, criar_usuario, usuario_teste):
-        """Deve enviar e-mail quando usuário existe"""
-        from unittest.mock import patch
+        """Deve enfileirar e-mail de recuperação quando usuário existe"""
+        from repo import email_pendente_repo
 
         criar_usuario(
             usuario_teste["nome"],
@@ -500,12 +529,16 @@ class TestEsqueciSenhaAdicional:
             usuario_teste["senha"]
         )
 
-        with patch('routes.auth_routes.servico_email.enviar_recuperacao_senha', return_value=True):
-            response = client.post("/esqueci-senha", data={
-                "email": usuario_teste["email"]
-            }, follow_redirects=False)
+        response = client.post("/esqueci-senha", data={
+            "email": usuario_teste["email"]
+        }, follow_redirects=False)
 
-            assert response.status_code == status.HTTP_303_SEE_OTHER
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+        enfileirados = [
+            email for email in email_pendente_repo.reivindicar_prontos(time.time(), 10, 60)
+            if email.assunto == "Recuperação de Senha"
+        ]
+        assert [email.para_email for email in enfileirados] == [usuario_teste["email"]]
 
 
 class TestRedefinirSenhaAdicional:
@@ -176,6 +176,28 @@ class TestChatRoutes:
         data = response.json()
         assert isinstance(data, list)
 
+    def test_listar_mensagens_paginacao_por_cursor(self, usuarios_chat):
+        """latest/before_id devem paginar do mais recente para o mais antigo"""
+        client = usuarios_chat["client"]
+        outro_id = usuarios_chat["outro_usuario_id"]
+        resp = client.post("/chat/salas", data={"outro_usuario_id": outro_id})
+        sala_id = resp.json()["sala_id"]
+        for i in range(5):
+            client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": f"Msg {i}"})
+
+        recentes = client.get(f"/chat/mensagens/{sala_id}?limit=3&latest=true").json()
+        anteriores = client.get(
+            f"/chat/mensagens/{sala_id}?limit=3&before_id={recentes[0]['id']}"
+        ).json()
+
+        assert [m["mensagem"] for m in recentes] == ["Msg 2", "Msg 3", "Msg 4"]
+        assert [m["mensagem"] for m in anteriores] == ["Msg 0", "Msg 1"]
+
+        posteriores = client.get(
+            f"/chat/mensagens/{sala_id}?after_id={anteriores[-1]['id']}"
+        ).json()
+        assert [m["mensagem"] for m in posteriores] == ["Msg 2", "Msg 3", "Msg 4"]
+
     # =========================================================================
     # Testes de Envio de Mensagem
     # =========================================================================
@@ -505,10 +527,10 @@ class TestChatValidationErrors:
         fazer_login("sala_fantasma@teste.com", "Teste@123")
 
         # Mock: participante existe mas sala não
-        with patch('routes.chat_routes.chat_participante_repo.obter_por_sala_e_usuario') as mock_part:
+        with patch('repo.chat_participante_repo.obter_por_sala_e_usuario') as mock_part:
             mock_part.return_value = MagicMock(usuario_id=usuario_id, sala_id="sala_fantasma")
 
-            with patch('routes.chat_routes.chat_sala_repo.obter_por_id', return_value=None):
+            with patch('repo.chat_sala_repo.obter_por_id', return_value=None):
                 response = client.post(
                     "/chat/mensagens",
                     data={"sala_id": "sala_fantasma", "mensagem": "teste"}
@@ -553,94 +575,130 @@ class TestChatTotalNaoLidas:
 class TestChatListarConversasEdgeCases:
     """Testes de casos de borda para listagem de conversas"""
 
-    def test_listar_conversas_sala_inexistente(self, client, fazer_login, criar_usuario_direto):
-        """Deve tratar quando sala não existe mais (continue no loop)"""
-        usuario_id = criar_usuario_direto(
+    def test_listar_conversas_sem_participacoes(self, client, fazer_login, criar_usuario_direto):
+        """Usuário sem salas deve receber lista vazia"""
+        criar_usuario_direto(
             nome="User Sala Inexistente",
             email="sala_inexistente@teste.com",
             senha="Teste@123"
         )
         fazer_login("sala_inexistente@teste.com", "Teste@123")
 
-        # Mock para simular participação em sala que não existe
-        with patch('routes.chat_routes.chat_participante_repo.listar_por_usuario') as mock_part:
-            mock_participacao = MagicMock()
-            mock_participacao.sala_id = "sala_que_nao_existe"
-            mock_part.return_value = [mock_participacao]
-
-            with patch('routes.chat_routes.chat_sala_repo.obter_por_id', return_value=None):
-                response = client.get("/chat/conversas")
+        response = client.get("/chat/conversas")
 
-                assert response.status_code == 200
-                # Lista deve estar vazia (sala inexistente é ignorada)
-                assert response.json() == []
+        assert response.status_code == 200
+        assert response.json() == []
 
     def test_listar_conversas_outro_participante_inexistente(self, client, fazer_login, criar_usuario_direto):
-        """Deve tratar quando não encontra outro participante na sala"""
+        """Deve ignorar sala sem outro participante"""
+        from repo import chat_sala_repo as sala_repo, chat_participante_repo as participante_repo
+
         usuario_id = criar_usuario_direto(
             nome="User Sem Outro",
             email="sem_outro@teste.com",
             senha="Teste@123"
         )
+        outro_id = criar_usuario_direto(
+            nome="Outro Sem Participacao",
+            email="outro_sem_part@teste.com",
+            senha="Teste@123"
+        )
         fazer_login("sem_outro@teste.com", "Teste@123")
 
-        # Mock para simular sala sem outro participante
-        with patch('routes.chat_routes.chat_participante_repo.listar_por_usuario') as mock_list_user:
-            mock_participacao = MagicMock()
-            mock_participacao.sala_id = "sala_teste"
-            mock_list_user.return_value = [mock_participacao]
+        # Sala com apenas o próprio usuário como participante
+        sala = sala_repo.criar_ou_obter_sala(usuario_id, outro_id)
+        participante_repo.adicionar_participante(sala.id, usuario_id)
 
-            with patch('routes.chat_routes.chat_sala_repo.obter_por_id') as mock_sala:
-                mock_sala_obj = MagicMock()
-                mock_sala_obj.id = "sala_teste"
-                mock_sala.return_value = mock_sala_obj
-
-                # Simular lista de participantes com apenas o próprio usuário
-                with patch('routes.chat_routes.chat_participante_repo.listar_por_sala') as mock_list_sala:
-                    mock_part_proprio = MagicMock()
-                    mock_part_proprio.usuario_id = usuario_id
-                    mock_list_sala.return_value = [mock_part_proprio]
-
-                    response = client.get("/chat/conversas")
+        response = client.get("/chat/conversas")
 
-                    assert response.status_code == 200
-                    # Lista deve estar vazia (sem outro participante)
-                    assert response.json() == []
+        assert response.status_code == 200
+        assert response.json() == []
 
     def test_listar_conversas_outro_usuario_excluido(self, client, fazer_login, criar_usuario_direto):
-        """Deve tratar quando outro usuário foi excluído do sistema"""
-        usuario_id = criar_usuario_direto(
+        """Deve ignorar sala cujo outro usuário foi excluído do sistema"""
+        from repo import usuario_repo as repo_usuario
+
+        criar_usuario_direto(
             nome="User Outro Excluido",
             email="outro_excluido@teste.com",
             senha="Teste@123"
         )
+        outro_id = criar_usuario_direto(
+            nome="Outro Excluido",
+            email="outro_excluido2@teste.com",
+            senha="Teste@123"
+        )
         fazer_login("outro_excluido@teste.com", "Teste@123")
+        client.post("/chat/salas", data={"outro_usuario_id": outro_id})
 
-        # Mock para simular sala com participante cujo usuário foi excluído
-        with patch('routes.chat_routes.chat_participante_repo.listar_por_usuario') as mock_list_user:
-            mock_participacao = MagicMock()
-            mock_participacao.sala_id = "sala_teste"
-            mock_list_user.return_value = [mock_participacao]
+        repo_usuario.excluir(outro_id)
+        response = client.get("/chat/conversas")
 
-            with patch('routes.chat_routes.chat_sala_repo.obter_por_id') as mock_sala:
-                mock_sala_obj = MagicMock()
-                mock_sala_obj.id = "sala_teste"
-                mock_sala.return_value = mock_sala_obj
+        assert response.status_code == 200
+        assert response.json() == []
 
-                with patch('routes.chat_routes.chat_participante_repo.listar_por_sala') as mock_list_sala:
-                    mock_part_proprio = MagicMock()
-                    mock_part_proprio.usuario_id = usuario_id
-                    mock_part_outro = MagicMock()
-                    mock_part_outro.usuario_id = 99999  # Usuário que foi excluído
-                    mock_list_sala.return_value = [mock_part_proprio, mock_part_outro]
+    def test_listar_conversas_sem_consultas_por_sala(self, client, fazer_login, criar_usuario_direto):
+        """Listagem deve vir de uma única query, sem consultas por sala"""
+        criar_usuario_direto(
+            nome="User Query Unica",
+            email="query_unica@teste.com",
+            senha="Teste@123"
+        )
+        outro_id = criar_usuario_direto(
+            nome="Outro Query Unica",
+            email="query_unica2@teste.com",
+            senha="Teste@123"
+        )
+        fazer_login("query_unica@teste.com", "Teste@123")
+        client.post("/chat/salas", data={"outro_usuario_id": outro_id})
 
-                    # Usuário excluído - retorna None
-                    with patch('routes.chat_routes.usuario_repo.obter_por_id', return_value=None):
-                        response = client.get("/chat/conversas")
+        with patch('repo.chat_participante_repo.listar_por_sala') as mock_sala, \
+             patch('repo.usuario_repo.obter_por_id') as mock_usuario:
+            response = client.get("/chat/conversas")
 
-                        assert response.status_code == 200
-                        # Lista deve estar vazia (outro usuário foi excluído)
-                        assert response.json() == []
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["outro_usuario"]["id"] == outro_id
+        assert data[0]["outro_usuario"]["nome"] == "Outro Query Unica"
+        assert data[0]["ultima_mensagem"] is None
+        mock_sala.assert_not_called()
+        mock_usuario.assert_not_called()
+
+    def test_listar_conversas_paginacao_por_cursor(self, client, fazer_login, criar_usuario_direto):
+        """Cursor da última conversa deve retornar a página seguinte sem repetir"""
+        criar_usuario_direto(
+            nome="User Cursor",
+            email="cursor@teste.com",
+            senha="Teste@123"
+        )
+        outros = [
+            criar_usuario_direto(
+                nome=f"Outro Cursor {i}",
+                email=f"cursor_outro{i}@teste.com",
+                senha="Teste@123"
+            )
+            for i in range(3)
+        ]
+        fazer_login("cursor@teste.com", "Teste@123")
+        for outro_id in outros:
+            client.post("/chat/salas", data={"outro_usuario_id": outro_id})
+
+        primeira = client.get("/chat/conversas?limit=2").json()
+        ultima = primeira[-1]
+        segunda = client.get(
+            "/chat/conversas",
+            params={
+                "limit": 2,
+                "antes_atividade": ultima["ultima_atividade"],
+                "antes_sala_id": ultima["sala_id"],
+            }
+        ).json()
+
+        assert len(primeira) == 2
+        assert len(segunda) == 1
+        ids_primeira = {c["sala_id"] for c in primeira}
+        assert segunda[0]["sala_id"] not in ids_primeira
 
 
 class TestChatEnviarMensagemEdgeCases:
@@ -712,3 +770,91 @@ class TestChatEnviarMensagemEdgeCases:
 
             # Deve retornar 400 Bad Request
             assert response.status_code == 400
+
+
+class TestChatStreamReenvio:
+    """Testes do formato SSE e do reenvio de eventos perdidos a partir do banco"""
+
+    def test_formatar_evento_com_id(self):
+        """Eventos com ID devem incluir o campo id: do SSE"""
+        from routes.chat_routes import _formatar_evento_sse
+        from util.chat_manager import EventoChat
+
+        texto = _formatar_evento_sse(EventoChat({"tipo": "atualizar_contador"}, 42))
+
+        assert texto == 'id: 42\ndata: {"tipo": "atualizar_contador"}\n\n'
+
+    def test_formatar_evento_sem_id(self):
+        from routes.chat_routes import _formatar_evento_sse
+
+        assert _formatar_evento_sse({"tipo": "x"}) == 'data: {"tipo": "x"}\n\n'
+
+    def test_formatar_evento_com_cursor_de_mensagem(self):
+        """Com cursor, o id: deve levar o ID do evento e o da última mensagem entregue"""
+        from routes.chat_routes import _formatar_evento_sse
+        from util.chat_manager import EventoChat
+
+        texto = _formatar_evento_sse(EventoChat({"tipo": "atualizar_contador"}, 42), 7)
+
+        assert texto.startswith('id: 42-7\n')
+
+    def test_formatar_lote_avanca_cursor(self):
+        """O cursor deve avançar com as mensagens do lote"""
+        from routes.chat_routes import _formatar_lote_sse
+        from util.chat_manager import EventoChat
+
+        eventos = [
+            EventoChat({"tipo": "nova_mensagem", "mensagem": {"id": 9}}, 100),
+            EventoChat({"tipo": "atualizar_contador"}, 101),
+        ]
+        texto, cursor = _formatar_lote_sse(eventos, 5)
+
+        assert cursor == 9
+        assert 'id: 100-9\n' in texto
+        assert 'id: 101-9\n' in texto
+
+    @pytest.mark.parametrize("valor,esperado", [
+        ("42-7", (42, 7)),
+        ("42", (42, None)),
+        ("abc", (None, None)),
+        ("42-x", (None, None)),
+    ])
+    def test_obter_ultimo_evento_id(self, valor, esperado):
+        """Last-Event-ID no formato "<evento>-<mensagem>" e no formato antigo"""
+        from routes.chat_routes import _obter_ultimo_evento_id
+
+        request = MagicMock()
+        request.headers = {"last-event-id": valor}
+        request.query_params = {}
+
+        assert _obter_ultimo_evento_id(request) == esperado
+
+    async def test_eventos_perdidos_do_banco(self):
+        """Mensagens com ID maior que o cursor devem virar eventos e um atualizar_contador final"""
+        from datetime import datetime, timezone
+        from model.chat_mensagem_model import ChatMensagem
+        from routes.chat_routes import _eventos_perdidos_do_banco
+
+        envio = datetime(2025, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        mensagens = [
+            ChatMensagem(id=i, sala_id="1_2", usuario_id=2, mensagem=f"m{i}", data_envio=envio, lida_em=None)
+            for i in (7, 8)
+        ]
+
+        with patch('repo.chat_mensagem_repo.listar_por_usuario_depois_de', return_value=mensagens) as mock_listar:
+            eventos = await _eventos_perdidos_do_banco(1, 6, 1000)
+
+        assert mock_listar.call_args[0][:2] == (1, 6)
+        assert [e["mensagem"]["id"] for e in eventos[:-1]] == [7, 8]
+        assert all(e.id == 1000 for e in eventos[:-1])
+        assert eventos[-1] == {"tipo": "atualizar_contador"}
+
+    async def test_eventos_perdidos_sem_cursor_so_atualiza_contador(self):
+        """Last-Event-ID no formato antigo (sem cursor) não deve consultar mensagens"""
+        from routes.chat_routes import _eventos_perdidos_do_banco
+
+        with patch('repo.chat_mensagem_repo.listar_por_usuario_depois_de') as mock_listar:
+            eventos = await _eventos_perdidos_do_banco(1, None, 1000)
+
+        mock_listar.assert_not_called()
+        assert eventos == [{"tipo": "atualizar_contador"}]
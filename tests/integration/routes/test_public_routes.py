@@ -181,3 +181,108 @@ class TestPublicRateLimiting:
         response = client.get("/sobre")
 
         assert response.status_code == 429
+
+
+class TestCachePaginasPublicas:
+    """Testes do cache de páginas públicas"""
+
+    @pytest.fixture(autouse=True)
+    def versao_sincronizada(self, client):
+        """Alinha o cache à versão do banco (a sincronização em background não o invalida)"""
+        from util.pagina_cache import cache_paginas
+
+        cache_paginas.sincronizar()
+        yield cache_paginas
+
+    @pytest.fixture
+    def artigo_publicado(self):
+        from model.artigo_model import Artigo
+        from repo import artigo_repo
+
+        artigo_id = artigo_repo.inserir(Artigo(titulo="Artigo em cache", conteudo="Texto", status="Publicado"))
+        yield artigo_id
+        artigo_repo.excluir(artigo_id)
+
+    def test_segundo_acesso_anonimo_nao_consulta_banco(self, client):
+        """O HTML da segunda requisição anônima vem do cache"""
+        from repo import artigo_repo
+        from routes import public_routes
+
+        with patch(
+            "routes.public_routes.artigo_repo.obter_ultimos_publicados",
+            wraps=artigo_repo.obter_ultimos_publicados,
+        ) as mock_obter, patch(
+            "routes.public_routes.templates_public.TemplateResponse",
+            wraps=public_routes.templates_public.TemplateResponse,
+        ) as mock_template:
+            primeira = client.get("/")
+            segunda = client.get("/")
+
+        assert primeira.status_code == segunda.status_code == status.HTTP_200_OK
+        assert primeira.text == segunda.text
+        assert mock_obter.call_count == 1
+        assert mock_template.call_count == 1
+
+    def test_parametros_geram_paginas_distintas(self, client):
+        """Páginas diferentes da lista não compartilham entrada"""
+        with patch("routes.public_routes.artigo_repo.obter_publicados", return_value=[]) as mock_obter:
+            client.get("/artigos?page=1")
+            client.get("/artigos?page=2")
+            client.get("/artigos?page=1")
+
+        assert mock_obter.call_count == 2
+
+    def test_usuario_logado_nao_recebe_pagina_anonima(self, client, cliente_autenticado, usuario_teste):
+        """A navbar com o usuário logado não vem do cache anônimo"""
+        response = cliente_autenticado.get("/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert usuario_teste["nome"] in response.text
+
+    def test_alterar_artigo_invalida_cache(self, client, artigo_publicado):
+        """Alterações em artigos aparecem na próxima requisição"""
+        from repo import artigo_repo
+
+        assert "Artigo em cache" in client.get(f"/artigos/ler/{artigo_publicado}").text
+
+        artigo = artigo_repo.obter_por_id(artigo_publicado)
+        artigo.titulo = "Título alterado"
+        artigo_repo.alterar(artigo)
+
+        assert "Título alterado" in client.get(f"/artigos/ler/{artigo_publicado}").text
+
+    def test_visualizacoes_contadas_com_pagina_em_cache(self, client, artigo_publicado):
+        """Leituras servidas do cache continuam incrementando o contador"""
+        from repo import artigo_repo
+        from util.db_util import obter_fila_escrita
+
+        client.get(f"/artigos/ler/{artigo_publicado}")
+        client.get(f"/artigos/ler/{artigo_publicado}")
+
+        # Os incrementos não são aguardados pela rota: a fila é FIFO, então
+        # uma operação vazia enfileirada depois deles marca sua conclusão
+        obter_fila_escrita().submeter(lambda conn: None).result()
+        assert artigo_repo.obter_por_id(artigo_publicado).visualizacoes == 2
+
+    def test_falha_no_incremento_registrada_no_log(self, client, artigo_publicado):
+        """Erro da thread escritora não derruba a leitura, mas vai para o log"""
+        from concurrent.futures import Future
+
+        futuro = Future()
+        with patch("routes.public_routes.artigo_repo.incrementar_visualizacoes", return_value=futuro), \
+                patch("routes.public_routes.logger") as mock_logger:
+            response = client.get(f"/artigos/ler/{artigo_publicado}")
+            futuro.set_exception(RuntimeError("database is locked"))
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_logger.warning.assert_called_once()
+        assert "database is locked" in mock_logger.warning.call_args[0][0]
+
+    def test_artigo_inexistente_nao_cacheado(self, client):
+        """404 não é armazenado"""
+        from util.pagina_cache import cache_paginas
+
+        response = client.get("/artigos/ler/999999")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert cache_paginas.obter_estatisticas()["bytes"] == 0
@@ -3,7 +3,7 @@ Testes de integração para rotas de usuário (/usuario)
 Testa dashboard, perfil, edição, alteração de senha e upload de foto
 """
 from fastapi import status
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from tests.test_helpers import assert_redirects_to, assert_permission_denied, assert_contains_text
 
 
@@ -56,7 +56,7 @@ class TestVisualizarPerfil:
 
     def test_visualizar_perfil_usuario_nao_encontrado(self, cliente_autenticado):
         """Redireciona para logout se usuário não for encontrado no banco"""
-        with patch('routes.usuario_routes.usuario_repo') as mock_repo:
+        with patch('routes.usuario_routes.usuario_repo', new_callable=AsyncMock) as mock_repo:
             mock_repo.obter_por_id.return_value = None
 
             response = cliente_autenticado.get(
@@ -317,7 +317,7 @@ class TestAtualizarFoto:
 
     def test_atualizar_foto_erro_io(self, cliente_autenticado):
         """Deve tratar erro de I/O ao salvar foto"""
-        with patch('routes.usuario_routes.salvar_foto_cropada_usuario', side_effect=IOError("Disk full")):
+        with patch('routes.usuario_routes.salvar_foto_cropada_usuario_async', side_effect=IOError("Disk full")):
             response = cliente_autenticado.post(
                 "/usuario/perfil/atualizar-foto",
                 data={"foto_base64": "data:image/png;base64," + "A" * 200},
@@ -328,7 +328,7 @@ class TestAtualizarFoto:
 
     def test_atualizar_foto_erro_os(self, cliente_autenticado):
         """Deve tratar OSError ao salvar foto"""
-        with patch('routes.usuario_routes.salvar_foto_cropada_usuario', side_effect=OSError("Permission denied")):
+        with patch('routes.usuario_routes.salvar_foto_cropada_usuario_async', side_effect=OSError("Permission denied")):
             response = cliente_autenticado.post(
                 "/usuario/perfil/atualizar-foto",
                 data={"foto_base64": "data:image/png;base64," + "A" * 200},
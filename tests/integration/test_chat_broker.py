@@ -0,0 +1,143 @@
+"""
+Testes para o módulo util/chat_broker.py
+
+Testa os brokers de distribuição de eventos do chat: entrega em memória e
+pub/sub entre workers via SQLite (simulado com duas instâncias de broker,
+cada uma com sua origem, sobre o mesmo banco).
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from util.chat_broker import BrokerMemoria, BrokerSQLite, MetricaLatencia, criar_broker
+from util.chat_manager import GerenciadorChat
+
+
+async def _aguardar_item(queue: asyncio.Queue, timeout: float = 2.0):
+    return await asyncio.wait_for(queue.get(), timeout)
+
+
+class TestMetricaLatencia:
+    """Testes para a classe MetricaLatencia"""
+
+    def test_estatisticas_vazias(self):
+        stats = MetricaLatencia().obter_estatisticas()
+
+        assert stats["entregas"] == 0
+        assert stats["latencia_media_ms"] == 0
+        assert stats["latencia_p95_ms"] == 0
+
+    def test_registra_media_maxima_e_p95(self):
+        metrica = MetricaLatencia(janela=100)
+        for i in range(1, 101):
+            metrica.registrar(i / 1000)
+
+        stats = metrica.obter_estatisticas()
+
+        assert stats["entregas"] == 100
+        assert stats["latencia_media_ms"] == pytest.approx(50.5)
+        assert stats["latencia_maxima_ms"] == pytest.approx(100)
+        assert stats["latencia_p95_ms"] == pytest.approx(95)
+
+
+class TestBrokerMemoria:
+    """Testes para o broker em memória"""
+
+    def test_interface_abstrata(self):
+        from util.chat_broker import BrokerChat
+
+        with pytest.raises(TypeError):
+            BrokerChat()
+
+    async def test_broadcast_entrega_pelo_broker(self):
+        """broadcast_para_sala deve passar pelo broker e chegar à fila local"""
+        broker = BrokerMemoria()
+        gerenciador = GerenciadorChat(broker)
+        queue = await gerenciador.conectar(1)
+
+        await gerenciador.broadcast_para_sala("1_2", {"texto": "oi"})
+
+        assert queue.get_nowait() == {"texto": "oi"}
+        stats = gerenciador.obter_estatisticas()["broker"]
+        assert stats["backend"] == "memoria"
+        assert stats["publicados"] == 1
+        assert stats["entregas"] == 1
+
+    async def test_sala_invalida_nao_publica(self):
+        broker = BrokerMemoria()
+        gerenciador = GerenciadorChat(broker)
+
+        await gerenciador.broadcast_para_sala("invalido", {"texto": "oi"})
+
+        assert broker.obter_estatisticas()["publicados"] == 0
+
+    def test_criar_broker_backend_desconhecido_usa_memoria(self):
+        assert isinstance(criar_broker("redis"), BrokerMemoria)
+        assert isinstance(criar_broker("sqlite"), BrokerSQLite)
+
+
+class TestBrokerSQLite:
+    """Testes para o broker entre workers via SQLite"""
+
+    @pytest.fixture
+    def banco_eventos(self, tmp_path):
+        from util.db_util import fechar_pools
+
+        with patch('util.db_util.DATABASE_PATH', str(tmp_path / "eventos.db")):
+            yield
+        fechar_pools()
+
+    async def test_evento_chega_ao_outro_worker(self, banco_eventos):
+        """Mensagem publicada no worker A deve chegar à conexão do worker B"""
+        worker_a = GerenciadorChat(BrokerSQLite(intervalo_ms=10))
+        worker_b = GerenciadorChat(BrokerSQLite(intervalo_ms=10))
+        try:
+            queue_a = await worker_a.conectar(1)
+            queue_b = await worker_b.conectar(2)
+            await asyncio.sleep(0.1)  # consumidores leem o último ID
+
+            await worker_a.broadcast_para_sala("1_2", {"texto": "entre workers"})
+
+            assert await _aguardar_item(queue_b) == {"texto": "entre workers"}
+            # Worker A entrega localmente uma única vez (ignora o próprio evento no log)
+            assert queue_a.get_nowait() == {"texto": "entre workers"}
+            await asyncio.sleep(0.1)
+            assert queue_a.empty()
+
+            stats_b = worker_b.obter_estatisticas()["broker"]
+            assert stats_b["recebidos_outros_workers"] == 1
+            assert stats_b["latencia_maxima_ms"] >= 0
+        finally:
+            await worker_a.encerrar()
+            await worker_b.encerrar()
+
+    async def test_eventos_antigos_nao_sao_reentregues(self, banco_eventos):
+        """Worker iniciado depois não deve receber eventos anteriores"""
+        worker_a = GerenciadorChat(BrokerSQLite(intervalo_ms=10))
+        worker_b = GerenciadorChat(BrokerSQLite(intervalo_ms=10))
+        try:
+            await worker_a.conectar(1)
+            await asyncio.sleep(0.1)
+            await worker_a.broadcast_para_sala("1_2", {"texto": "antigo"})
+
+            queue_b = await worker_b.conectar(2)
+            await asyncio.sleep(0.2)
+
+            assert queue_b.empty()
+        finally:
+            await worker_a.encerrar()
+            await worker_b.encerrar()
+
+    async def test_limpeza_remove_eventos_expirados(self, banco_eventos):
+        from repo import chat_evento_repo
+
+        chat_evento_repo.criar_tabela()
+        chat_evento_repo.inserir("1_2", "{}", "outro", 0.0)
+        chat_evento_repo.inserir("1_2", "{}", "outro", 9e9)
+
+        removidos = chat_evento_repo.excluir_anteriores(1.0)
+
+        assert removidos == 1
+        assert len(chat_evento_repo.listar_posteriores(0, "eu")) == 1
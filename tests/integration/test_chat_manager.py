@@ -8,7 +8,15 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, patch
 
-from util.chat_manager import GerenciadorChat, gerenciador_chat
+from util.chat_manager import (
+    ConexaoChat,
+    EventoChat,
+    GerenciadorChat,
+    gerenciador_chat,
+    POLITICA_AGRUPAR,
+    POLITICA_DESCARTAR_ANTIGAS,
+    POLITICA_DESCONECTAR,
+)
 
 
 class TestGerenciadorChat:
@@ -180,6 +188,239 @@ class TestGerenciadorChat:
         assert gerenciador.esta_conectado(1)
 
 
+class TestGerenciadorChatMultiplasConexoes:
+    """Testes para várias conexões (abas) do mesmo usuário"""
+
+    @pytest.fixture
+    def gerenciador(self):
+        g = GerenciadorChat()
+        yield g
+        g._connections.clear()
+        g._active_connections.clear()
+
+    async def test_conexoes_tem_ids_distintos(self, gerenciador):
+        """Cada conexão deve ter ID próprio e não substituir a anterior"""
+        aba1 = await gerenciador.conectar(1)
+        aba2 = await gerenciador.conectar(1)
+
+        assert aba1.id != aba2.id
+        assert aba1.usuario_id == aba2.usuario_id == 1
+        assert gerenciador.obter_estatisticas()["total_conexoes"] == 2
+        assert gerenciador.obter_estatisticas()["total_usuarios_ativos"] == 1
+
+    async def test_broadcast_entrega_para_todas_as_abas(self, gerenciador):
+        """Mensagem deve chegar a todas as conexões do usuário"""
+        aba1 = await gerenciador.conectar(1)
+        aba2 = await gerenciador.conectar(1)
+        outro = await gerenciador.conectar(2)
+
+        await gerenciador.broadcast_para_sala("1_2", {"texto": "oi"})
+
+        assert aba1.get_nowait() == {"texto": "oi"}
+        assert aba2.get_nowait() == {"texto": "oi"}
+        assert outro.get_nowait() == {"texto": "oi"}
+
+    async def test_desconectar_aba_antiga_mantem_nova(self, gerenciador):
+        """Fechar a aba antiga não deve derrubar a nova"""
+        aba_antiga = await gerenciador.conectar(1)
+        aba_nova = await gerenciador.conectar(1)
+
+        await gerenciador.desconectar(1, aba_antiga.id)
+        await gerenciador.broadcast_para_sala("1_2", {"texto": "oi"})
+
+        assert gerenciador.esta_conectado(1)
+        assert aba_nova.get_nowait() == {"texto": "oi"}
+        assert aba_antiga.empty()
+
+    async def test_desconectar_ultima_aba_remove_usuario(self, gerenciador):
+        """Usuário deve sair dos ativos quando a última conexão fecha"""
+        aba1 = await gerenciador.conectar(1)
+        aba2 = await gerenciador.conectar(1)
+
+        await gerenciador.desconectar(1, aba1.id)
+        await gerenciador.desconectar(1, aba2.id)
+
+        assert not gerenciador.esta_conectado(1)
+        assert 1 not in gerenciador._connections
+
+    async def test_desconectar_conexao_inexistente(self, gerenciador):
+        """Desconectar ID desconhecido não deve afetar outras conexões"""
+        aba = await gerenciador.conectar(1)
+
+        await gerenciador.desconectar(1, aba.id + 1000)
+
+        assert gerenciador.esta_conectado(1)
+
+
+class TestConexaoChatBackpressure:
+    """Testes para filas limitadas e políticas de fila cheia"""
+
+    def test_descartar_antigas_mantem_mais_recentes(self):
+        """Fila cheia deve descartar o evento mais antigo"""
+        conexao = ConexaoChat(1, 1, maxsize=3, politica=POLITICA_DESCARTAR_ANTIGAS)
+
+        for i in range(5):
+            conexao.enfileirar({"n": i})
+
+        assert conexao.qsize() == 3
+        assert conexao.descartados == 2
+        assert [conexao.get_nowait()["n"] for _ in range(3)] == [2, 3, 4]
+
+    def test_agrupar_recibos_de_leitura(self):
+        """Recibos repetidos da mesma sala devem ser agrupados"""
+        conexao = ConexaoChat(1, 1, maxsize=10, politica=POLITICA_AGRUPAR)
+        recibo = {"tipo": "atualizar_contador", "sala_id": "1_2"}
+
+        conexao.enfileirar(recibo)
+        conexao.enfileirar(dict(recibo))
+        conexao.enfileirar({"tipo": "atualizar_contador", "sala_id": "1_3"})
+
+        assert conexao.qsize() == 2
+        assert conexao.agrupados == 1
+
+        # Depois de consumido, novo recibo da mesma sala volta a ser enfileirado
+        conexao.get_nowait()
+        conexao.enfileirar(dict(recibo))
+        assert conexao.qsize() == 2
+
+    def test_desconectar_encerra_e_libera_fila(self):
+        """Política desconectar deve encerrar a conexão e esvaziar a fila"""
+        conexao = ConexaoChat(1, 1, maxsize=2, politica=POLITICA_DESCONECTAR)
+        conexao.enfileirar({"n": 1})
+        conexao.enfileirar({"n": 2})
+
+        resultado = conexao.enfileirar({"n": 3})
+
+        assert resultado == "desconectado"
+        assert conexao.encerrada
+        assert conexao.qsize() == 1  # apenas o sentinela de encerramento
+
+    async def test_obter_lote_drena_todos_os_pendentes(self):
+        """obter_lote deve retornar todos os eventos pendentes de uma vez"""
+        conexao = ConexaoChat(1, 1, maxsize=10)
+        for i in range(4):
+            conexao.enfileirar({"n": i})
+
+        lote = await conexao.obter_lote()
+
+        assert [e["n"] for e in lote] == [0, 1, 2, 3]
+        assert conexao.empty()
+
+    async def test_obter_lote_conexao_encerrada(self):
+        conexao = ConexaoChat(1, 1, maxsize=1, politica=POLITICA_DESCONECTAR)
+        conexao.encerrar()
+
+        assert await conexao.obter_lote() == []
+
+    async def test_gerenciador_contabiliza_descartes(self):
+        """Estatísticas devem contar eventos descartados por fila cheia"""
+        gerenciador = GerenciadorChat(tamanho_fila=1, politica_fila=POLITICA_DESCARTAR_ANTIGAS)
+        conexao = await gerenciador.conectar(1)
+        await gerenciador.conectar(2)
+
+        await gerenciador.broadcast_para_sala("1_2", {"n": 1})
+        await gerenciador.broadcast_para_sala("1_2", {"n": 2})
+
+        assert gerenciador.obter_estatisticas()["eventos_descartados"] == 2
+        assert conexao.get_nowait() == {"n": 2}
+
+    async def test_gerenciador_desconecta_cliente_lento(self):
+        """Política desconectar deve remover a conexão lenta do gerenciador"""
+        gerenciador = GerenciadorChat(tamanho_fila=1, politica_fila=POLITICA_DESCONECTAR)
+        conexao = await gerenciador.conectar(1)
+
+        await gerenciador.broadcast_para_sala("1_2", {"n": 1})
+        await gerenciador.broadcast_para_sala("1_2", {"n": 2})
+
+        assert conexao.encerrada
+        assert not gerenciador.esta_conectado(1)
+        assert gerenciador.obter_estatisticas()["desconectados_por_lentidao"] == 1
+
+
+class TestGerenciadorChatReenvio:
+    """Testes de IDs de evento, heartbeat e reenvio após reconexão (Last-Event-ID)"""
+
+    async def test_eventos_recebem_ids_crescentes(self):
+        """Cada evento entregue deve ter ID maior que o anterior"""
+        gerenciador = GerenciadorChat()
+        conexao = await gerenciador.conectar(1)
+
+        for i in range(3):
+            await gerenciador.broadcast_para_sala("1_2", {"n": i})
+        eventos = await conexao.obter_lote()
+
+        ids = [evento.id for evento in eventos]
+        assert ids == sorted(set(ids))
+        assert all(isinstance(evento, EventoChat) for evento in eventos)
+        assert eventos[0] == {"n": 0}
+
+    async def test_obter_lote_timeout_retorna_vazio(self):
+        """Sem eventos, obter_lote com timeout deve retornar lista vazia (heartbeat)"""
+        conexao = ConexaoChat(1, 1)
+
+        assert await conexao.obter_lote(0.01) == []
+        assert not conexao.encerrada
+
+    async def test_reconexao_reenvia_do_buffer(self):
+        """Eventos entregues enquanto desconectado devem ser reenviados ao reconectar"""
+        gerenciador = GerenciadorChat()
+        conexao = await gerenciador.conectar(1)
+        await gerenciador.broadcast_para_sala("1_2", {"n": 1})
+        ultimo_id = (await conexao.obter_lote())[-1].id
+        await gerenciador.desconectar(1, conexao.id)
+
+        await gerenciador.broadcast_para_sala("1_2", {"n": 2})
+        await gerenciador.broadcast_para_sala("1_2", {"n": 3})
+        nova = await gerenciador.conectar(1, ultimo_evento_id=ultimo_id)
+
+        assert [evento["n"] for evento in await nova.obter_lote()] == [2, 3]
+        assert nova.reenviar_do_banco_desde is None
+        assert gerenciador.obter_estatisticas()["eventos_reenviados"] == 2
+
+    async def test_reconexao_sem_eventos_perdidos(self):
+        """Reconexão em dia não deve reenviar nada"""
+        gerenciador = GerenciadorChat()
+        conexao = await gerenciador.conectar(1)
+        await gerenciador.broadcast_para_sala("1_2", {"n": 1})
+        ultimo_id = (await conexao.obter_lote())[-1].id
+
+        nova = await gerenciador.conectar(1, ultimo_evento_id=ultimo_id)
+
+        assert nova.empty()
+        assert nova.reenviar_do_banco_desde is None
+
+    async def test_buffer_estourado_marca_reenvio_do_banco(self):
+        """Se eventos após o Last-Event-ID saíram do buffer, o reenvio vem do banco"""
+        gerenciador = GerenciadorChat(tamanho_historico=2)
+        conexao = await gerenciador.conectar(1)
+        await gerenciador.broadcast_para_sala("1_2", {"n": 0})
+        ultimo_id = (await conexao.obter_lote())[-1].id
+        for i in range(1, 4):
+            await gerenciador.broadcast_para_sala("1_2", {"n": i})
+
+        nova = await gerenciador.conectar(1, ultimo_evento_id=ultimo_id)
+
+        assert nova.reenviar_do_banco_desde == ultimo_id
+        assert nova.empty()
+        assert gerenciador.obter_estatisticas()["reenvios_do_banco"] == 1
+
+    async def test_sem_buffer_marca_reenvio_do_banco(self):
+        """Last-Event-ID anterior ao buffer (ex: outro worker) deve usar o banco"""
+        gerenciador = GerenciadorChat()
+
+        nova = await gerenciador.conectar(1, ultimo_evento_id=123)
+
+        assert nova.reenviar_do_banco_desde == 123
+
+    async def test_buffer_expira_apos_ttl(self):
+        """Buffer de usuário desconectado deve ser removido após o TTL"""
+        gerenciador = GerenciadorChat(ttl_historico_segundos=0)
+        conexao = await gerenciador.conectar(1)
+        await gerenciador.desconectar(1, conexao.id)
+
+        assert gerenciador.obter_estatisticas()["historicos_usuarios"] == 0
+
+
 class TestGerenciadorChatSingleton:
     """Testes para a instância singleton"""
 
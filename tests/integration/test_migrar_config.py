@@ -67,8 +67,8 @@ class TestMigrarConfigsParaBanco:
                 # Não deve lançar exceção
                 migrar_configs_para_banco()
 
-    def test_limpa_cache_apos_migracao(self):
-        """Deve limpar cache após migração"""
+    def test_recarrega_cache_apos_migracao(self):
+        """Deve recarregar o snapshot de configurações após migração"""
         with patch('util.migrar_config.configuracao_repo') as mock_repo:
             mock_repo.obter_por_chave.return_value = MagicMock()  # Todas existem
 
@@ -76,7 +76,7 @@ class TestMigrarConfigsParaBanco:
                 from util.migrar_config import migrar_configs_para_banco
                 migrar_configs_para_banco()
 
-                mock_cache.limpar.assert_called_once()
+                mock_cache.recarregar.assert_called_once()
 
 
 class TestConfigsParaMigrar:
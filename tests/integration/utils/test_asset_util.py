@@ -0,0 +1,210 @@
+"""
+Testes para o módulo util/asset_util.py
+
+Testa o manifesto de versões dos arquivos estáticos e os cabeçalhos de
+cache do ArquivosEstaticos.
+"""
+
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from util.asset_util import ArquivosEstaticos, ManifestoAssets, STATIC_CACHE_MAX_AGE
+from util.compressao_util import precomprimir_pasta
+from util.db_async import executor_banco
+
+
+@pytest.fixture
+def pasta_static(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("body { color: red; }\n" * 50)
+    (tmp_path / "img" / "usuarios").mkdir(parents=True)
+    (tmp_path / "img" / "usuarios" / "000001.jpg").write_bytes(b"foto")
+    return tmp_path
+
+
+@pytest.fixture
+def manifesto(pasta_static):
+    return ManifestoAssets(raiz=pasta_static)
+
+
+class TestManifestoAssets:
+    """Testes do manifesto de versões"""
+
+    def test_url_versionada(self, manifesto):
+        manifesto.atualizar("css/site.css")
+        url = manifesto.url("css/site.css")
+
+        assert url.startswith("/static/css/site.css?v=")
+        assert len(url.split("v=")[1]) == 12
+
+    def test_aceita_url_com_prefixo(self, manifesto):
+        manifesto.atualizar("css/site.css")
+        assert manifesto.url("/static/css/site.css") == manifesto.url("css/site.css")
+
+    def test_arquivo_inexistente_sem_versao(self, manifesto):
+        assert manifesto.url("css/nao-existe.css") == "/static/css/nao-existe.css"
+
+    def test_versao_muda_com_conteudo(self, manifesto, pasta_static):
+        manifesto.atualizar("css/site.css")
+        antes = manifesto.url("css/site.css")
+        (pasta_static / "css" / "site.css").write_text("body { color: blue; margin: 0; }")
+        manifesto.atualizar("css/site.css")
+
+        assert manifesto.url("css/site.css") != antes
+
+    def test_hash_calculado_uma_vez(self, manifesto):
+        manifesto.construir()
+        for _ in range(5):
+            manifesto.url("css/site.css")
+
+        estatisticas = manifesto.obter_estatisticas()
+        assert estatisticas["hashes_calculados"] == 1
+
+    def test_entrada_desatualizada_calculada_em_background(self, manifesto, pasta_static):
+        """A renderização não lê o arquivo: sai sem versão e o hash é calculado no pool"""
+        manifesto.atualizar("css/site.css")
+        (pasta_static / "css" / "site.css").write_text("body { color: blue; margin: 0; }")
+
+        assert manifesto.url("css/site.css") == "/static/css/site.css"
+
+        executor_banco.encerrar()
+        assert manifesto.url("css/site.css").startswith("/static/css/site.css?v=")
+        assert manifesto.obter_estatisticas()["hashes_calculados"] == 2
+
+    def test_construir_ignora_fotos_de_usuarios(self, manifesto):
+        assert manifesto.construir() == 1
+
+    def test_construir_ignora_precomprimidos(self, manifesto, pasta_static):
+        precomprimir_pasta(pasta_static, ("gzip",))
+
+        assert manifesto.construir() == 1
+
+
+class TestArquivosEstaticos:
+    """Testes dos cabeçalhos de cache das respostas estáticas"""
+
+    @pytest.fixture
+    def cliente(self, pasta_static, manifesto):
+        app = FastAPI()
+        app.mount("/static", ArquivosEstaticos(directory=str(pasta_static), manifesto=manifesto), name="static")
+        return TestClient(app)
+
+    def test_versao_atual_imutavel(self, cliente, manifesto):
+        manifesto.atualizar("css/site.css")
+        response = cliente.get(manifesto.url("css/site.css"))
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == f"public, max-age={STATIC_CACHE_MAX_AGE}, immutable"
+        assert "etag" in response.headers
+
+    def test_sem_versao_revalida(self, cliente):
+        response = cliente.get("/static/css/site.css")
+
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_versao_antiga_nao_e_imutavel(self, cliente):
+        response = cliente.get("/static/css/site.css?v=000000000000")
+
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_if_none_match_retorna_304(self, cliente, manifesto):
+        manifesto.atualizar("css/site.css")
+        url = manifesto.url("css/site.css")
+        etag = cliente.get(url).headers["etag"]
+
+        response = cliente.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert "immutable" in response.headers["cache-control"]
+
+    def test_foto_de_usuario_versionada(self, cliente, manifesto, pasta_static):
+        versao = manifesto.obter_hash_arquivo(pasta_static / "img" / "usuarios" / "000001.jpg")
+
+        response = cliente.get(f"/static/img/usuarios/000001.jpg?v={versao}")
+
+        assert "immutable" in response.headers["cache-control"]
+
+    def test_arquivo_inexistente_404(self, cliente):
+        assert cliente.get("/static/css/nao-existe.css").status_code == 404
+
+    def test_hash_de_arquivo_alterado_calculado_fora_do_event_loop(self, cliente, manifesto, pasta_static):
+        """Arquivo trocado (ex: em outro worker) tem o hash recalculado em thread"""
+        import asyncio
+        from unittest.mock import patch
+        from util import asset_util
+
+        manifesto.atualizar("css/site.css")
+        (pasta_static / "css" / "site.css").write_text("body { color: blue; }\n" * 60)
+        versao = asset_util.calcular_hash(pasta_static / "css" / "site.css")
+        em_event_loop = []
+
+        def calcular(caminho):
+            try:
+                asyncio.get_running_loop()
+                em_event_loop.append(True)
+            except RuntimeError:
+                em_event_loop.append(False)
+            return versao
+
+        with patch("util.asset_util.calcular_hash", side_effect=calcular):
+            response = cliente.get(f"/static/css/site.css?v={versao}")
+
+        assert "immutable" in response.headers["cache-control"]
+        assert em_event_loop == [False]
+
+    def test_sem_versao_nao_calcula_hash(self, cliente, manifesto):
+        cliente.get("/static/css/site.css")
+
+        assert manifesto.obter_estatisticas()["hashes_calculados"] == 0
+
+
+class TestArquivosPrecomprimidos:
+    """Testes da entrega de irmãos .gz conforme Accept-Encoding"""
+
+    @pytest.fixture
+    def cliente(self, pasta_static, manifesto):
+        precomprimir_pasta(pasta_static, ("gzip",))
+        app = FastAPI()
+        app.mount("/static", ArquivosEstaticos(directory=str(pasta_static), manifesto=manifesto), name="static")
+        return TestClient(app)
+
+    def _get_bruto(self, cliente, url, accept_encoding):
+        """GET sem descompressão automática do cliente"""
+        with cliente.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as response:
+            return response, b"".join(response.iter_raw())
+
+    def test_entrega_gz_quando_aceito(self, cliente, pasta_static):
+        response, corpo = self._get_bruto(cliente, "/static/css/site.css", "gzip, deflate")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/css")
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert gzip.decompress(corpo) == (pasta_static / "css" / "site.css").read_bytes()
+
+    def test_sem_accept_encoding_entrega_original(self, cliente, pasta_static):
+        response, corpo = self._get_bruto(cliente, "/static/css/site.css", "identity")
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert corpo == (pasta_static / "css" / "site.css").read_bytes()
+
+    def test_gz_desatualizado_ignorado(self, cliente, pasta_static):
+        os.utime(pasta_static / "css" / "site.css.gz", ns=(0, 0))
+
+        response, _ = self._get_bruto(cliente, "/static/css/site.css", "gzip")
+
+        assert "content-encoding" not in response.headers
+
+    def test_etag_e_304_da_versao_comprimida(self, cliente, manifesto):
+        manifesto.atualizar("css/site.css")
+        url = manifesto.url("css/site.css")
+        response, _ = self._get_bruto(cliente, url, "gzip")
+
+        revalidacao = cliente.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+
+        assert revalidacao.status_code == 304
+        assert "immutable" in revalidacao.headers["cache-control"]
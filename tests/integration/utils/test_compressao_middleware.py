@@ -0,0 +1,196 @@
+"""
+Testes para o módulo util/compressao_middleware.py
+
+Testa a compressão das respostas dinâmicas, a exclusão de SSE e o custo
+da compressão (benchmark).
+"""
+
+import asyncio
+import gzip
+import time
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from util.compressao_middleware import EstatisticasCompressao, MiddlewareCompressao
+
+
+HTML_GRANDE = "<html><body>" + "<tr><td>Chamado</td><td>Aberto</td></tr>" * 200 + "</body></html>"
+
+
+@pytest.fixture
+def estatisticas():
+    return EstatisticasCompressao()
+
+
+@pytest.fixture
+def cliente(estatisticas):
+    app = FastAPI()
+    app.add_middleware(MiddlewareCompressao, tamanho_minimo=500, estatisticas=estatisticas)
+
+    @app.get("/listagem")
+    async def listagem():
+        linhas = "".join(
+            f"<tr><td>{i}</td><td>Chamado {i * 7919 % 10007} - problema no módulo {i % 13}</td>"
+            f"<td>usuario{i * 31 % 997}@exemplo.com</td><td>2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}</td></tr>"
+            for i in range(500)
+        )
+        return HTMLResponse(f"<html><body><table>{linhas}</table></body></html>")
+
+    @app.get("/html")
+    async def html():
+        return HTMLResponse(HTML_GRANDE, headers={"ETag": '"abc"'})
+
+    @app.get("/pequeno")
+    async def pequeno():
+        return HTMLResponse("<p>oi</p>")
+
+    @app.get("/json")
+    async def json():
+        return JSONResponse({"conversas": [{"id": i, "nome": "Usuário"} for i in range(100)]})
+
+    @app.get("/imagem")
+    async def imagem():
+        return Response(b"\x89PNG" + b"0" * 2000, media_type="image/png")
+
+    @app.get("/ja-comprimido")
+    async def ja_comprimido():
+        return Response(
+            gzip.compress(HTML_GRANDE.encode()), media_type="text/html", headers={"Content-Encoding": "gzip"}
+        )
+
+    @app.get("/stream")
+    async def stream():
+        async def partes():
+            for i in range(3):
+                yield f"<div>parte {i}</div>".encode() * 10
+
+        return StreamingResponse(partes(), media_type="text/html")
+
+    @app.get("/sse")
+    async def sse():
+        async def eventos():
+            for i in range(3):
+                yield f"data: evento {i}\n\n".encode() * 100
+                await asyncio.sleep(0)
+
+        return StreamingResponse(eventos(), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+def _get_bruto(cliente, url, accept_encoding="gzip"):
+    """GET sem descompressão automática: retorna (response, partes recebidas)"""
+    with cliente.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, list(response.iter_raw())
+
+
+class TestMiddlewareCompressao:
+    """Testes de seleção e formato das respostas comprimidas"""
+
+    def test_html_grande_comprimido(self, cliente):
+        response, partes = _get_bruto(cliente, "/html")
+        corpo = b"".join(partes)
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) == len(corpo)
+        assert gzip.decompress(corpo).decode() == HTML_GRANDE
+
+    def test_etag_enfraquecido(self, cliente):
+        response, _ = _get_bruto(cliente, "/html")
+
+        assert response.headers["etag"] == 'W/"abc"'
+
+    def test_json_comprimido(self, cliente):
+        response, _ = _get_bruto(cliente, "/json")
+
+        assert response.headers["content-encoding"] == "gzip"
+
+    def test_abaixo_do_limite_sem_compressao(self, cliente):
+        response, partes = _get_bruto(cliente, "/pequeno")
+
+        assert "content-encoding" not in response.headers
+        assert b"".join(partes) == b"<p>oi</p>"
+
+    def test_tipo_fora_da_lista_sem_compressao(self, cliente):
+        response, _ = _get_bruto(cliente, "/imagem")
+
+        assert "content-encoding" not in response.headers
+
+    def test_ja_comprimido_intacto(self, cliente):
+        response, partes = _get_bruto(cliente, "/ja-comprimido")
+
+        assert gzip.decompress(b"".join(partes)).decode() == HTML_GRANDE
+
+    def test_cliente_sem_gzip(self, cliente):
+        response, partes = _get_bruto(cliente, "/html", accept_encoding="identity")
+
+        assert "content-encoding" not in response.headers
+        assert b"".join(partes).decode() == HTML_GRANDE
+
+    async def test_streaming_comprimido_parte_a_parte(self, estatisticas):
+        """Cada parte descarregada deve ser decodificável assim que chega"""
+        partes = [f"<div>parte {i}</div>".encode() * 10 for i in range(3)]
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/html")]})
+            for i, parte in enumerate(partes):
+                await send({"type": "http.response.body", "body": parte, "more_body": i < len(partes) - 1})
+
+        enviadas = []
+
+        async def send(message):
+            enviadas.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+        await MiddlewareCompressao(app, estatisticas=estatisticas)(scope, None, send)
+
+        cabecalhos = dict(enviadas[0]["headers"])
+        assert cabecalhos[b"content-encoding"] == b"gzip"
+        assert b"content-length" not in cabecalhos
+        descompressor = zlib.decompressobj(31)
+        for mensagem, parte in zip(enviadas[1:], partes):
+            assert descompressor.decompress(mensagem["body"]) == parte
+        assert enviadas[-1]["more_body"] is False
+
+    def test_sse_nunca_comprimido(self, cliente):
+        response, partes = _get_bruto(cliente, "/sse", accept_encoding="gzip, br")
+
+        assert "content-encoding" not in response.headers
+        assert b"".join(partes).startswith(b"data: evento 0")
+
+    def test_estatisticas(self, cliente, estatisticas):
+        _get_bruto(cliente, "/html")
+        _get_bruto(cliente, "/pequeno")
+
+        resultado = estatisticas.obter_estatisticas()
+        assert resultado["respostas_comprimidas"] == 1
+        assert resultado["respostas_ignoradas"] == 1
+        assert resultado["bytes_originais"] == len(HTML_GRANDE.encode())
+        assert 0 < resultado["taxa_compressao"] < 0.2
+
+    @pytest.mark.slow
+    def test_benchmark_bytes_e_cpu_por_resposta(self, cliente, estatisticas):
+        """Bytes na rede e CPU por resposta de uma listagem HTML (~65 KB)"""
+        quantidade = 200
+        _get_bruto(cliente, "/listagem")
+        estatisticas.limpar()
+
+        inicio = time.perf_counter()
+        for _ in range(quantidade):
+            _get_bruto(cliente, "/listagem")
+        total_ms = (time.perf_counter() - inicio) / quantidade * 1000
+
+        resultado = estatisticas.obter_estatisticas()
+        print(
+            f"\n[benchmark compressão gzip] {resultado['bytes_originais'] // quantidade} → "
+            f"{resultado['bytes_comprimidos'] // quantidade} bytes/resposta "
+            f"(taxa {resultado['taxa_compressao']}), CPU {resultado['cpu_media_ms']} ms/resposta, "
+            f"requisição completa {total_ms:.2f} ms"
+        )
+        assert resultado["taxa_compressao"] < 0.3
+        assert resultado["cpu_media_ms"] < 5
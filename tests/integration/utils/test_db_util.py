@@ -82,6 +82,276 @@ class TestObterConexao:
                         raise RuntimeError("Erro de teste")
 
 
+class TestPoolConexoes:
+    """Testes para o pool de conexões usado por obter_conexao"""
+
+    def test_reutiliza_conexao_entre_chamadas(self):
+        """Chamadas sequenciais devem reutilizar a mesma conexão"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"), tamanho_maximo=2)
+
+            conn1, _ = pool.adquirir()
+            pool.devolver(conn1)
+            conn2, _ = pool.adquirir()
+            pool.devolver(conn2)
+
+            assert conn1 is conn2
+            estatisticas = pool.obter_estatisticas()
+            assert estatisticas["conexoes_criadas"] == 1
+            assert estatisticas["checkouts"] == 2
+            assert estatisticas["conexoes_em_uso"] == 0
+            pool.fechar()
+
+    def test_pragmas_aplicados_na_conexao(self):
+        """Conexões do pool devem ter foreign_keys e row_factory configurados"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"))
+            conn, _ = pool.adquirir()
+
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            assert conn.row_factory is sqlite3.Row
+
+            pool.devolver(conn)
+            pool.fechar()
+
+    def test_overflow_quando_pool_esgotado(self):
+        """Pool esgotado deve entregar conexão temporária após o timeout"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"), tamanho_maximo=1, timeout=0.01)
+
+            conn1, overflow1 = pool.adquirir()
+            conn2, overflow2 = pool.adquirir()
+
+            assert overflow1 is False
+            assert overflow2 is True
+            assert conn1 is not conn2
+            assert pool.obter_estatisticas()["overflow"] == 1
+
+            pool.devolver(conn2, overflow2)
+            pool.devolver(conn1, overflow1)
+            assert pool.obter_estatisticas()["conexoes_abertas"] == 1
+            pool.fechar()
+
+    def test_descarta_conexao_invalida_no_health_check(self):
+        """Conexão que falha no health-check deve ser substituída"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"), intervalo_health_check=0)
+
+            conn1, _ = pool.adquirir()
+            pool.devolver(conn1)
+            conn1.close()
+
+            conn2, _ = pool.adquirir()
+
+            assert conn2 is not conn1
+            estatisticas = pool.obter_estatisticas()
+            assert estatisticas["health_checks_falhos"] == 1
+            assert estatisticas["conexoes_descartadas"] == 1
+            pool.devolver(conn2)
+            pool.fechar()
+
+    def test_devolver_reverte_transacao_pendente(self):
+        """Conexão devolvida com transação aberta deve ser revertida"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"))
+
+            conn, _ = pool.adquirir()
+            conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY)")
+            conn.commit()
+            conn.execute("INSERT INTO test VALUES (1)")
+            pool.devolver(conn)
+
+            conn, _ = pool.adquirir()
+            assert conn.in_transaction is False
+            assert conn.execute("SELECT COUNT(*) FROM test").fetchone()[0] == 0
+            pool.devolver(conn)
+            pool.fechar()
+
+    def test_fechar_pools_remove_pool_do_registro(self):
+        """fechar_pools deve fechar conexões e criar novo pool na próxima chamada"""
+        from util.db_util import obter_conexao, obter_pool, fechar_pools
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+
+            with patch('util.db_util.DATABASE_PATH', db_path):
+                with obter_conexao() as conn:
+                    conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY)")
+                pool_antigo = obter_pool()
+
+                fechar_pools()
+
+                assert obter_pool() is not pool_antigo
+                assert pool_antigo.obter_estatisticas()["conexoes_abertas"] == 0
+
+
+class TestPerfilArmazenamento:
+    """Testes para os PRAGMAs do perfil de armazenamento"""
+
+    def test_conexao_usa_wal_e_pragmas_configurados(self):
+        """Conexões abertas devem usar WAL, synchronous=NORMAL e busy_timeout"""
+        from util.db_util import abrir_conexao, PerfilArmazenamento
+
+        perfil = PerfilArmazenamento(
+            journal_mode="WAL", synchronous="NORMAL", mmap_size=0, cache_size=-1000, busy_timeout_ms=1234
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            conn = abrir_conexao(os.path.join(temp_dir, "test.db"), perfil)
+
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -1000
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            conn.close()
+
+
+class TestFilaEscrita:
+    """Testes para a fila de escrita (escritor único com lotes)"""
+
+    def _criar_banco(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, valor TEXT UNIQUE)")
+        conn.commit()
+        conn.close()
+
+    def test_executar_retorna_resultado_apos_commit(self):
+        """Resultado da operação deve ser retornado e os dados persistidos"""
+        from util.db_util import FilaEscrita
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+            self._criar_banco(db_path)
+            fila = FilaEscrita(db_path)
+
+            novo_id = fila.executar(lambda conn: conn.execute("INSERT INTO test (valor) VALUES ('a')").lastrowid)
+            fila.parar()
+
+            conn = sqlite3.connect(db_path)
+            rows = conn.execute("SELECT id, valor FROM test").fetchall()
+            conn.close()
+            assert rows == [(novo_id, "a")]
+
+    def test_falha_de_uma_operacao_nao_desfaz_o_lote(self):
+        """Erro em uma operação deve afetar apenas o seu próprio future"""
+        from util.db_util import FilaEscrita
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+            self._criar_banco(db_path)
+            fila = FilaEscrita(db_path)
+
+            futures = [
+                fila.submeter(lambda conn, v=v: conn.execute("INSERT INTO test (valor) VALUES (?)", (v,)))
+                for v in ["a", "a", "b"]
+            ]
+            erros = [f.exception(timeout=5) for f in futures]
+            fila.parar()
+
+            assert erros[0] is None
+            assert isinstance(erros[1], sqlite3.IntegrityError)
+            assert erros[2] is None
+
+            conn = sqlite3.connect(db_path)
+            valores = [r[0] for r in conn.execute("SELECT valor FROM test ORDER BY valor")]
+            conn.close()
+            assert valores == ["a", "b"]
+            assert fila.obter_estatisticas()["falhas"] == 1
+
+    def test_operacoes_concorrentes_agrupadas_em_lotes(self):
+        """Escritas concorrentes devem ser todas aplicadas, em menos transações"""
+        from util.db_util import FilaEscrita
+        import threading
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+            self._criar_banco(db_path)
+            fila = FilaEscrita(db_path, lote_maximo=50)
+
+            def escrever(i):
+                fila.executar(lambda conn: conn.execute("INSERT INTO test (valor) VALUES (?)", (str(i),)))
+
+            threads = [threading.Thread(target=escrever, args=(i,)) for i in range(100)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            fila.parar()
+
+            estatisticas = fila.obter_estatisticas()
+            assert estatisticas["operacoes"] == 100
+            assert estatisticas["lotes"] <= 100
+
+            conn = sqlite3.connect(db_path)
+            total = conn.execute("SELECT COUNT(*) FROM test").fetchone()[0]
+            conn.close()
+            assert total == 100
+
+    def test_fila_reinicia_apos_parar(self):
+        """Submissões após parar() devem iniciar uma nova thread escritora"""
+        from util.db_util import FilaEscrita
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+            self._criar_banco(db_path)
+            fila = FilaEscrita(db_path)
+
+            fila.executar(lambda conn: conn.execute("INSERT INTO test (valor) VALUES ('a')"))
+            fila.parar()
+            fila.executar(lambda conn: conn.execute("INSERT INTO test (valor) VALUES ('b')"))
+            fila.parar()
+
+            assert fila.obter_estatisticas()["operacoes"] == 2
+
+    def test_erro_inesperado_falha_pendentes_e_reinicia_thread(self):
+        """Exceção inesperada no loop não deve deixar futures pendentes nem a fila parada"""
+        from util.db_util import FilaEscrita
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+            self._criar_banco(db_path)
+            fila = FilaEscrita(db_path)
+
+            with patch.object(FilaEscrita, "_processar_lote", side_effect=RuntimeError("falha injetada")):
+                future = fila.submeter(lambda conn: conn.execute("INSERT INTO test (valor) VALUES ('a')"))
+                erro = future.exception(timeout=5)
+
+            assert isinstance(erro, RuntimeError)
+            assert str(erro) == "falha injetada"
+
+            # A próxima escrita inicia uma nova thread escritora
+            fila.executar(lambda conn: conn.execute("INSERT INTO test (valor) VALUES ('b')"))
+            fila.parar()
+
+            conn = sqlite3.connect(db_path)
+            valores = [r[0] for r in conn.execute("SELECT valor FROM test")]
+            conn.close()
+            assert valores == ["b"]
+
+    def test_erro_ao_abrir_conexao_falha_pendentes(self):
+        """Sem conexão de escrita, as operações falham em vez de aguardar para sempre"""
+        from util.db_util import FilaEscrita
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fila = FilaEscrita(os.path.join(temp_dir, "inexistente", "test.db"))
+
+            future = fila.submeter(lambda conn: None)
+
+            assert isinstance(future.exception(timeout=5), sqlite3.Error)
+            assert fila._thread is None
+
+
 class TestAdaptarDatetime:
     """Testes para a função adaptar_datetime"""
 
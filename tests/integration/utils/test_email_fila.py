@@ -0,0 +1,199 @@
+"""
+Testes para o módulo util/email_fila.py
+
+Testa a fila de saída de e-mails (tabela email_pendente) e o processador
+em background usando o transporte em memória no lugar do Resend.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from model.email_pendente_model import StatusEmail
+from repo import email_pendente_repo
+from util.email_fila import ProcessadorEmails
+from util.email_service import ServicoEmail, TransporteMemoria, TransporteResend, criar_transporte
+
+
+@pytest.fixture
+def transporte():
+    return TransporteMemoria()
+
+
+@pytest.fixture
+def servico(transporte):
+    return ServicoEmail(transporte=transporte)
+
+
+def _criar_processador(servico, **kwargs) -> ProcessadorEmails:
+    parametros = {"intervalo_segundos": 0.01, "lote": 10, "max_tentativas": 3, "backoff_segundos": 30}
+    parametros.update(kwargs)
+    return ProcessadorEmails(servico, **parametros)
+
+
+class TestFilaEmailRepo:
+    """Testes do repositório da fila de saída"""
+
+    def test_inserir_e_reivindicar(self):
+        email_id = email_pendente_repo.inserir("a@example.com", "A", "Assunto", "<p>Oi</p>")
+
+        lote = email_pendente_repo.reivindicar_prontos(time.time(), 10, 60)
+
+        assert [email.id for email in lote] == [email_id]
+        assert lote[0].status == StatusEmail.PENDENTE.value
+
+    def test_reivindicado_fica_reservado(self):
+        """Outro processador não deve pegar e-mails já reservados"""
+        email_pendente_repo.inserir("a@example.com", "A", "Assunto", "<p>Oi</p>")
+        agora = time.time()
+
+        primeiro = email_pendente_repo.reivindicar_prontos(agora, 10, 60)
+        segundo = email_pendente_repo.reivindicar_prontos(agora, 10, 60)
+        apos_reserva = email_pendente_repo.reivindicar_prontos(agora + 61, 10, 60)
+
+        assert len(primeiro) == 1
+        assert segundo == []
+        assert len(apos_reserva) == 1
+
+    def test_respeita_limite_do_lote(self):
+        for i in range(5):
+            email_pendente_repo.inserir(f"u{i}@example.com", "U", "Assunto", "<p>Oi</p>")
+
+        lote = email_pendente_repo.reivindicar_prontos(time.time(), 3, 60)
+
+        assert len(lote) == 3
+        assert [email.id for email in lote] == sorted(email.id for email in lote)
+
+    def test_registrar_resultados(self):
+        enviado = email_pendente_repo.inserir("a@example.com", "A", "Assunto", "<p>Oi</p>")
+        reagendado = email_pendente_repo.inserir("b@example.com", "B", "Assunto", "<p>Oi</p>")
+        falhou = email_pendente_repo.inserir("c@example.com", "C", "Assunto", "<p>Oi</p>")
+        agora = time.time()
+
+        email_pendente_repo.registrar_resultados(
+            [enviado], [(reagendado, agora + 30, "timeout")], [(falhou, "erro")], agora
+        )
+
+        email_enviado = email_pendente_repo.obter_por_id(enviado)
+        assert email_enviado.status == StatusEmail.ENVIADO.value
+        assert email_enviado.html == "" and email_enviado.texto is None
+        email_reagendado = email_pendente_repo.obter_por_id(reagendado)
+        assert email_reagendado.tentativas == 1
+        assert email_reagendado.ultimo_erro == "timeout"
+        assert email_pendente_repo.obter_por_id(falhou).status == StatusEmail.FALHOU.value
+        assert email_pendente_repo.contar_por_status() == {"enviado": 1, "pendente": 1, "falhou": 1}
+        assert email_pendente_repo.obter_por_id(reagendado).html == "<p>Oi</p>"
+
+
+class TestProcessadorEmails:
+    """Testes do processador em background"""
+
+    async def test_enfileirar_nao_envia_na_hora(self, servico, transporte):
+        """A requisição só grava na fila; o envio acontece no processador"""
+        servico.enfileirar_boas_vindas("novo@example.com", "Novo")
+
+        assert transporte.enviados == []
+
+        processados = await _criar_processador(servico).processar_lote()
+
+        assert processados == 1
+        assert transporte.enviados[0]["to"] == ["novo@example.com"]
+        assert transporte.enviados[0]["subject"] == "Bem-vindo ao Sistema"
+
+    async def test_falha_reagenda_com_backoff_exponencial(self, servico, transporte):
+        email_id = servico.enfileirar_email("a@example.com", "A", "Assunto", "<p>Oi</p>")
+        transporte.falhas_simuladas = 1
+        processador = _criar_processador(servico)
+
+        antes = time.time()
+        await processador.processar_lote()
+
+        email = email_pendente_repo.obter_por_id(email_id)
+        assert email.status == StatusEmail.PENDENTE.value
+        assert email.tentativas == 1
+        assert email.proxima_tentativa >= antes + 30
+        assert await processador.processar_lote() == 0
+        assert processador.obter_estatisticas()["reagendados"] == 1
+
+    def test_calcular_backoff(self, servico):
+        processador = _criar_processador(servico, backoff_segundos=10, backoff_maximo_segundos=60)
+
+        assert [processador.calcular_backoff(t) for t in (1, 2, 3, 4, 5)] == [10, 20, 40, 60, 60]
+
+    async def test_esgotar_tentativas_marca_falha(self, servico, transporte):
+        email_id = servico.enfileirar_email("a@example.com", "A", "Assunto", "<p>Oi</p>")
+        transporte.falhas_simuladas = 10
+        processador = _criar_processador(servico, max_tentativas=2, backoff_segundos=0)
+
+        await processador.processar_lote()
+        await processador.processar_lote()
+
+        email = email_pendente_repo.obter_por_id(email_id)
+        assert email.status == StatusEmail.FALHOU.value
+        assert email.tentativas == 2
+        assert processador.obter_estatisticas()["falhas_definitivas"] == 1
+
+    async def test_processa_em_lotes(self, servico, transporte):
+        for i in range(25):
+            servico.enfileirar_email(f"u{i}@example.com", "U", "Assunto", "<p>Oi</p>")
+        processador = _criar_processador(servico, lote=10)
+
+        assert [await processador.processar_lote() for _ in range(4)] == [10, 10, 5, 0]
+        assert len(transporte.enviados) == 25
+        assert processador.obter_estatisticas()["lotes"] == 3
+
+    async def test_processador_em_background_acordado_ao_enfileirar(self, servico, transporte):
+        processador = _criar_processador(servico, intervalo_segundos=30)
+        tarefa = processador.iniciar()
+        try:
+            await asyncio.sleep(0.05)
+            servico.enfileirar_email("a@example.com", "A", "Assunto", "<p>Oi</p>")
+
+            for _ in range(100):
+                if transporte.enviados:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert len(transporte.enviados) == 1
+        finally:
+            tarefa.cancel()
+
+    def test_transporte_nao_configurado_nao_inicia(self, monkeypatch):
+        monkeypatch.setattr("util.email_service.resend.api_key", None)
+        processador = _criar_processador(ServicoEmail(transporte=TransporteResend()))
+
+        assert processador.iniciar() is None
+
+
+class TestTransportes:
+    """Testes da seleção de transporte"""
+
+    def test_criar_transporte(self):
+        assert isinstance(criar_transporte("memoria"), TransporteMemoria)
+        assert isinstance(criar_transporte("resend"), TransporteResend)
+        assert isinstance(criar_transporte("smtp"), TransporteResend)
+
+    def test_interface_abstrata(self):
+        from util.email_service import TransporteEmail
+
+        with pytest.raises(TypeError):
+            TransporteEmail()
+
+    def test_resend_lote_usa_batch(self, monkeypatch):
+        from unittest.mock import MagicMock
+
+        batch = MagicMock()
+        monkeypatch.setattr("util.email_service.resend.Batch.send", batch)
+
+        erros = TransporteResend().enviar_lote([{"to": ["a@x.com"]}, {"to": ["b@x.com"]}])
+
+        assert erros == [None, None]
+        batch.assert_called_once()
+
+    def test_resend_falha_do_lote_vale_para_todos(self, monkeypatch):
+        from unittest.mock import MagicMock
+
+        monkeypatch.setattr("util.email_service.resend.Batch.send", MagicMock(side_effect=RuntimeError("503")))
+
+        assert TransporteResend().enviar_lote([{}, {}]) == ["503", "503"]
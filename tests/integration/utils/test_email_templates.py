@@ -0,0 +1,102 @@
+"""
+Testes para o módulo util/email_templates.py
+
+Testa a renderização dos templates de e-mail, o cache do ambiente e a
+renderização em lote.
+"""
+
+import time
+
+import pytest
+
+from repo import email_pendente_repo
+from util import email_templates
+from util.email_service import ServicoEmail, TransporteMemoria
+
+
+class TestEmailTemplates:
+    """Testes dos templates compilados"""
+
+    def test_renderizar_boas_vindas(self):
+        assunto, html = email_templates.renderizar("boas_vindas", para_nome="Maria")
+
+        assert assunto == "Bem-vindo ao Sistema"
+        assert "Olá Maria," in html
+        assert "Bem-vindo(a)!" in html
+
+    def test_renderizar_escapa_variaveis(self):
+        _, html = email_templates.renderizar("boas_vindas", para_nome="<script>x</script>")
+
+        assert "<script>" not in html
+        assert "&lt;script&gt;" in html
+
+    def test_template_desconhecido(self):
+        with pytest.raises(KeyError):
+            email_templates.renderizar("inexistente")
+
+    def test_ambiente_e_templates_em_cache(self):
+        """Ambiente e templates compilados devem ser reutilizados"""
+        assert email_templates.obter_ambiente() is email_templates.obter_ambiente()
+        assert email_templates.obter_template("boas_vindas") is email_templates.obter_template("boas_vindas")
+        assert email_templates.obter_ambiente().auto_reload is False
+
+    def test_precompilar_todos(self):
+        assert email_templates.precompilar() == len(email_templates.ASSUNTOS)
+
+    def test_renderizar_lote_personalizado(self):
+        corpos = email_templates.renderizar_lote(
+            "recuperacao_senha",
+            [{"para_nome": "Ana", "url_recuperacao": "/a"}, {"para_nome": "Bia", "url_recuperacao": "/b"}],
+        )
+
+        assert len(corpos) == 2
+        assert "Olá Ana," in corpos[0] and 'href="/a"' in corpos[0]
+        assert "Olá Bia," in corpos[1] and 'href="/b"' in corpos[1]
+
+    def test_renderizar_lote_contexto_comum(self):
+        corpos = email_templates.renderizar_lote(
+            "recuperacao_senha",
+            [{"para_nome": "Ana"}, {"para_nome": "Bia", "url_recuperacao": "/propria"}],
+            comum={"url_recuperacao": "/comum"},
+        )
+
+        assert 'href="/comum"' in corpos[0]
+        assert 'href="/propria"' in corpos[1]
+
+
+class TestEnfileirarLote:
+    """Testes do envio em massa pela fila de saída"""
+
+    def test_enfileirar_lote(self):
+        servico = ServicoEmail(transporte=TransporteMemoria())
+
+        ids = servico.enfileirar_lote(
+            "boas_vindas",
+            [("a@example.com", "Ana", {}), ("b@example.com", "Bia", {})],
+        )
+
+        assert len(ids) == 2
+        email = email_pendente_repo.obter_por_id(ids[1])
+        assert email.para_email == "b@example.com"
+        assert email.assunto == "Bem-vindo ao Sistema"
+        assert "Olá Bia," in email.html
+
+    def test_enfileirar_lote_vazio(self):
+        assert ServicoEmail(transporte=TransporteMemoria()).enfileirar_lote("boas_vindas", []) == []
+
+    @pytest.mark.slow
+    def test_benchmark_10k_destinatarios(self):
+        """Renderização em lote para 10 mil destinatários"""
+        quantidade = 10_000
+        contextos = [{"para_nome": f"Usuário {i}"} for i in range(quantidade)]
+        email_templates.precompilar()
+
+        inicio = time.perf_counter()
+        corpos = email_templates.renderizar_lote("boas_vindas", contextos)
+        duracao = time.perf_counter() - inicio
+
+        print(f"\n[benchmark e-mail] {quantidade} mensagens em {duracao * 1000:.0f} ms "
+              f"({quantidade / duracao:,.0f} mensagens/s)")
+        assert len(corpos) == quantidade
+        assert "Usuário 9999" in corpos[-1]
+        assert quantidade / duracao > 5000
@@ -7,11 +7,14 @@ Testa o gerenciamento de fotos de usuários.
 import pytest
 import base64
 import tempfile
+import time
 import os
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 from PIL import Image
 import io
+import struct
+import zlib
 
 from util.foto_util import (
     obter_caminho_foto_usuario,
@@ -264,3 +267,281 @@ class TestObterTamanhoFoto:
                 resultado = obter_tamanho_foto(999)
 
                 assert resultado is None
+
+
+class TestProcessamentoFoto:
+    """Testes do pipeline de upload: orçamentos, decodificação em blocos e pool"""
+
+    def _criar_jpeg_base64(self, tamanho: tuple) -> str:
+        img = Image.new("RGB", tamanho, color="blue")
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG")
+        return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+    def test_decodificacao_em_blocos_igual_b64decode(self):
+        """Decodificar em blocos deve produzir os mesmos bytes que b64decode"""
+        from util.imagem_util import BLOCO_BASE64, decodificar_base64_em_arquivo, inicio_dados_base64
+
+        dados = os.urandom(BLOCO_BASE64 * 2 + 1234)
+        conteudo = "data:image/png;base64," + base64.b64encode(dados).decode()
+        arquivo = io.BytesIO()
+
+        gravados = decodificar_base64_em_arquivo(conteudo, arquivo, inicio_dados_base64(conteudo))
+
+        assert gravados == len(dados)
+        assert arquivo.getvalue() == dados
+
+    def test_tamanho_decodificado_sem_decodificar(self):
+        from util.imagem_util import tamanho_decodificado
+
+        for n in (1, 2, 3, 100):
+            assert tamanho_decodificado(base64.b64encode(b"x" * n).decode()) == n
+
+    def test_rejeita_imagem_acima_do_orcamento_de_pixels(self):
+        """Imagem acima de FOTO_MAX_PIXELS é rejeitada pelo cabeçalho"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pasta_fotos = Path(tmpdir) / "usuarios"
+
+            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
+                with patch('util.foto_util.FOTO_MAX_PIXELS', 100 * 100):
+                    resultado = salvar_foto_cropada_usuario(1, self._criar_jpeg_base64((101, 100)))
+
+            assert resultado is False
+            assert not (pasta_fotos / "000001.jpg").exists()
+
+    def test_rejeita_png_minusculo_com_dimensoes_enormes(self):
+        """PNG de poucos bytes declarando 20000x20000 é rejeitado sem exceção"""
+        def chunk(tipo: bytes, dados: bytes) -> bytes:
+            return struct.pack(">I", len(dados)) + tipo + dados + struct.pack(">I", zlib.crc32(tipo + dados))
+
+        png = (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", 20000, 20000, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(b""))
+            + chunk(b"IEND", b"")
+        )
+        conteudo = "data:image/png;base64," + base64.b64encode(png).decode()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pasta_fotos = Path(tmpdir) / "usuarios"
+
+            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
+                resultado = salvar_foto_cropada_usuario(1, conteudo)
+
+            assert resultado is False
+            assert not (pasta_fotos / "000001.jpg").exists()
+
+    def test_rejeita_upload_acima_do_limite_de_bytes(self):
+        """Upload acima de FOTO_MAX_UPLOAD_BYTES é rejeitado antes de decodificar"""
+        with patch('util.foto_util.FOTO_MAX_UPLOAD_BYTES', 10):
+            with patch('util.foto_util.decodificar_base64_em_arquivo') as mock_decodificar:
+                resultado = salvar_foto_cropada_usuario(1, self._criar_jpeg_base64((10, 10)))
+
+        assert resultado is False
+        mock_decodificar.assert_not_called()
+
+    def test_jpeg_grande_reduzido_com_draft(self):
+        """JPEG grande deve ser reduzido ao tamanho máximo"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pasta_fotos = Path(tmpdir) / "usuarios"
+
+            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
+                with patch('util.foto_util.config') as mock_config:
+                    mock_config.obter_int.return_value = 256
+                    resultado = salvar_foto_cropada_usuario(1, self._criar_jpeg_base64((3000, 2000)))
+
+            assert resultado is True
+            with Image.open(pasta_fotos / "000001.jpg") as salva:
+                assert salva.size == (256, 171)
+
+    def test_nao_deixa_arquivos_temporarios(self):
+        """O arquivo temporário do upload deve ser removido mesmo em falha"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch('tempfile.tempdir', tmpdir):
+                salvar_foto_cropada_usuario(1, base64.b64encode(b"texto qualquer").decode())
+
+                assert os.listdir(tmpdir) == []
+
+    async def test_versao_async_processa_no_pool(self):
+        """A versão assíncrona deve salvar a foto usando o pool de processos"""
+        from util.foto_util import encerrar_processamento_fotos, salvar_foto_cropada_usuario_async
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pasta_fotos = Path(tmpdir) / "usuarios"
+
+            try:
+                with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
+                    with patch('util.foto_util.config') as mock_config:
+                        mock_config.obter_int.return_value = 64
+                        resultado = await salvar_foto_cropada_usuario_async(1, self._criar_jpeg_base64((200, 100)))
+                        invalido = await salvar_foto_cropada_usuario_async(1, "isso não é base64 válido!!!")
+            finally:
+                encerrar_processamento_fotos()
+
+            assert resultado is True
+            assert invalido is False
+            with Image.open(pasta_fotos / "000001.jpg") as salva:
+                assert salva.size == (64, 32)
+
+
+class TestVariantesFoto:
+    """Testes das variantes reduzidas (avatares) e do índice LRU"""
+
+    @pytest.fixture(autouse=True)
+    def pasta_fotos(self, tmp_path):
+        from util import foto_util
+
+        pasta = tmp_path / "usuarios"
+        foto_util._variantes.clear()
+        with patch('util.foto_util.PASTA_FOTOS', pasta):
+            yield pasta
+        foto_util._variantes.clear()
+
+    def _aguardar_variante(self, id: int, tamanho: int, esperado: str, timeout: float = 30) -> str:
+        """Renderiza o caminho até a geração em background publicar a variante."""
+        limite = time.monotonic() + timeout
+        while True:
+            caminho = obter_caminho_foto_usuario(id, tamanho)
+            if esperado in caminho or time.monotonic() > limite:
+                return caminho
+            time.sleep(0.05)
+
+    def _criar_png_base64(self, tamanho: tuple) -> str:
+        img = Image.new("RGBA", tamanho, color=(255, 0, 0, 128))
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        return base64.b64encode(buffer.getvalue()).decode()
+
+    def test_upload_gera_variantes(self, pasta_fotos):
+        """O upload deve gravar uma variante por tamanho configurado"""
+        with patch('util.foto_util.FOTO_VARIANTES', (32, 64)):
+            assert salvar_foto_cropada_usuario(1, self._criar_png_base64((200, 100))) is True
+
+        with Image.open(pasta_fotos / "000001_32.jpg") as v32, Image.open(pasta_fotos / "000001_64.jpg") as v64:
+            assert v32.size == (32, 16)
+            assert v64.size == (64, 32)
+
+    def test_variantes_em_webp(self, pasta_fotos):
+        with patch('util.foto_util.FOTO_VARIANTES', (32,)), patch('util.foto_util.FORMATO_VARIANTES', "webp"):
+            salvar_foto_cropada_usuario(1, self._criar_png_base64((100, 100)))
+
+            assert "/000001_32.webp?v=" in obter_caminho_foto_usuario(1, 32)
+
+        with Image.open(pasta_fotos / "000001_32.webp") as variante:
+            assert variante.format == "WEBP"
+
+    def test_seleciona_menor_variante_que_cobre(self):
+        from util.foto_util import selecionar_tamanho_variante
+
+        with patch('util.foto_util.FOTO_VARIANTES', (32, 64, 256)):
+            assert selecionar_tamanho_variante(20) == 32
+            assert selecionar_tamanho_variante(64) == 64
+            assert selecionar_tamanho_variante(65) == 256
+            assert selecionar_tamanho_variante(512) is None
+
+    def test_caminho_sem_tamanho_usa_foto_completa(self):
+        assert obter_caminho_foto_usuario(1).endswith("/000001.jpg")
+        assert obter_caminho_foto_usuario(1, 4096).endswith("/000001.jpg")
+
+    def test_gera_variante_sob_demanda(self, pasta_fotos):
+        """Foto anterior às variantes (ou foto padrão) gera a variante em background"""
+        pasta_fotos.mkdir()
+        Image.new("RGB", (256, 256), "green").save(pasta_fotos / "000007.jpg")
+
+        with patch('util.foto_util.FOTO_VARIANTES', (32, 64)):
+            primeiro = obter_caminho_foto_usuario(7, 30)
+            caminho = self._aguardar_variante(7, 30, "/000007_32.jpg?v=")
+
+        # O primeiro pedido não espera a geração: serve a foto completa
+        assert "/000007.jpg" in primeiro
+        assert "/000007_32.jpg?v=" in caminho
+        assert (pasta_fotos / "000007_64.jpg").exists()
+
+    def test_sem_foto_usa_caminho_completo(self):
+        """Sem foto principal não há variante: o caminho completo mantém o fallback do onerror"""
+        assert obter_caminho_foto_usuario(99, 32).endswith("/000099.jpg")
+
+    def test_indice_evita_acesso_ao_disco(self, pasta_fotos):
+        from util.foto_util import obter_estatisticas_variantes
+
+        pasta_fotos.mkdir()
+        Image.new("RGB", (64, 64)).save(pasta_fotos / "000001.jpg")
+        with patch('util.foto_util.FOTO_VARIANTES', (32,)):
+            self._aguardar_variante(1, 32, "/000001_32.jpg?v=")
+            with patch('util.foto_util._conferir_variante') as mock_conferir:
+                for _ in range(10):
+                    obter_caminho_foto_usuario(1, 32)
+
+        mock_conferir.assert_not_called()
+        assert obter_estatisticas_variantes()["acertos"] >= 10
+
+    def test_indice_limitado_lru(self, pasta_fotos):
+        from util import foto_util
+
+        with patch('util.foto_util.FOTO_CACHE_VARIANTES', 3), patch('util.foto_util.FOTO_VARIANTES', (32,)):
+            for id in range(1, 6):
+                obter_caminho_foto_usuario(id, 32)
+
+        assert list(foto_util._variantes) == [(3, 32), (4, 32), (5, 32)]
+
+    def test_nova_foto_regenera_variante_antiga(self, pasta_fotos):
+        """Variante mais antiga que a foto principal é regerada"""
+        pasta_fotos.mkdir()
+        Image.new("RGB", (64, 64), "white").save(pasta_fotos / "000001.jpg")
+        Image.new("RGB", (32, 32), "black").save(pasta_fotos / "000001_32.jpg")
+        os.utime(pasta_fotos / "000001_32.jpg", (0, 0))
+
+        with patch('util.foto_util.FOTO_VARIANTES', (32,)):
+            self._aguardar_variante(1, 32, "/000001_32.jpg?v=")
+
+        with Image.open(pasta_fotos / "000001_32.jpg") as variante:
+            assert variante.convert("L").getpixel((16, 16)) > 200
+
+    def test_renderizacao_nao_decodifica_imagem(self, pasta_fotos):
+        """A falta de variante agenda a geração no pool, sem gerar no chamador"""
+        from util import foto_util
+
+        pasta_fotos.mkdir()
+        Image.new("RGB", (64, 64)).save(pasta_fotos / "000001.jpg")
+        executor = MagicMock()
+        with patch('util.foto_util.FOTO_VARIANTES', (32,)), \
+                patch('util.foto_util._obter_executor', return_value=executor), \
+                patch('util.foto_util.gerar_variantes_de_arquivo') as mock_gerar:
+            for _ in range(3):
+                assert "/000001.jpg" in obter_caminho_foto_usuario(1, 32)
+
+        mock_gerar.assert_not_called()
+        executor.submit.assert_called_once()
+        foto_util._geracoes_pendentes.discard(1)
+
+    def test_erro_na_geracao_registrado_no_indice(self, pasta_fotos):
+        """Foto ilegível não é reagendada a cada renderização"""
+        from util import foto_util
+
+        pasta_fotos.mkdir()
+        (pasta_fotos / "000001.jpg").write_bytes(b"nao e imagem")
+
+        with patch('util.foto_util.FOTO_VARIANTES', (32,)):
+            obter_caminho_foto_usuario(1, 32)
+            limite = time.monotonic() + 30
+            while foto_util._variantes.get((1, 32)) is None and time.monotonic() < limite:
+                time.sleep(0.05)
+
+        assert foto_util._variantes[(1, 32)] is False
+        assert foto_util.obter_estatisticas_variantes()["erros"] >= 1
+
+    def test_escritores_concorrentes_nao_colidem(self, pasta_fotos):
+        """Gerações simultâneas da mesma variante usam temporários distintos"""
+        from concurrent.futures import ThreadPoolExecutor
+        from util.imagem_util import gerar_variantes_de_arquivo
+
+        pasta_fotos.mkdir()
+        foto = pasta_fotos / "000001.jpg"
+        Image.new("RGB", (512, 512), "blue").save(foto)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futuros = [executor.submit(gerar_variantes_de_arquivo, str(foto), (32, 64)) for _ in range(16)]
+            for futuro in futuros:
+                futuro.result()
+
+        assert sorted(p.name for p in pasta_fotos.iterdir()) == ["000001.jpg", "000001_32.jpg", "000001_64.jpg"]
@@ -0,0 +1,181 @@
+"""
+Testes para o módulo util/rate_limit_backend.py
+
+Testa o backend SQLite compartilhado entre workers e a seleção de backend
+pelo RegistroLimiters.
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from util.rate_limit_backend import BackendMemoria, BackendSQLite, criar_backend
+from util.rate_limiter import RateLimiter, RegistroLimiters
+
+
+def _consumir_em_processo(caminho: str, tentativas: int, resultados) -> None:
+    """Worker de outro processo disputando o mesmo identificador."""
+    backend = BackendSQLite("login", caminho)
+    permitidos = 0
+    for _ in range(tentativas):
+        permitido = backend.consumir("10.0.0.1", 20, 60.0, backend.agora())
+        permitidos += permitido
+    resultados.put(permitidos)
+
+
+class TestBackendSQLite:
+    """Testes para o backend compartilhado em SQLite"""
+
+    @pytest.fixture
+    def caminho(self, tmp_path):
+        return str(tmp_path / "rate_limit.db")
+
+    def test_consumir_respeita_janela(self, caminho):
+        """Deve permitir max_tentativas na janela e bloquear a seguinte"""
+        backend = BackendSQLite("teste", caminho)
+
+        resultados = [backend.consumir("ip", 3, 30.0, 100.0) for _ in range(4)]
+
+        assert resultados == [True, True, True, False]
+        assert backend.obter_instantes("ip", 30.0, 100.0) == [100.0, 100.0, 100.0]
+
+    def test_no_maximo_max_tentativas_em_qualquer_janela(self, caminho):
+        """Tentando a cada segundo, nenhuma janela de 300 s tem mais de 5 permitidas"""
+        backend = BackendSQLite("login", caminho)
+
+        permitidas = [t for t in range(0, 900) if backend.consumir("ip", 5, 300.0, float(t))]
+
+        assert permitidas == [0, 1, 2, 3, 4, 300, 301, 302, 303, 304, 600, 601, 602, 603, 604]
+
+    def test_namespaces_isolados(self, caminho):
+        """Limiters diferentes no mesmo arquivo não compartilham contagem"""
+        login = BackendSQLite("login", caminho)
+        cadastro = BackendSQLite("cadastro", caminho)
+
+        login.consumir("ip", 1, 10.0, 0.0)
+
+        assert login.consumir("ip", 1, 10.0, 0.0) is False
+        assert cadastro.consumir("ip", 1, 10.0, 0.0) is True
+
+    def test_estado_compartilhado_entre_instancias(self, caminho):
+        """Duas instâncias (workers) do mesmo limiter veem o mesmo estado"""
+        worker_a = RateLimiter(
+            max_tentativas=3, janela_minutos=1, nome="login", backend=BackendSQLite("login", caminho)
+        )
+        worker_b = RateLimiter(
+            max_tentativas=3, janela_minutos=1, nome="login", backend=BackendSQLite("login", caminho)
+        )
+
+        assert worker_a.verificar("ip")
+        assert worker_b.verificar("ip")
+        assert worker_a.verificar("ip")
+
+        assert worker_b.verificar("ip") is False
+        assert worker_a.obter_tentativas_restantes("ip") == 0
+
+    def test_limite_global_entre_processos(self, caminho):
+        """Com vários processos, o total permitido deve ser o limite (não N vezes)"""
+        BackendSQLite("login", caminho).limpar()
+        contexto = multiprocessing.get_context("spawn")
+        resultados = contexto.Queue()
+        processos = [
+            contexto.Process(target=_consumir_em_processo, args=(caminho, 30, resultados))
+            for _ in range(3)
+        ]
+        for processo in processos:
+            processo.start()
+        for processo in processos:
+            processo.join(30)
+
+        total = sum(resultados.get(timeout=5) for _ in processos)
+
+        assert total == 20
+
+    def test_remover_limpar_e_contar(self, caminho):
+        backend = BackendSQLite("teste", caminho)
+        backend.consumir("a", 10, 10.0, 0.0)
+        backend.consumir("a", 10, 10.0, 0.0)
+        backend.consumir("b", 10, 10.0, 0.0)
+
+        assert len(backend) == 2
+        assert "a" in backend
+        assert backend.remover("a") is True
+        assert backend.remover("a") is False
+
+        backend.limpar()
+
+        assert len(backend) == 0
+
+    def test_remove_identificadores_inativos(self, caminho):
+        backend = BackendSQLite("teste", caminho, intervalo_limpeza=60.0)
+        backend.consumir("antigo", 10, 10.0, 0.0)
+
+        backend.consumir("novo", 10, 10.0, 61.0)
+
+        assert "antigo" not in backend
+        assert backend.obter_estatisticas()["tentativas_expiradas_removidas"] == 1
+
+    @pytest.mark.parametrize("politica,esperado", [("permitir", True), ("bloquear", False)])
+    def test_banco_ocupado_aplica_politica_sem_esperar(self, caminho, politica, esperado):
+        """Com o lock de escrita preso por outro processo, a espera é curta e a política decide"""
+        import sqlite3
+
+        backend = BackendSQLite("teste", caminho, busy_timeout_ms=20, politica_falha=politica)
+        backend.consumir("ip", 3, 30.0, 100.0)
+        bloqueador = sqlite3.connect(caminho, isolation_level=None)
+        bloqueador.execute("BEGIN IMMEDIATE")
+        try:
+            inicio = time.perf_counter()
+            resultado = backend.consumir("ip", 3, 30.0, 101.0)
+            duracao = time.perf_counter() - inicio
+        finally:
+            bloqueador.execute("ROLLBACK")
+            bloqueador.close()
+
+        assert resultado is esperado
+        assert duracao < 1.0
+        assert backend.obter_estatisticas()["falhas_banco"] == 1
+        # Banco liberado: volta a contar normalmente
+        assert backend.consumir("ip", 3, 30.0, 102.0) is True
+        assert len(backend.obter_instantes("ip", 30.0, 102.0)) == 2
+
+    def test_politica_desconhecida_permite(self, caminho):
+        assert BackendSQLite("teste", caminho, politica_falha="talvez").politica_falha == "permitir"
+
+    @pytest.mark.slow
+    def test_latencia_por_verificacao(self, caminho):
+        """Verificação no backend compartilhado deve custar menos de 1 ms"""
+        limiter = RateLimiter(
+            max_tentativas=100, janela_minutos=1, nome="latencia", backend=BackendSQLite("latencia", caminho)
+        )
+        limiter.verificar("aquecimento")
+
+        quantidade = 2000
+        inicio = time.perf_counter()
+        for i in range(quantidade):
+            limiter.verificar(f"10.0.{i >> 8 & 255}.{i & 255}")
+        media_ms = (time.perf_counter() - inicio) / quantidade * 1000
+
+        print(f"\n[benchmark rate limit sqlite] {media_ms * 1000:.1f} us/verificação")
+        assert media_ms < 1
+
+
+class TestSelecaoBackend:
+    """Testes da escolha de backend pelo registro"""
+
+    def test_criar_backend_padrao_memoria(self):
+        assert isinstance(criar_backend("teste", "memoria"), BackendMemoria)
+
+    def test_criar_backend_desconhecido_usa_memoria(self):
+        assert isinstance(criar_backend("teste", "redis"), BackendMemoria)
+
+    def test_registro_cria_backend_configurado(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("util.rate_limit_backend.RATE_LIMIT_DB_PATH", str(tmp_path / "rl.db"))
+        registro = RegistroLimiters(tipo_backend="sqlite")
+
+        backend = registro.criar_backend("login")
+
+        assert isinstance(backend, BackendSQLite)
+        assert backend.namespace == "login"
+        assert registro.obter_estatisticas()["backend"] == "sqlite"
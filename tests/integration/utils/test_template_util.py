@@ -5,6 +5,7 @@ Testa filtros de formatação de data e funções de template.
 """
 
 import pytest
+import time
 from datetime import datetime
 from unittest.mock import patch, MagicMock
 
@@ -158,17 +159,54 @@ class TestFotoUsuario:
     def test_id_1_formata_corretamente(self):
         """ID 1 deve formatar para 000001.jpg"""
         resultado = foto_usuario(1)
-        assert resultado == "/static/img/usuarios/000001.jpg"
+        assert resultado.split("?v=")[0] == "/static/img/usuarios/000001.jpg"
 
     def test_id_grande_formata_corretamente(self):
         """ID grande deve formatar com zeros à esquerda"""
         resultado = foto_usuario(12345)
-        assert resultado == "/static/img/usuarios/012345.jpg"
+        assert resultado.split("?v=")[0] == "/static/img/usuarios/012345.jpg"
 
     def test_id_com_6_digitos(self):
         """ID com 6 dígitos deve formatar sem zeros extras"""
         resultado = foto_usuario(999999)
-        assert resultado == "/static/img/usuarios/999999.jpg"
+        assert resultado.split("?v=")[0] == "/static/img/usuarios/999999.jpg"
+
+    def test_foto_existente_recebe_versao_do_conteudo(self, tmp_path):
+        """URL muda quando o conteúdo da foto muda"""
+        from util.asset_util import manifesto_assets
+
+        # O upload registra o hash no manifesto; a renderização só faz stat
+        foto = tmp_path / "000001.jpg"
+        foto.write_bytes(b"foto 1")
+        manifesto_assets.obter_hash_arquivo(foto)
+        with patch('util.foto_util.PASTA_FOTOS', tmp_path):
+            primeira = foto_usuario(1)
+            foto.write_bytes(b"foto 2 maior")
+            manifesto_assets.obter_hash_arquivo(foto)
+            segunda = foto_usuario(1)
+
+        assert "/000001.jpg?v=" in primeira
+        assert primeira != segunda
+
+    def test_tamanho_seleciona_variante(self, tmp_path):
+        """Com tamanho, o filtro deve apontar para a variante reduzida"""
+        from PIL import Image
+        from util import foto_util
+
+        Image.new("RGB", (256, 256)).save(tmp_path / "000001.jpg")
+        foto_util._variantes.clear()
+        try:
+            with patch('util.foto_util.PASTA_FOTOS', tmp_path), patch('util.foto_util.FOTO_VARIANTES', (32, 64)):
+                # Variante e hash gerados em background: até lá, a foto completa
+                limite = time.monotonic() + 30
+                resultado = foto_usuario(1, 40)
+                while "_64.jpg?v=" not in resultado and time.monotonic() < limite:
+                    time.sleep(0.05)
+                    resultado = foto_usuario(1, 40)
+        finally:
+            foto_util._variantes.clear()
+
+        assert "/000001_64.jpg?v=" in resultado
 
 
 class TestCsrfInput:
@@ -0,0 +1,89 @@
+"""
+Testes para o módulo util/compressao_util.py
+
+Testa a negociação de Accept-Encoding e a pré-compressão de arquivos.
+"""
+
+import gzip
+import os
+
+import pytest
+
+from util.compressao_util import comprimir, escolher_codificacao, precomprimir_arquivo, precomprimir_pasta
+
+
+class TestEscolherCodificacao:
+    """Testes para a função escolher_codificacao()"""
+
+    @pytest.mark.parametrize("accept_encoding,esperado", [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("GZIP", "gzip"),
+        ("gzip;q=abc, br", "br"),
+    ])
+    def test_negociacao(self, accept_encoding, esperado):
+        assert escolher_codificacao(accept_encoding, ("br", "gzip")) == esperado
+
+    def test_respeita_disponiveis(self):
+        """Sem brotli disponível, br aceito não deve ser escolhido"""
+        assert escolher_codificacao("br", ("gzip",)) is None
+        assert escolher_codificacao("br, gzip", ("gzip",)) == "gzip"
+
+
+class TestPrecomprimirPasta:
+    """Testes para a função precomprimir_pasta()"""
+
+    @pytest.fixture
+    def pasta(self, tmp_path):
+        (tmp_path / "css").mkdir()
+        (tmp_path / "css" / "site.css").write_text("body { color: red; }\n" * 100)
+        (tmp_path / "css" / "pequeno.css").write_text("a{}")
+        (tmp_path / "img").mkdir()
+        (tmp_path / "img" / "foto.jpg").write_bytes(os.urandom(2048))
+        return tmp_path
+
+    def test_grava_gz_dos_arquivos_de_texto(self, pasta):
+        gravados = precomprimir_pasta(pasta, ("gzip",))
+
+        assert gravados == 1
+        original = (pasta / "css" / "site.css").read_bytes()
+        assert gzip.decompress((pasta / "css" / "site.css.gz").read_bytes()) == original
+        assert not (pasta / "css" / "pequeno.css.gz").exists()
+        assert not (pasta / "img" / "foto.jpg.gz").exists()
+
+    def test_segunda_execucao_nao_regrava(self, pasta):
+        precomprimir_pasta(pasta, ("gzip",))
+
+        assert precomprimir_pasta(pasta, ("gzip",)) == 0
+
+    def test_regrava_quando_original_muda(self, pasta):
+        precomprimir_pasta(pasta, ("gzip",))
+        os.utime(pasta / "css" / "site.css.gz", ns=(0, 0))
+
+        assert precomprimir_pasta(pasta, ("gzip",)) == 1
+
+    def test_ignora_subpastas(self, pasta):
+        assert precomprimir_pasta(pasta, ("gzip",), ignorar=("css",)) == 0
+
+    def test_precomprimir_arquivo(self, pasta):
+        """Um arquivo trocado (ex: tema) pode ser pré-comprimido sozinho"""
+        precomprimir_pasta(pasta, ("gzip",))
+        (pasta / "css" / "site.css").write_text("body { color: blue; }\n" * 100)
+        os.utime(pasta / "css" / "site.css.gz", ns=(0, 0))
+
+        assert precomprimir_arquivo(pasta / "css" / "site.css", ("gzip",)) == 1
+        conteudo = gzip.decompress((pasta / "css" / "site.css.gz").read_bytes())
+        assert conteudo == (pasta / "css" / "site.css").read_bytes()
+
+    def test_precomprimir_arquivo_inexistente(self, pasta):
+        assert precomprimir_arquivo(pasta / "css" / "nao-existe.css", ("gzip",)) == 0
+
+    def test_gzip_deterministico(self):
+        """Mesmo conteúdo deve gerar o mesmo .gz (mtime fixo no cabeçalho)"""
+        assert comprimir(b"x" * 1000, "gzip") == comprimir(b"x" * 1000, "gzip")
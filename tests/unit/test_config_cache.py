@@ -22,7 +22,7 @@ class TestConfigCacheObter:
     def test_obter_valor_do_cache(self):
         """Quando valor está no cache, deve retornar sem acessar banco"""
         # Preenche o cache manualmente
-        ConfigCache._cache["chave_teste"] = "valor_cacheado"
+        ConfigCache._estado[0]["chave_teste"] = "valor_cacheado"
 
         with patch('util.config_cache.configuracao_repo') as mock_repo:
             resultado = ConfigCache.obter("chave_teste", "padrao")
@@ -32,35 +32,46 @@ class TestConfigCacheObter:
             assert resultado == "valor_cacheado"
 
     def test_obter_valor_do_banco(self):
-        """Quando valor não está no cache, deve buscar do banco"""
-        mock_config = MagicMock()
-        mock_config.valor = "valor_do_banco"
+        """Quando valor não está no cache, deve carregar a tabela inteira do banco"""
+        mock_config = MagicMock(chave="chave_nova", valor="valor_do_banco")
+        outra = MagicMock(chave="outra_chave", valor="outro_valor")
 
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = mock_config
+            mock_repo.obter_todos.return_value = [mock_config, outra]
 
             resultado = ConfigCache.obter("chave_nova", "padrao")
 
-            mock_repo.obter_por_chave.assert_called_once_with("chave_nova")
+            mock_repo.obter_todos.assert_called_once_with()
+            mock_repo.obter_por_chave.assert_not_called()
             assert resultado == "valor_do_banco"
-            # Deve ter sido cacheado
-            assert ConfigCache._cache["chave_nova"] == "valor_do_banco"
+            # Snapshot completo: demais chaves também cacheadas
+            assert ConfigCache._estado[0]["chave_nova"] == "valor_do_banco"
+            assert ConfigCache._estado[0]["outra_chave"] == "outro_valor"
 
     def test_obter_retorna_padrao_quando_nao_existe(self):
         """Quando configuração não existe no banco, retorna padrão"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = None
+            mock_repo.obter_todos.return_value = []
 
             resultado = ConfigCache.obter("chave_inexistente", "valor_padrao")
 
             assert resultado == "valor_padrao"
-            # Deve cachear o padrão também
-            assert ConfigCache._cache["chave_inexistente"] == "valor_padrao"
+
+    def test_obter_chave_ausente_nao_consulta_banco_novamente(self):
+        """Com snapshot completo, chave ausente é respondida sem nova consulta"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = []
+
+            ConfigCache.obter("chave_inexistente", "valor_padrao")
+            resultado = ConfigCache.obter("chave_inexistente", "outro_padrao")
+
+            assert resultado == "outro_padrao"
+            mock_repo.obter_todos.assert_called_once()
 
     def test_obter_sqlite_error_retorna_padrao(self):
         """Em caso de sqlite3.Error, retorna padrão sem crashar"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.side_effect = sqlite3.Error("Erro de banco")
+            mock_repo.obter_todos.side_effect = sqlite3.Error("Erro de banco")
 
             with patch('util.config_cache.logger') as mock_logger:
                 resultado = ConfigCache.obter("chave_erro", "padrao_erro")
@@ -72,7 +83,7 @@ class TestConfigCacheObter:
     def test_obter_exception_generica_retorna_padrao(self):
         """Em caso de Exception genérica, retorna padrão e loga como crítico"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.side_effect = Exception("Erro inesperado")
+            mock_repo.obter_todos.side_effect = Exception("Erro inesperado")
 
             with patch('util.config_cache.logger') as mock_logger:
                 resultado = ConfigCache.obter("chave_critica", "padrao_critico")
@@ -82,6 +93,64 @@ class TestConfigCacheObter:
                 assert "Erro crítico" in str(mock_logger.critical.call_args)
 
 
+class TestConfigCacheSnapshot:
+    """Testes do snapshot (recarregar, obter_multiplos em uma carga e métricas)"""
+
+    def setup_method(self):
+        """Limpa o cache antes de cada teste"""
+        ConfigCache.limpar()
+
+    def test_recarregar_troca_snapshot(self):
+        """recarregar() deve publicar um novo dicionário sem alterar o anterior"""
+        ConfigCache._estado = ({"tema": "antigo"}, False)
+        anterior = ConfigCache._estado[0]
+        versao = ConfigCache.obter_versao()
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = [MagicMock(chave="tema", valor="novo")]
+            assert ConfigCache.recarregar() is True
+
+        assert ConfigCache.obter("tema", "") == "novo"
+        assert anterior == {"tema": "antigo"}
+        assert ConfigCache.obter_versao() == versao + 1
+
+    def test_recarregar_com_erro_mantem_snapshot(self):
+        ConfigCache._estado = ({"tema": "atual"}, False)
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.side_effect = sqlite3.Error("Erro de banco")
+            with patch('util.config_cache.logger'):
+                assert ConfigCache.recarregar() is False
+
+        assert ConfigCache._estado[0] == {"tema": "atual"}
+
+    def test_obter_multiplos_uma_unica_carga(self):
+        """obter_multiplos com chaves ausentes deve consultar o banco uma vez"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = [MagicMock(chave="a", valor="1")]
+
+            resultado = ConfigCache.obter_multiplos(["a", "b", "c"], ["x", "y", "z"])
+
+            assert resultado == {"a": "1", "b": "y", "c": "z"}
+            mock_repo.obter_todos.assert_called_once()
+
+    def test_estatisticas_acertos_e_faltas(self):
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = [MagicMock(chave="a", valor="1")]
+            antes = ConfigCache.obter_estatisticas()
+
+            ConfigCache.obter("a", "")
+            ConfigCache.obter("a", "")
+            ConfigCache.obter("b", "")
+
+        depois = ConfigCache.obter_estatisticas()
+        assert depois["faltas"] - antes["faltas"] == 1
+        assert depois["acertos"] - antes["acertos"] == 2
+        assert depois["cargas"] - antes["cargas"] == 1
+        assert depois["completo"] is True
+        assert depois["chaves"] == 1
+
+
 class TestConfigCacheObterInt:
     """Testes para o método obter_int()"""
 
@@ -91,7 +160,7 @@ class TestConfigCacheObterInt:
 
     def test_obter_int_conversao_sucesso(self):
         """Deve converter string numérica para int"""
-        ConfigCache._cache["numero"] = "42"
+        ConfigCache._estado[0]["numero"] = "42"
 
         resultado = ConfigCache.obter_int("numero", 0)
 
@@ -109,7 +178,7 @@ class TestConfigCacheObterInt:
 
     def test_obter_int_valor_invalido_retorna_padrao(self):
         """Quando valor não é numérico, retorna padrão"""
-        ConfigCache._cache["texto"] = "nao_e_numero"
+        ConfigCache._estado[0]["texto"] = "nao_e_numero"
 
         with patch('util.config_cache.logger') as mock_logger:
             resultado = ConfigCache.obter_int("texto", 999)
@@ -120,7 +189,7 @@ class TestConfigCacheObterInt:
 
     def test_obter_int_valor_float_trunca(self):
         """Valor float na string deve funcionar"""
-        ConfigCache._cache["decimal"] = "3.14"
+        ConfigCache._estado[0]["decimal"] = "3.14"
 
         # int("3.14") levanta ValueError
         with patch('util.config_cache.logger'):
@@ -142,7 +211,7 @@ class TestConfigCacheObterBool:
         valores_true = ["true", "TRUE", "True", "1", "yes", "YES", "sim", "SIM", "verdadeiro"]
 
         for valor in valores_true:
-            ConfigCache._cache["bool_test"] = valor
+            ConfigCache._estado[0]["bool_test"] = valor
             resultado = ConfigCache.obter_bool("bool_test", False)
             assert resultado is True, f"'{valor}' deveria ser True"
 
@@ -151,7 +220,7 @@ class TestConfigCacheObterBool:
         valores_false = ["false", "FALSE", "0", "no", "nao", "não", "qualquer_coisa"]
 
         for valor in valores_false:
-            ConfigCache._cache["bool_test"] = valor
+            ConfigCache._estado[0]["bool_test"] = valor
             resultado = ConfigCache.obter_bool("bool_test", True)
             assert resultado is False, f"'{valor}' deveria ser False"
 
@@ -180,7 +249,7 @@ class TestConfigCacheObterFloat:
 
     def test_obter_float_conversao_sucesso(self):
         """Deve converter string para float"""
-        ConfigCache._cache["decimal"] = "3.14159"
+        ConfigCache._estado[0]["decimal"] = "3.14159"
 
         resultado = ConfigCache.obter_float("decimal", 0.0)
 
@@ -189,7 +258,7 @@ class TestConfigCacheObterFloat:
 
     def test_obter_float_inteiro_funciona(self):
         """Deve converter inteiro para float"""
-        ConfigCache._cache["inteiro"] = "42"
+        ConfigCache._estado[0]["inteiro"] = "42"
 
         resultado = ConfigCache.obter_float("inteiro", 0.0)
 
@@ -197,7 +266,7 @@ class TestConfigCacheObterFloat:
 
     def test_obter_float_valor_invalido_retorna_padrao(self):
         """Quando valor não é numérico, retorna padrão"""
-        ConfigCache._cache["texto"] = "nao_e_numero"
+        ConfigCache._estado[0]["texto"] = "nao_e_numero"
 
         with patch('util.config_cache.logger') as mock_logger:
             resultado = ConfigCache.obter_float("texto", 9.99)
@@ -207,7 +276,7 @@ class TestConfigCacheObterFloat:
 
     def test_obter_float_notacao_cientifica(self):
         """Deve aceitar notação científica"""
-        ConfigCache._cache["cientifico"] = "1.5e-10"
+        ConfigCache._estado[0]["cientifico"] = "1.5e-10"
 
         resultado = ConfigCache.obter_float("cientifico", 0.0)
 
@@ -223,8 +292,8 @@ class TestConfigCacheObterMultiplos:
 
     def test_obter_multiplos_sucesso(self):
         """Deve retornar dicionário com todas as configurações"""
-        ConfigCache._cache["config1"] = "valor1"
-        ConfigCache._cache["config2"] = "valor2"
+        ConfigCache._estado[0]["config1"] = "valor1"
+        ConfigCache._estado[0]["config2"] = "valor2"
 
         resultado = ConfigCache.obter_multiplos(
             ["config1", "config2"],
@@ -265,35 +334,100 @@ class TestConfigCacheObterMultiplos:
         assert resultado == {}
 
 
+class TestConfigCacheSincronizacao:
+    """Testes da invalidação entre workers pela versão global do banco"""
+
+    def setup_method(self):
+        """Limpa o cache antes de cada teste"""
+        ConfigCache.limpar()
+
+    def test_snapshot_guarda_versao_do_banco(self):
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 7
+            mock_repo.obter_todos.return_value = [MagicMock(chave="tema", valor="claro")]
+
+            ConfigCache.obter("tema", "")
+
+        assert ConfigCache.obter_estatisticas()["versao_banco"] == 7
+
+    def test_sincronizar_sem_alteracao_nao_recarrega(self):
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 3
+            mock_repo.obter_todos.return_value = [MagicMock(chave="tema", valor="claro")]
+            ConfigCache.obter("tema", "")
+
+            assert ConfigCache.sincronizar() is False
+            mock_repo.obter_todos.assert_called_once()
+
+    def test_sincronizar_recarrega_quando_outro_worker_altera(self):
+        """Versão do banco diferente da do snapshot deve recarregar"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 3
+            mock_repo.obter_todos.return_value = [MagicMock(chave="tema", valor="claro")]
+            ConfigCache.obter("tema", "")
+            versao = ConfigCache.obter_versao()
+
+            mock_repo.obter_versao.return_value = 4
+            mock_repo.obter_todos.return_value = [MagicMock(chave="tema", valor="escuro")]
+
+            assert ConfigCache.sincronizar() is True
+
+        assert ConfigCache.obter("tema", "") == "escuro"
+        assert ConfigCache.obter_versao() == versao + 1
+        assert ConfigCache.obter_estatisticas()["sincronizacoes"] == 1
+
+    def test_sincronizar_sem_snapshot_nao_consulta(self):
+        """Sem snapshot carregado, a próxima leitura já busca do banco"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            assert ConfigCache.sincronizar() is False
+            mock_repo.obter_versao.assert_not_called()
+
+    def test_sincronizacao_periodica_desativada(self):
+        from util.config_cache import iniciar_sincronizacao_periodica
+
+        assert iniciar_sincronizacao_periodica(0) is None
+
+    async def test_sincronizacao_periodica_executa_em_background(self):
+        import asyncio
+        from util.config_cache import iniciar_sincronizacao_periodica
+
+        with patch.object(ConfigCache, 'sincronizar', return_value=False) as mock_sincronizar:
+            tarefa = iniciar_sincronizacao_periodica(0.01)
+            await asyncio.sleep(0.05)
+            tarefa.cancel()
+
+        assert mock_sincronizar.call_count >= 1
+
+
 class TestConfigCacheLimpar:
     """Testes para os métodos de limpeza de cache"""
 
     def setup_method(self):
         """Prepara cache com dados de teste"""
-        ConfigCache._cache = {
+        ConfigCache._estado = ({
             "chave1": "valor1",
             "chave2": "valor2",
             "chave3": "valor3"
-        }
+        }, False)
 
     def test_limpar_remove_todo_cache(self):
         """limpar() deve remover todas as entradas do cache"""
-        assert len(ConfigCache._cache) == 3
+        assert len(ConfigCache._estado[0]) == 3
 
         ConfigCache.limpar()
 
-        assert len(ConfigCache._cache) == 0
-        assert ConfigCache._cache == {}
+        assert len(ConfigCache._estado[0]) == 0
+        assert ConfigCache._estado[0] == {}
 
     def test_limpar_chave_existente(self):
         """limpar_chave() deve remover apenas a chave especificada"""
-        assert "chave1" in ConfigCache._cache
+        assert "chave1" in ConfigCache._estado[0]
 
         ConfigCache.limpar_chave("chave1")
 
-        assert "chave1" not in ConfigCache._cache
-        assert "chave2" in ConfigCache._cache
-        assert "chave3" in ConfigCache._cache
+        assert "chave1" not in ConfigCache._estado[0]
+        assert "chave2" in ConfigCache._estado[0]
+        assert "chave3" in ConfigCache._estado[0]
 
     def test_limpar_chave_inexistente(self):
         """limpar_chave() não deve falhar para chave inexistente"""
@@ -301,7 +435,44 @@ class TestConfigCacheLimpar:
         ConfigCache.limpar_chave("chave_que_nao_existe")
 
         # Cache deve permanecer intacto
-        assert len(ConfigCache._cache) == 3
+        assert len(ConfigCache._estado[0]) == 3
+
+    def test_limpar_chave_publica_snapshot_incompleto(self):
+        """Após limpar_chave() a chave removida é buscada no banco, nunca o padrão"""
+        ConfigCache._estado = ({"chave1": "valor1", "chave2": "valor2"}, True)
+
+        ConfigCache.limpar_chave("chave1")
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = [MagicMock(chave="chave1", valor="novo")]
+            assert ConfigCache.obter("chave1", "padrao") == "novo"
+
+    def test_limpar_incrementa_versao(self):
+        """limpar() deve incrementar a versão das configurações"""
+        versao = ConfigCache.obter_versao()
+
+        ConfigCache.limpar()
+
+        assert ConfigCache.obter_versao() == versao + 1
+
+    def test_limpar_chave_incrementa_versao(self):
+        """limpar_chave() deve incrementar a versão, mesmo sem a chave no cache"""
+        versao = ConfigCache.obter_versao()
+
+        ConfigCache.limpar_chave("chave1")
+        ConfigCache.limpar_chave("chave_que_nao_existe")
+
+        assert ConfigCache.obter_versao() == versao + 2
+
+    def test_obter_nao_altera_versao(self):
+        """Leituras (inclusive cache miss) não devem alterar a versão"""
+        versao = ConfigCache.obter_versao()
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = []
+            ConfigCache.obter("chave_nova", "padrao")
+
+        assert ConfigCache.obter_versao() == versao
 
 
 class TestConfigCacheThreadSafety:
@@ -319,7 +490,7 @@ class TestConfigCacheThreadSafety:
     def test_obter_thread_safe(self):
         """Verifica que obter() funciona com cache populado"""
         # Testa comportamento básico que demonstra thread-safety
-        ConfigCache._cache["teste"] = "valor"
+        ConfigCache._estado[0]["teste"] = "valor"
 
         resultado = ConfigCache.obter("teste", "padrao")
 
@@ -0,0 +1,133 @@
+"""
+Testes para o módulo util/db_async.py
+
+Testa o executor limitado de chamadas ao banco e a fachada
+assíncrona de repositórios.
+"""
+
+import asyncio
+import threading
+import types
+
+import pytest
+from unittest.mock import patch
+
+from util.db_async import ExecutorBanco, RepositorioAsync
+
+
+def _criar_modulo_fake():
+    """Cria um módulo de repositório falso com funções síncronas."""
+    modulo = types.ModuleType("repo_fake")
+
+    def obter_por_id(id: int) -> dict:
+        return {"id": id, "thread": threading.current_thread().name}
+
+    def falhar() -> None:
+        raise ValueError("erro de teste")
+
+    modulo.obter_por_id = obter_por_id
+    modulo.falhar = falhar
+    modulo.CONSTANTE = 42
+    return modulo
+
+
+class TestExecutorBanco:
+    """Testes para a classe ExecutorBanco"""
+
+    def test_max_workers_invalido(self):
+        """max_workers deve ser positivo"""
+        with pytest.raises(ValueError):
+            ExecutorBanco(max_workers=0)
+
+    async def test_executa_fora_do_event_loop(self):
+        """Função deve rodar em thread do pool, não na thread do event loop"""
+        executor = ExecutorBanco(max_workers=2)
+
+        nome_thread = await executor.executar(lambda: threading.current_thread().name)
+
+        assert nome_thread.startswith("db-async")
+        assert nome_thread != threading.current_thread().name
+        executor.encerrar()
+
+    async def test_metricas_de_fila(self):
+        """Chamadas além do limite de workers devem aparecer como fila pendente"""
+        executor = ExecutorBanco(max_workers=1)
+        liberar = threading.Event()
+
+        tarefas = [asyncio.create_task(executor.executar(liberar.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        estatisticas = executor.obter_estatisticas()
+        assert estatisticas["em_execucao"] == 1
+        assert estatisticas["fila_pendentes"] == 2
+        assert estatisticas["maior_fila"] >= 2
+
+        liberar.set()
+        await asyncio.gather(*tarefas)
+
+        estatisticas = executor.obter_estatisticas()
+        assert estatisticas["fila_pendentes"] == 0
+        assert estatisticas["em_execucao"] == 0
+        assert estatisticas["concluidas"] == 3
+        executor.encerrar()
+
+    async def test_excecao_propagada_e_contabilizada(self):
+        """Exceções da função devem ser propagadas e contadas como falha"""
+        executor = ExecutorBanco(max_workers=1)
+
+        with pytest.raises(ValueError):
+            await executor.executar(_criar_modulo_fake().falhar)
+
+        assert executor.obter_estatisticas()["falhas"] == 1
+        executor.encerrar()
+
+    async def test_executor_recriado_apos_encerrar(self):
+        """Após encerrar(), nova chamada deve criar novo pool"""
+        executor = ExecutorBanco(max_workers=1)
+        await executor.executar(lambda: None)
+        executor.encerrar()
+
+        resultado = await executor.executar(lambda: "ok")
+
+        assert resultado == "ok"
+        executor.encerrar()
+
+
+class TestRepositorioAsync:
+    """Testes para a fachada RepositorioAsync"""
+
+    async def test_expoe_mesmas_funcoes_como_corrotinas(self):
+        """Funções do módulo devem ser expostas com o mesmo nome e aguardáveis"""
+        executor = ExecutorBanco(max_workers=1)
+        repo = RepositorioAsync(_criar_modulo_fake(), executor)
+
+        resultado = await repo.obter_por_id(7)
+
+        assert resultado["id"] == 7
+        assert resultado["thread"].startswith("db-async")
+        assert repo.obter_por_id.__name__ == "obter_por_id"
+        executor.encerrar()
+
+    async def test_resolve_funcao_no_momento_da_chamada(self):
+        """Patches aplicados ao módulo devem valer para a fachada"""
+        executor = ExecutorBanco(max_workers=1)
+        modulo = _criar_modulo_fake()
+        repo = RepositorioAsync(modulo, executor)
+        await repo.obter_por_id(1)  # popula cache de wrappers
+
+        with patch.object(modulo, "obter_por_id", return_value="mockado"):
+            resultado = await repo.obter_por_id(1)
+
+        assert resultado == "mockado"
+        executor.encerrar()
+
+    def test_atributo_inexistente_ou_nao_callable(self):
+        """Atributos inexistentes, privados ou não-callable devem levantar AttributeError"""
+        repo = RepositorioAsync(_criar_modulo_fake(), ExecutorBanco(max_workers=1))
+
+        with pytest.raises(AttributeError):
+            repo.nao_existe
+        with pytest.raises(AttributeError):
+            repo._privado
+        with pytest.raises(AttributeError):
+            repo.CONSTANTE
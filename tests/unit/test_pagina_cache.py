@@ -0,0 +1,190 @@
+"""
+Testes para o módulo util/pagina_cache.py
+
+Testa TTL, limites LRU (entradas e bytes), invalidação, proteção contra
+armazenar páginas renderizadas durante uma invalidação e a sincronização
+pela versão do conteúdo no banco.
+"""
+
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from util.pagina_cache import CachePaginas, chave_pagina
+
+
+class TestCachePaginasArmazenamento:
+    """Testes de obter/armazenar"""
+
+    def test_obter_inexistente_retorna_none(self):
+        cache = CachePaginas()
+        assert cache.obter("x") is None
+        assert cache.obter_estatisticas()["faltas"] == 1
+
+    def test_armazenar_e_obter(self):
+        cache = CachePaginas()
+        assert cache.armazenar("pagina", b"<html></html>")
+        assert cache.obter("pagina") == b"<html></html>"
+
+        stats = cache.obter_estatisticas()
+        assert stats["acertos"] == 1
+        assert stats["bytes"] == len(b"<html></html>")
+
+    def test_entrada_expirada(self):
+        cache = CachePaginas(ttl_segundos=10)
+        with patch("util.pagina_cache.time.monotonic", return_value=100.0):
+            cache.armazenar("pagina", b"html")
+        with patch("util.pagina_cache.time.monotonic", return_value=111.0):
+            assert cache.obter("pagina") is None
+
+        stats = cache.obter_estatisticas()
+        assert stats["expiradas"] == 1
+        assert stats["entradas"] == 0
+        assert stats["bytes"] == 0
+
+    def test_substituir_entrada_atualiza_bytes(self):
+        cache = CachePaginas()
+        cache.armazenar("pagina", b"a" * 100)
+        cache.armazenar("pagina", b"a" * 10)
+        assert cache.obter_estatisticas()["bytes"] == 10
+
+    def test_max_entradas_invalido(self):
+        with pytest.raises(ValueError):
+            CachePaginas(max_entradas=0)
+
+
+class TestCachePaginasLRU:
+    """Testes dos limites de memória"""
+
+    def test_descarta_menos_usada_por_entradas(self):
+        cache = CachePaginas(max_entradas=2)
+        cache.armazenar("a", b"1")
+        cache.armazenar("b", b"2")
+        cache.obter("a")  # "b" passa a ser a menos usada
+        cache.armazenar("c", b"3")
+
+        assert cache.obter("b") is None
+        assert cache.obter("a") == b"1"
+        assert cache.obter("c") == b"3"
+        assert cache.obter_estatisticas()["descartadas"] == 1
+
+    def test_descarta_por_bytes(self):
+        cache = CachePaginas(max_bytes=100)
+        cache.armazenar("a", b"x" * 60)
+        cache.armazenar("b", b"x" * 60)
+
+        assert cache.obter("a") is None
+        assert cache.obter("b") is not None
+        assert cache.obter_estatisticas()["bytes"] == 60
+
+    def test_valor_maior_que_limite_nao_armazenado(self):
+        cache = CachePaginas(max_bytes=10)
+        assert not cache.armazenar("a", b"x" * 11)
+        assert cache.obter_estatisticas()["entradas"] == 0
+
+    def test_dados_nao_contam_bytes(self):
+        cache = CachePaginas(max_bytes=10)
+        cache.armazenar("categorias", ["a" * 100])
+        assert cache.obter_estatisticas()["bytes"] == 0
+        assert cache.obter("categorias") == ["a" * 100]
+
+
+class TestCachePaginasInvalidacao:
+    """Testes de invalidação e geração"""
+
+    def test_invalidar_remove_tudo(self):
+        cache = CachePaginas()
+        cache.armazenar("a", b"1")
+        cache.armazenar("b", [1, 2])
+        cache.invalidar()
+
+        stats = cache.obter_estatisticas()
+        assert stats["entradas"] == 0
+        assert stats["bytes"] == 0
+        assert stats["invalidacoes"] == 1
+
+    def test_valor_calculado_antes_da_invalidacao_nao_armazenado(self):
+        cache = CachePaginas()
+        geracao = cache.geracao
+        cache.invalidar()  # ex: artigo alterado durante a renderização
+
+        assert not cache.armazenar("pagina", b"antiga", geracao)
+        assert cache.obter("pagina") is None
+
+    def test_obter_ou_carregar(self):
+        cache = CachePaginas()
+        carregar = MagicMock(return_value=[1, 2, 3])
+
+        assert cache.obter_ou_carregar("dados", carregar) == [1, 2, 3]
+        assert cache.obter_ou_carregar("dados", carregar) == [1, 2, 3]
+        carregar.assert_called_once()
+
+    def test_obter_ou_carregar_nao_armazena_none(self):
+        cache = CachePaginas()
+        carregar = MagicMock(return_value=None)
+
+        cache.obter_ou_carregar("artigo", carregar)
+        cache.obter_ou_carregar("artigo", carregar)
+        assert carregar.call_count == 2
+
+
+class TestCachePaginasSincronizacao:
+    """Testes da sincronização pela versão do conteúdo no banco"""
+
+    def test_primeira_sincronizacao_invalida(self):
+        cache = CachePaginas()
+        cache.armazenar("a", b"1")
+        with patch("util.pagina_cache.conteudo_versao_repo.obter_versao", return_value=3):
+            assert cache.sincronizar()
+        assert cache.obter("a") is None
+        assert cache.obter_estatisticas()["versao_banco"] == 3
+
+    def test_versao_inalterada_mantem_cache(self):
+        cache = CachePaginas()
+        with patch("util.pagina_cache.conteudo_versao_repo.obter_versao", return_value=3):
+            cache.sincronizar()
+            cache.armazenar("a", b"1")
+            assert not cache.sincronizar()
+        assert cache.obter("a") == b"1"
+
+    def test_versao_alterada_invalida(self):
+        cache = CachePaginas()
+        with patch("util.pagina_cache.conteudo_versao_repo.obter_versao", side_effect=[3, 4]):
+            cache.sincronizar()
+            cache.armazenar("a", b"1")
+            assert cache.sincronizar()
+        assert cache.obter("a") is None
+
+    def test_erro_de_banco_propagado(self):
+        cache = CachePaginas()
+        with patch(
+            "util.pagina_cache.conteudo_versao_repo.obter_versao",
+            side_effect=sqlite3.OperationalError("database is locked"),
+        ):
+            with pytest.raises(sqlite3.Error):
+                cache.sincronizar()
+
+
+class TestChavePagina:
+    """Testes da chave de cache das páginas"""
+
+    def _request(self, sessao: dict, caminho: str = "/artigos"):
+        request = MagicMock()
+        request.session = sessao
+        request.url.path = caminho
+        return request
+
+    def test_anonimo_tem_chave(self):
+        chave = chave_pagina(self._request({}), page=2, categoria=None)
+        assert chave == ("pagina", "/artigos", (("categoria", None), ("page", 2)), "anonimo")
+
+    def test_parametros_diferentes_chaves_diferentes(self):
+        request = self._request({})
+        assert chave_pagina(request, page=1) != chave_pagina(request, page=2)
+
+    def test_usuario_logado_nao_cacheavel(self):
+        assert chave_pagina(self._request({"usuario_logado": {"id": 1}})) is None
+
+    def test_mensagens_pendentes_nao_cacheavel(self):
+        assert chave_pagina(self._request({"mensagens": [{"texto": "oi"}]})) is None
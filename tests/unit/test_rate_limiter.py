@@ -4,6 +4,9 @@ Testes para o módulo util/rate_limiter.py
 Testa RateLimiter, DynamicRateLimiter, RegistroLimiters e decorator @com_rate_limit.
 """
 
+import time
+import tracemalloc
+
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 from datetime import datetime, timedelta
@@ -18,6 +21,7 @@ from util.rate_limiter import (
     obter_identificador_cliente,
     com_rate_limit
 )
+from util.rate_limit_backend import BackendMemoria
 
 
 class TestRateLimiter:
@@ -210,6 +214,197 @@ class TestRateLimiter:
         assert "5" in repr_str
 
 
+class TestRateLimiterJanelaDeslizante:
+    """Testes da janela deslizante com relógio controlado"""
+
+    @pytest.fixture
+    def relogio(self):
+        """Substitui o relógio do backend em memória por um valor controlado"""
+        instante = {"agora": 1000.0}
+        with patch.object(BackendMemoria, 'agora', lambda self: instante["agora"]):
+            yield instante
+
+    @pytest.mark.parametrize("max_tentativas,janela_minutos", [(5, 5), (3, 1), (10, 2)])
+    def test_no_maximo_max_tentativas_em_qualquer_janela(self, relogio, max_tentativas, janela_minutos):
+        """Tentando a cada 10 s, nenhuma janela pode ter mais que max_tentativas permitidas"""
+        limiter = RateLimiter(max_tentativas=max_tentativas, janela_minutos=janela_minutos, nome="teste")
+        janela = janela_minutos * 60
+        permitidas = []
+        with patch('util.rate_limiter.logger'):
+            for _ in range(200):
+                if limiter.verificar("ip"):
+                    permitidas.append(relogio["agora"])
+                relogio["agora"] += 10
+
+        for inicio in permitidas:
+            na_janela = [t for t in permitidas if inicio <= t < inicio + janela]
+            assert len(na_janela) <= max_tentativas
+        # E o limite é atingido: a cada janela completa, max_tentativas permitidas
+        primeira = permitidas[0]
+        assert len([t for t in permitidas if primeira <= t < primeira + janela]) == max_tentativas
+
+    def test_login_5_em_5_minutos(self, relogio):
+        """Cenário do brute force: 5 tentativas por 5 min, tentando a cada segundo"""
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=5, nome="login")
+        permitidas = 0
+        with patch('util.rate_limiter.logger'):
+            for _ in range(300):
+                permitidas += limiter.verificar("ip")
+                relogio["agora"] += 1
+
+        assert permitidas == 5
+
+    def test_libera_quando_tentativa_mais_antiga_sai_da_janela(self, relogio):
+        """Após esgotar, a próxima tentativa é liberada quando a mais antiga expira"""
+        limiter = RateLimiter(max_tentativas=3, janela_minutos=1, nome="teste")
+        assert limiter.verificar("ip")
+        relogio["agora"] += 20
+        assert limiter.verificar("ip")
+        assert limiter.verificar("ip")
+        with patch('util.rate_limiter.logger'):
+            assert not limiter.verificar("ip")
+
+        relogio["agora"] += 39
+        assert limiter.obter_tentativas_restantes("ip") == 0
+        assert limiter.obter_tempo_reset("ip").total_seconds() == pytest.approx(1)
+
+        relogio["agora"] += 1
+        assert limiter.obter_tentativas_restantes("ip") == 1
+        assert limiter.obter_tempo_reset("ip") is None
+        assert limiter.verificar("ip")
+        with patch('util.rate_limiter.logger'):
+            assert not limiter.verificar("ip")
+
+    def test_janela_completa_zera_identificador(self, relogio):
+        """Após uma janela inteira sem tentativas, o limite volta ao máximo"""
+        limiter = RateLimiter(max_tentativas=3, janela_minutos=1, nome="teste")
+        for _ in range(3):
+            limiter.verificar("ip")
+
+        relogio["agora"] += 60
+
+        assert limiter.obter_tentativas_restantes("ip") == 3
+        assert limiter.obter_tempo_reset("ip") is None
+
+    def test_tentativa_bloqueada_nao_consome_limite(self, relogio):
+        """Tentativas bloqueadas não devem prolongar o bloqueio"""
+        limiter = RateLimiter(max_tentativas=2, janela_minutos=1, nome="teste")
+        limiter.verificar("ip")
+        limiter.verificar("ip")
+        with patch('util.rate_limiter.logger'):
+            for _ in range(10):
+                assert not limiter.verificar("ip")
+
+        relogio["agora"] += 60
+
+        assert limiter.verificar("ip")
+        assert limiter.verificar("ip")
+
+    def test_reduzir_max_tentativas_bloqueia(self, relogio):
+        """DynamicRateLimiter pode reduzir max_tentativas: o histórico recente continua valendo"""
+        limiter = RateLimiter(max_tentativas=4, janela_minutos=1, nome="teste")
+        for _ in range(3):
+            limiter.verificar("ip")
+
+        limiter.max_tentativas = 2
+        with patch('util.rate_limiter.logger'):
+            assert not limiter.verificar("ip")
+
+    def test_aumentar_max_tentativas_mantem_historico(self, relogio):
+        """Ao aumentar max_tentativas, as tentativas já registradas continuam contando"""
+        limiter = RateLimiter(max_tentativas=4, janela_minutos=1, nome="teste")
+        for _ in range(4):
+            limiter.verificar("ip")
+
+        limiter.max_tentativas = 6
+        assert limiter.verificar("ip")
+        assert limiter.verificar("ip")
+        with patch('util.rate_limiter.logger'):
+            assert not limiter.verificar("ip")
+
+
+class TestBackendMemoria:
+    """Testes para o backend em memória particionado"""
+
+    def test_shards_invalido(self):
+        with pytest.raises(ValueError):
+            BackendMemoria(shards=0)
+
+    def test_consumir_respeita_janela(self):
+        """Deve permitir max_tentativas na janela e bloquear a seguinte"""
+        backend = BackendMemoria(shards=4)
+
+        resultados = [backend.consumir("ip", 3, 30.0, 0.0) for _ in range(4)]
+
+        assert resultados == [True, True, True, False]
+        assert backend.obter_instantes("ip", 30.0, 10.0) == [0.0, 0.0, 0.0]
+
+    def test_interface_abstrata(self):
+        from util.rate_limit_backend import BackendRateLimit
+
+        with pytest.raises(TypeError):
+            BackendRateLimit()
+
+    def test_remove_identificadores_inativos(self):
+        """Identificadores zerados devem ser removidos na limpeza periódica"""
+        backend = BackendMemoria(shards=1, intervalo_limpeza=60.0)
+        for i in range(100):
+            backend.consumir(f"10.0.0.{i}", 10, 10.0, 0.0)
+        assert len(backend) == 100
+
+        # Primeira operação após o intervalo de limpeza remove os zerados
+        backend.consumir("novo", 10, 10.0, 61.0)
+
+        assert len(backend) == 1
+        assert "novo" in backend
+        assert backend.obter_estatisticas()["removidos_por_inatividade"] == 100
+
+    def test_limpeza_mantem_identificadores_ativos(self):
+        backend = BackendMemoria(shards=1, intervalo_limpeza=1.0)
+        backend.consumir("ativo", 3, 300.0, 0.0)
+
+        backend.consumir("outro", 3, 300.0, 50.0)
+
+        assert "ativo" in backend
+
+    @pytest.mark.slow
+    def test_benchmark_100k_ips(self):
+        """Benchmark: 100 mil IPs distintos com verificação O(1) e memória compacta"""
+        limiter = RateLimiter(max_tentativas=10, janela_minutos=1, nome="benchmark")
+        ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(100_000)]
+
+        inicio = time.perf_counter()
+        for ip in ips:
+            limiter.verificar(ip)
+        duracao_novos = time.perf_counter() - inicio
+
+        # Segunda passada: identificadores já existentes
+        inicio = time.perf_counter()
+        for ip in ips:
+            limiter.verificar(ip)
+        duracao_existentes = time.perf_counter() - inicio
+
+        limiter.limpar()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        for ip in ips:
+            limiter.verificar(ip)
+        memoria = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+
+        por_verificacao_us = duracao_existentes / len(ips) * 1_000_000
+        por_ip_bytes = memoria / len(ips)
+        print(
+            f"\n[benchmark rate limiter] 100k IPs: novos {duracao_novos:.3f}s, "
+            f"existentes {duracao_existentes:.3f}s ({por_verificacao_us:.2f} us/verificação), "
+            f"memória {memoria / 1024 / 1024:.1f} MiB ({por_ip_bytes:.0f} bytes/IP)"
+        )
+
+        assert len(limiter.tentativas) == len(ips)
+        assert por_verificacao_us < 50
+        assert por_ip_bytes < 300
+
+
 class TestDynamicRateLimiter:
     """Testes para a classe DynamicRateLimiter"""
 
@@ -334,6 +529,51 @@ class TestDynamicRateLimiter:
                 limiter.obter_tempo_reset("192.168.1.1")
                 mock_atualizar.assert_called_once()
 
+    def test_verificar_nao_rele_config_sem_mudanca(self):
+        """Sem mudança de versão, verificações não devem consultar o config"""
+        with patch('util.rate_limiter.config') as mock_config:
+            mock_config.obter_versao.return_value = 1
+            mock_config.obter_int.side_effect = lambda k, d: d
+
+            limiter = DynamicRateLimiter(
+                chave_max="teste_max",
+                chave_minutos="teste_minutos",
+                padrao_max=50,
+                padrao_minutos=5,
+                nome="teste"
+            )
+            limiter.verificar("192.168.1.1")
+            mock_config.obter_int.reset_mock()
+
+            for _ in range(10):
+                limiter.verificar("192.168.1.1")
+            limiter.obter_tentativas_restantes("192.168.1.1")
+            limiter.obter_tempo_reset("192.168.1.1")
+
+            mock_config.obter_int.assert_not_called()
+
+    def test_verificar_rele_config_apos_mudanca_de_versao(self):
+        """Nova versão do config (limpar) deve aplicar os novos valores"""
+        with patch('util.rate_limiter.config') as mock_config:
+            mock_config.obter_versao.return_value = 1
+            mock_config.obter_int.side_effect = lambda k, d: d
+
+            limiter = DynamicRateLimiter(
+                chave_max="teste_max",
+                chave_minutos="teste_minutos",
+                padrao_max=5,
+                padrao_minutos=5,
+                nome="teste"
+            )
+            limiter.verificar("192.168.1.1")
+
+            mock_config.obter_int.side_effect = lambda k, d: {"teste_max": 1}.get(k, d)
+            mock_config.obter_versao.return_value = 2
+
+            with patch('util.rate_limiter.logger'):
+                assert limiter.verificar("192.168.1.1") is False
+            assert limiter.max_tentativas == 1
+
     def test_repr(self):
         """Deve ter representação string correta"""
         with patch('util.rate_limiter.config') as mock_config:
@@ -0,0 +1,110 @@
+"""
+Testes para o módulo util/senha_service.py
+
+Testa o serviço assíncrono de senhas: execução fora do event loop,
+limite de concorrência, métricas de fila e rehash de hashes antigos.
+"""
+
+import asyncio
+
+import pytest
+from passlib.context import CryptContext
+
+from util.senha_service import ServicoSenha
+
+
+# Hash barato com parâmetros diferentes dos atuais (força rehash)
+contexto_antigo = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+
+
+class TestServicoSenha:
+    """Testes para a classe ServicoSenha"""
+
+    def test_max_workers_invalido(self):
+        with pytest.raises(ValueError):
+            ServicoSenha(max_workers=0)
+
+    def test_concorrencia_padrao_igual_workers(self):
+        assert ServicoSenha(max_workers=3, max_concorrentes=0).max_concorrentes == 3
+
+    async def test_gerar_hash_e_verificar_em_processo(self):
+        """Pool de processos deve gerar hash verificável"""
+        servico = ServicoSenha(max_workers=1, executor="processos")
+        try:
+            senha_hash = await servico.gerar_hash("Senha@123")
+
+            assert await servico.verificar("Senha@123", senha_hash) is True
+            assert await servico.verificar("Errada@123", senha_hash) is False
+            assert servico.obter_estatisticas()["concluidas"] == 3
+        finally:
+            servico.encerrar()
+
+    async def test_verificar_e_atualizar_regera_hash_antigo(self):
+        servico = ServicoSenha(max_workers=1, executor="threads")
+        hash_antigo = contexto_antigo.hash("Senha@123")
+
+        correta, novo_hash = await servico.verificar_e_atualizar("Senha@123", hash_antigo)
+
+        assert correta is True
+        assert novo_hash is not None and novo_hash != hash_antigo
+        assert contexto_antigo.verify("Senha@123", novo_hash)
+        assert servico.obter_estatisticas()["rehashes"] == 1
+        servico.encerrar()
+
+    async def test_verificar_e_atualizar_senha_incorreta_sem_rehash(self):
+        servico = ServicoSenha(max_workers=1, executor="threads")
+        hash_antigo = contexto_antigo.hash("Senha@123")
+
+        correta, novo_hash = await servico.verificar_e_atualizar("Errada@123", hash_antigo)
+
+        assert correta is False
+        assert novo_hash is None
+        servico.encerrar()
+
+    async def test_limite_de_concorrencia_e_metricas_de_fila(self):
+        """Operações além do limite devem esperar na fila do serviço"""
+        servico = ServicoSenha(max_workers=2, max_concorrentes=1, executor="threads")
+        hash_antigo = contexto_antigo.hash("Senha@123")
+
+        tarefas = [asyncio.create_task(servico.verificar("Senha@123", hash_antigo)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        estatisticas = servico.obter_estatisticas()
+        assert estatisticas["em_execucao"] == 1
+        assert estatisticas["fila_pendentes"] == 2
+
+        assert await asyncio.gather(*tarefas) == [True, True, True]
+
+        estatisticas = servico.obter_estatisticas()
+        assert estatisticas["maior_fila"] == 2
+        assert estatisticas["fila_pendentes"] == 0
+        assert estatisticas["em_execucao"] == 0
+        assert estatisticas["espera_maxima_ms"] > 0
+        servico.encerrar()
+
+    async def test_excecao_propagada_e_contabilizada(self):
+        servico = ServicoSenha(max_workers=1, executor="threads")
+
+        with pytest.raises(ValueError):
+            await servico.verificar("Senha@123", "hash-invalido")
+
+        assert servico.obter_estatisticas()["falhas"] == 1
+        servico.encerrar()
+
+    async def test_event_loop_livre_durante_hash(self):
+        """O event loop deve continuar respondendo enquanto o bcrypt roda"""
+        servico = ServicoSenha(max_workers=1, executor="threads")
+        batidas = 0
+
+        async def contar_batidas():
+            nonlocal batidas
+            while True:
+                await asyncio.sleep(0.01)
+                batidas += 1
+
+        contador = asyncio.create_task(contar_batidas())
+        await servico.gerar_hash("Senha@123")
+        contador.cancel()
+
+        assert batidas > 0
+        servico.encerrar()
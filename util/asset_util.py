@@ -0,0 +1,412 @@
+"""
+URLs versionadas por conteúdo para arquivos estáticos.
+
+Sem versão na URL, o navegador precisa revalidar cada CSS, JS e foto de
+perfil a cada página. O manifesto guarda, para cada arquivo em static/, um
+hash curto do conteúdo; `asset_url` (global dos templates) e o filtro
+`foto_usuario` devolvem a URL com `?v=<hash>`. Como a URL muda sempre que
+o conteúdo muda, essas respostas podem ser cacheadas como imutáveis.
+
+O manifesto é montado no startup (CSS, JS e imagens do site). As consultas
+dos templates só conferem mtime e tamanho do arquivo (um stat): o hash
+nunca é calculado durante a renderização. Quem troca um arquivo (upload
+de foto, troca de tema) atualiza a entrada fora do event loop
+(`atualizar`); entradas ausentes ou desatualizadas (ex: arquivo trocado
+em outro worker) saem sem versão e têm o hash recalculado em background
+no executor de util.db_async, sem comunicação entre processos.
+
+ArquivosEstaticos substitui o StaticFiles: URLs com a versão atual recebem
+Cache-Control imutável; as demais, `no-cache` (revalidação por ETag, com
+resposta 304 quando o arquivo não mudou). Arquivos de texto com irmão
+pré-comprimido (.br/.gz, gerados por iniciar_precompressao no startup ou
+por `python -m util.compressao_util static` no deploy) são entregues
+comprimidos conforme o Accept-Encoding, sem compressão por requisição.
+
+Uso nos templates:
+    <link rel="stylesheet" href="{{ asset_url('css/custom.css') }}">
+
+Configuração (.env):
+    STATIC_CACHE_MAX_AGE=31536000
+    STATIC_PRECOMPRIMIR=True
+"""
+import asyncio
+import hashlib
+import mimetypes
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from util.compressao_util import (
+    EXTENSOES_COMPRIMIVEIS,
+    SUFIXOS,
+    codificacoes_disponiveis,
+    escolher_codificacao,
+    precomprimir_pasta,
+)
+from util.db_async import executar_em_thread, executor_banco
+from util.logger_config import logger
+
+
+STATIC_CACHE_MAX_AGE = int(os.getenv('STATIC_CACHE_MAX_AGE', str(365 * 24 * 3600)))
+STATIC_PRECOMPRIMIR = os.getenv('STATIC_PRECOMPRIMIR', 'True').lower() == 'true'
+
+PASTA_STATIC = Path("static")
+PREFIXO_STATIC = "/static"
+
+# Pastas incluídas no manifesto do startup (fotos de usuários entram sob demanda)
+PASTAS_MANIFESTO = ("css", "js", "img")
+PASTAS_IGNORADAS = ("img/usuarios",)
+# Irmãos pré-comprimidos e temporários não são endereçados por URL própria
+SUFIXOS_IGNORADOS = (".gz", ".br", ".tmp")
+
+# Caracteres hexadecimais do hash usados na URL
+TAMANHO_HASH = 12
+
+
+def calcular_hash(caminho: Path) -> str:
+    """Hash curto (sha256) do conteúdo do arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(64 * 1024), b""):
+            digest.update(bloco)
+    return digest.hexdigest()[:TAMANHO_HASH]
+
+
+class ManifestoAssets:
+    """
+    Mapa caminho do arquivo → hash do conteúdo dos arquivos estáticos.
+
+    Cada entrada guarda (mtime_ns, tamanho, hash); o hash só é recalculado
+    quando o stat do arquivo muda. Usado por templates, pelas threads do
+    ArquivosEstaticos e pelo pool do banco: o mapa é protegido por lock
+    (o hash é calculado fora dele).
+
+    `obter_hash`/`consultar_hash_arquivo` (templates) fazem apenas o stat;
+    `obter_hash_arquivo`/`atualizar` leem o arquivo e são bloqueantes.
+    """
+
+    def __init__(self, raiz: Path = PASTA_STATIC, prefixo: str = PREFIXO_STATIC):
+        self.raiz = Path(raiz)
+        self.prefixo = prefixo.rstrip("/")
+        self._entradas: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+        # Arquivos com hash sendo recalculado em background
+        self._pendentes: Set[str] = set()
+
+        # Métricas
+        self._consultas = 0
+        self._hashes_calculados = 0
+
+    def _normalizar(self, caminho: str) -> str:
+        """Aceita 'css/a.css', '/static/css/a.css' ou 'static/css/a.css'."""
+        caminho = caminho.lstrip("/")
+        raiz = self.prefixo.lstrip("/") + "/"
+        if caminho.startswith(raiz):
+            caminho = caminho[len(raiz):]
+        return caminho
+
+    def obter_hash(self, caminho: str) -> Optional[str]:
+        """
+        Retorna o hash registrado de um arquivo da pasta static (apenas stat).
+
+        Args:
+            caminho: Caminho relativo à pasta static (ou URL /static/...)
+
+        Returns:
+            Hash do conteúdo ou None se o arquivo não existe ou a entrada
+            ainda não está atualizada
+        """
+        return self.consultar_hash_arquivo(self.raiz / self._normalizar(caminho))
+
+    def consultar_hash_arquivo(self, arquivo: Path) -> Optional[str]:
+        """
+        Retorna o hash registrado do arquivo, sem ler seu conteúdo.
+
+        Seguro para o event loop (templates). Entrada ausente ou com stat
+        diferente tem o hash recalculado em background; até lá, None (URL
+        sem versão, servida com no-cache).
+
+        Args:
+            arquivo: Caminho do arquivo no disco
+
+        Returns:
+            Hash do conteúdo ou None
+        """
+        stat, versao = self._consultar(arquivo)
+        if stat is not None and versao is None:
+            self._agendar_atualizacao(arquivo)
+        return versao
+
+    def _agendar_atualizacao(self, arquivo: Path) -> None:
+        """Recalcula o hash no executor de util.db_async (uma vez por arquivo)."""
+        chave = str(arquivo)
+        with self._lock:
+            if chave in self._pendentes:
+                return
+            self._pendentes.add(chave)
+        try:
+            executor_banco.submeter(self._atualizar_pendente, arquivo)
+        except RuntimeError as e:
+            with self._lock:
+                self._pendentes.discard(chave)
+            logger.warning(f"[Assets] Erro ao agendar hash de {arquivo}: {e}")
+
+    def _atualizar_pendente(self, arquivo: Path) -> None:
+        """Executado no pool: recalcula o hash e libera o arquivo para novo agendamento."""
+        try:
+            self.obter_hash_arquivo(arquivo)
+        finally:
+            with self._lock:
+                self._pendentes.discard(str(arquivo))
+
+    def atualizar(self, caminho: str) -> Optional[str]:
+        """
+        Atualiza a entrada de um arquivo recém-gravado (upload, troca de tema).
+
+        Bloqueante (lê o arquivo): chamar com executar_em_thread.
+
+        Args:
+            caminho: Caminho relativo à pasta static (ou URL /static/...)
+
+        Returns:
+            Hash do conteúdo ou None se o arquivo não existe
+        """
+        return self.obter_hash_arquivo(self.raiz / self._normalizar(caminho))
+
+    def _consultar(self, arquivo: Path) -> Tuple[Optional[os.stat_result], Optional[str]]:
+        """
+        Confere o stat do arquivo contra a entrada do manifesto.
+
+        Returns:
+            Tupla (stat, hash em cache): stat None se o arquivo não existe;
+            hash None se precisa ser (re)calculado
+        """
+        chave = str(arquivo)
+        try:
+            stat = os.stat(arquivo)
+        except (OSError, ValueError):
+            with self._lock:
+                self._consultas += 1
+                self._entradas.pop(chave, None)
+            return None, None
+
+        with self._lock:
+            self._consultas += 1
+            entrada = self._entradas.get(chave)
+        if entrada is not None and entrada[0] == stat.st_mtime_ns and entrada[1] == stat.st_size:
+            return stat, entrada[2]
+        return stat, None
+
+    def obter_hash_arquivo(self, arquivo: Path) -> Optional[str]:
+        """
+        Retorna o hash atual do arquivo, recalculando-o se o stat mudou.
+
+        Bloqueante: lê o arquivo inteiro quando a entrada está desatualizada.
+
+        Args:
+            arquivo: Caminho do arquivo no disco
+
+        Returns:
+            Hash do conteúdo ou None se o arquivo não existe
+        """
+        stat, versao = self._consultar(arquivo)
+        if stat is None or versao is not None:
+            return versao
+
+        try:
+            versao = calcular_hash(arquivo)
+        except OSError as e:
+            logger.warning(f"[Assets] Erro ao calcular hash de {arquivo}: {e}")
+            return None
+        with self._lock:
+            self._hashes_calculados += 1
+            self._entradas[str(arquivo)] = (stat.st_mtime_ns, stat.st_size, versao)
+        return versao
+
+    async def obter_hash_async(self, caminho: str) -> Optional[str]:
+        """
+        Retorna o hash atual, aguardando o recálculo (leitura do arquivo
+        inteiro, no executor de util.db_async) quando o arquivo mudou; com o
+        manifesto atualizado, só o stat roda no event loop.
+
+        Args:
+            caminho: Caminho relativo à pasta static (ou URL /static/...)
+
+        Returns:
+            Hash do conteúdo ou None se o arquivo não existe
+        """
+        arquivo = self.raiz / self._normalizar(caminho)
+        stat, versao = self._consultar(arquivo)
+        if stat is None or versao is not None:
+            return versao
+        return await executar_em_thread(self.obter_hash_arquivo, arquivo)
+
+    def url(self, caminho: str) -> str:
+        """
+        Retorna a URL do arquivo com a versão do conteúdo.
+
+        Args:
+            caminho: Caminho relativo à pasta static (ex: "css/custom.css")
+
+        Returns:
+            URL /static/... com ?v=<hash> (sem versão se o arquivo não existe
+            ou a entrada ainda não foi atualizada)
+        """
+        relativo = self._normalizar(caminho)
+        versao = self.obter_hash(relativo)
+        url = f"{self.prefixo}/{relativo}"
+        return f"{url}?v={versao}" if versao else url
+
+    def construir(self, pastas: Iterable[str] = PASTAS_MANIFESTO) -> int:
+        """
+        Calcula o hash de todos os arquivos das pastas (no startup).
+
+        Returns:
+            Quantidade de arquivos no manifesto
+        """
+        for pasta in pastas:
+            base = self.raiz / pasta
+            if not base.is_dir():
+                continue
+            for caminho in base.rglob("*"):
+                relativo = caminho.relative_to(self.raiz).as_posix()
+                if (
+                    caminho.is_file()
+                    and not relativo.startswith(PASTAS_IGNORADAS)
+                    and caminho.suffix not in SUFIXOS_IGNORADOS
+                ):
+                    self.obter_hash_arquivo(caminho)
+        with self._lock:
+            total = len(self._entradas)
+        logger.info(f"[Assets] Manifesto com {total} arquivo(s)")
+        return total
+
+    def limpar(self) -> None:
+        """Remove todas as entradas do manifesto."""
+        with self._lock:
+            self._entradas.clear()
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna estatísticas do manifesto.
+
+        Returns:
+            Dicionário com arquivos, consultas e hashes calculados
+        """
+        with self._lock:
+            return {
+                "arquivos": len(self._entradas),
+                "consultas": self._consultas,
+                "hashes_calculados": self._hashes_calculados,
+            }
+
+
+class ArquivosEstaticos(StaticFiles):
+    """
+    StaticFiles com Cache-Control conforme a versão pedida na URL.
+
+    Com `?v=` igual ao hash atual, a resposta é imutável por
+    STATIC_CACHE_MAX_AGE; sem versão (ou com versão antiga), `no-cache`:
+    o navegador revalida com If-None-Match e recebe 304 se nada mudou.
+    ETag, Last-Modified e o 304 vêm do StaticFiles.
+    """
+
+    def __init__(self, *args, manifesto: Optional[ManifestoAssets] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifesto = manifesto
+        self._precomprimidas = 0
+
+    def _obter_precomprimido(self, full_path, stat_result: os.stat_result, accept_encoding: str):
+        """
+        Procura o irmão pré-comprimido na melhor codificação aceita.
+
+        Só vale o irmão tão novo quanto o original (um .gz antigo de um CSS
+        trocado seria conteúdo errado).
+
+        Returns:
+            Tupla (codificação, caminho, stat) ou None
+        """
+        existentes = {}
+        for codificacao in codificacoes_disponiveis():
+            caminho = f"{full_path}{SUFIXOS[codificacao]}"
+            try:
+                stat_irmao = os.stat(caminho)
+            except OSError:
+                continue
+            if stat_irmao.st_mtime_ns >= stat_result.st_mtime_ns:
+                existentes[codificacao] = (caminho, stat_irmao)
+
+        codificacao = escolher_codificacao(accept_encoding, tuple(existentes))
+        if codificacao is None:
+            return None
+        return (codificacao, *existentes[codificacao])
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        if not str(full_path).lower().endswith(EXTENSOES_COMPRIMIVEIS):
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        precomprimido = self._obter_precomprimido(full_path, stat_result, request_headers.get("accept-encoding", ""))
+        if precomprimido is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+
+        codificacao, caminho, stat_irmao = precomprimido
+        self._precomprimidas += 1
+        response = FileResponse(
+            caminho,
+            status_code=status_code,
+            stat_result=stat_irmao,
+            media_type=mimetypes.guess_type(str(full_path))[0] or "application/octet-stream",
+            headers={"Content-Encoding": codificacao, "Vary": "Accept-Encoding"},
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code not in (200, 304):
+            return response
+
+        manifesto = self.manifesto or manifesto_assets
+        versao = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v")
+        # Só URLs versionadas precisam do hash (calculado fora do event loop)
+        if versao and versao[0] == await manifesto.obter_hash_async(path):
+            response.headers["Cache-Control"] = f"public, max-age={STATIC_CACHE_MAX_AGE}, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
+# Instância global
+manifesto_assets = ManifestoAssets()
+
+
+def iniciar_precompressao() -> Optional[asyncio.Task]:
+    """
+    Gera os irmãos .gz/.br dos arquivos de texto de static/ em background.
+
+    Roda no executor de util.db_async (brotli no nível máximo leva segundos
+    nos temas bootswatch) e só grava arquivos ausentes ou desatualizados.
+
+    Returns:
+        Task agendada ou None se STATIC_PRECOMPRIMIR estiver desativado
+    """
+    if not STATIC_PRECOMPRIMIR or not PASTA_STATIC.is_dir():
+        return None
+    return asyncio.create_task(executar_em_thread(precomprimir_pasta, PASTA_STATIC, None, PASTAS_IGNORADAS))
+
+
+def asset_url(caminho: str) -> str:
+    """Global dos templates: URL versionada de um arquivo em static/."""
+    return manifesto_assets.url(caminho)
@@ -12,6 +12,7 @@ from typing import Optional, List
 from dataclasses import dataclass
 
 from util.config import DATABASE_PATH
+from util.db_util import fechar_pools
 from util.logger_config import logger
 from util.datetime_util import agora
 
@@ -176,6 +177,41 @@ def _validar_integridade_backup(caminho: Path) -> tuple[bool, str]:
         return False, mensagem
 
 
+def _consolidar_wal(db_path: Path) -> None:
+    """
+    Transfere o conteúdo do arquivo WAL para o banco principal.
+
+    Com journal_mode=WAL, commits recentes ficam no arquivo "-wal" até o
+    próximo checkpoint; sem isso a cópia do arquivo principal ficaria
+    desatualizada.
+
+    Args:
+        db_path: Path do banco de dados
+    """
+    try:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Não foi possível consolidar WAL antes do backup: {e}")
+
+
+def _remover_arquivos_wal(db_path: Path) -> None:
+    """
+    Remove arquivos "-wal" e "-shm" remanescentes do banco.
+
+    Devem ser removidos antes de sobrescrever o banco: um WAL antigo seria
+    reaplicado sobre o conteúdo restaurado.
+
+    Args:
+        db_path: Path do banco de dados
+    """
+    for sufixo in ("-wal", "-shm"):
+        Path(f"{db_path}{sufixo}").unlink(missing_ok=True)
+
+
 def _verificar_database_pos_restauracao() -> bool:
     """
     Verifica se o banco de dados atual está válido após restauração
@@ -215,7 +251,8 @@ def criar_backup(automatico: bool = False) -> tuple[bool, str]:
         nome_backup = agora().strftime(formato)
         caminho_backup = BACKUP_DIR / nome_backup
 
-        # Copiar arquivo do banco de dados
+        # Copiar arquivo do banco de dados (após consolidar o WAL)
+        _consolidar_wal(db_path)
         shutil.copy2(db_path, caminho_backup)
 
         # Obter tamanho do backup
@@ -342,7 +379,10 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
                 # Continua mesmo se falhar o backup automático
 
         # Restaurar backup (copiar sobre o arquivo atual)
+        # Conexões pooled precisam ser fechadas antes de substituir o arquivo
+        fechar_pools()
         db_path = Path(DATABASE_PATH)
+        _remover_arquivos_wal(db_path)
         shutil.copy2(caminho_backup, db_path)
 
         # VALIDAÇÃO PÓS-RESTAURAÇÃO: Verificar se banco restaurado está válido
@@ -352,6 +392,8 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
             logger.error("Banco corrompido após restauração! Executando rollback...")
 
             if caminho_backup_seguranca and caminho_backup_seguranca.exists():
+                fechar_pools()
+                _remover_arquivos_wal(db_path)
                 shutil.copy2(caminho_backup_seguranca, db_path)
                 mensagem = (
                     f"Restauração falhou! Banco revertido para estado anterior. "
@@ -379,7 +421,9 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
         # Tentar rollback em caso de exceção
         if caminho_backup_seguranca and caminho_backup_seguranca.exists():
             try:
+                fechar_pools()
                 db_path = Path(DATABASE_PATH)
+                _remover_arquivos_wal(db_path)
                 shutil.copy2(caminho_backup_seguranca, db_path)
                 logger.info("Rollback executado com sucesso após exceção")
                 mensagem += " (Banco revertido para estado anterior)"
@@ -0,0 +1,264 @@
+"""
+Brokers de distribuição de eventos do chat.
+
+O GerenciadorChat mantém as filas SSE na memória do processo. Com vários
+workers do uvicorn, a mensagem enviada no worker A precisa chegar às
+conexões mantidas pelo worker B. O broker recebe cada evento publicado e o
+entrega ao callback de entrega local de TODOS os workers.
+
+Backends:
+    - memoria: entrega direta no próprio processo (padrão, um worker)
+    - sqlite: log de eventos compartilhado (tabela chat_evento) consultado
+      periodicamente por cada worker; funciona entre processos do mesmo host
+
+Configuração (.env):
+    CHAT_BROKER=memoria|sqlite
+    CHAT_BROKER_INTERVALO_MS=50
+    CHAT_BROKER_RETENCAO_SEGUNDOS=60
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from repo import chat_evento_repo
+from util.db_async import executar_em_thread
+from util.logger_config import logger
+
+
+CHAT_BROKER = os.getenv('CHAT_BROKER', 'memoria').lower()
+CHAT_BROKER_INTERVALO_MS = int(os.getenv('CHAT_BROKER_INTERVALO_MS', '50'))
+CHAT_BROKER_RETENCAO_SEGUNDOS = int(os.getenv('CHAT_BROKER_RETENCAO_SEGUNDOS', '60'))
+
+# Callback de entrega local: (sala_id, evento) -> None
+CallbackEntrega = Callable[[str, dict], Awaitable[None]]
+
+
+class MetricaLatencia:
+    """
+    Acumula latências de entrega (publicação -> fila local).
+
+    Guarda as últimas amostras em janela fixa para calcular percentis sem
+    crescer a memória.
+    """
+
+    def __init__(self, janela: int = 1000):
+        self._amostras: deque = deque(maxlen=janela)
+        self.total = 0
+        self._soma = 0.0
+        self._maxima = 0.0
+
+    def registrar(self, latencia_segundos: float) -> None:
+        """Registra uma entrega."""
+        latencia = max(latencia_segundos, 0.0)
+        self.total += 1
+        self._soma += latencia
+        self._maxima = max(self._maxima, latencia)
+        self._amostras.append(latencia)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna média, máxima e p95 em milissegundos.
+
+        Returns:
+            Dicionário com as métricas de latência
+        """
+        ordenadas = sorted(self._amostras)
+        p95 = ordenadas[int(len(ordenadas) * 0.95) - 1] if ordenadas else 0.0
+        return {
+            "entregas": self.total,
+            "latencia_media_ms": round(self._soma / self.total * 1000, 3) if self.total else 0,
+            "latencia_maxima_ms": round(self._maxima * 1000, 3),
+            "latencia_p95_ms": round(p95 * 1000, 3),
+        }
+
+
+class BrokerChat(ABC):
+    """
+    Interface dos brokers de eventos do chat.
+
+    O GerenciadorChat registra seu callback de entrega local com
+    `registrar_entrega` e publica eventos com `publicar`.
+    """
+
+    nome = "base"
+
+    def __init__(self):
+        self._entregar: Optional[CallbackEntrega] = None
+        self._publicados = 0
+        self._latencia = MetricaLatencia()
+
+    def registrar_entrega(self, callback: CallbackEntrega) -> None:
+        """Define o callback que entrega eventos às conexões deste processo."""
+        self._entregar = callback
+
+    async def _entregar_local(self, sala_id: str, evento: dict, publicado_em: float) -> None:
+        """Entrega ao callback local registrando a latência."""
+        if self._entregar is None:
+            return
+        await self._entregar(sala_id, evento)
+        self._latencia.registrar(time.time() - publicado_em)
+
+    @abstractmethod
+    async def iniciar(self) -> None:
+        """Inicia recursos em background (idempotente)."""
+
+    @abstractmethod
+    async def publicar(self, sala_id: str, evento: dict) -> None:
+        """Publica um evento para todos os workers."""
+
+    @abstractmethod
+    async def encerrar(self) -> None:
+        """Libera recursos em background."""
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna estatísticas do broker.
+
+        Returns:
+            Dicionário com backend, publicações e latência de entrega
+        """
+        return {
+            "backend": self.nome,
+            "publicados": self._publicados,
+            **self._latencia.obter_estatisticas(),
+        }
+
+
+class BrokerMemoria(BrokerChat):
+    """Broker em memória: entrega direta às conexões do próprio processo."""
+
+    nome = "memoria"
+
+    async def iniciar(self) -> None:
+        """Nada a iniciar: a entrega é feita na própria chamada de publicar."""
+
+    async def publicar(self, sala_id: str, evento: dict) -> None:
+        self._publicados += 1
+        await self._entregar_local(sala_id, evento, time.time())
+
+    async def encerrar(self) -> None:
+        """Nada a liberar."""
+
+
+class BrokerSQLite(BrokerChat):
+    """
+    Broker entre processos baseado em log de eventos no SQLite.
+
+    Cada publicação é entregue imediatamente às conexões locais e gravada
+    na tabela chat_evento. Cada worker consulta periodicamente os eventos
+    de outras origens posteriores ao último consumido (consulta pela PK) e
+    os entrega localmente. Eventos mais antigos que a retenção são
+    removidos periodicamente.
+    """
+
+    nome = "sqlite"
+
+    def __init__(
+        self,
+        intervalo_ms: int = CHAT_BROKER_INTERVALO_MS,
+        retencao_segundos: int = CHAT_BROKER_RETENCAO_SEGUNDOS,
+        lote_maximo: int = 500
+    ):
+        super().__init__()
+        self.intervalo = intervalo_ms / 1000
+        self.retencao_segundos = retencao_segundos
+        self.lote_maximo = lote_maximo
+        self.origem = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._ultimo_id = 0
+        self._tarefa: Optional[asyncio.Task] = None
+        self._recebidos = 0
+        self._falhas = 0
+
+    async def iniciar(self) -> None:
+        tarefa = self._tarefa
+        if tarefa is not None and not tarefa.done() and tarefa.get_loop() is asyncio.get_running_loop():
+            return
+        # Tarefa criada de imediato: chamadas concorrentes não duplicam o consumo
+        self._tarefa = asyncio.create_task(self._consumir())
+        logger.info(f"[ChatBroker] Broker SQLite iniciado (origem {self.origem})")
+
+    async def publicar(self, sala_id: str, evento: dict) -> None:
+        publicado_em = time.time()
+        self._publicados += 1
+        await self._entregar_local(sala_id, evento, publicado_em)
+        try:
+            await executar_em_thread(
+                chat_evento_repo.inserir, sala_id, json.dumps(evento), self.origem, publicado_em
+            )
+        except sqlite3.Error as e:
+            self._falhas += 1
+            logger.error(f"[ChatBroker] Erro ao publicar evento da sala {sala_id}: {e}")
+
+    async def _consumir(self) -> None:
+        """Laço de consumo dos eventos de outros workers."""
+        await executar_em_thread(chat_evento_repo.criar_tabela)
+        # Consumir apenas eventos publicados a partir de agora
+        self._ultimo_id = await executar_em_thread(chat_evento_repo.obter_ultimo_id)
+        ultima_limpeza = time.monotonic()
+        while True:
+            try:
+                eventos = await executar_em_thread(
+                    chat_evento_repo.listar_posteriores, self._ultimo_id, self.origem, self.lote_maximo
+                )
+                for evento in eventos:
+                    self._ultimo_id = evento.id
+                    self._recebidos += 1
+                    await self._entregar_local(evento.sala_id, json.loads(evento.payload), evento.publicado_em)
+
+                if time.monotonic() - ultima_limpeza > self.retencao_segundos:
+                    ultima_limpeza = time.monotonic()
+                    await executar_em_thread(
+                        chat_evento_repo.excluir_anteriores, time.time() - self.retencao_segundos
+                    )
+
+                # Lote cheio: pode haver mais eventos, consultar de novo sem esperar
+                if len(eventos) < self.lote_maximo:
+                    await asyncio.sleep(self.intervalo)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._falhas += 1
+                logger.error(f"[ChatBroker] Erro ao consumir eventos: {e}")
+                await asyncio.sleep(self.intervalo * 10)
+
+    async def encerrar(self) -> None:
+        if self._tarefa is None:
+            return
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+
+    def obter_estatisticas(self) -> dict:
+        return {
+            **super().obter_estatisticas(),
+            "origem": self.origem,
+            "recebidos_outros_workers": self._recebidos,
+            "ultimo_evento_id": self._ultimo_id,
+            "falhas": self._falhas,
+        }
+
+
+def criar_broker(backend: str = CHAT_BROKER) -> BrokerChat:
+    """
+    Cria o broker configurado.
+
+    Args:
+        backend: "memoria" ou "sqlite"
+
+    Returns:
+        Instância do broker (memória se o backend for desconhecido)
+    """
+    if backend == "sqlite":
+        return BrokerSQLite()
+    if backend != "memoria":
+        logger.warning(f"[ChatBroker] Backend '{backend}' desconhecido, usando memória")
+    return BrokerMemoria()
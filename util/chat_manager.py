@@ -1,66 +1,373 @@
 """
 Gerenciador de conexões SSE do chat.
 Mantém conexões ativas e faz broadcast de mensagens para usuários conectados.
+
+O broadcast passa por um broker (util/chat_broker.py), que entrega o evento
+às conexões de todos os workers: em memória por padrão ou via SQLite quando
+CHAT_BROKER=sqlite.
+
+Cada conexão tem fila limitada (CHAT_FILA_MAXIMA). Quando um cliente lento
+enche a fila, a política CHAT_FILA_POLITICA decide o que fazer:
+    - descartar_antigas: descarta o evento mais antigo da fila (padrão)
+    - agrupar: não enfileira "atualizar_contador" repetido da mesma sala;
+      se ainda assim encher, descarta o mais antigo
+    - desconectar: encerra a conexão (o EventSource reconecta)
+
+Cada evento entregue recebe um ID crescente (microssegundos desde a época,
+estritamente monotônico no processo) enviado no campo "id:" do SSE. Os
+últimos CHAT_HISTORICO_EVENTOS eventos de cada usuário ficam em um buffer
+circular, mantido por CHAT_HISTORICO_TTL_SEGUNDOS após a última conexão do
+usuário cair. Ao reconectar com Last-Event-ID, os eventos perdidos são
+reenviados do buffer; se o buffer não cobre o intervalo, a conexão é
+marcada para reenvio a partir do banco, pelo ID da última mensagem entregue
+(ver routes/chat_routes.py).
 """
 import asyncio
-from typing import Dict, Set
+import itertools
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Set, Tuple
+from util.chat_broker import BrokerChat, criar_broker
 from util.logger_config import logger
 
 
+CHAT_FILA_MAXIMA = int(os.getenv('CHAT_FILA_MAXIMA', '100'))
+CHAT_FILA_POLITICA = os.getenv('CHAT_FILA_POLITICA', 'descartar_antigas').lower()
+CHAT_HISTORICO_EVENTOS = int(os.getenv('CHAT_HISTORICO_EVENTOS', '50'))
+CHAT_HISTORICO_TTL_SEGUNDOS = int(os.getenv('CHAT_HISTORICO_TTL_SEGUNDOS', '300'))
+# Intervalo dos comentários de heartbeat do stream SSE (evita corte por proxies)
+CHAT_SSE_HEARTBEAT_SEGUNDOS = float(os.getenv('CHAT_SSE_HEARTBEAT_SEGUNDOS', '15'))
+
+POLITICA_DESCARTAR_ANTIGAS = "descartar_antigas"
+POLITICA_AGRUPAR = "agrupar"
+POLITICA_DESCONECTAR = "desconectar"
+
+# Resultados de ConexaoChat.enfileirar
+ENFILEIRADO = "enfileirado"
+DESCARTADO = "descartado"
+AGRUPADO = "agrupado"
+DESCONECTADO = "desconectado"
+
+
+def _chave_agrupamento(evento) -> Optional[str]:
+    """Chave de eventos agrupáveis (recibos de leitura) ou None."""
+    if isinstance(evento, dict) and evento.get("tipo") == "atualizar_contador":
+        return evento.get("sala_id")
+    return None
+
+
+class EventoChat(dict):
+    """
+    Evento entregue às conexões SSE: o dicionário do evento com o ID SSE.
+
+    Compara igual ao dicionário original; o ID fica no atributo `id`.
+    """
+
+    __slots__ = ("id",)
+
+    def __init__(self, dados: dict, evento_id: int):
+        super().__init__(dados)
+        self.id = evento_id
+
+
+class HistoricoEventos:
+    """
+    Buffer circular dos últimos eventos de um usuário.
+
+    Attributes:
+        eventos: Últimos eventos (EventoChat), do mais antigo ao mais recente
+        inicio_id: Último ID gerado quando o buffer foi criado; eventos
+            posteriores a ele foram todos registrados (até saírem do buffer)
+        ultimo_descartado_id: Maior ID que já saiu do buffer
+    """
+
+    __slots__ = ("eventos", "inicio_id", "ultimo_descartado_id")
+
+    def __init__(self, tamanho: int, inicio_id: int):
+        self.eventos: deque = deque(maxlen=max(tamanho, 1))
+        self.inicio_id = inicio_id
+        self.ultimo_descartado_id = 0
+
+    def adicionar(self, evento: EventoChat) -> None:
+        """Registra um evento, descartando o mais antigo se cheio."""
+        if len(self.eventos) == self.eventos.maxlen:
+            self.ultimo_descartado_id = self.eventos[0].id
+        self.eventos.append(evento)
+
+    def desde(self, ultimo_evento_id: int) -> Optional[List[EventoChat]]:
+        """
+        Retorna os eventos posteriores a um ID.
+
+        Args:
+            ultimo_evento_id: Último ID recebido pelo cliente
+
+        Returns:
+            Eventos com ID maior, ou None se o buffer não cobre o intervalo
+        """
+        if ultimo_evento_id < self.inicio_id or ultimo_evento_id < self.ultimo_descartado_id:
+            return None
+        return [evento for evento in self.eventos if evento.id > ultimo_evento_id]
+
+
+class ConexaoChat(asyncio.Queue):
+    """
+    Fila SSE limitada de uma conexão (aba/dispositivo) de um usuário.
+
+    Attributes:
+        id: ID único da conexão neste processo
+        usuario_id: ID do usuário dono da conexão
+        politica: Política aplicada quando a fila está cheia
+        encerrada: True quando a conexão foi encerrada por lentidão
+        descartados: Eventos descartados por fila cheia
+        agrupados: Recibos de leitura agrupados (não enfileirados)
+        reenviar_do_banco_desde: ID do Last-Event-ID quando o buffer não
+            cobria a reconexão e os eventos perdidos devem vir do banco
+        evento_id_inicial: Último ID de evento gerado no registro da conexão
+            (eventos ao vivo e do buffer recebidos depois têm IDs maiores)
+    """
+
+    def __init__(
+        self,
+        conexao_id: int,
+        usuario_id: int,
+        maxsize: int = CHAT_FILA_MAXIMA,
+        politica: str = CHAT_FILA_POLITICA
+    ):
+        super().__init__(maxsize)
+        self.id = conexao_id
+        self.usuario_id = usuario_id
+        self.politica = politica
+        self.encerrada = False
+        self.descartados = 0
+        self.agrupados = 0
+        self.reenviar_do_banco_desde: Optional[int] = None
+        self.evento_id_inicial = 0
+        self._agrupaveis_pendentes: Set[str] = set()
+
+    def _put(self, item):
+        super()._put(item)
+        chave = _chave_agrupamento(item)
+        if chave is not None:
+            self._agrupaveis_pendentes.add(chave)
+
+    def _get(self):
+        item = super()._get()
+        chave = _chave_agrupamento(item)
+        if chave is not None:
+            self._agrupaveis_pendentes.discard(chave)
+        return item
+
+    def enfileirar(self, evento: dict) -> str:
+        """
+        Enfileira sem bloquear, aplicando a política de fila cheia.
+
+        Args:
+            evento: Evento a entregar
+
+        Returns:
+            ENFILEIRADO, DESCARTADO (o mais antigo saiu), AGRUPADO ou DESCONECTADO
+        """
+        if self.encerrada:
+            return DESCONECTADO
+
+        if self.politica == POLITICA_AGRUPAR:
+            chave = _chave_agrupamento(evento)
+            if chave is not None and chave in self._agrupaveis_pendentes:
+                self.agrupados += 1
+                return AGRUPADO
+
+        resultado = ENFILEIRADO
+        if self.full():
+            if self.politica == POLITICA_DESCONECTAR:
+                self.encerrar()
+                return DESCONECTADO
+            self.get_nowait()
+            self.descartados += 1
+            resultado = DESCARTADO
+
+        self.put_nowait(evento)
+        return resultado
+
+    def encerrar(self) -> None:
+        """Encerra a conexão: libera a fila e acorda o consumidor."""
+        self.encerrada = True
+        while not self.empty():
+            self.get_nowait()
+        self.put_nowait(None)
+
+    async def obter_lote(self, timeout: Optional[float] = None) -> List[dict]:
+        """
+        Aguarda o próximo evento e retorna todos os que estiverem na fila.
+
+        Args:
+            timeout: Espera máxima em segundos (None espera indefinidamente)
+
+        Returns:
+            Lista de eventos (vazia se a conexão foi encerrada ou o timeout expirou)
+        """
+        try:
+            primeiro = await asyncio.wait_for(self.get(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        lote = [primeiro]
+        while not self.empty():
+            lote.append(self.get_nowait())
+        return [evento for evento in lote if evento is not None]
+
+
 class GerenciadorChat:
     """
     Gerencia conexões SSE para o sistema de chat.
 
-    Cada usuário tem UMA conexão SSE que recebe mensagens de TODAS as suas salas.
-    Quando uma mensagem é enviada em uma sala, o GerenciadorChat faz broadcast
-    para ambos os participantes da sala (se estiverem conectados).
+    Cada usuário pode ter VÁRIAS conexões SSE (uma por aba), e cada uma recebe
+    mensagens de TODAS as suas salas. Quando uma mensagem é enviada em uma
+    sala, o GerenciadorChat publica no broker, que a entrega a todas as
+    conexões dos dois participantes da sala em qualquer worker.
     """
 
-    def __init__(self):
-        # Dicionário de filas: usuario_id -> asyncio.Queue
-        self._connections: Dict[int, asyncio.Queue] = {}
+    def __init__(
+        self,
+        broker: Optional[BrokerChat] = None,
+        tamanho_fila: int = CHAT_FILA_MAXIMA,
+        politica_fila: str = CHAT_FILA_POLITICA,
+        tamanho_historico: int = CHAT_HISTORICO_EVENTOS,
+        ttl_historico_segundos: float = CHAT_HISTORICO_TTL_SEGUNDOS
+    ):
+        self.tamanho_fila = tamanho_fila
+        self.politica_fila = politica_fila
+        self.tamanho_historico = tamanho_historico
+        self.ttl_historico_segundos = ttl_historico_segundos
+        # Conexões por usuário: usuario_id -> {conexao_id -> ConexaoChat}
+        self._connections: Dict[int, Dict[int, ConexaoChat]] = {}
+        self._ids_conexao = itertools.count(1)
         # Set de usuários com conexão ativa
         self._active_connections: Set[int] = set()
+        # Contadores de backpressure
+        self._eventos_descartados = 0
+        self._eventos_agrupados = 0
+        self._desconectados_por_lentidao = 0
+        # IDs de evento SSE e buffers de reenvio por usuário
+        self._ultimo_evento_id = 0
+        self._historicos: Dict[int, HistoricoEventos] = {}
+        # Usuários sem conexão cujo buffer ainda é mantido: usuario_id -> desconectado_em
+        self._historicos_ociosos: "OrderedDict[int, float]" = OrderedDict()
+        self._eventos_reenviados = 0
+        self._reenvios_do_banco = 0
+        # Broker de distribuição entre workers
+        self._broker = broker if broker is not None else criar_broker("memoria")
+        self._broker.registrar_entrega(self._entregar_local)
+
+    def _proximo_evento_id(self) -> int:
+        """Gera o próximo ID de evento (microssegundos, estritamente crescente)."""
+        self._ultimo_evento_id = max(self._ultimo_evento_id + 1, time.time_ns() // 1000)
+        return self._ultimo_evento_id
 
-    async def conectar(self, usuario_id: int) -> asyncio.Queue:
+    def _limpar_historicos_expirados(self) -> None:
+        """Remove buffers de usuários desconectados há mais que o TTL."""
+        limite = time.monotonic() - self.ttl_historico_segundos
+        while self._historicos_ociosos:
+            usuario_id, desconectado_em = next(iter(self._historicos_ociosos.items()))
+            if desconectado_em > limite:
+                break
+            del self._historicos_ociosos[usuario_id]
+            self._historicos.pop(usuario_id, None)
+
+    async def conectar(self, usuario_id: int, ultimo_evento_id: Optional[int] = None) -> ConexaoChat:
         """
         Registra nova conexão SSE para um usuário.
 
+        Conexões anteriores do mesmo usuário (outras abas) são mantidas.
+        Com `ultimo_evento_id` (Last-Event-ID da reconexão), os eventos
+        perdidos são enfileirados a partir do buffer do usuário; se o buffer
+        não cobre o intervalo, `conexao.reenviar_do_banco_desde` é preenchido.
+
         Args:
             usuario_id: ID do usuário conectando
+            ultimo_evento_id: Último ID de evento recebido pelo cliente
 
         Returns:
-            Queue para envio de mensagens SSE
+            ConexaoChat (asyncio.Queue com o ID da conexão) para envio de mensagens SSE
         """
-        queue = asyncio.Queue()
-        self._connections[usuario_id] = queue
+        # Broker só precisa consumir eventos de outros workers se há conexões aqui
+        await self._broker.iniciar()
+
+        conexao = ConexaoChat(
+            next(self._ids_conexao), usuario_id, self.tamanho_fila, self.politica_fila
+        )
+        conexao.evento_id_inicial = self._ultimo_evento_id
+
+        # Reenvio e registro sem await entre si: nenhum evento fica de fora nem duplica
+        self._historicos_ociosos.pop(usuario_id, None)
+        self._limpar_historicos_expirados()
+        historico = self._historicos.get(usuario_id)
+        if ultimo_evento_id is not None:
+            perdidos = historico.desde(ultimo_evento_id) if historico is not None else None
+            if perdidos is None:
+                conexao.reenviar_do_banco_desde = ultimo_evento_id
+                self._reenvios_do_banco += 1
+            else:
+                for evento in perdidos:
+                    conexao.enfileirar(evento)
+                self._eventos_reenviados += len(perdidos)
+        if historico is None:
+            self._historicos[usuario_id] = HistoricoEventos(self.tamanho_historico, self._ultimo_evento_id)
+
+        self._connections.setdefault(usuario_id, {})[conexao.id] = conexao
         self._active_connections.add(usuario_id)
 
         logger.info(
-            f"[GerenciadorChat] Usuário {usuario_id} conectado. "
-            f"Total conexões: {len(self._active_connections)}"
+            f"[GerenciadorChat] Usuário {usuario_id} conectado (conexão {conexao.id}). "
+            f"Conexões do usuário: {len(self._connections[usuario_id])}"
         )
 
-        return queue
+        return conexao
 
-    async def desconectar(self, usuario_id: int):
+    async def desconectar(self, usuario_id: int, conexao_id: Optional[int] = None):
         """
         Remove conexão SSE de um usuário.
 
         Args:
             usuario_id: ID do usuário desconectando
+            conexao_id: ID da conexão a remover (None remove todas do usuário)
         """
-        if usuario_id in self._connections:
-            del self._connections[usuario_id]
+        conexoes = self._connections.get(usuario_id)
+        if conexoes is not None:
+            if conexao_id is None:
+                conexoes.clear()
+            else:
+                conexoes.pop(conexao_id, None)
 
-        if usuario_id in self._active_connections:
-            self._active_connections.remove(usuario_id)
+            if not conexoes:
+                del self._connections[usuario_id]
+                self._active_connections.discard(usuario_id)
+                # Buffer mantido por um tempo para a reconexão do EventSource
+                if usuario_id in self._historicos:
+                    self._historicos_ociosos[usuario_id] = time.monotonic()
+                    self._historicos_ociosos.move_to_end(usuario_id)
+                self._limpar_historicos_expirados()
+        else:
+            self._active_connections.discard(usuario_id)
 
         logger.info(
-            f"[GerenciadorChat] Usuário {usuario_id} desconectado. "
-            f"Total conexões: {len(self._active_connections)}"
+            f"[GerenciadorChat] Usuário {usuario_id} desconectado (conexão {conexao_id}). "
+            f"Usuários conectados: {len(self._active_connections)}"
         )
 
+    @staticmethod
+    def _extrair_participantes(sala_id: str) -> Optional[Tuple[int, int]]:
+        """Extrai os IDs dos dois participantes do sala_id ("menor_maior")."""
+        partes = sala_id.split("_")
+        if len(partes) != 2:
+            logger.error(f"[ChatManager] sala_id inválido: {sala_id}")
+            return None
+
+        try:
+            return int(partes[0]), int(partes[1])
+        except ValueError:
+            logger.error(f"[ChatManager] Erro ao parsear IDs do sala_id: {sala_id}")
+            return None
+
     async def broadcast_para_sala(self, sala_id: str, mensagem_dict: dict):
         """
         Envia mensagem SSE para ambos os participantes de uma sala.
@@ -69,27 +376,57 @@ class GerenciadorChat:
             sala_id: ID da sala (formato: "menor_id_maior_id")
             mensagem_dict: Dicionário com dados da mensagem a enviar
         """
-        # Extrair IDs dos usuários do sala_id
-        partes = sala_id.split("_")
-        if len(partes) != 2:
-            logger.error(f"[ChatManager] sala_id inválido: {sala_id}")
+        if self._extrair_participantes(sala_id) is None:
             return
 
-        try:
-            usuario1_id = int(partes[0])
-            usuario2_id = int(partes[1])
-        except ValueError:
-            logger.error(f"[ChatManager] Erro ao parsear IDs do sala_id: {sala_id}")
+        await self._broker.publicar(sala_id, mensagem_dict)
+
+    async def _entregar_local(self, sala_id: str, mensagem_dict: dict):
+        """
+        Entrega um evento às conexões deste processo (callback do broker).
+
+        Args:
+            sala_id: ID da sala
+            mensagem_dict: Dicionário com dados da mensagem
+        """
+        participantes = self._extrair_participantes(sala_id)
+        if participantes is None:
             return
 
-        # Enviar para cada participante se estiver conectado
-        for usuario_id in [usuario1_id, usuario2_id]:
-            if usuario_id in self._connections:
-                await self._connections[usuario_id].put(mensagem_dict)
-                logger.debug(f"[ChatManager] Mensagem enviada para usuário {usuario_id} via SSE")
+        evento = EventoChat(mensagem_dict, self._proximo_evento_id())
+
+        # Enviar para todas as conexões de cada participante conectado
+        for usuario_id in participantes:
+            historico = self._historicos.get(usuario_id)
+            if historico is not None:
+                historico.adicionar(evento)
+
+            conexoes = self._connections.get(usuario_id)
+            if conexoes:
+                for conexao in list(conexoes.values()):
+                    resultado = conexao.enfileirar(evento)
+                    if resultado == DESCARTADO:
+                        self._eventos_descartados += 1
+                    elif resultado == AGRUPADO:
+                        self._eventos_agrupados += 1
+                    elif resultado == DESCONECTADO:
+                        self._desconectados_por_lentidao += 1
+                        logger.warning(
+                            f"[ChatManager] Conexão {conexao.id} do usuário {usuario_id} "
+                            f"encerrada por fila cheia (cliente lento)"
+                        )
+                        await self.desconectar(usuario_id, conexao.id)
+                logger.debug(
+                    f"[ChatManager] Mensagem enviada para usuário {usuario_id} via SSE "
+                    f"({len(conexoes)} conexões)"
+                )
             else:
                 logger.debug(f"[ChatManager] Usuário {usuario_id} não está conectado (não receberá via SSE)")
 
+    async def encerrar(self):
+        """Encerra o broker (consumo de eventos de outros workers)."""
+        await self._broker.encerrar()
+
     def esta_conectado(self, usuario_id: int) -> bool:
         """
         Verifica se um usuário está conectado.
@@ -110,11 +447,19 @@ class GerenciadorChat:
             Dicionário com estatísticas
         """
         return {
-            "total_conexoes": len(self._connections),
+            "total_conexoes": sum(len(conexoes) for conexoes in self._connections.values()),
             "usuarios_ativos": list(self._active_connections),
-            "total_usuarios_ativos": len(self._active_connections)
+            "total_usuarios_ativos": len(self._active_connections),
+            "eventos_descartados": self._eventos_descartados,
+            "eventos_agrupados": self._eventos_agrupados,
+            "desconectados_por_lentidao": self._desconectados_por_lentidao,
+            "ultimo_evento_id": self._ultimo_evento_id,
+            "historicos_usuarios": len(self._historicos),
+            "eventos_reenviados": self._eventos_reenviados,
+            "reenvios_do_banco": self._reenvios_do_banco,
+            "broker": self._broker.obter_estatisticas()
         }
 
 
-# Instância singleton global
-gerenciador_chat = GerenciadorChat()
+# Instância singleton global (backend do broker definido por CHAT_BROKER)
+gerenciador_chat = GerenciadorChat(criar_broker())
@@ -0,0 +1,245 @@
+"""
+Middleware de compressão gzip/brotli das respostas dinâmicas.
+
+Comprime páginas HTML e JSON conforme o Accept-Encoding do cliente:
+
+- Respostas de um único corpo abaixo de COMPRESSAO_TAMANHO_MINIMO seguem
+  sem compressão (o cabeçalho gzip e a CPU não compensam)
+- Apenas tipos da lista TIPOS_COMPRIMIVEIS são comprimidos (imagens e
+  arquivos já comprimidos não ganham nada)
+- Respostas em partes (StreamingResponse) são comprimidas em streaming:
+  cada parte enviada pela aplicação é descarregada (sync flush), então o
+  cliente recebe os dados sem esperar o buffer do compressor encher
+- SSE (text/event-stream) nunca é comprimido: proxies e navegadores
+  precisam ver cada evento assim que ele é emitido
+- Respostas que já têm Content-Encoding (ex: estáticos pré-comprimidos),
+  parciais (206) ou com Cache-Control no-transform passam intactas
+
+Middleware ASGI puro (não BaseHTTPMiddleware), para não acumular o corpo
+das respostas em streaming.
+
+Configuração (.env):
+    COMPRESSAO_ATIVA=True
+    COMPRESSAO_TAMANHO_MINIMO=500
+    COMPRESSAO_NIVEL_GZIP=6
+    COMPRESSAO_QUALIDADE_BROTLI=4
+"""
+import os
+import time
+import zlib
+from typing import Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from util.compressao_util import brotli, codificacoes_disponiveis, escolher_codificacao
+
+
+COMPRESSAO_ATIVA = os.getenv('COMPRESSAO_ATIVA', 'True').lower() == 'true'
+COMPRESSAO_TAMANHO_MINIMO = int(os.getenv('COMPRESSAO_TAMANHO_MINIMO', '500'))
+COMPRESSAO_NIVEL_GZIP = int(os.getenv('COMPRESSAO_NIVEL_GZIP', '6'))
+COMPRESSAO_QUALIDADE_BROTLI = int(os.getenv('COMPRESSAO_QUALIDADE_BROTLI', '4'))
+
+# Tipos de conteúdo comprimidos (sem parâmetros como charset)
+TIPOS_COMPRIMIVEIS = (
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "text/xml",
+    "image/svg+xml",
+)
+
+# Nunca comprimidos, mesmo se incluídos na lista acima
+TIPOS_EXCLUIDOS = ("text/event-stream",)
+
+
+class EstatisticasCompressao:
+    """Contadores de bytes e tempo de CPU da compressão (por worker)."""
+
+    def __init__(self):
+        self.limpar()
+
+    def limpar(self) -> None:
+        self.comprimidas = 0
+        self.ignoradas = 0
+        self.bytes_originais = 0
+        self.bytes_comprimidos = 0
+        self.tempo_compressao = 0.0
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna estatísticas da compressão.
+
+        Returns:
+            Dicionário com respostas, bytes antes/depois, taxa e CPU por resposta
+        """
+        return {
+            "respostas_comprimidas": self.comprimidas,
+            "respostas_ignoradas": self.ignoradas,
+            "bytes_originais": self.bytes_originais,
+            "bytes_comprimidos": self.bytes_comprimidos,
+            "taxa_compressao": (
+                round(self.bytes_comprimidos / self.bytes_originais, 4) if self.bytes_originais else 0
+            ),
+            "cpu_media_ms": (
+                round(self.tempo_compressao / self.comprimidas * 1000, 3) if self.comprimidas else 0
+            ),
+        }
+
+
+# Instância global (compartilhada pelas instâncias do middleware)
+estatisticas_compressao = EstatisticasCompressao()
+
+
+class _Compressor:
+    """Compressor incremental com a mesma interface para gzip e brotli."""
+
+    def __init__(self, codificacao: str, nivel_gzip: int, qualidade_brotli: int):
+        if codificacao == "br":
+            self._brotli = brotli.Compressor(quality=qualidade_brotli)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31: formato gzip (cabeçalho e CRC)
+            self._zlib = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados: bytes, final: bool) -> bytes:
+        """Comprime uma parte; descarrega (sync flush) ou finaliza o stream."""
+        if self._brotli is not None:
+            saida = self._brotli.process(dados)
+            return saida + (self._brotli.finish() if final else self._brotli.flush())
+        saida = self._zlib.compress(dados)
+        return saida + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _comprimivel(headers: Headers, status: int, tipos: Sequence[str]) -> bool:
+    """Verifica se a resposta pode ser comprimida, só pelos cabeçalhos."""
+    if status < 200 or status in (204, 206, 304) or "content-encoding" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", "").lower():
+        return False
+    tipo = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    return tipo in tipos and tipo not in TIPOS_EXCLUIDOS
+
+
+class MiddlewareCompressao:
+    """Comprime respostas dinâmicas com gzip ou brotli (veja o módulo)."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        tamanho_minimo: int = COMPRESSAO_TAMANHO_MINIMO,
+        nivel_gzip: int = COMPRESSAO_NIVEL_GZIP,
+        qualidade_brotli: int = COMPRESSAO_QUALIDADE_BROTLI,
+        tipos: Sequence[str] = TIPOS_COMPRIMIVEIS,
+        estatisticas: Optional[EstatisticasCompressao] = None,
+    ):
+        self.app = app
+        self.tamanho_minimo = tamanho_minimo
+        self.nivel_gzip = nivel_gzip
+        self.qualidade_brotli = qualidade_brotli
+        self.tipos = tuple(tipos)
+        self.estatisticas = estatisticas or estatisticas_compressao
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacao = escolher_codificacao(
+            Headers(scope=scope).get("accept-encoding", ""), codificacoes_disponiveis()
+        )
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _RespostaComprimida(self, codificacao, send).executar(scope, receive)
+
+
+class _RespostaComprimida:
+    """Estado da compressão de uma resposta."""
+
+    def __init__(self, middleware: MiddlewareCompressao, codificacao: str, send: Send):
+        self.middleware = middleware
+        self.codificacao = codificacao
+        self.send = send
+        self.inicio: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.repassar = False
+
+    async def executar(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.enviar)
+
+    def _ajustar_cabecalhos(self, tamanho: Optional[int]) -> None:
+        headers = MutableHeaders(raw=self.inicio["headers"])
+        headers["Content-Encoding"] = self.codificacao
+        headers.add_vary_header("Accept-Encoding")
+        if tamanho is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(tamanho)
+        # Outra representação: o ETag forte do original deixa de valer
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    def _comprimir(self, dados: bytes, final: bool) -> bytes:
+        inicio = time.perf_counter()
+        comprimido = self.compressor.comprimir(dados, final)
+        estatisticas = self.middleware.estatisticas
+        estatisticas.tempo_compressao += time.perf_counter() - inicio
+        estatisticas.bytes_originais += len(dados)
+        estatisticas.bytes_comprimidos += len(comprimido)
+        return comprimido
+
+    async def enviar(self, message: Message) -> None:
+        if self.repassar:
+            await self.send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if not _comprimivel(headers, message["status"], self.middleware.tipos):
+                # SSE e demais não comprimíveis: cabeçalhos seguem imediatamente
+                self.repassar = True
+                self.middleware.estatisticas.ignoradas += 1
+                await self.send(message)
+                return
+            # Aguarda o primeiro corpo para decidir pelo tamanho
+            self.inicio = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        corpo = message.get("body", b"")
+        mais = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not mais and len(corpo) < self.middleware.tamanho_minimo:
+                self.repassar = True
+                self.middleware.estatisticas.ignoradas += 1
+                await self.send(self.inicio)
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(
+                self.codificacao, self.middleware.nivel_gzip, self.middleware.qualidade_brotli
+            )
+            self.middleware.estatisticas.comprimidas += 1
+            comprimido = self._comprimir(corpo, final=not mais)
+            self._ajustar_cabecalhos(None if mais else len(comprimido))
+            await self.send(self.inicio)
+            await self.send({"type": "http.response.body", "body": comprimido, "more_body": mais})
+            return
+
+        await self.send({
+            "type": "http.response.body",
+            "body": self._comprimir(corpo, final=not mais),
+            "more_body": mais,
+        })
@@ -0,0 +1,197 @@
+"""
+Compressão gzip/brotli de respostas e arquivos estáticos.
+
+- escolher_codificacao: melhor codificação aceita pelo cliente
+  (Accept-Encoding, com valores q)
+- precomprimir_pasta: grava irmãos .gz/.br dos arquivos de texto de uma
+  pasta (executado no startup ou no deploy), para que o servidor de
+  estáticos entregue a versão comprimida sem gastar CPU por requisição
+
+O brotli vem do requirements.txt; em ambientes sem o pacote `brotli`,
+apenas gzip é usado.
+
+Uso no deploy:
+    python -m util.compressao_util static
+"""
+import gzip
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+from util.logger_config import logger
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+
+# Extensões de texto que valem a pena comprimir
+EXTENSOES_COMPRIMIVEIS = (".css", ".js", ".svg", ".html", ".json", ".txt", ".map", ".xml")
+
+# Sufixo do arquivo pré-comprimido por codificação
+SUFIXOS = {"br": ".br", "gzip": ".gz"}
+
+# Abaixo disso o ganho não compensa um arquivo extra (e uma requisição a mais de stat)
+TAMANHO_MINIMO_PRECOMPRESSAO = 256
+
+
+def codificacoes_disponiveis() -> tuple:
+    """Codificações suportadas, da preferida para a menos preferida."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def escolher_codificacao(accept_encoding: str, disponiveis: Sequence[str]) -> Optional[str]:
+    """
+    Escolhe a codificação a usar a partir do cabeçalho Accept-Encoding.
+
+    Entre as codificações aceitas com q > 0, vence a de maior q; empates
+    seguem a ordem de `disponiveis` (preferência do servidor).
+
+    Args:
+        accept_encoding: Valor do cabeçalho (ex: "gzip, deflate, br;q=0.9")
+        disponiveis: Codificações que o servidor pode entregar, em ordem de preferência
+
+    Returns:
+        Codificação escolhida ou None para enviar sem compressão
+    """
+    if not accept_encoding:
+        return None
+
+    pesos: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        nome, _, parametros = item.strip().partition(";")
+        peso = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                peso = float(parametros[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nome.strip()] = peso
+
+    coringa = pesos.get("*", 0.0)
+    melhor, melhor_peso = None, 0.0
+    for codificacao in disponiveis:
+        peso = pesos.get(codificacao, coringa)
+        if peso > melhor_peso:
+            melhor, melhor_peso = codificacao, peso
+    return melhor
+
+
+def comprimir(dados: bytes, codificacao: str, nivel: Optional[int] = None) -> bytes:
+    """
+    Comprime bytes em uma chamada (nível máximo por padrão, para pré-compressão).
+
+    Args:
+        dados: Conteúdo original
+        codificacao: "gzip" ou "br"
+        nivel: Nível de compressão (gzip 1-9, brotli 0-11)
+
+    Returns:
+        Conteúdo comprimido
+    """
+    if codificacao == "br":
+        return brotli.compress(dados, quality=11 if nivel is None else nivel)
+    # mtime=0: saída determinística (mesmo conteúdo → mesmo arquivo em todos os servidores)
+    return gzip.compress(dados, compresslevel=9 if nivel is None else nivel, mtime=0)
+
+
+def _precomprimir_arquivo(caminho: Path, codificacoes: Iterable[str]) -> int:
+    """
+    Grava os irmãos comprimidos do arquivo que estiverem ausentes ou desatualizados.
+
+    Returns:
+        Quantidade de arquivos gravados
+    """
+    stat = caminho.stat()
+    if stat.st_size < TAMANHO_MINIMO_PRECOMPRESSAO:
+        return 0
+
+    dados = None
+    gravados = 0
+    for codificacao in codificacoes:
+        destino = caminho.with_name(caminho.name + SUFIXOS[codificacao])
+        try:
+            if destino.stat().st_mtime_ns >= stat.st_mtime_ns:
+                continue
+        except OSError:
+            pass
+
+        if dados is None:
+            dados = caminho.read_bytes()
+        comprimido = comprimir(dados, codificacao)
+        if len(comprimido) >= len(dados):
+            continue
+
+        # Gravação atômica: vários workers podem pré-comprimir ao mesmo tempo
+        temporario = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+        try:
+            temporario.write_bytes(comprimido)
+            os.replace(temporario, destino)
+        finally:
+            if temporario.exists():
+                temporario.unlink()
+        gravados += 1
+    return gravados
+
+
+def precomprimir_arquivo(caminho: Path, codificacoes: Optional[Iterable[str]] = None) -> int:
+    """
+    Pré-comprime um arquivo de texto (ex: CSS trocado em tempo de execução).
+
+    Args:
+        caminho: Arquivo a comprimir
+        codificacoes: Codificações a gerar (padrão: todas as disponíveis)
+
+    Returns:
+        Quantidade de arquivos .gz/.br gravados
+    """
+    try:
+        return _precomprimir_arquivo(Path(caminho), tuple(codificacoes or codificacoes_disponiveis()))
+    except OSError as e:
+        logger.warning(f"[Compressão] Erro ao pré-comprimir {caminho}: {e}")
+        return 0
+
+
+def precomprimir_pasta(
+    raiz: Path,
+    codificacoes: Optional[Iterable[str]] = None,
+    ignorar: Sequence[str] = (),
+) -> int:
+    """
+    Pré-comprime os arquivos de texto de uma pasta (recursivamente).
+
+    Arquivos já pré-comprimidos e atualizados são mantidos, então a
+    chamada é barata a partir da segunda execução.
+
+    Args:
+        raiz: Pasta com os arquivos estáticos
+        codificacoes: Codificações a gerar (padrão: todas as disponíveis)
+        ignorar: Subpastas (relativas à raiz, com "/") a ignorar
+
+    Returns:
+        Quantidade de arquivos .gz/.br gravados
+    """
+    raiz = Path(raiz)
+    codificacoes = tuple(codificacoes or codificacoes_disponiveis())
+    gravados = 0
+    for caminho in raiz.rglob("*"):
+        if caminho.suffix.lower() not in EXTENSOES_COMPRIMIVEIS or not caminho.is_file():
+            continue
+        if ignorar and caminho.relative_to(raiz).as_posix().startswith(tuple(ignorar)):
+            continue
+        try:
+            gravados += _precomprimir_arquivo(caminho, codificacoes)
+        except OSError as e:
+            logger.warning(f"[Compressão] Erro ao pré-comprimir {caminho}: {e}")
+
+    if gravados:
+        logger.info(f"[Compressão] {gravados} arquivo(s) pré-comprimido(s) em {raiz} ({', '.join(codificacoes)})")
+    return gravados
+
+
+if __name__ == "__main__":
+    for pasta in sys.argv[1:] or ["static"]:
+        print(f"{pasta}: {precomprimir_pasta(Path(pasta))} arquivo(s) gravado(s)")
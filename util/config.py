@@ -65,6 +65,18 @@ IS_DEVELOPMENT = RUNNING_MODE.lower() == "development"
 FOTO_PERFIL_TAMANHO_MAX = int(os.getenv("FOTO_PERFIL_TAMANHO_MAX", "256"))
 # Tamanho máximo em bytes (5MB)
 FOTO_MAX_UPLOAD_BYTES = int(os.getenv("FOTO_MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+# Orçamento de pixels da imagem original, verificado antes de decodificar (25 MP)
+FOTO_MAX_PIXELS = int(os.getenv("FOTO_MAX_PIXELS", str(25_000_000)))
+# Processos dedicados ao processamento de fotos
+FOTO_WORKERS = int(os.getenv("FOTO_WORKERS", "1"))
+# Tamanhos (px) das variantes reduzidas usadas em avatares e listas
+FOTO_VARIANTES = tuple(
+    int(tamanho) for tamanho in os.getenv("FOTO_VARIANTES", "32,64,256").split(",") if tamanho.strip()
+)
+# Gravar as variantes em WebP em vez de JPEG
+FOTO_VARIANTES_WEBP = os.getenv("FOTO_VARIANTES_WEBP", "False").lower() == "true"
+# Entradas do índice em memória de variantes já geradas (por worker)
+FOTO_CACHE_VARIANTES = int(os.getenv("FOTO_CACHE_VARIANTES", "4096"))
 
 # === Configurações de Senha ===
 PASSWORD_MIN_LENGTH = int(os.getenv("PASSWORD_MIN_LENGTH", "8"))
@@ -1,26 +1,118 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import os
 import sqlite3
 import threading
 from repo import configuracao_repo
+from util.db_async import executar_em_thread
 from util.logger_config import logger
 
 
+# Intervalo da verificação de alterações feitas por outros workers (0 desativa)
+CONFIG_SINCRONIZACAO_SEGUNDOS = float(os.getenv('CONFIG_SINCRONIZACAO_SEGUNDOS', '5'))
+
+
 class ConfigCache:
     """
     Cache de configurações do sistema para melhor performance.
 
-    Thread-safe: utiliza RLock para sincronização de acesso ao cache
-    em ambientes multi-thread.
+    Baseado em snapshot: a tabela configuracao inteira é carregada em uma
+    única consulta (configuracao_repo.obter_todos) para um dicionário que
+    nunca é alterado depois de publicado. Leituras são consultas ao
+    dicionário sem lock; escritores montam um novo snapshot e o publicam
+    com uma única atribuição (atômica), sob o RLock que serializa apenas
+    cargas e invalidações. O snapshot e o indicador de completude são
+    publicados juntos na tupla _estado, lida uma única vez por consulta:
+    um leitor nunca combina o snapshot de uma troca com o indicador de outra.
+
+    Com o snapshot completo carregado, chaves ausentes também são
+    respondidas sem consulta ao banco (valor padrão).
+
+    A versão é incrementada a cada invalidação (limpar/limpar_chave/
+    recarregar). Consumidores que derivam valores das configurações (ex:
+    rate limiters dinâmicos) comparam a versão, uma leitura sem lock, e só
+    releem as configurações quando ela muda.
+
+    Entre workers, a invalidação usa a versão global do banco (tabela
+    config_versao, incrementada por triggers a cada escrita em
+    configuracao): cada snapshot guarda a versão do banco em que foi
+    carregado e `sincronizar()`, chamado periodicamente em background,
+    recarrega o snapshot quando ela muda. Alterações feitas em outro worker
+    passam a valer em no máximo CONFIG_SINCRONIZACAO_SEGUNDOS, sem consulta
+    ao banco no caminho das requisições.
     """
-    _cache: Dict[str, Any] = {}
+    # (snapshot, completo): completo é True quando o snapshot contém a
+    # tabela inteira (ausência = chave inexistente)
+    _estado: Tuple[Dict[str, Any], bool] = ({}, False)
     _lock: threading.RLock = threading.RLock()
+    _versao: int = 0
+    # Versão global do banco em que o snapshot foi carregado
+    _versao_banco: Optional[int] = None
+
+    # Métricas (contadores sem lock: valores aproximados sob concorrência)
+    _acertos: int = 0
+    _faltas: int = 0
+    _cargas: int = 0
+    _sincronizacoes: int = 0
+
+    @classmethod
+    def obter_versao(cls) -> int:
+        """
+        Retorna a versão atual das configurações.
+
+        Sem lock: leitura de um inteiro, segura para o caminho de cada requisição.
+
+        Returns:
+            Contador incrementado a cada invalidação do cache
+        """
+        return cls._versao
+
+    @classmethod
+    def _carregar_snapshot(cls) -> Dict[str, Any]:
+        """
+        Carrega a tabela inteira e publica o novo snapshot.
+
+        Deve ser chamado com o lock adquirido. Em caso de erro, o snapshot
+        atual é mantido e a exceção propagada.
+
+        Returns:
+            Snapshot publicado
+        """
+        # Versão lida antes dos dados: uma escrita concorrente gera no
+        # máximo uma recarga extra, nunca um snapshot antigo com versão nova
+        versao_banco = cls._obter_versao_banco()
+        snapshot = {c.chave: c.valor for c in configuracao_repo.obter_todos()}
+        cls._estado = (snapshot, True)
+        cls._versao_banco = versao_banco
+        cls._cargas += 1
+        return snapshot
+
+    @classmethod
+    def _obter_versao_banco(cls) -> Optional[int]:
+        """Versão global do banco (None se indisponível)."""
+        try:
+            return configuracao_repo.obter_versao()
+        except sqlite3.Error as e:
+            logger.warning(f"Versão das configurações indisponível: {e}")
+            return None
+
+    @classmethod
+    def _obter_snapshot_completo(cls) -> Dict[str, Any]:
+        """Retorna o snapshot completo, carregando do banco se necessário."""
+        with cls._lock:
+            # Outra thread pode ter carregado enquanto esperávamos o lock
+            snapshot, completo = cls._estado
+            if completo:
+                return snapshot
+            return cls._carregar_snapshot()
 
     @classmethod
     def obter(cls, chave: str, padrao: str = "") -> str:
         """
         Obtém configuração com cache e tratamento de erros.
 
-        Thread-safe: utiliza lock para sincronização.
+        Thread-safe: leitura sem lock do snapshot atual; somente a carga
+        do snapshot (na primeira falta) é serializada.
 
         Args:
             chave: Chave da configuração
@@ -32,30 +124,29 @@ class ConfigCache:
         Raises:
             Nenhuma exceção - retorna padrao em caso de erro
         """
-        with cls._lock:
-            # Retorna do cache se disponível
-            if chave in cls._cache:
-                return cls._cache[chave]
+        # Caminho rápido: consulta ao snapshot publicado, sem lock
+        snapshot, completo = cls._estado
+        if chave in snapshot:
+            cls._acertos += 1
+            return snapshot[chave]
+        if completo:
+            cls._acertos += 1
+            return padrao
 
-            # Tenta buscar do banco com error handling
-            try:
-                config = configuracao_repo.obter_por_chave(chave)
-                if config:
-                    cls._cache[chave] = config.valor
-                    return config.valor
-                else:
-                    cls._cache[chave] = padrao
-                    return padrao
-
-            except sqlite3.Error as e:
-                logger.error(f"Erro ao buscar configuração '{chave}' do banco: {e}")
-                # Retorna padrão em vez de crashar a aplicação
-                return padrao
+        cls._faltas += 1
+        # Tenta carregar o snapshot do banco com error handling
+        try:
+            return cls._obter_snapshot_completo().get(chave, padrao)
 
-            except Exception as e:
-                logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
-                # Ainda retorna padrão, mas loga como crítico
-                return padrao
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar configuração '{chave}' do banco: {e}")
+            # Retorna padrão em vez de crashar a aplicação
+            return padrao
+
+        except Exception as e:
+            logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
+            # Ainda retorna padrão, mas loga como crítico
+            return padrao
 
     @classmethod
     def obter_int(cls, chave: str, padrao: int) -> int:
@@ -143,33 +234,144 @@ class ConfigCache:
             logger.error("obter_multiplos: número de chaves diferente de padrões")
             return dict(zip(chaves, padroes))
 
-        resultado = {}
-        for chave, padrao in zip(chaves, padroes):
-            resultado[chave] = cls.obter(chave, padrao)
+        # Todas as chaves lidas do mesmo snapshot (no máximo uma carga)
+        snapshot, completo = cls._estado
+        if not completo and any(chave not in snapshot for chave in chaves):
+            cls._faltas += 1
+            try:
+                snapshot = cls._obter_snapshot_completo()
+            except Exception as e:
+                logger.error(f"Erro ao buscar configurações do banco: {e}")
+        else:
+            cls._acertos += 1
+
+        return {chave: snapshot.get(chave, padrao) for chave, padrao in zip(chaves, padroes)}
 
-        return resultado
+    @classmethod
+    def recarregar(cls) -> bool:
+        """
+        Recarrega todas as configurações do banco e troca o snapshot.
+
+        Usado por quem altera configurações (ex: admin): leitores continuam
+        vendo o snapshot anterior até a troca, sem janela de cache vazio.
+
+        Returns:
+            True se recarregado, False em caso de erro (snapshot mantido)
+        """
+        with cls._lock:
+            try:
+                cls._carregar_snapshot()
+                return True
+            except Exception as e:
+                logger.error(f"Erro ao recarregar configurações do banco: {e}")
+                return False
+            finally:
+                cls._versao += 1
+
+    @classmethod
+    def sincronizar(cls) -> bool:
+        """
+        Recarrega o snapshot se as configurações mudaram no banco.
+
+        Compara a versão global do banco (uma consulta pela PK) com a do
+        snapshot atual. Sem snapshot completo não há o que sincronizar: a
+        próxima leitura já carrega do banco.
+
+        Returns:
+            True se o snapshot foi recarregado
+
+        Raises:
+            sqlite3.Error: Se a versão não puder ser consultada
+        """
+        if not cls._estado[1]:
+            return False
+
+        versao_banco = configuracao_repo.obter_versao()
+        if versao_banco == cls._versao_banco:
+            return False
+
+        logger.info(
+            f"Configurações alteradas no banco (versão {cls._versao_banco} -> {versao_banco}), recarregando"
+        )
+        cls._sincronizacoes += 1
+        return cls.recarregar()
+
+    @classmethod
+    def obter_estatisticas(cls) -> dict:
+        """
+        Retorna estatísticas do cache de configurações.
+
+        Returns:
+            Dicionário com versão, tamanho do snapshot, acertos, faltas e cargas
+        """
+        consultas = cls._acertos + cls._faltas
+        snapshot, completo = cls._estado
+        return {
+            "versao": cls._versao,
+            "completo": completo,
+            "chaves": len(snapshot),
+            "acertos": cls._acertos,
+            "faltas": cls._faltas,
+            "cargas": cls._cargas,
+            "versao_banco": cls._versao_banco,
+            "sincronizacoes": cls._sincronizacoes,
+            "taxa_acerto": round(cls._acertos / consultas, 4) if consultas else 0,
+        }
 
     @classmethod
     def limpar(cls):
         """
         Limpa todo o cache de configurações.
 
-        Thread-safe: utiliza lock para sincronização.
+        Thread-safe: utiliza lock para sincronização. A próxima leitura
+        recarrega o snapshot completo.
         """
         with cls._lock:
-            cls._cache = {}
+            cls._estado = ({}, False)
+            cls._versao += 1
 
     @classmethod
     def limpar_chave(cls, chave: str):
         """
         Limpa cache de uma chave específica.
 
-        Thread-safe: utiliza lock para sincronização.
+        Thread-safe: publica um novo snapshot sem a chave (o atual não é
+        alterado). A próxima leitura da chave recarrega o snapshot.
         """
         with cls._lock:
-            if chave in cls._cache:
-                del cls._cache[chave]
+            snapshot = dict(cls._estado[0])
+            snapshot.pop(chave, None)
+            cls._estado = (snapshot, False)
+            cls._versao += 1
 
 
 # Instância global para uso em toda a aplicação
 config = ConfigCache()
+
+
+async def _sincronizar_periodicamente(intervalo_segundos: float) -> None:
+    """Laço da sincronização periódica (consulta fora do event loop)."""
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        try:
+            await executar_em_thread(config.sincronizar)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao verificar versão das configurações: {e}")
+
+
+def iniciar_sincronizacao_periodica(
+    intervalo_segundos: float = CONFIG_SINCRONIZACAO_SEGUNDOS
+) -> Optional[asyncio.Task]:
+    """
+    Agenda a verificação periódica de alterações de outros workers.
+
+    Args:
+        intervalo_segundos: Intervalo entre verificações (0 desativa)
+
+    Returns:
+        Task agendada ou None se desativada
+    """
+    if intervalo_segundos <= 0:
+        return None
+    logger.info(f"Sincronização de configurações agendada a cada {intervalo_segundos:g} s")
+    return asyncio.create_task(_sincronizar_periodicamente(intervalo_segundos))
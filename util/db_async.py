@@ -0,0 +1,224 @@
+"""
+Acesso assíncrono ao banco de dados.
+
+Os repositórios em `repo/` são síncronos (sqlite3). Chamá-los diretamente
+de um handler `async def` bloqueia o event loop durante a query, travando
+streams SSE e demais requisições do worker. Este módulo executa essas
+chamadas em um pool de threads limitado, permitindo que os handlers usem
+`await` sem alterar os repositórios.
+
+Uso:
+    from repo import async_repo
+
+    usuario = await async_repo.usuario_repo.obter_por_id(usuario_id)
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional
+
+
+# Menor ou igual ao DB_POOL_TAMANHO para não esgotar o pool de conexões
+DB_ASYNC_WORKERS = int(os.getenv('DB_ASYNC_WORKERS', '8'))
+
+
+class ExecutorBanco:
+    """
+    Pool de threads limitado para chamadas síncronas ao banco.
+
+    Mantém métricas de profundidade da fila (tarefas aguardando thread),
+    tarefas em execução e tempo de espera na fila.
+    """
+
+    def __init__(self, max_workers: int = DB_ASYNC_WORKERS):
+        if max_workers <= 0:
+            raise ValueError("max_workers deve ser positivo")
+
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._pendentes = 0
+        self._em_execucao = 0
+        self._concluidas = 0
+        self._falhas = 0
+        self._maior_fila = 0
+        self._espera_total = 0.0
+        self._espera_maxima = 0.0
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        """Cria o ThreadPoolExecutor sob demanda (e após encerrar())."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="db-async",
+                    )
+        return self._executor
+
+    def _executar_medindo(self, enfileirada_em: float, func: Callable, *args, **kwargs) -> Any:
+        """Executa a função na thread do pool, registrando métricas."""
+        espera = time.monotonic() - enfileirada_em
+        with self._lock:
+            self._pendentes -= 1
+            self._em_execucao += 1
+            self._espera_total += espera
+            self._espera_maxima = max(self._espera_maxima, espera)
+
+        sucesso = False
+        try:
+            resultado = func(*args, **kwargs)
+            sucesso = True
+            return resultado
+        finally:
+            with self._lock:
+                self._em_execucao -= 1
+                self._concluidas += 1
+                if not sucesso:
+                    self._falhas += 1
+
+    async def executar(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Executa uma função síncrona no pool de threads e aguarda o resultado.
+
+        Args:
+            func: Função síncrona (ex: função de repositório)
+            *args, **kwargs: Argumentos repassados à função
+
+        Returns:
+            Retorno da função
+        """
+        loop = asyncio.get_running_loop()
+        contexto = contextvars.copy_context()
+
+        with self._lock:
+            self._pendentes += 1
+            self._maior_fila = max(self._maior_fila, self._pendentes)
+
+        chamada = functools.partial(
+            contexto.run, self._executar_medindo, time.monotonic(), func, *args, **kwargs
+        )
+        try:
+            future = loop.run_in_executor(self._obter_executor(), chamada)
+        except RuntimeError:
+            # Executor encerrado antes de aceitar a tarefa
+            with self._lock:
+                self._pendentes -= 1
+            raise
+        return await future
+
+    def submeter(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        Agenda uma função síncrona no pool de threads sem aguardar.
+
+        Para trabalho em background disparado fora de corrotinas (ex: de
+        dentro da renderização de templates).
+
+        Args:
+            func: Função síncrona
+            *args, **kwargs: Argumentos repassados à função
+
+        Returns:
+            Future da execução
+        """
+        with self._lock:
+            self._pendentes += 1
+            self._maior_fila = max(self._maior_fila, self._pendentes)
+        try:
+            return self._obter_executor().submit(
+                self._executar_medindo, time.monotonic(), func, *args, **kwargs
+            )
+        except RuntimeError:
+            with self._lock:
+                self._pendentes -= 1
+            raise
+
+    def encerrar(self, aguardar: bool = True) -> None:
+        """Encerra o pool de threads (um novo é criado na próxima chamada)."""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=aguardar)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas do executor.
+
+        Returns:
+            Dicionário com profundidade da fila, execuções e tempos de espera
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "fila_pendentes": self._pendentes,
+                "em_execucao": self._em_execucao,
+                "maior_fila": self._maior_fila,
+                "concluidas": self._concluidas,
+                "falhas": self._falhas,
+                "espera_media_ms": round(self._espera_total / self._concluidas * 1000, 3) if self._concluidas else 0,
+                "espera_maxima_ms": round(self._espera_maxima * 1000, 3),
+            }
+
+
+class RepositorioAsync:
+    """
+    Fachada assíncrona para um módulo de repositório.
+
+    Expõe as mesmas funções públicas do módulo, retornando corrotinas que
+    executam a função original no ExecutorBanco. A função é resolvida no
+    momento da chamada, então patches aplicados ao módulo (testes) continuam
+    valendo.
+    """
+
+    def __init__(self, modulo: ModuleType, executor: "ExecutorBanco"):
+        self._modulo = modulo
+        self._executor = executor
+        self._funcoes: Dict[str, Callable] = {}
+
+    def __getattr__(self, nome: str) -> Callable:
+        if nome.startswith("_"):
+            raise AttributeError(nome)
+
+        funcao = self._funcoes.get(nome)
+        if funcao is not None:
+            return funcao
+
+        original = getattr(self._modulo, nome)
+        if not callable(original):
+            raise AttributeError(f"{self._modulo.__name__}.{nome} não é uma função")
+
+        @functools.wraps(original)
+        async def chamada(*args, **kwargs):
+            return await self._executor.executar(getattr(self._modulo, nome), *args, **kwargs)
+
+        self._funcoes[nome] = chamada
+        return chamada
+
+    def __repr__(self) -> str:
+        return f"RepositorioAsync({self._modulo.__name__})"
+
+
+# Instância global
+executor_banco = ExecutorBanco()
+
+
+async def executar_em_thread(func: Callable, *args, **kwargs) -> Any:
+    """
+    Atalho para executar qualquer função síncrona de banco no executor global.
+
+    Args:
+        func: Função síncrona
+        *args, **kwargs: Argumentos repassados à função
+
+    Returns:
+        Retorno da função
+    """
+    return await executor_banco.executar(func, *args, **kwargs)
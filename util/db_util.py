@@ -1,10 +1,18 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, Callable, Dict, Optional
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
+from util.logger_config import logger
+
 
 load_dotenv()
 
@@ -12,17 +20,561 @@ DATABASE_PATH = os.getenv('DATABASE_PATH', 'dados.db')
 TIMEZONE = os.getenv('TIMEZONE', 'America/Sao_Paulo')
 APP_TIMEZONE = ZoneInfo(TIMEZONE)
 
+# Perfil de armazenamento (PRAGMAs aplicados em cada conexão)
+DB_JOURNAL_MODE = os.getenv('DB_JOURNAL_MODE', 'WAL')
+DB_SYNCHRONOUS = os.getenv('DB_SYNCHRONOUS', 'NORMAL')
+DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))
+# Valor negativo = tamanho em KiB (padrão SQLite); -20000 ≈ 20 MB por conexão
+DB_CACHE_SIZE = int(os.getenv('DB_CACHE_SIZE', '-20000'))
+DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))
 
-@contextmanager
-def obter_conexao():
-    """Context manager para conexão com banco de dados"""
-    registrar_adaptadores()
+# Pool de conexões
+DB_POOL_TAMANHO = int(os.getenv('DB_POOL_TAMANHO', '10'))
+DB_POOL_TIMEOUT_SEGUNDOS = float(os.getenv('DB_POOL_TIMEOUT_SEGUNDOS', '5'))
+# Conexões ociosas há mais tempo que isso passam por health-check antes do uso
+DB_POOL_HEALTH_CHECK_SEGUNDOS = float(os.getenv('DB_POOL_HEALTH_CHECK_SEGUNDOS', '30'))
+
+# Fila de escrita
+DB_ESCRITA_LOTE_MAX = int(os.getenv('DB_ESCRITA_LOTE_MAX', '50'))
+
+
+@dataclass(frozen=True)
+class PerfilArmazenamento:
+    """
+    Conjunto de PRAGMAs aplicados a cada conexão aberta.
+
+    WAL permite que leitores não bloqueiem atrás de escritores;
+    synchronous=NORMAL é seguro com WAL e evita fsync a cada commit.
+    """
+    journal_mode: str = DB_JOURNAL_MODE
+    synchronous: str = DB_SYNCHRONOUS
+    mmap_size: int = DB_MMAP_SIZE
+    cache_size: int = DB_CACHE_SIZE
+    busy_timeout_ms: int = DB_BUSY_TIMEOUT_MS
+
+    def aplicar(self, conn: sqlite3.Connection) -> None:
+        """Aplica os PRAGMAs do perfil na conexão."""
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        conn.execute("PRAGMA foreign_keys = ON")
+
+
+PERFIL_PADRAO = PerfilArmazenamento()
+
+
+def abrir_conexao(caminho: str, perfil: PerfilArmazenamento = PERFIL_PADRAO) -> sqlite3.Connection:
+    """
+    Abre uma conexão configurada com o perfil de armazenamento.
+
+    Args:
+        caminho: Caminho do arquivo do banco
+        perfil: PRAGMAs a aplicar
+
+    Returns:
+        Conexão pronta para uso (row_factory=sqlite3.Row)
+    """
     conn = sqlite3.connect(
-        DATABASE_PATH,
-        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+        caminho,
+        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+        timeout=perfil.busy_timeout_ms / 1000,
+        check_same_thread=False,
     )
-    conn.execute("PRAGMA foreign_keys = ON")
+    perfil.aplicar(conn)
     conn.row_factory = sqlite3.Row
+    return conn
+
+
+class PoolConexoes:
+    """
+    Pool limitado de conexões SQLite de longa duração.
+
+    As conexões são criadas sob demanda até `tamanho_maximo`, configuradas
+    uma única vez (adaptadores, PRAGMAs, row_factory) e devolvidas à fila
+    ao final de cada uso. Se o pool estiver esgotado por mais de `timeout`
+    segundos, uma conexão temporária (overflow) é criada para evitar deadlock
+    e fechada ao ser devolvida.
+
+    Thread-safe: a fila interna sincroniza o acesso entre threads.
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        tamanho_maximo: int = DB_POOL_TAMANHO,
+        timeout: float = DB_POOL_TIMEOUT_SEGUNDOS,
+        intervalo_health_check: float = DB_POOL_HEALTH_CHECK_SEGUNDOS,
+        perfil: PerfilArmazenamento = PERFIL_PADRAO,
+    ):
+        if tamanho_maximo <= 0:
+            raise ValueError("tamanho_maximo deve ser positivo")
+
+        self.caminho = caminho
+        self.tamanho_maximo = tamanho_maximo
+        self.timeout = timeout
+        self.intervalo_health_check = intervalo_health_check
+        self.perfil = perfil
+
+        # Fila de (conexão, instante em que foi devolvida)
+        self._ociosas: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._total = 0
+        self._em_uso = 0
+        self._fechado = False
+
+        # Métricas
+        self._criadas = 0
+        self._descartadas = 0
+        self._checkouts = 0
+        self._overflow = 0
+        self._health_checks_falhos = 0
+
+    def _criar_conexao(self) -> sqlite3.Connection:
+        """Abre e configura uma nova conexão."""
+        conn = abrir_conexao(self.caminho, self.perfil)
+        with self._lock:
+            self._criadas += 1
+        return conn
+
+    def _criar_se_houver_vaga(self) -> Optional[sqlite3.Connection]:
+        """Cria uma conexão se o pool ainda não atingiu o tamanho máximo."""
+        with self._lock:
+            if self._total >= self.tamanho_maximo:
+                return None
+            self._total += 1
+        try:
+            return self._criar_conexao()
+        except sqlite3.Error:
+            with self._lock:
+                self._total -= 1
+            raise
+
+    def _conexao_saudavel(self, conn: sqlite3.Connection) -> bool:
+        """Executa um SELECT trivial para validar a conexão."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            with self._lock:
+                self._health_checks_falhos += 1
+            return False
+
+    def _descartar(self, conn: sqlite3.Connection) -> None:
+        """Fecha uma conexão do pool e libera sua vaga."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._total -= 1
+            self._descartadas += 1
+
+    def adquirir(self) -> tuple[sqlite3.Connection, bool]:
+        """
+        Obtém uma conexão do pool.
+
+        Returns:
+            Tupla (conexão, é_overflow)
+        """
+        prazo = time.monotonic() + self.timeout
+
+        while True:
+            try:
+                conn, devolvida_em = self._ociosas.get_nowait()
+            except queue.Empty:
+                conn = self._criar_se_houver_vaga()
+                if conn is not None:
+                    break
+                try:
+                    conn, devolvida_em = self._ociosas.get(timeout=max(prazo - time.monotonic(), 0))
+                except queue.Empty:
+                    # Pool esgotado: conexão temporária em vez de bloquear indefinidamente
+                    with self._lock:
+                        self._overflow += 1
+                        self._checkouts += 1
+                    return self._criar_conexao(), True
+
+            if (time.monotonic() - devolvida_em >= self.intervalo_health_check
+                    and not self._conexao_saudavel(conn)):
+                self._descartar(conn)
+                continue
+            break
+
+        with self._lock:
+            self._em_uso += 1
+            self._checkouts += 1
+        return conn, False
+
+    def devolver(self, conn: sqlite3.Connection, overflow: bool = False) -> None:
+        """
+        Devolve uma conexão ao pool.
+
+        Transações pendentes são revertidas para que a próxima requisição
+        receba a conexão em estado limpo.
+        """
+        if overflow:
+            conn.close()
+            return
+
+        with self._lock:
+            self._em_uso -= 1
+            fechado = self._fechado
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._descartar(conn)
+            return
+
+        if fechado:
+            self._descartar(conn)
+            return
+
+        self._ociosas.put((conn, time.monotonic()))
+
+    def fechar(self) -> None:
+        """Fecha todas as conexões ociosas e impede reuso das que estão em uso."""
+        with self._lock:
+            self._fechado = True
+        while True:
+            try:
+                conn, _ = self._ociosas.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(conn)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas de uso do pool.
+
+        Returns:
+            Dicionário com tamanho, uso e contadores acumulados
+        """
+        with self._lock:
+            return {
+                "caminho": self.caminho,
+                "tamanho_maximo": self.tamanho_maximo,
+                "conexoes_abertas": self._total,
+                "conexoes_em_uso": self._em_uso,
+                "conexoes_ociosas": self._ociosas.qsize(),
+                "conexoes_criadas": self._criadas,
+                "conexoes_descartadas": self._descartadas,
+                "checkouts": self._checkouts,
+                "overflow": self._overflow,
+                "health_checks_falhos": self._health_checks_falhos,
+            }
+
+
+class FilaEscrita:
+    """
+    Escritor único do banco, alimentado por uma fila de transações curtas.
+
+    Uma thread dedicada mantém a conexão de escrita e agrupa as operações
+    pendentes (até `lote_maximo`) em uma única transação BEGIN IMMEDIATE,
+    reduzindo commits e disputas pelo lock de escrita. Cada operação roda
+    em seu próprio SAVEPOINT: a falha de uma não desfaz as demais do lote.
+
+    As operações recebem a conexão de escrita e NÃO devem chamar commit().
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        lote_maximo: int = DB_ESCRITA_LOTE_MAX,
+        perfil: PerfilArmazenamento = PERFIL_PADRAO,
+    ):
+        if lote_maximo <= 0:
+            raise ValueError("lote_maximo deve ser positivo")
+
+        self.caminho = caminho
+        self.lote_maximo = lote_maximo
+        self.perfil = perfil
+
+        self._fila: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._ident_escritora: Optional[int] = None
+
+        # Métricas
+        self._operacoes = 0
+        self._falhas = 0
+        self._lotes = 0
+        self._maior_lote = 0
+
+    def submeter(self, operacao: Callable[[sqlite3.Connection], Any]) -> Future:
+        """
+        Enfileira uma operação de escrita.
+
+        Args:
+            operacao: Função que recebe a conexão de escrita
+
+        Returns:
+            Future resolvido com o retorno da operação após o commit
+        """
+        future: Future = Future()
+        with self._lock:
+            # Thread escritora iniciada sob demanda (e reiniciada após parar())
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._executar_loop,
+                    name=f"fila-escrita:{self.caminho}",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._fila.put((operacao, future))
+        return future
+
+    def executar(self, operacao: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Executa uma operação de escrita e aguarda o commit.
+
+        Chamadas feitas de dentro da própria thread escritora são executadas
+        diretamente, evitando deadlock.
+        """
+        if self._conn is not None and threading.get_ident() == self._ident_escritora:
+            return operacao(self._conn)
+        return self.submeter(operacao).result()
+
+    def _coletar_lote(self) -> tuple[list, bool]:
+        """
+        Aguarda a próxima operação e agrupa as demais já pendentes.
+
+        Returns:
+            Tupla (lote, parada_solicitada)
+        """
+        lote = []
+        parar = False
+        item = self._fila.get()
+        while True:
+            if item is None:
+                parar = True
+            else:
+                lote.append(item)
+            if len(lote) >= self.lote_maximo:
+                break
+            try:
+                item = self._fila.get_nowait()
+            except queue.Empty:
+                break
+        return lote, parar
+
+    def _executar_loop(self) -> None:
+        """
+        Loop da thread escritora: drena a fila em lotes.
+
+        Se a thread terminar por erro (ao abrir a conexão ou inesperado no
+        processamento), ela se desregistra e falha o lote em andamento e as
+        operações pendentes: nenhum Future fica aguardando para sempre e a
+        próxima submissão inicia uma nova thread.
+        """
+        erro: Optional[BaseException] = None
+        lote: list = []
+        parada_normal = False
+        conn: Optional[sqlite3.Connection] = None
+        try:
+            conn = abrir_conexao(self.caminho, self.perfil)
+            # Controle explícito de transações (BEGIN/COMMIT manuais)
+            conn.isolation_level = None
+            self._conn = conn
+            self._ident_escritora = threading.get_ident()
+
+            parar = False
+            while True:
+                if parar:
+                    with self._lock:
+                        if self._fila.empty():
+                            self._thread = None
+                            parada_normal = True
+                            break
+
+                lote, parada_solicitada = self._coletar_lote()
+                parar = parar or parada_solicitada
+                if lote:
+                    self._processar_lote(lote)
+                lote = []
+        except Exception as e:
+            erro = e
+            logger.error(f"[FilaEscrita] Thread escritora de {self.caminho} encerrada por erro: {e!r}")
+        finally:
+            pendentes = []
+            if not parada_normal:
+                with self._lock:
+                    self._thread = None
+                    while not self._fila.empty():
+                        pendentes.append(self._fila.get_nowait())
+            if conn is not None:
+                conn.close()
+            # Uma nova thread pode já ter assumido a fila após a parada
+            if self._conn is conn:
+                self._conn = None
+                self._ident_escritora = None
+
+            falha = erro or RuntimeError("Thread escritora encerrada inesperadamente")
+            for item in lote + pendentes:
+                if item is not None and not item[1].done():
+                    item[1].set_exception(falha)
+
+    def _processar_lote(self, lote: list) -> None:
+        """Executa um lote de operações em uma única transação."""
+        conn = self._conn
+        resultados = []
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operacao, future in lote:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT operacao")
+                try:
+                    resultado = operacao(conn)
+                    conn.execute("RELEASE SAVEPOINT operacao")
+                    resultados.append((future, resultado, None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO SAVEPOINT operacao")
+                    conn.execute("RELEASE SAVEPOINT operacao")
+                    resultados.append((future, None, e))
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            # Falha ao iniciar/confirmar a transação: todo o lote é descartado
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            with self._lock:
+                self._falhas += len(lote)
+            for _, future in lote:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        with self._lock:
+            self._lotes += 1
+            self._operacoes += len(resultados)
+            self._maior_lote = max(self._maior_lote, len(resultados))
+            self._falhas += sum(1 for _, _, erro in resultados if erro is not None)
+
+        for future, resultado, erro in resultados:
+            if erro is not None:
+                future.set_exception(erro)
+            else:
+                future.set_result(resultado)
+
+    def parar(self, timeout: float = 5.0) -> None:
+        """Processa as operações pendentes e encerra a thread escritora."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._fila.put(None)
+        thread.join(timeout)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas da fila de escrita.
+
+        Returns:
+            Dicionário com tamanho da fila e contadores acumulados
+        """
+        with self._lock:
+            return {
+                "caminho": self.caminho,
+                "pendentes": self._fila.qsize(),
+                "operacoes": self._operacoes,
+                "falhas": self._falhas,
+                "lotes": self._lotes,
+                "maior_lote": self._maior_lote,
+                "media_por_lote": round(self._operacoes / self._lotes, 2) if self._lotes else 0,
+            }
+
+
+_pools: Dict[str, PoolConexoes] = {}
+_pools_lock = threading.Lock()
+_filas_escrita: Dict[str, FilaEscrita] = {}
+
+
+def obter_pool(caminho: Optional[str] = None) -> PoolConexoes:
+    """
+    Retorna o pool do banco informado (padrão: DATABASE_PATH atual).
+
+    O caminho é lido a cada chamada, de modo que alterações em
+    DATABASE_PATH (ex: testes) passam a usar um pool próprio.
+    """
+    caminho = caminho or DATABASE_PATH
+    pool = _pools.get(caminho)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(caminho)
+            if pool is None:
+                pool = PoolConexoes(caminho)
+                _pools[caminho] = pool
+    return pool
+
+
+def obter_fila_escrita(caminho: Optional[str] = None) -> FilaEscrita:
+    """Retorna a fila de escrita do banco informado (padrão: DATABASE_PATH atual)."""
+    caminho = caminho or DATABASE_PATH
+    fila = _filas_escrita.get(caminho)
+    if fila is None:
+        with _pools_lock:
+            fila = _filas_escrita.get(caminho)
+            if fila is None:
+                fila = FilaEscrita(caminho)
+                _filas_escrita[caminho] = fila
+    return fila
+
+
+def executar_escrita(operacao: Callable[[sqlite3.Connection], Any], caminho: Optional[str] = None) -> Any:
+    """
+    Executa uma escrita curta pela fila de escrita e aguarda o commit.
+
+    Indicado para escritas frequentes e concorrentes (ex: envio de mensagens,
+    contadores). NÃO chamar de dentro de um `with obter_conexao()` que já
+    tenha escrito: a transação aberta seguraria o lock de escrita.
+
+    Args:
+        operacao: Função que recebe a conexão e executa os comandos
+        caminho: Banco de destino (padrão: DATABASE_PATH atual)
+
+    Returns:
+        Retorno da operação
+    """
+    return obter_fila_escrita(caminho).executar(operacao)
+
+
+def fechar_pools() -> None:
+    """
+    Fecha todas as conexões pooled e encerra as filas de escrita.
+
+    Deve ser chamado antes de substituir o arquivo do banco (ex: restauração
+    de backup) e no shutdown da aplicação.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        filas = list(_filas_escrita.values())
+        _pools.clear()
+        _filas_escrita.clear()
+    for fila in filas:
+        fila.parar()
+    for pool in pools:
+        pool.fechar()
+
+
+def obter_estatisticas_pool() -> dict:
+    """Retorna estatísticas de todos os pools e filas de escrita ativos."""
+    with _pools_lock:
+        return {
+            "pools": {caminho: pool.obter_estatisticas() for caminho, pool in _pools.items()},
+            "filas_escrita": {caminho: fila.obter_estatisticas() for caminho, fila in _filas_escrita.items()},
+        }
+
+
+@contextmanager
+def obter_conexao():
+    """Context manager para conexão com banco de dados (reutiliza conexões do pool)"""
+    pool = obter_pool()
+    conn, overflow = pool.adquirir()
     try:
         yield conn
         conn.commit()
@@ -30,7 +582,7 @@ def obter_conexao():
         conn.rollback()
         raise e
     finally:
-        conn.close()
+        pool.devolver(conn, overflow)
 
 
 def adaptar_datetime(dt: datetime) -> str:
@@ -92,3 +644,6 @@ def registrar_adaptadores() -> None:
     """Registra os adaptadores customizados para datetime no sqlite3"""
     sqlite3.register_adapter(datetime, adaptar_datetime)
     sqlite3.register_converter("TIMESTAMP", converter_datetime)
+
+
+registrar_adaptadores()
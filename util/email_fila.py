@@ -0,0 +1,220 @@
+"""
+Processamento em background da fila de saída de e-mails.
+
+As rotas apenas gravam o e-mail na tabela email_pendente
+(`servico_email.enfileirar_email`). O processador reserva lotes de e-mails
+prontos, envia pelo transporte configurado fora do event loop e registra
+o resultado: falhas temporárias são reagendadas com backoff exponencial e,
+esgotadas as tentativas, o e-mail é marcado como falhou. A fila persiste
+entre reinícios e a reserva atômica permite um processador por worker.
+
+Configuração (.env):
+    EMAIL_FILA_INTERVALO_SEGUNDOS=2
+    EMAIL_FILA_LOTE=20
+    EMAIL_FILA_MAX_TENTATIVAS=5
+    EMAIL_FILA_BACKOFF_SEGUNDOS=30
+    EMAIL_FILA_BACKOFF_MAXIMO_SEGUNDOS=3600
+    EMAIL_FILA_RETENCAO_DIAS=7
+"""
+import asyncio
+import os
+import time
+from typing import List, Optional
+
+from repo import email_pendente_repo
+from model.email_pendente_model import EmailPendente
+from util.db_async import executar_em_thread
+from util.email_service import ServicoEmail, servico_email
+from util.logger_config import logger
+
+
+EMAIL_FILA_INTERVALO_SEGUNDOS = float(os.getenv('EMAIL_FILA_INTERVALO_SEGUNDOS', '2'))
+EMAIL_FILA_LOTE = int(os.getenv('EMAIL_FILA_LOTE', '20'))
+EMAIL_FILA_MAX_TENTATIVAS = int(os.getenv('EMAIL_FILA_MAX_TENTATIVAS', '5'))
+EMAIL_FILA_BACKOFF_SEGUNDOS = float(os.getenv('EMAIL_FILA_BACKOFF_SEGUNDOS', '30'))
+EMAIL_FILA_BACKOFF_MAXIMO_SEGUNDOS = float(os.getenv('EMAIL_FILA_BACKOFF_MAXIMO_SEGUNDOS', '3600'))
+EMAIL_FILA_RETENCAO_DIAS = int(os.getenv('EMAIL_FILA_RETENCAO_DIAS', '7'))
+
+
+class ProcessadorEmails:
+    """
+    Consumidor da fila de saída de e-mails.
+
+    Um lote reservado fica indisponível para outros processadores por
+    `reserva_segundos`; se o worker morrer durante o envio, os e-mails
+    voltam à fila ao fim da reserva.
+    """
+
+    def __init__(
+        self,
+        servico: ServicoEmail = servico_email,
+        intervalo_segundos: float = EMAIL_FILA_INTERVALO_SEGUNDOS,
+        lote: int = EMAIL_FILA_LOTE,
+        max_tentativas: int = EMAIL_FILA_MAX_TENTATIVAS,
+        backoff_segundos: float = EMAIL_FILA_BACKOFF_SEGUNDOS,
+        backoff_maximo_segundos: float = EMAIL_FILA_BACKOFF_MAXIMO_SEGUNDOS,
+        retencao_dias: int = EMAIL_FILA_RETENCAO_DIAS,
+        reserva_segundos: float = 120.0
+    ):
+        if lote <= 0:
+            raise ValueError("lote deve ser positivo")
+
+        self.servico = servico
+        self.intervalo = intervalo_segundos
+        self.lote = lote
+        self.max_tentativas = max_tentativas
+        self.backoff_segundos = backoff_segundos
+        self.backoff_maximo_segundos = backoff_maximo_segundos
+        self.retencao_segundos = retencao_dias * 86400
+        self.reserva_segundos = reserva_segundos
+
+        self._tarefa: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._acordar: Optional[asyncio.Event] = None
+
+        # Métricas
+        self._lotes = 0
+        self._enviados = 0
+        self._reagendados = 0
+        self._falhas_definitivas = 0
+        self._erros_processamento = 0
+
+    def calcular_backoff(self, tentativas: int) -> float:
+        """
+        Espera até a próxima tentativa após `tentativas` falhas.
+
+        Args:
+            tentativas: Número de falhas já ocorridas (incluindo a atual)
+
+        Returns:
+            Segundos (base * 2^(tentativas-1), limitado ao máximo)
+        """
+        return min(self.backoff_segundos * 2 ** max(tentativas - 1, 0), self.backoff_maximo_segundos)
+
+    async def processar_lote(self) -> int:
+        """
+        Reserva, envia e registra um lote de e-mails prontos.
+
+        Returns:
+            Quantidade de e-mails processados (enviados ou não)
+        """
+        agora = time.time()
+        emails: List[EmailPendente] = await executar_em_thread(
+            email_pendente_repo.reivindicar_prontos, agora, self.lote, self.reserva_segundos
+        )
+        if not emails:
+            return 0
+
+        lote = [
+            self.servico.montar_params(email.para_email, email.assunto, email.html, email.texto)
+            for email in emails
+        ]
+        erros = await executar_em_thread(self.servico.transporte.enviar_lote, lote)
+
+        enviados, reagendados, falhas = [], [], []
+        agora = time.time()
+        for email, erro in zip(emails, erros):
+            if erro is None:
+                enviados.append(email.id)
+                continue
+
+            tentativas = email.tentativas + 1
+            if tentativas >= self.max_tentativas:
+                falhas.append((email.id, erro))
+                logger.error(
+                    f"[EmailFila] E-mail {email.id} para {email.para_email} descartado após "
+                    f"{tentativas} tentativas: {erro}"
+                )
+            else:
+                reagendados.append((email.id, agora + self.calcular_backoff(tentativas), erro))
+                logger.warning(f"[EmailFila] Falha ao enviar e-mail {email.id} (tentativa {tentativas}): {erro}")
+
+        await executar_em_thread(email_pendente_repo.registrar_resultados, enviados, reagendados, falhas, agora)
+
+        self._lotes += 1
+        self._enviados += len(enviados)
+        self._reagendados += len(reagendados)
+        self._falhas_definitivas += len(falhas)
+        if enviados:
+            logger.info(f"[EmailFila] {len(enviados)} e-mail(s) enviado(s)")
+        return len(emails)
+
+    def notificar(self) -> None:
+        """Acorda o processador (chamado a cada e-mail enfileirado, de qualquer thread)."""
+        if self._loop is None or self._acordar is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._acordar.set)
+
+    async def _esperar(self) -> None:
+        """Aguarda o intervalo ou um novo e-mail enfileirado."""
+        try:
+            await asyncio.wait_for(self._acordar.wait(), self.intervalo)
+        except asyncio.TimeoutError:
+            pass
+        self._acordar.clear()
+
+    async def _executar(self) -> None:
+        """Laço do processador."""
+        proxima_limpeza = 0.0
+        while True:
+            try:
+                processados = await self.processar_lote()
+
+                if time.monotonic() >= proxima_limpeza:
+                    proxima_limpeza = time.monotonic() + 3600
+                    await executar_em_thread(
+                        email_pendente_repo.excluir_enviados_anteriores, time.time() - self.retencao_segundos
+                    )
+
+                # Lote cheio: pode haver mais e-mails prontos, processar sem esperar
+                if processados < self.lote:
+                    await self._esperar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._erros_processamento += 1
+                logger.error(f"[EmailFila] Erro ao processar fila de e-mails: {e}")
+                await asyncio.sleep(self.intervalo)
+
+    def iniciar(self) -> Optional[asyncio.Task]:
+        """
+        Agenda o processador no event loop atual.
+
+        Returns:
+            Task agendada ou None se o transporte não estiver configurado
+            (os e-mails permanecem na fila até a configuração)
+        """
+        if not self.servico.transporte.configurado():
+            logger.warning(
+                f"[EmailFila] Transporte '{self.servico.transporte.nome}' não configurado; "
+                "e-mails ficarão na fila sem envio"
+            )
+            return None
+
+        self._loop = asyncio.get_running_loop()
+        self._acordar = asyncio.Event()
+        self.servico.registrar_notificacao(self.notificar)
+        self._tarefa = asyncio.create_task(self._executar())
+        logger.info(f"[EmailFila] Processador iniciado (transporte {self.servico.transporte.nome})")
+        return self._tarefa
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna estatísticas do processador.
+
+        Returns:
+            Dicionário com lotes, enviados, reagendados e falhas
+        """
+        return {
+            "transporte": self.servico.transporte.nome,
+            "ativo": self._tarefa is not None and not self._tarefa.done(),
+            "lotes": self._lotes,
+            "enviados": self._enviados,
+            "reagendados": self._reagendados,
+            "falhas_definitivas": self._falhas_definitivas,
+            "erros_processamento": self._erros_processamento,
+        }
+
+
+# Instância global
+processador_emails = ProcessadorEmails()
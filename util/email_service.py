@@ -1,14 +1,107 @@
 import os
-from typing import Optional
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Tuple
 
 import resend
 from resend.exceptions import ResendError
 
+from repo import email_pendente_repo
+from util.email_templates import ASSUNTOS, renderizar, renderizar_lote
 from util.logger_config import logger
 
 
-class ServicoEmail:
+EMAIL_TRANSPORTE = os.getenv('EMAIL_TRANSPORTE', 'resend').lower()
+
+
+class TransporteEmail(ABC):
+    """
+    Interface dos transportes usados pelo processador da fila de e-mails.
+
+    `enviar_lote` recebe os parâmetros no formato do Resend e devolve, para
+    cada e-mail, None (enviado) ou a mensagem de erro.
+    """
+
+    nome = "base"
+
+    def configurado(self) -> bool:
+        """Indica se o transporte pode enviar (ex: API key presente)."""
+        return True
+
+    @abstractmethod
+    def enviar_lote(self, lote: List[dict]) -> List[Optional[str]]:
+        """Envia os e-mails e retorna, por e-mail, None ou a mensagem de erro."""
+
+
+class TransporteResend(TransporteEmail):
+    """Envio via API do Resend (lotes de até 100 e-mails em uma requisição)."""
+
+    nome = "resend"
+    LOTE_MAXIMO = 100
+
+    def configurado(self) -> bool:
+        return bool(resend.api_key)
+
+    def enviar_lote(self, lote: List[dict]) -> List[Optional[str]]:
+        erros: List[Optional[str]] = []
+        for inicio in range(0, len(lote), self.LOTE_MAXIMO):
+            parte = lote[inicio:inicio + self.LOTE_MAXIMO]
+            try:
+                if len(parte) == 1:
+                    resend.Emails.send(parte[0])
+                else:
+                    resend.Batch.send(parte)
+                erros.extend([None] * len(parte))
+            except Exception as e:
+                # Falha da requisição vale para todo o lote (reenviado depois)
+                erros.extend([str(e) or type(e).__name__] * len(parte))
+        return erros
+
+
+class TransporteMemoria(TransporteEmail):
+    """
+    Transporte local que guarda os e-mails em memória.
+
+    Usado em testes e desenvolvimento; `falhas_simuladas` faz os próximos
+    envios falharem para exercitar os reenvios.
+    """
+
+    nome = "memoria"
+
     def __init__(self):
+        self.enviados: List[dict] = []
+        self.falhas_simuladas = 0
+
+    def enviar_lote(self, lote: List[dict]) -> List[Optional[str]]:
+        erros: List[Optional[str]] = []
+        for params in lote:
+            if self.falhas_simuladas > 0:
+                self.falhas_simuladas -= 1
+                erros.append("Falha simulada")
+            else:
+                self.enviados.append(params)
+                erros.append(None)
+        return erros
+
+
+def criar_transporte(transporte: str = EMAIL_TRANSPORTE) -> TransporteEmail:
+    """
+    Cria o transporte configurado.
+
+    Args:
+        transporte: "resend" ou "memoria"
+
+    Returns:
+        Instância do transporte (Resend se o nome for desconhecido)
+    """
+    if transporte == "memoria":
+        return TransporteMemoria()
+    if transporte != "resend":
+        logger.warning(f"[Email] Transporte '{transporte}' desconhecido, usando Resend")
+    return TransporteResend()
+
+
+class ServicoEmail:
+    def __init__(self, transporte: Optional[TransporteEmail] = None):
         self.api_key = os.getenv('RESEND_API_KEY')
         self.from_email = os.getenv('RESEND_FROM_EMAIL', 'noreply@seudominio.com')
         self.from_name = os.getenv('RESEND_FROM_NAME', 'Sistema')
@@ -17,6 +110,28 @@ class ServicoEmail:
         if self.api_key:
             resend.api_key = self.api_key
 
+        # Transporte da fila de saída e callback avisado a cada enfileiramento
+        self.transporte = transporte or criar_transporte()
+        self._notificar: Optional[Callable[[], None]] = None
+
+    def montar_params(
+        self,
+        para_email: str,
+        assunto: str,
+        html: str,
+        texto: Optional[str] = None
+    ) -> dict:
+        """Monta os parâmetros de envio no formato do Resend"""
+        params = {
+            "from": f"{self.from_name} <{self.from_email}>",
+            "to": [para_email],
+            "subject": assunto,
+            "html": html
+        }
+        if texto:
+            params["text"] = texto
+        return params
+
     def enviar_email(
         self,
         para_email: str,
@@ -30,12 +145,7 @@ class ServicoEmail:
             logger.warning("RESEND_API_KEY não configurada")
             return False
 
-        params = {
-            "from": f"{self.from_name} <{self.from_email}>",
-            "to": [para_email],
-            "subject": assunto,
-            "html": html
-        }
+        params = self.montar_params(para_email, assunto, html, texto)
 
         try:
             email = resend.Emails.send(params)
@@ -45,51 +155,110 @@ class ServicoEmail:
             logger.error(f"Erro ao enviar e-mail: {e}")
             return False
 
-    def enviar_recuperacao_senha(self, para_email: str, para_nome: str, token: str) -> bool:
-        """Envia e-mail de recuperação de senha"""
-        url_recuperacao = f"{os.getenv('BASE_URL', 'http://localhost:8000')}/redefinir-senha?token={token}"
+    def registrar_notificacao(self, callback: Callable[[], None]) -> None:
+        """Define o callback avisado a cada e-mail enfileirado (processador da fila)"""
+        self._notificar = callback
+
+    def enfileirar_email(
+        self,
+        para_email: str,
+        para_nome: str,
+        assunto: str,
+        html: str,
+        texto: Optional[str] = None
+    ) -> int:
+        """
+        Grava o e-mail na fila de saída para envio em background.
+
+        A requisição não espera a API de e-mail: o processador da fila
+        envia com reenvios e backoff.
 
-        html = f"""
-        <html>
-        <body>
-            <h2>Recuperação de Senha</h2>
-            <p>Olá {para_nome},</p>
-            <p>Você solicitou a recuperação de senha.</p>
-            <p>Clique no link abaixo para redefinir sua senha:</p>
-            <a href="{url_recuperacao}">Redefinir Senha</a>
-            <p>Este link expira em 1 hora.</p>
-            <p>Se você não solicitou esta recuperação, ignore este e-mail.</p>
-        </body>
-        </html>
+        Returns:
+            ID do e-mail na fila
         """
+        email_id = email_pendente_repo.inserir(para_email, para_nome, assunto, html, texto)
+        logger.debug(f"E-mail {email_id} enfileirado para {para_email}")
+        if self._notificar is not None:
+            self._notificar()
+        return email_id
 
+    def enfileirar_lote(
+        self,
+        template: str,
+        destinatarios: List[Tuple[str, str, dict]],
+        comum: Optional[dict] = None
+    ) -> List[int]:
+        """
+        Renderiza e enfileira um e-mail por destinatário (envios em massa).
+
+        O template é renderizado para todos em uma passada e os e-mails
+        são gravados na fila em uma única transação.
+
+        Args:
+            template: Nome do template de e-mail (ver util.email_templates)
+            destinatarios: Tuplas (para_email, para_nome, contexto)
+            comum: Variáveis compartilhadas por todas as mensagens
+
+        Returns:
+            IDs dos e-mails na fila
+        """
+        if not destinatarios:
+            return []
+
+        assunto = ASSUNTOS[template]
+        corpos = renderizar_lote(
+            template,
+            ({"para_nome": para_nome, **contexto} for _, para_nome, contexto in destinatarios),
+            comum
+        )
+        ids = email_pendente_repo.inserir_lote([
+            (para_email, para_nome, assunto, html)
+            for (para_email, para_nome, _), html in zip(destinatarios, corpos)
+        ])
+        logger.info(f"{len(ids)} e-mail(s) '{template}' enfileirados")
+        if self._notificar is not None:
+            self._notificar()
+        return ids
+
+    def _conteudo_recuperacao_senha(self, para_nome: str, token: str) -> tuple[str, str]:
+        """Assunto e HTML do e-mail de recuperação de senha"""
+        url_recuperacao = f"{os.getenv('BASE_URL', 'http://localhost:8000')}/redefinir-senha?token={token}"
+        return renderizar("recuperacao_senha", para_nome=para_nome, url_recuperacao=url_recuperacao)
+
+    def enviar_recuperacao_senha(self, para_email: str, para_nome: str, token: str) -> bool:
+        """Envia e-mail de recuperação de senha"""
+        assunto, html = self._conteudo_recuperacao_senha(para_nome, token)
         return self.enviar_email(
             para_email=para_email,
             para_nome=para_nome,
-            assunto="Recuperação de Senha",
+            assunto=assunto,
             html=html
         )
 
+    def enfileirar_recuperacao_senha(self, para_email: str, para_nome: str, token: str) -> int:
+        """Enfileira e-mail de recuperação de senha"""
+        assunto, html = self._conteudo_recuperacao_senha(para_nome, token)
+        return self.enfileirar_email(para_email, para_nome, assunto, html)
+
+    def _conteudo_boas_vindas(self, para_nome: str) -> tuple[str, str]:
+        """Assunto e HTML do e-mail de boas-vindas"""
+        return renderizar("boas_vindas", para_nome=para_nome)
+
     def enviar_boas_vindas(self, para_email: str, para_nome: str) -> bool:
         """Envia e-mail de boas-vindas"""
-        html = f"""
-        <html>
-        <body>
-            <h2>Bem-vindo(a)!</h2>
-            <p>Olá {para_nome},</p>
-            <p>Seu cadastro foi realizado com sucesso!</p>
-            <p>Agora você pode acessar o sistema com seu e-mail e senha.</p>
-        </body>
-        </html>
-        """
-
+        assunto, html = self._conteudo_boas_vindas(para_nome)
         return self.enviar_email(
             para_email=para_email,
             para_nome=para_nome,
-            assunto="Bem-vindo ao Sistema",
+            assunto=assunto,
             html=html
         )
 
+    def enfileirar_boas_vindas(self, para_email: str, para_nome: str) -> int:
+        """Enfileira e-mail de boas-vindas"""
+        assunto, html = self._conteudo_boas_vindas(para_nome)
+        return self.enfileirar_email(para_email, para_nome, assunto, html)
+
 
 # Instância global
 servico_email = ServicoEmail()
@@ -0,0 +1,115 @@
+"""
+Templates Jinja2 dos e-mails.
+
+Os corpos dos e-mails ficam em templates/email/. O ambiente é criado uma
+única vez e os templates são compilados na primeira carga (ou em
+`precompilar()`, no startup) e mantidos em memória: com auto_reload
+desativado, renderizações seguintes não consultam o disco.
+
+`renderizar_lote` renderiza N mensagens personalizadas do mesmo template
+em uma passada, reaproveitando o template compilado e o contexto comum.
+
+Uso:
+    assunto, html = renderizar("boas_vindas", para_nome="Maria")
+    corpos = renderizar_lote("boas_vindas", [{"para_nome": n} for n in nomes])
+"""
+import functools
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, Template
+
+from util.config import APP_NAME
+
+
+EMAIL_TEMPLATES_DIR = "templates/email"
+
+# Templates disponíveis e seus assuntos
+ASSUNTOS: Dict[str, str] = {
+    "recuperacao_senha": "Recuperação de Senha",
+    "boas_vindas": "Bem-vindo ao Sistema",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def obter_ambiente() -> Environment:
+    """
+    Retorna o ambiente Jinja2 dos e-mails (criado uma única vez).
+
+    Returns:
+        Environment com autoescape e sem verificação de alteração dos arquivos
+    """
+    env = Environment(
+        loader=FileSystemLoader(EMAIL_TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=False,
+    )
+    env.globals["APP_NAME"] = APP_NAME
+    return env
+
+
+@functools.lru_cache(maxsize=None)
+def obter_template(nome: str) -> Template:
+    """
+    Retorna o template compilado de um e-mail.
+
+    Args:
+        nome: Nome do template (chave de ASSUNTOS)
+
+    Returns:
+        Template compilado
+
+    Raises:
+        KeyError: Se o template não existir
+    """
+    if nome not in ASSUNTOS:
+        raise KeyError(f"Template de e-mail desconhecido: {nome}")
+    return obter_ambiente().get_template(f"{nome}.html")
+
+
+def precompilar() -> int:
+    """
+    Compila todos os templates de e-mail antecipadamente.
+
+    Returns:
+        Quantidade de templates compilados
+    """
+    for nome in ASSUNTOS:
+        obter_template(nome)
+    return len(ASSUNTOS)
+
+
+def renderizar(nome: str, **contexto) -> Tuple[str, str]:
+    """
+    Renderiza um e-mail.
+
+    Args:
+        nome: Nome do template
+        **contexto: Variáveis do template
+
+    Returns:
+        Tupla (assunto, html)
+    """
+    return ASSUNTOS[nome], obter_template(nome).render(contexto)
+
+
+def renderizar_lote(
+    nome: str,
+    contextos: Iterable[dict],
+    comum: Optional[dict] = None
+) -> List[str]:
+    """
+    Renderiza várias mensagens personalizadas do mesmo template.
+
+    Args:
+        nome: Nome do template
+        contextos: Variáveis de cada destinatário
+        comum: Variáveis compartilhadas por todas as mensagens
+
+    Returns:
+        Lista de HTMLs na ordem dos contextos
+    """
+    template = obter_template(nome)
+    render = template.render
+    if not comum:
+        return [render(contexto) for contexto in contextos]
+    return [render({**comum, **contexto}) for contexto in contextos]
@@ -4,20 +4,46 @@ Utilitário para gerenciamento de fotos de usuários.
 Este módulo fornece funções para:
 - Obter caminhos de fotos de usuários (padrão: {id:06d}.jpg)
 - Criar foto padrão ao cadastrar usuário
-- Salvar foto cropada do upload
+- Salvar foto cropada do upload (em pool de processos nas rotas assíncronas)
+- Variantes reduzidas (ex: 32/64/256 px) para avatares e listas, geradas
+  no upload ou sob demanda (em background) a partir da foto principal
 """
 
-import base64
+import asyncio
 import binascii
-import io
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Set, Tuple
 
-from PIL import Image, UnidentifiedImageError
+from PIL import UnidentifiedImageError
 
+from util.asset_util import manifesto_assets
 from util.logger_config import logger
-from util.config import FOTO_PERFIL_TAMANHO_MAX
+from util.config import (
+    FOTO_PERFIL_TAMANHO_MAX,
+    FOTO_MAX_UPLOAD_BYTES,
+    FOTO_MAX_PIXELS,
+    FOTO_WORKERS,
+    FOTO_VARIANTES,
+    FOTO_VARIANTES_WEBP,
+    FOTO_CACHE_VARIANTES,
+)
 from util.config_cache import config
+from util.db_async import executar_em_thread
+from util.imagem_util import (
+    caminho_variante,
+    decodificar_base64_em_arquivo,
+    gerar_variantes_de_arquivo,
+    inicio_dados_base64,
+    processar_foto,
+    tamanho_decodificado,
+)
 
 
 # Configurações
@@ -26,19 +52,197 @@ FOTO_DEFAULT = PASTA_FOTO_DEFAULT / "user.jpg"
 PASTA_FOTOS = PASTA_FOTO_DEFAULT / "usuarios"
 FORMATO_FOTO = "JPEG"
 QUALIDADE_FOTO = 90
+FORMATO_VARIANTES = "webp" if FOTO_VARIANTES_WEBP else "jpg"
 
+# Pool de processos do processamento de fotos (criado sob demanda)
+_executor: Optional[ProcessPoolExecutor] = None
+_lock_executor = threading.Lock()
 
-def obter_caminho_foto_usuario(id: int) -> str:
+# Índice LRU (por worker) das variantes já conferidas em disco:
+# (id, tamanho) → variante disponível
+_variantes: "OrderedDict[Tuple[int, int], bool]" = OrderedDict()
+_lock_variantes = threading.Lock()
+# Usuários com variantes sendo geradas no pool de processos
+_geracoes_pendentes: Set[int] = set()
+_estatisticas_variantes = {"acertos": 0, "falhas": 0, "geradas": 0, "erros": 0}
+
+
+def selecionar_tamanho_variante(tamanho: int) -> Optional[int]:
+    """
+    Escolhe a menor variante que cobre o tamanho de exibição.
+
+    Args:
+        tamanho: Tamanho exibido em pixels (considerar a densidade da tela)
+
+    Returns:
+        Tamanho da variante ou None se nenhuma for grande o suficiente
+    """
+    candidatas = [variante for variante in FOTO_VARIANTES if variante >= tamanho]
+    return min(candidatas) if candidatas else None
+
+
+def _conferir_variante(id: int, tamanho: int) -> Optional[bool]:
+    """
+    Confere a variante em disco (apenas stat, sem decodificar imagens).
+
+    Returns:
+        True se a variante existe e não é mais antiga que a foto principal,
+        False se precisa ser gerada (ausente ou foto padrão recriada) e
+        None se o usuário não tem foto
+    """
+    foto = PASTA_FOTOS / f"{id:06d}.jpg"
+    variante = Path(caminho_variante(str(foto), tamanho, FORMATO_VARIANTES))
+    try:
+        mtime_foto = foto.stat().st_mtime
+    except OSError:
+        return None
+    try:
+        return variante.stat().st_mtime >= mtime_foto
+    except OSError:
+        return False
+
+
+def _armazenar_variante(chave: Tuple[int, int], disponivel: bool) -> None:
+    """Registra a variante no índice LRU (chamado com o lock adquirido)."""
+    _variantes[chave] = disponivel
+    _variantes.move_to_end(chave)
+    while len(_variantes) > FOTO_CACHE_VARIANTES:
+        _variantes.popitem(last=False)
+
+
+def _geracao_concluida(id: int, tamanhos: Tuple[int, ...], futuro: Future) -> None:
+    """Atualiza o índice ao fim da geração em background."""
+    erro = None if futuro.cancelled() else futuro.exception()
+    with _lock_variantes:
+        _geracoes_pendentes.discard(id)
+        if futuro.cancelled():
+            return
+        if erro is None:
+            _estatisticas_variantes["geradas"] += 1
+            for tamanho in tamanhos:
+                _armazenar_variante((id, tamanho), True)
+        else:
+            # Foto ilegível: não tentar de novo até a foto ser trocada
+            _estatisticas_variantes["erros"] += 1
+            for tamanho in tamanhos:
+                _armazenar_variante((id, tamanho), False)
+    if erro is not None:
+        logger.error(f"Erro ao gerar variantes da foto do usuário {id}: {erro}")
+
+
+def _agendar_geracao_variantes(id: int) -> None:
+    """
+    Gera as variantes do usuário no pool de processos de fotos, sem
+    aguardar: quem renderiza segue com a foto completa até terminar.
+    """
+    with _lock_variantes:
+        if id in _geracoes_pendentes:
+            return
+        _geracoes_pendentes.add(id)
+
+    tamanhos = tuple(FOTO_VARIANTES)
+    foto = str(PASTA_FOTOS / f"{id:06d}.jpg")
+    try:
+        futuro = _obter_executor().submit(gerar_variantes_de_arquivo, foto, tamanhos, FORMATO_VARIANTES)
+    except (BrokenProcessPool, RuntimeError) as e:
+        with _lock_variantes:
+            _geracoes_pendentes.discard(id)
+        logger.error(f"Erro ao agendar variantes da foto do usuário {id}: {e}")
+        encerrar_processamento_fotos()
+        return
+    futuro.add_done_callback(lambda f: _geracao_concluida(id, tamanhos, f))
+
+
+def variante_disponivel(id: int, tamanho: int) -> bool:
+    """
+    Verifica se a variante de um tamanho da foto do usuário pode ser servida.
+
+    O resultado fica no índice LRU em memória: renderizações seguintes não
+    acessam o disco. Variante ausente ou desatualizada é gerada em
+    background no pool de processos (uma vez por foto; os arquivos
+    persistem entre workers e reinícios) e, até lá, a foto completa é
+    servida: a renderização nunca decodifica imagens.
+
+    Args:
+        id: ID do usuário
+        tamanho: Tamanho da variante (um de FOTO_VARIANTES)
+
+    Returns:
+        True se a variante pode ser servida
+    """
+    chave = (id, tamanho)
+    with _lock_variantes:
+        disponivel = _variantes.get(chave)
+        if disponivel is not None:
+            _variantes.move_to_end(chave)
+            _estatisticas_variantes["acertos"] += 1
+            return disponivel
+        _estatisticas_variantes["falhas"] += 1
+        if id in _geracoes_pendentes:
+            return False
+
+    estado = _conferir_variante(id, tamanho)
+    if estado is False:
+        _agendar_geracao_variantes(id)
+        return False
+
+    with _lock_variantes:
+        _armazenar_variante(chave, bool(estado))
+    return bool(estado)
+
+
+def _invalidar_variantes(id: int) -> None:
+    """Remove as variantes do usuário do índice (após trocar a foto)."""
+    with _lock_variantes:
+        for tamanho in FOTO_VARIANTES:
+            _variantes.pop((id, tamanho), None)
+
+
+def obter_estatisticas_variantes() -> dict:
+    """
+    Retorna estatísticas do índice de variantes.
+
+    Returns:
+        Dicionário com tamanhos, formato, entradas, gerações pendentes,
+        acertos, falhas e gerações
+    """
+    with _lock_variantes:
+        entradas = len(_variantes)
+        em_geracao = len(_geracoes_pendentes)
+    return {
+        "tamanhos": list(FOTO_VARIANTES),
+        "formato": FORMATO_VARIANTES,
+        "entradas": entradas,
+        "em_geracao": em_geracao,
+        "max_entradas": FOTO_CACHE_VARIANTES,
+        **_estatisticas_variantes,
+    }
+
+
+def obter_caminho_foto_usuario(id: int, tamanho: Optional[int] = None) -> str:
     """
     Retorna o caminho absoluto da foto do usuário para uso em templates.
 
     Args:
         id: ID do usuário
+        tamanho: Tamanho de exibição em pixels; usa a menor variante que o
+            cobre (foto completa se None ou maior que todas as variantes)
 
     Returns:
-        String com caminho absoluto (ex: /static/img/usuarios/000001.jpg)
+        String com caminho absoluto e versão do conteúdo, se a foto existe
+        (ex: /static/img/usuarios/000001_64.jpg?v=3f2a9c1b7d4e)
     """
-    return f"/{PASTA_FOTOS}/{id:06d}.jpg"
+    nome = f"{id:06d}.jpg"
+    if tamanho is not None:
+        variante = selecionar_tamanho_variante(tamanho)
+        if variante is not None and variante_disponivel(id, variante):
+            nome = f"{id:06d}_{variante}.{FORMATO_VARIANTES}"
+
+    # Versão do conteúdo: URL nova a cada upload, cacheável como imutável.
+    # Só stat: o hash é registrado no upload (ou recalculado em background)
+    versao = manifesto_assets.consultar_hash_arquivo(PASTA_FOTOS / nome)
+    url = f"/{PASTA_FOTOS}/{nome}"
+    return f"{url}?v={versao}" if versao else url
 
 
 def obter_path_absoluto_foto(id: int) -> Path:
@@ -80,6 +284,7 @@ def criar_foto_padrao_usuario(id: int) -> bool:
             with open(destino, "wb") as f_destino:
                 f_destino.write(f_origem.read())
 
+        _invalidar_variantes(id)
         logger.info(f"Foto padrão criada para usuário ID: {id}")
         return True
 
@@ -88,11 +293,63 @@ def criar_foto_padrao_usuario(id: int) -> bool:
         return False
 
 
+def _preparar_upload(conteudo_base64: str) -> str:
+    """
+    Valida o tamanho e decodifica o upload para um arquivo temporário.
+
+    O tamanho é verificado pelo comprimento do base64, antes de decodificar.
+
+    Returns:
+        Caminho do arquivo temporário (o chamador deve removê-lo)
+
+    Raises:
+        ValueError: Se exceder o tamanho máximo ou tiver caracteres não ASCII
+        binascii.Error: Se o conteúdo não for base64 válido
+    """
+    inicio = inicio_dados_base64(conteudo_base64)
+    tamanho = tamanho_decodificado(conteudo_base64, inicio)
+    if tamanho > FOTO_MAX_UPLOAD_BYTES:
+        raise ValueError(f"Upload de {tamanho} bytes excede o limite de {FOTO_MAX_UPLOAD_BYTES} bytes")
+
+    with tempfile.NamedTemporaryFile(prefix="foto-", suffix=".upload", delete=False) as arquivo:
+        try:
+            decodificar_base64_em_arquivo(conteudo_base64, arquivo, inicio)
+        except BaseException:
+            arquivo.close()
+            os.unlink(arquivo.name)
+            raise
+        return arquivo.name
+
+
+def _parametros_processamento(id: int) -> tuple:
+    """Destino e limites (lidos do cache: database → .env) para processar_foto."""
+    tamanho_max = config.obter_int("foto_perfil_tamanho_max", FOTO_PERFIL_TAMANHO_MAX)
+    return (
+        str(obter_path_absoluto_foto(id)), tamanho_max, FOTO_MAX_PIXELS, QUALIDADE_FOTO,
+        FOTO_VARIANTES, FORMATO_VARIANTES,
+    )
+
+
+def _atualizar_manifesto(id: int) -> None:
+    """
+    Atualiza no manifesto de assets a foto e as variantes recém-gravadas.
+
+    Bloqueante (lê os arquivos): as renderizações seguintes só fazem stat.
+    """
+    foto = PASTA_FOTOS / f"{id:06d}.jpg"
+    manifesto_assets.obter_hash_arquivo(foto)
+    for tamanho in FOTO_VARIANTES:
+        manifesto_assets.obter_hash_arquivo(Path(caminho_variante(str(foto), tamanho, FORMATO_VARIANTES)))
+
+
 def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
     """
     Salva a foto cropada do usuário enviada do frontend.
 
-    Recebe imagem em base64, decodifica, processa e salva como JPG.
+    Recebe imagem em base64, decodifica, processa e salva como JPG,
+    junto com as variantes reduzidas (FOTO_VARIANTES).
+    Versão síncrona (processa no processo atual); rotas assíncronas devem
+    usar salvar_foto_cropada_usuario_async.
 
     Args:
         id: ID do usuário
@@ -101,51 +358,89 @@ def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
     Returns:
         True se salvou com sucesso, False caso contrário
     """
+    origem = None
     try:
-        # Remover prefixo data:image/...;base64, se existir
-        if "," in conteudo_base64:
-            conteudo_base64 = conteudo_base64.split(",", 1)[1]
-
-        # Decodificar base64
-        image_data = base64.b64decode(conteudo_base64)
-
-        # Abrir imagem com Pillow
-        imagem = Image.open(io.BytesIO(image_data))
-
-        # Converter para RGB se necessário (remove canal alpha)
-        if imagem.mode in ("RGBA", "LA", "P"):
-            # Criar fundo branco
-            fundo: Image.Image = Image.new("RGB", imagem.size, (255, 255, 255))
-            if imagem.mode == "P":
-                imagem = imagem.convert("RGBA")
-            fundo.paste(imagem, mask=imagem.split()[-1] if "A" in imagem.mode else None)
-            imagem = fundo
-        elif imagem.mode != "RGB":
-            imagem = imagem.convert("RGB")
-
-        # Redimensionar se necessário (mantendo aspect ratio)
-        # Lê tamanho máximo do cache (database → .env)
-        tamanho_max = config.obter_int("foto_perfil_tamanho_max", FOTO_PERFIL_TAMANHO_MAX)
-        if imagem.width > tamanho_max or imagem.height > tamanho_max:
-            # thumbnail redimensiona mantendo aspect ratio
-            imagem.thumbnail((tamanho_max, tamanho_max), Image.Resampling.LANCZOS)
-            logger.info(f"Imagem redimensionada para {imagem.width}x{imagem.height}px (max: {tamanho_max}px)")
-
-        # Salvar como JPG
-        destino = obter_path_absoluto_foto(id)
-        imagem.save(destino, format=FORMATO_FOTO, quality=QUALIDADE_FOTO, optimize=True)
-
-        logger.info(f"Foto cropada salva para usuário ID: {id}")
+        origem = _preparar_upload(conteudo_base64)
+        largura, altura = processar_foto(origem, *_parametros_processamento(id))
+        _invalidar_variantes(id)
+        _atualizar_manifesto(id)
+        logger.info(f"Foto cropada salva para usuário ID: {id} ({largura}x{altura}px)")
         return True
 
     except (OSError, binascii.Error, UnidentifiedImageError, ValueError) as e:
         # OSError: Erro de I/O ao salvar arquivo
         # binascii.Error: Erro ao decodificar base64
         # UnidentifiedImageError: Formato de imagem inválido ou não suportado
-        # ValueError: Erro ao processar dados da imagem
+        # ValueError: Erro ao processar dados da imagem ou limite excedido
+        logger.error(f"Erro ao salvar foto cropada para usuário {id}: {e}")
+        return False
+
+    finally:
+        if origem:
+            os.unlink(origem)
+
+
+def _obter_executor() -> ProcessPoolExecutor:
+    """Cria o pool de processamento de fotos sob demanda (e após encerrar)."""
+    global _executor
+    if _executor is None:
+        with _lock_executor:
+            if _executor is None:
+                contexto = multiprocessing.get_context("forkserver")
+                contexto.set_forkserver_preload(["util.imagem_util"])
+                _executor = ProcessPoolExecutor(max_workers=FOTO_WORKERS, mp_context=contexto)
+    return _executor
+
+
+def encerrar_processamento_fotos() -> None:
+    """Encerra o pool de processamento de fotos (recriado na próxima chamada)."""
+    global _executor
+    with _lock_executor:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def salvar_foto_cropada_usuario_async(id: int, conteudo_base64: str) -> bool:
+    """
+    Salva a foto cropada sem bloquear o event loop.
+
+    A decodificação do base64 (em blocos, para arquivo temporário) roda no
+    executor de util.db_async; a decodificação da imagem, conversão e
+    gravação rodam no pool de processos de fotos.
+
+    Args:
+        id: ID do usuário
+        conteudo_base64: String base64 da imagem (pode incluir prefixo data:image/...)
+
+    Returns:
+        True se salvou com sucesso, False caso contrário
+    """
+    loop = asyncio.get_running_loop()
+    origem = None
+    try:
+        origem = await executar_em_thread(_preparar_upload, conteudo_base64)
+        try:
+            largura, altura = await loop.run_in_executor(
+                _obter_executor(), processar_foto, origem, *_parametros_processamento(id)
+            )
+        except BrokenProcessPool:
+            logger.error("Pool de processamento de fotos quebrado, recriando")
+            encerrar_processamento_fotos()
+            return False
+        _invalidar_variantes(id)
+        await executar_em_thread(_atualizar_manifesto, id)
+        logger.info(f"Foto cropada salva para usuário ID: {id} ({largura}x{altura}px)")
+        return True
+
+    except (OSError, binascii.Error, UnidentifiedImageError, ValueError) as e:
         logger.error(f"Erro ao salvar foto cropada para usuário {id}: {e}")
         return False
 
+    finally:
+        if origem:
+            os.unlink(origem)
+
 
 def foto_existe(id: int) -> bool:
     """
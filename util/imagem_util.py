@@ -0,0 +1,215 @@
+"""
+Processamento de imagens de upload (funções puras, sem dependências da aplicação).
+
+Executado nos processos do pool de fotos (util.foto_util): o módulo importa
+apenas Pillow e a biblioteca padrão, então os workers não carregam banco,
+cache de configurações nem rotas.
+
+- decodificar_base64_em_arquivo: decodifica o data URL em blocos direto
+  para um arquivo, sem manter cópias do payload inteiro em memória
+- processar_foto: lê apenas o cabeçalho para validar o orçamento de
+  pixels antes de decodificar, usa Image.draft para decodificar JPEGs já
+  reduzidos e grava o resultado de forma atômica
+- gerar_variantes: cópias reduzidas (ex: 32/64/256 px) para avatares
+"""
+import base64
+import os
+import threading
+from typing import BinaryIO, Sequence, Tuple
+
+from PIL import Image
+
+
+# Caracteres base64 decodificados por bloco (múltiplo de 4)
+BLOCO_BASE64 = 64 * 1024
+
+# Formato Pillow por extensão das variantes
+FORMATOS_VARIANTE = {"jpg": "JPEG", "webp": "WEBP"}
+
+
+def tamanho_decodificado(conteudo_base64: str, inicio: int = 0) -> int:
+    """
+    Calcula o tamanho em bytes do conteúdo base64 sem decodificá-lo.
+
+    Args:
+        conteudo_base64: String base64
+        inicio: Posição do primeiro caractere base64 (após o prefixo data:)
+
+    Returns:
+        Tamanho aproximado dos dados decodificados
+    """
+    tamanho = len(conteudo_base64) - inicio
+    padding = 2 if conteudo_base64.endswith("==") else 1 if conteudo_base64.endswith("=") else 0
+    return tamanho * 3 // 4 - padding
+
+
+def inicio_dados_base64(conteudo_base64: str) -> int:
+    """Posição dos dados após o prefixo `data:image/...;base64,` (0 se ausente)."""
+    virgula = conteudo_base64.find(",", 0, 256)
+    return virgula + 1 if virgula >= 0 else 0
+
+
+def decodificar_base64_em_arquivo(conteudo_base64: str, arquivo: BinaryIO, inicio: int = 0) -> int:
+    """
+    Decodifica base64 em blocos, gravando em um arquivo.
+
+    Cada bloco é uma fatia pequena da string: em nenhum momento existe uma
+    segunda cópia do payload inteiro (nem em str, nem em bytes).
+
+    Args:
+        conteudo_base64: String base64
+        arquivo: Arquivo binário de destino
+        inicio: Posição do primeiro caractere base64
+
+    Returns:
+        Quantidade de bytes gravados
+
+    Raises:
+        binascii.Error: Se o conteúdo não for base64 válido
+        ValueError: Se o conteúdo tiver caracteres não ASCII
+    """
+    gravados = 0
+    for posicao in range(inicio, len(conteudo_base64), BLOCO_BASE64):
+        bloco = base64.b64decode(conteudo_base64[posicao:posicao + BLOCO_BASE64], validate=True)
+        arquivo.write(bloco)
+        gravados += len(bloco)
+    return gravados
+
+
+def caminho_variante(destino: str, tamanho: int, formato: str = "jpg") -> str:
+    """Caminho da variante de uma foto (ex: 000001.jpg → 000001_64.webp)."""
+    base, _ = os.path.splitext(destino)
+    return f"{base}_{tamanho}.{formato}"
+
+
+def _salvar_atomico(imagem: Image.Image, destino: str, formato: str, qualidade: int) -> None:
+    """
+    Grava em arquivo temporário e troca: a versão antiga continua servida até a troca.
+
+    O temporário é único por processo e thread: escritores concorrentes (ex:
+    upload e geração sob demanda em workers diferentes) não gravam no mesmo
+    arquivo, como em compressao_util._precomprimir_arquivo.
+    """
+    temporario = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        imagem.save(temporario, format=formato, quality=qualidade, optimize=True)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.unlink(temporario)
+
+
+def gerar_variantes(
+    imagem: Image.Image,
+    destino: str,
+    tamanhos: Sequence[int],
+    formato: str = "jpg",
+    qualidade: int = 85
+) -> None:
+    """
+    Grava cópias reduzidas da foto, uma por tamanho.
+
+    Os tamanhos são processados do maior para o menor, cada um reduzido a
+    partir do anterior (menos pixels a reamostrar a cada passo).
+
+    Args:
+        imagem: Foto RGB já processada
+        destino: Caminho da foto principal (base dos nomes das variantes)
+        tamanhos: Maiores dimensões das variantes, em pixels
+        formato: Extensão das variantes ("jpg" ou "webp")
+        qualidade: Qualidade de compressão
+    """
+    atual = imagem
+    for tamanho in sorted(set(tamanhos), reverse=True):
+        if atual.width > tamanho or atual.height > tamanho:
+            atual = atual.copy()
+            atual.thumbnail((tamanho, tamanho), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        _salvar_atomico(atual, caminho_variante(destino, tamanho, formato), FORMATOS_VARIANTE[formato], qualidade)
+
+
+def gerar_variantes_de_arquivo(
+    destino: str,
+    tamanhos: Sequence[int],
+    formato: str = "jpg",
+    qualidade: int = 85
+) -> None:
+    """
+    Gera as variantes a partir de uma foto já gravada (geração sob demanda).
+
+    Args:
+        destino: Caminho da foto principal
+        tamanhos: Maiores dimensões das variantes, em pixels
+        formato: Extensão das variantes ("jpg" ou "webp")
+        qualidade: Qualidade de compressão
+    """
+    with Image.open(destino) as imagem:
+        maior = max(tamanhos)
+        imagem.draft("RGB", (maior, maior))
+        rgb = imagem.convert("RGB")
+    gerar_variantes(rgb, destino, tamanhos, formato, qualidade)
+
+
+def processar_foto(
+    origem: str,
+    destino: str,
+    tamanho_max: int,
+    pixels_max: int,
+    qualidade: int = 90,
+    variantes: Sequence[int] = (),
+    formato_variantes: str = "jpg"
+) -> Tuple[int, int]:
+    """
+    Converte a imagem de upload em JPEG RGB de no máximo tamanho_max pixels.
+
+    Args:
+        origem: Arquivo com a imagem decodificada
+        destino: Caminho do JPEG final
+        tamanho_max: Maior dimensão permitida (largura e altura)
+        pixels_max: Orçamento de pixels (largura x altura) da imagem original
+        qualidade: Qualidade JPEG
+        variantes: Tamanhos das variantes reduzidas a gerar junto com a foto
+        formato_variantes: Extensão das variantes ("jpg" ou "webp")
+
+    Returns:
+        Tupla (largura, altura) da imagem gravada
+
+    Raises:
+        ValueError: Se a imagem exceder o orçamento de pixels
+        UnidentifiedImageError: Se o arquivo não for uma imagem suportada
+        OSError: Em erros de leitura/gravação
+    """
+    try:
+        imagem = Image.open(origem)
+    except Image.DecompressionBombError as e:
+        # Acima de 2x Image.MAX_IMAGE_PIXELS o próprio Pillow recusa o cabeçalho
+        raise ValueError(f"Imagem excede o limite de {pixels_max} pixels: {e}") from e
+
+    with imagem:
+        # Image.open lê só o cabeçalho: rejeitar antes de decodificar os pixels
+        largura, altura = imagem.size
+        if largura * altura > pixels_max:
+            raise ValueError(f"Imagem com {largura}x{altura} pixels excede o limite de {pixels_max} pixels")
+
+        # JPEG: o decodificador já entrega a imagem reduzida (escala DCT)
+        imagem.draft("RGB", (tamanho_max, tamanho_max))
+
+        # Converter para RGB se necessário (remove canal alpha)
+        if imagem.mode in ("RGBA", "LA", "P"):
+            # Criar fundo branco
+            convertida = imagem.convert("RGBA") if imagem.mode == "P" else imagem
+            resultado = Image.new("RGB", convertida.size, (255, 255, 255))
+            resultado.paste(convertida, mask=convertida.split()[-1])
+        elif imagem.mode != "RGB":
+            resultado = imagem.convert("RGB")
+        else:
+            resultado = imagem.copy()
+
+    # Redimensionar se necessário (mantendo aspect ratio)
+    if resultado.width > tamanho_max or resultado.height > tamanho_max:
+        resultado.thumbnail((tamanho_max, tamanho_max), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    _salvar_atomico(resultado, destino, "JPEG", qualidade)
+    if variantes:
+        gerar_variantes(resultado, destino, variantes, formato_variantes)
+
+    return resultado.width, resultado.height
@@ -291,7 +291,7 @@ def migrar_configs_para_banco():
         f"{migradas} migradas, {ignoradas} ignoradas/existentes"
     )
 
-    # Limpa cache para forçar reload
+    # Pré-carrega o snapshot de configurações (uma única consulta)
     from util.config_cache import config
-    config.limpar()
-    logger.debug("Cache de configurações limpo após migração")
+    config.recarregar()
+    logger.debug("Cache de configurações recarregado após migração")
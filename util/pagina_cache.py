@@ -0,0 +1,284 @@
+"""
+Cache de páginas públicas renderizadas e dos dados que elas exibem.
+
+As páginas públicas (home, index, lista e leitura de artigos) consultavam
+artigo_repo e categoria_repo e renderizavam o template a cada acesso. Com
+o cache:
+
+- Visitantes anônimos sem mensagens flash pendentes recebem o HTML já
+  renderizado (chave: rota, parâmetros e estado anônimo/logado)
+- Usuários logados têm a página renderizada (navbar com o próprio nome),
+  mas os dados (artigos, categorias) vêm do cache
+- Entradas expiram após PAGINA_CACHE_TTL_SEGUNDOS e o cache é limitado por
+  número de entradas e bytes de HTML, descartando as menos usadas (LRU)
+
+Invalidação:
+- No próprio worker, imediata: artigo_repo e categoria_repo chamam
+  `cache_paginas.invalidar()` após inserir, alterar ou excluir
+- Entre workers, pela versão global do banco (tabela conteudo_versao,
+  incrementada por triggers em artigo e categoria), verificada em
+  background a cada PAGINA_CACHE_SINCRONIZACAO_SEGUNDOS, como no
+  ConfigCache
+
+Uma página renderizada durante uma invalidação não é armazenada (a
+geração do cache é conferida antes de armazenar).
+
+Configuração (.env):
+    PAGINA_CACHE_TTL_SEGUNDOS=60
+    PAGINA_CACHE_MAX_ENTRADAS=1000
+    PAGINA_CACHE_MAX_BYTES=33554432
+    PAGINA_CACHE_SINCRONIZACAO_SEGUNDOS=5
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from fastapi import Request
+
+from repo import conteudo_versao_repo
+from util.db_async import executar_em_thread
+from util.logger_config import logger
+
+
+PAGINA_CACHE_TTL_SEGUNDOS = float(os.getenv('PAGINA_CACHE_TTL_SEGUNDOS', '60'))
+PAGINA_CACHE_MAX_ENTRADAS = int(os.getenv('PAGINA_CACHE_MAX_ENTRADAS', '1000'))
+PAGINA_CACHE_MAX_BYTES = int(os.getenv('PAGINA_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+PAGINA_CACHE_SINCRONIZACAO_SEGUNDOS = float(os.getenv('PAGINA_CACHE_SINCRONIZACAO_SEGUNDOS', '5'))
+
+
+class CachePaginas:
+    """
+    Cache LRU com TTL de páginas renderizadas (bytes) e dados de páginas.
+
+    Valores bytes contam no limite de bytes; demais valores (listas de
+    artigos, categorias) contam apenas no limite de entradas. Os valores
+    são compartilhados entre requisições e não devem ser alterados.
+    """
+
+    def __init__(
+        self,
+        ttl_segundos: float = PAGINA_CACHE_TTL_SEGUNDOS,
+        max_entradas: int = PAGINA_CACHE_MAX_ENTRADAS,
+        max_bytes: int = PAGINA_CACHE_MAX_BYTES,
+    ):
+        if max_entradas <= 0:
+            raise ValueError("max_entradas deve ser positivo")
+
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+
+        # chave → (expira_em, tamanho em bytes, valor)
+        self._entradas: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Incrementada a cada invalidação: valores calculados antes dela são descartados
+        self._geracao = 0
+        # Versão global do banco em que o cache foi validado pela última vez
+        self._versao_banco: Optional[int] = None
+
+        # Métricas
+        self._acertos = 0
+        self._faltas = 0
+        self._expiradas = 0
+        self._descartadas = 0
+        self._invalidacoes = 0
+        self._sincronizacoes = 0
+
+    @property
+    def geracao(self) -> int:
+        """Geração atual (capturar antes de calcular um valor a armazenar)."""
+        return self._geracao
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """
+        Retorna o valor armazenado, se presente e não expirado.
+
+        Args:
+            chave: Chave da entrada
+
+        Returns:
+            Valor ou None
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self._faltas += 1
+                return None
+            if entrada[0] <= time.monotonic():
+                self._remover(chave)
+                self._expiradas += 1
+                self._faltas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self._acertos += 1
+            return entrada[2]
+
+    def armazenar(self, chave: Hashable, valor: Any, geracao: Optional[int] = None) -> bool:
+        """
+        Armazena um valor, descartando as entradas menos usadas se preciso.
+
+        Args:
+            chave: Chave da entrada
+            valor: Valor (bytes de HTML ou dados imutáveis)
+            geracao: Geração capturada antes de calcular o valor; se houve
+                invalidação desde então, o valor não é armazenado
+
+        Returns:
+            True se armazenou
+        """
+        tamanho = len(valor) if isinstance(valor, (bytes, bytearray)) else 0
+        if tamanho > self.max_bytes:
+            return False
+
+        with self._lock:
+            if geracao is not None and geracao != self._geracao:
+                return False
+            if chave in self._entradas:
+                self._remover(chave)
+            self._entradas[chave] = (time.monotonic() + self.ttl_segundos, tamanho, valor)
+            self._bytes += tamanho
+            while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                self._remover(next(iter(self._entradas)))
+                self._descartadas += 1
+            return True
+
+    def obter_ou_carregar(self, chave: Hashable, carregar: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor do cache ou o carrega e armazena.
+
+        Args:
+            chave: Chave da entrada
+            carregar: Função que calcula o valor (ex: consulta ao repositório)
+
+        Returns:
+            Valor armazenado ou recém-carregado
+        """
+        valor = self.obter(chave)
+        if valor is None:
+            geracao = self._geracao
+            valor = carregar()
+            if valor is not None:
+                self.armazenar(chave, valor, geracao)
+        return valor
+
+    def _remover(self, chave: Hashable) -> None:
+        """Remove uma entrada (chamado com o lock adquirido)."""
+        _, tamanho, _ = self._entradas.pop(chave)
+        self._bytes -= tamanho
+
+    def invalidar(self) -> None:
+        """Remove todas as entradas (conteúdo público alterado)."""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+            self._geracao += 1
+            self._invalidacoes += 1
+
+    def limpar(self) -> None:
+        """Remove todas as entradas e esquece a versão do banco."""
+        self.invalidar()
+        self._versao_banco = None
+
+    def sincronizar(self) -> bool:
+        """
+        Invalida o cache se o conteúdo mudou no banco (ex: em outro worker).
+
+        Na primeira verificação, sem versão conhecida, o cache também é
+        invalidado: as entradas podem ser anteriores a uma alteração.
+
+        Returns:
+            True se o cache foi invalidado
+
+        Raises:
+            sqlite3.Error: Se a versão não puder ser consultada
+        """
+        versao_banco = conteudo_versao_repo.obter_versao()
+        if versao_banco == self._versao_banco:
+            return False
+        self._versao_banco = versao_banco
+        self._sincronizacoes += 1
+        self.invalidar()
+        return True
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna estatísticas do cache de páginas.
+
+        Returns:
+            Dicionário com entradas, bytes, acertos, faltas, expirações e descartes
+        """
+        consultas = self._acertos + self._faltas
+        return {
+            "entradas": len(self._entradas),
+            "max_entradas": self.max_entradas,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_segundos": self.ttl_segundos,
+            "acertos": self._acertos,
+            "faltas": self._faltas,
+            "taxa_acerto": round(self._acertos / consultas, 4) if consultas else 0,
+            "expiradas": self._expiradas,
+            "descartadas": self._descartadas,
+            "invalidacoes": self._invalidacoes,
+            "sincronizacoes": self._sincronizacoes,
+            "versao_banco": self._versao_banco,
+        }
+
+
+# Instância global
+cache_paginas = CachePaginas()
+
+
+def chave_pagina(request: Request, **parametros) -> Optional[tuple]:
+    """
+    Chave do cache de HTML para a requisição, ou None se não for cacheável.
+
+    Só páginas de visitantes anônimos sem mensagens flash pendentes são
+    cacheáveis: a navbar de usuários logados mostra o próprio usuário e as
+    mensagens flash são consumidas na renderização. Apenas os parâmetros
+    informados (já validados pela rota) entram na chave, então query
+    strings arbitrárias não criam entradas novas.
+
+    Args:
+        request: Requisição atual
+        **parametros: Parâmetros que alteram o conteúdo (ex: page=2)
+
+    Returns:
+        Tupla (rota, parâmetros, estado) ou None
+    """
+    if request.session.get("usuario_logado") or request.session.get("mensagens"):
+        return None
+    return ("pagina", request.url.path, tuple(sorted(parametros.items())), "anonimo")
+
+
+async def _sincronizar_periodicamente(intervalo_segundos: float) -> None:
+    """Laço da sincronização periódica (consulta fora do event loop)."""
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        try:
+            await executar_em_thread(cache_paginas.sincronizar)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao verificar versão do conteúdo público: {e}")
+
+
+def iniciar_sincronizacao_periodica(
+    intervalo_segundos: float = PAGINA_CACHE_SINCRONIZACAO_SEGUNDOS
+) -> Optional[asyncio.Task]:
+    """
+    Agenda a verificação periódica de alterações de conteúdo em outros workers.
+
+    Args:
+        intervalo_segundos: Intervalo entre verificações (0 desativa)
+
+    Returns:
+        Task agendada ou None se desativada
+    """
+    if intervalo_segundos <= 0:
+        return None
+    logger.info(f"Sincronização do cache de páginas agendada a cada {intervalo_segundos:g} s")
+    return asyncio.create_task(_sincronizar_periodicamente(intervalo_segundos))
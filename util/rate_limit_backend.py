@@ -0,0 +1,393 @@
+"""
+Backends de armazenamento do rate limiting.
+
+O RateLimiter delega a contagem de tentativas a um backend que implementa
+uma janela deslizante exata: uma tentativa é permitida se houver menos de
+`max_tentativas` tentativas permitidas nos últimos `janela` segundos, então
+nenhum intervalo de `janela` segundos tem mais que `max_tentativas`
+tentativas. Tentativas bloqueadas não são registradas.
+
+Em memória, cada identificador guarda no máximo `max_tentativas` instantes
+(float) em um buffer circular: a verificação compara apenas o instante mais
+antigo do buffer, em O(1), sem reconstruir listas.
+
+Identificadores sem tentativas na janela estão "zerados" (idênticos a um
+identificador nunca visto) e são removidos periodicamente, então a memória
+acompanha apenas os clientes ativos na última janela.
+
+Backends:
+    - memoria: dicionários em memória particionados em shards, cada um com
+      seu lock (padrão; estado por processo)
+    - sqlite: tabela rate_limit_tentativa em um arquivo SQLite compartilhado
+      por todos os workers do host, com verificação e registro atômicos em
+      um único comando (com N workers, o limite continua valendo uma vez,
+      não N)
+
+O backend sqlite é consultado no event loop: a espera pelo lock de escrita
+é limitada a RATE_LIMIT_SQLITE_BUSY_TIMEOUT_MS e, se o banco continuar
+ocupado, RATE_LIMIT_SQLITE_FALHA decide se a tentativa passa (permitir) ou
+é bloqueada (bloquear).
+
+Configuração (.env):
+    RATE_LIMIT_BACKEND=memoria|sqlite
+    RATE_LIMIT_DB_PATH=rate_limit.db
+    RATE_LIMIT_SQLITE_BUSY_TIMEOUT_MS=50
+    RATE_LIMIT_SQLITE_FALHA=permitir|bloquear
+"""
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from typing import Dict, List
+
+from sql.rate_limit_sql import (
+    CRIAR_TABELA,
+    CRIAR_INDICE,
+    CONSUMIR,
+    OBTER_INSTANTES,
+    OBTER_POR_CHAVE,
+    EXCLUIR,
+    EXCLUIR_POR_LIMITER,
+    EXCLUIR_EXPIRADAS,
+    CONTAR_POR_LIMITER,
+)
+from util.db_util import PerfilArmazenamento
+from util.logger_config import logger
+
+
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memoria').lower()
+RATE_LIMIT_DB_PATH = os.getenv('RATE_LIMIT_DB_PATH', 'rate_limit.db')
+RATE_LIMIT_SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('RATE_LIMIT_SQLITE_BUSY_TIMEOUT_MS', '50'))
+RATE_LIMIT_SQLITE_FALHA = os.getenv('RATE_LIMIT_SQLITE_FALHA', 'permitir').lower()
+
+
+class BackendRateLimit(ABC):
+    """
+    Interface dos backends de rate limiting.
+
+    Os tempos são segundos do relógio do backend (`agora()`), informados
+    pelo chamador para que a mesma leitura do relógio valha para toda a
+    operação.
+    """
+
+    nome = "base"
+
+    def agora(self) -> float:
+        """Relógio do backend em segundos (monotônico por padrão)."""
+        return time.monotonic()
+
+    @abstractmethod
+    def consumir(self, chave: str, max_tentativas: int, janela: float, agora: float) -> bool:
+        """
+        Verifica e registra uma tentativa de forma atômica.
+
+        Args:
+            chave: Identificador (ex: IP)
+            max_tentativas: Tentativas permitidas em qualquer intervalo de `janela` segundos
+            janela: Tamanho da janela em segundos
+            agora: Instante atual (relógio do backend)
+
+        Returns:
+            True se a tentativa foi permitida (e registrada)
+        """
+
+    @abstractmethod
+    def obter_instantes(self, chave: str, janela: float, agora: float) -> List[float]:
+        """Instantes das tentativas dentro da janela, do mais antigo ao mais recente."""
+
+    @abstractmethod
+    def remover(self, chave: str) -> bool:
+        """Remove um identificador. Retorna True se existia."""
+
+    @abstractmethod
+    def limpar(self) -> None:
+        """Remove todos os identificadores."""
+
+    @abstractmethod
+    def contar(self) -> int:
+        """Número de identificadores armazenados."""
+
+    @abstractmethod
+    def contem(self, chave: str) -> bool:
+        """Verifica se o identificador está armazenado."""
+
+    def __len__(self) -> int:
+        return self.contar()
+
+    def __contains__(self, chave: object) -> bool:
+        return isinstance(chave, str) and self.contem(chave)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna estatísticas do backend.
+
+        Returns:
+            Dicionário com o nome do backend e o número de identificadores
+        """
+        return {"backend": self.nome, "identificadores": self.contar()}
+
+
+class _Registro:
+    """
+    Buffer circular com os instantes das últimas tentativas permitidas.
+
+    Enquanto não está cheio, `proximo` é o tamanho do buffer (próxima posição
+    de append); cheio, é a posição do instante mais antigo (próxima a ser
+    sobrescrita). Em ambos os casos o mais recente está em `proximo - 1`.
+    """
+
+    __slots__ = ("instantes", "proximo")
+
+    def __init__(self):
+        self.instantes = array("d")
+        self.proximo = 0
+
+    def mais_recente(self) -> float:
+        return self.instantes[self.proximo - 1]
+
+    def em_ordem(self) -> List[float]:
+        """Instantes do mais antigo ao mais recente."""
+        if len(self.instantes) == self.proximo:
+            return list(self.instantes)
+        return list(self.instantes[self.proximo:]) + list(self.instantes[:self.proximo])
+
+    def redimensionar(self, capacidade: int) -> None:
+        """Mantém os `capacidade` instantes mais recentes (max_tentativas alterado)."""
+        self.instantes = array("d", self.em_ordem()[-capacidade:])
+        self.proximo = len(self.instantes) % capacidade
+
+    def consumir(self, capacidade: int, janela: float, agora: float) -> bool:
+        tamanho = len(self.instantes)
+        consistente = self.proximo == tamanho if tamanho < capacidade else tamanho == capacidade > self.proximo
+        if not consistente:
+            self.redimensionar(capacidade)
+            tamanho = len(self.instantes)
+
+        if tamanho < capacidade:
+            self.instantes.append(agora)
+            self.proximo = (tamanho + 1) % capacidade
+            return True
+
+        # Cheio: permitido só se a tentativa mais antiga já saiu da janela
+        if self.instantes[self.proximo] > agora - janela:
+            return False
+        self.instantes[self.proximo] = agora
+        self.proximo = (self.proximo + 1) % capacidade
+        return True
+
+
+class _Shard:
+    """Partição do BackendMemoria: registros de parte dos identificadores e seu lock."""
+
+    __slots__ = ("registros", "lock", "proxima_limpeza")
+
+    def __init__(self):
+        self.registros: Dict[str, _Registro] = {}
+        self.lock = threading.Lock()
+        self.proxima_limpeza = 0.0
+
+
+class BackendMemoria(BackendRateLimit):
+    """
+    Backend em memória particionado em shards.
+
+    O identificador é distribuído por hash entre `shards` dicionários, cada
+    um protegido por seu próprio lock: threads do pool do FastAPI
+    verificando IPs diferentes raramente disputam o mesmo lock. Cada valor
+    é um buffer circular compacto (array de floats) com no máximo
+    `max_tentativas` instantes.
+
+    A cada `intervalo_limpeza` segundos, a primeira operação em um shard
+    remove os identificadores zerados daquele shard.
+    """
+
+    nome = "memoria"
+
+    def __init__(self, shards: int = 16, intervalo_limpeza: float = 60.0):
+        if shards <= 0:
+            raise ValueError("shards deve ser positivo")
+
+        self._shards = tuple(_Shard() for _ in range(shards))
+        self.intervalo_limpeza = intervalo_limpeza
+        self._removidos = 0
+
+    def _shard(self, chave: str) -> _Shard:
+        return self._shards[hash(chave) % len(self._shards)]
+
+    def _limpar_zerados(self, shard: _Shard, janela: float, agora: float) -> None:
+        """Remove identificadores zerados do shard (chamado com o lock adquirido)."""
+        shard.proxima_limpeza = agora + self.intervalo_limpeza
+        zerados = [chave for chave, registro in shard.registros.items() if registro.mais_recente() <= agora - janela]
+        for chave in zerados:
+            del shard.registros[chave]
+        self._removidos += len(zerados)
+
+    def consumir(self, chave: str, max_tentativas: int, janela: float, agora: float) -> bool:
+        shard = self._shard(chave)
+        with shard.lock:
+            if agora >= shard.proxima_limpeza:
+                self._limpar_zerados(shard, janela, agora)
+
+            registro = shard.registros.get(chave)
+            if registro is None:
+                registro = shard.registros[chave] = _Registro()
+            return registro.consumir(max_tentativas, janela, agora)
+
+    def obter_instantes(self, chave: str, janela: float, agora: float) -> List[float]:
+        shard = self._shard(chave)
+        with shard.lock:
+            registro = shard.registros.get(chave)
+            instantes = registro.em_ordem() if registro is not None else []
+        return [instante for instante in instantes if instante > agora - janela]
+
+    def remover(self, chave: str) -> bool:
+        shard = self._shard(chave)
+        with shard.lock:
+            return shard.registros.pop(chave, None) is not None
+
+    def limpar(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.registros.clear()
+
+    def contar(self) -> int:
+        return sum(len(shard.registros) for shard in self._shards)
+
+    def contem(self, chave: str) -> bool:
+        return chave in self._shard(chave).registros
+
+    def obter_estatisticas(self) -> dict:
+        return {
+            **super().obter_estatisticas(),
+            "shards": len(self._shards),
+            "removidos_por_inatividade": self._removidos,
+        }
+
+
+class BackendSQLite(BackendRateLimit):
+    """
+    Backend compartilhado entre processos via tabela SQLite.
+
+    Cada limiter usa seu nome como namespace na tabela
+    rate_limit_tentativa, com uma linha por tentativa permitida. A
+    verificação é um único INSERT condicional à contagem da janela
+    (atômico sob o lock de escrita do SQLite), em conexão própria por
+    thread, em modo autocommit e com WAL. O relógio é o de parede
+    (time.time), comum a todos os processos e estável entre reinícios.
+
+    A verificação roda no event loop, então a espera pelo lock do banco é
+    curta (busy_timeout_ms); esgotada, a tentativa é permitida ou bloqueada
+    conforme `politica_falha` e contada em `falhas_banco`.
+    """
+
+    nome = "sqlite"
+
+    _locais = threading.local()
+    _tabelas_criadas: set = set()
+    _lock_tabelas = threading.Lock()
+
+    def __init__(
+        self,
+        namespace: str,
+        caminho: str = RATE_LIMIT_DB_PATH,
+        intervalo_limpeza: float = 60.0,
+        busy_timeout_ms: int = RATE_LIMIT_SQLITE_BUSY_TIMEOUT_MS,
+        politica_falha: str = RATE_LIMIT_SQLITE_FALHA,
+    ):
+        if politica_falha not in ("permitir", "bloquear"):
+            logger.warning(f"[RateLimit] RATE_LIMIT_SQLITE_FALHA '{politica_falha}' desconhecida, usando 'permitir'")
+            politica_falha = "permitir"
+        self.namespace = namespace
+        self.caminho = caminho
+        self.intervalo_limpeza = intervalo_limpeza
+        self.busy_timeout_ms = busy_timeout_ms
+        self.politica_falha = politica_falha
+        self._proxima_limpeza = 0.0
+        self._removidas = 0
+        self._falhas_banco = 0
+
+    def agora(self) -> float:
+        return time.time()
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual para o arquivo do backend."""
+        conexoes = getattr(self._locais, "conexoes", None)
+        if conexoes is None:
+            conexoes = self._locais.conexoes = {}
+
+        conn = conexoes.get(self.caminho)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, isolation_level=None, timeout=self.busy_timeout_ms / 1000)
+            PerfilArmazenamento(busy_timeout_ms=self.busy_timeout_ms).aplicar(conn)
+            conexoes[self.caminho] = conn
+
+        if self.caminho not in self._tabelas_criadas:
+            with self._lock_tabelas:
+                if self.caminho not in self._tabelas_criadas:
+                    conn.execute(CRIAR_TABELA)
+                    conn.execute(CRIAR_INDICE)
+                    self._tabelas_criadas.add(self.caminho)
+        return conn
+
+    def consumir(self, chave: str, max_tentativas: int, janela: float, agora: float) -> bool:
+        try:
+            conn = self._conexao()
+            if agora >= self._proxima_limpeza:
+                self._proxima_limpeza = agora + self.intervalo_limpeza
+                self._removidas += conn.execute(EXCLUIR_EXPIRADAS, (self.namespace, agora - janela)).rowcount
+
+            return conn.execute(CONSUMIR, (self.namespace, chave, agora, max_tentativas, janela)).rowcount > 0
+        except sqlite3.OperationalError as e:
+            # Banco ocupado além do busy_timeout (ou indisponível): não segurar o event loop
+            self._falhas_banco += 1
+            logger.warning(
+                f"[RateLimit] Erro no backend sqlite ({self.namespace}): {e}; "
+                f"tentativa {'permitida' if self.politica_falha == 'permitir' else 'bloqueada'}"
+            )
+            return self.politica_falha == "permitir"
+
+    def obter_instantes(self, chave: str, janela: float, agora: float) -> List[float]:
+        rows = self._conexao().execute(OBTER_INSTANTES, (self.namespace, chave, agora - janela)).fetchall()
+        return [row[0] for row in rows]
+
+    def remover(self, chave: str) -> bool:
+        return self._conexao().execute(EXCLUIR, (self.namespace, chave)).rowcount > 0
+
+    def limpar(self) -> None:
+        self._conexao().execute(EXCLUIR_POR_LIMITER, (self.namespace,))
+
+    def contar(self) -> int:
+        return self._conexao().execute(CONTAR_POR_LIMITER, (self.namespace,)).fetchone()[0]
+
+    def contem(self, chave: str) -> bool:
+        return self._conexao().execute(OBTER_POR_CHAVE, (self.namespace, chave)).fetchone() is not None
+
+    def obter_estatisticas(self) -> dict:
+        return {
+            **super().obter_estatisticas(),
+            "caminho": self.caminho,
+            "tentativas_expiradas_removidas": self._removidas,
+            "busy_timeout_ms": self.busy_timeout_ms,
+            "politica_falha": self.politica_falha,
+            "falhas_banco": self._falhas_banco,
+        }
+
+
+def criar_backend(namespace: str, backend: str = RATE_LIMIT_BACKEND) -> BackendRateLimit:
+    """
+    Cria o backend configurado para um limiter.
+
+    Args:
+        namespace: Nome do limiter (separa o estado de cada limiter)
+        backend: "memoria" ou "sqlite"
+
+    Returns:
+        Instância do backend (memória se o backend for desconhecido)
+    """
+    if backend == "sqlite":
+        return BackendSQLite(namespace, RATE_LIMIT_DB_PATH)
+    if backend != "memoria":
+        logger.warning(f"[RateLimit] Backend '{backend}' desconhecido, usando memória")
+    return BackendMemoria()
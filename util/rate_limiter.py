@@ -7,14 +7,17 @@ rotas contra abuso, brute force e DDoS.
 Oferece duas classes:
     - RateLimiter: Rate limiter estático (valores fixos na inicialização)
     - DynamicRateLimiter: Rate limiter dinâmico (lê valores do config_cache)
+
+A contagem fica em um backend (util/rate_limit_backend.py) com janela
+deslizante exata: verificação O(1) e no máximo max_tentativas instantes por
+identificador ativo.
 """
 
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
 from util.logger_config import logger
 from util.config_cache import config
-from util.datetime_util import agora as obter_agora
+from util.rate_limit_backend import RATE_LIMIT_BACKEND, BackendRateLimit, criar_backend
 
 
 class RateLimiter:
@@ -22,12 +25,13 @@ class RateLimiter:
     Rate limiter baseado em janela deslizante (sliding window).
 
     Mantém registro de tentativas por identificador (geralmente IP)
-    e bloqueia se exceder limite em janela de tempo.
+    e bloqueia se exceder limite em janela de tempo: nenhum intervalo de
+    `janela` tem mais que `max_tentativas` tentativas permitidas.
 
     Attributes:
         max_tentativas: Número máximo de tentativas permitidas
         janela: Timedelta representando janela de tempo
-        tentativas: Dict de identificador -> lista de timestamps
+        tentativas: Backend com os identificadores ativos (suporta `in` e `len`)
     """
 
     def __init__(
@@ -35,6 +39,7 @@ class RateLimiter:
         max_tentativas: int = 5,
         janela_minutos: int = 5,
         nome: str = "default",
+        backend: Optional[BackendRateLimit] = None,
     ):
         """
         Inicializa rate limiter.
@@ -43,6 +48,7 @@ class RateLimiter:
             max_tentativas: Número máximo de tentativas na janela
             janela_minutos: Tamanho da janela em minutos
             nome: Nome descritivo do limiter (para logs)
+            backend: Armazenamento das tentativas (padrão: backend do registro_limiters)
         """
         if max_tentativas <= 0:
             raise ValueError("max_tentativas deve ser positivo")
@@ -53,14 +59,19 @@ class RateLimiter:
         self.janela = timedelta(minutes=janela_minutos)
         self.janela_minutos = janela_minutos
         self.nome = nome
-        self.tentativas: defaultdict[str, list[datetime]] = defaultdict(list)
+        self._backend = backend if backend is not None else registro_limiters.criar_backend(nome)
+
+    @property
+    def tentativas(self) -> BackendRateLimit:
+        """Backend com os identificadores ativos (suporta `in` e `len`)."""
+        return self._backend
 
     def verificar(self, identificador: str) -> bool:
         """
         Verifica se identificador está dentro do limite.
 
-        Remove tentativas antigas da janela e verifica se está
-        abaixo do máximo. Se estiver, registra nova tentativa.
+        Verifica e registra a tentativa em uma única operação O(1)
+        no backend.
 
         Args:
             identificador: Identificador único (geralmente IP)
@@ -69,24 +80,18 @@ class RateLimiter:
             True se dentro do limite (permitido)
             False se excedeu limite (bloqueado)
         """
-        momento_atual = obter_agora()
-
-        # Limpar tentativas antigas (fora da janela)
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
+        permitido = self._backend.consumir(
+            identificador, self.max_tentativas, self.janela.total_seconds(), self._backend.agora()
+        )
 
-        # Verificar se excedeu limite
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
+        if not permitido:
             logger.warning(
                 f"Rate limit excedido [{self.nome}] - "
                 f"Identificador: {identificador}, "
-                f"Tentativas: {len(self.tentativas[identificador])}/{self.max_tentativas}"
+                f"Tentativas: {self.max_tentativas}/{self.max_tentativas}"
             )
             return False
 
-        # Registrar nova tentativa
-        self.tentativas[identificador].append(momento_atual)
         return True
 
     def limpar(self, identificador: Optional[str] = None) -> None:
@@ -98,11 +103,10 @@ class RateLimiter:
                           Se None, limpa todos (útil para testes).
         """
         if identificador:
-            if identificador in self.tentativas:
-                del self.tentativas[identificador]
+            if self._backend.remover(identificador):
                 logger.debug(f"Limpo rate limit para identificador: {identificador}")
         else:
-            self.tentativas.clear()
+            self._backend.limpar()
             logger.debug(f"Limpo todos os rate limits [{self.nome}]")
 
     def obter_tentativas_restantes(self, identificador: str) -> int:
@@ -115,19 +119,14 @@ class RateLimiter:
         Returns:
             Número de tentativas restantes (0 se bloqueado)
         """
-        momento_atual = obter_agora()
-
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
-
-        tentativas_atuais = len(self.tentativas[identificador])
-        return max(0, self.max_tentativas - tentativas_atuais)
+        instantes = self._backend.obter_instantes(
+            identificador, self.janela.total_seconds(), self._backend.agora()
+        )
+        return max(0, self.max_tentativas - len(instantes))
 
     def obter_tempo_reset(self, identificador: str) -> Optional[timedelta]:
         """
-        Retorna tempo até o reset do limite.
+        Retorna tempo até o reset do limite (próxima tentativa permitida).
 
         Args:
             identificador: Identificador único
@@ -135,24 +134,15 @@ class RateLimiter:
         Returns:
             Timedelta até reset, ou None se não bloqueado
         """
-        if identificador not in self.tentativas or not self.tentativas[identificador]:
+        agora = self._backend.agora()
+        janela = self.janela.total_seconds()
+        instantes = self._backend.obter_instantes(identificador, janela, agora)
+        if len(instantes) < self.max_tentativas:
             return None
 
-        momento_atual = obter_agora()
-
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
-
-        # Se ainda está bloqueado, calcular tempo até reset
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
-            # Reset quando a tentativa mais antiga sair da janela
-            tentativa_mais_antiga = self.tentativas[identificador][0]
-            tempo_reset = (tentativa_mais_antiga + self.janela) - momento_atual
-            return tempo_reset if tempo_reset.total_seconds() > 0 else None
-
-        return None
+        # Libera quando a mais antiga das últimas max_tentativas sai da janela
+        espera = instantes[-self.max_tentativas] + janela - agora
+        return timedelta(seconds=espera) if espera > 0 else None
 
     def __repr__(self) -> str:
         """Representação string do limiter."""
@@ -165,11 +155,12 @@ class RateLimiter:
 
 class DynamicRateLimiter(RateLimiter):
     """
-    Rate limiter dinâmico que busca valores do config_cache a cada verificação.
+    Rate limiter dinâmico que acompanha os valores do config_cache.
 
     Permite alteração de rate limits sem reiniciar o servidor. Os valores
     max_tentativas e janela_minutos são lidos do cache de configuração
-    usando as chaves fornecidas.
+    usando as chaves fornecidas, e relidos apenas quando a versão do
+    config_cache muda (após limpar/limpar_chave).
 
     Attributes:
         chave_max: Chave de configuração para max_tentativas
@@ -206,6 +197,8 @@ class DynamicRateLimiter(RateLimiter):
         self.chave_minutos = chave_minutos
         self.padrao_max = padrao_max
         self.padrao_minutos = padrao_minutos
+        # Versão do config_cache dos valores atuais (None: ainda não sincronizado)
+        self._versao_config: Optional[int] = None
 
         # Inicializar com valores atuais do config
         max_tentativas = config.obter_int(chave_max, padrao_max)
@@ -221,9 +214,10 @@ class DynamicRateLimiter(RateLimiter):
         """
         Atualiza valores de max_tentativas e janela_minutos do config_cache.
 
-        Chamado internamente antes de cada verificação para garantir
-        que está usando os valores mais recentes.
+        Chamado por _sincronizar_config quando a versão do config_cache muda.
         """
+        # Versão lida antes dos valores: mudança concorrente força nova leitura
+        self._versao_config = config.obter_versao()
         max_tentativas = config.obter_int(self.chave_max, self.padrao_max)
         janela_minutos = config.obter_int(self.chave_minutos, self.padrao_minutos)
 
@@ -243,11 +237,21 @@ class DynamicRateLimiter(RateLimiter):
             self.janela_minutos = janela_minutos
             self.janela = timedelta(minutes=janela_minutos)
 
+    def _sincronizar_config(self) -> None:
+        """
+        Relê os valores apenas se as configurações mudaram.
+
+        Compara a versão do config_cache (leitura sem lock) com a dos
+        valores atuais; no caso comum não há consulta ao cache.
+        """
+        if config.obter_versao() != self._versao_config:
+            self._atualizar_valores()
+
     def verificar(self, identificador: str) -> bool:
         """
         Verifica se identificador está dentro do limite (com valores atualizados).
 
-        Atualiza valores do config_cache antes de verificar, garantindo
+        Sincroniza com o config_cache antes de verificar, garantindo
         que mudanças em configurações sejam aplicadas imediatamente.
 
         Args:
@@ -257,8 +261,8 @@ class DynamicRateLimiter(RateLimiter):
             True se dentro do limite (permitido)
             False se excedeu limite (bloqueado)
         """
-        # Atualizar valores antes de verificar
-        self._atualizar_valores()
+        # Atualizar valores antes de verificar (só relê se a config mudou)
+        self._sincronizar_config()
 
         # Usar lógica da classe pai
         return super().verificar(identificador)
@@ -273,7 +277,7 @@ class DynamicRateLimiter(RateLimiter):
         Returns:
             Número de tentativas restantes (0 se bloqueado)
         """
-        self._atualizar_valores()
+        self._sincronizar_config()
         return super().obter_tentativas_restantes(identificador)
 
     def obter_tempo_reset(self, identificador: str) -> Optional[timedelta]:
@@ -286,7 +290,7 @@ class DynamicRateLimiter(RateLimiter):
         Returns:
             Timedelta até reset, ou None se não bloqueado
         """
-        self._atualizar_valores()
+        self._sincronizar_config()
         return super().obter_tempo_reset(identificador)
 
     def __repr__(self) -> str:
@@ -327,11 +331,31 @@ class RegistroLimiters:
     - Listar todos os limiters registrados
     - Obter estatísticas globais
     - Limpar todos os limiters de uma vez (útil para testes)
+    - Definir o backend de armazenamento dos limiters (RATE_LIMIT_BACKEND)
     """
 
-    def __init__(self):
-        """Inicializa o registry vazio."""
+    def __init__(self, tipo_backend: str = RATE_LIMIT_BACKEND):
+        """
+        Inicializa o registry vazio.
+
+        Args:
+            tipo_backend: Backend dos limiters criados sem backend explícito
+                ("memoria" ou "sqlite")
+        """
         self._limiters: dict[str, RateLimiter] = {}
+        self.tipo_backend = tipo_backend
+
+    def criar_backend(self, nome: str) -> BackendRateLimit:
+        """
+        Cria o backend de armazenamento de um limiter.
+
+        Args:
+            nome: Nome do limiter (namespace no backend compartilhado)
+
+        Returns:
+            Backend do tipo configurado no registry
+        """
+        return criar_backend(nome, self.tipo_backend)
 
     def registrar(self, limiter: RateLimiter) -> None:
         """
@@ -373,6 +397,7 @@ class RegistroLimiters:
         """
         stats = {
             "total_limiters": len(self._limiters),
+            "backend": self.tipo_backend,
             "limiters": {}
         }
 
@@ -0,0 +1,63 @@
+"""
+Reconciliação dos contadores de mensagens não lidas do chat.
+
+O contador `chat_participante.nao_lidas` é mantido incrementalmente pelos
+repositórios. Este módulo recalcula os contadores a partir das mensagens
+para corrigir divergências (mensagens excluídas, escritas manuais, falhas),
+sob demanda ou periodicamente em background.
+"""
+import asyncio
+import os
+import sqlite3
+from typing import Optional
+
+from repo import chat_participante_repo
+from util.db_async import executar_em_thread
+from util.logger_config import logger
+
+
+# Intervalo da reconciliação periódica (0 desativa)
+CHAT_RECONCILIACAO_INTERVALO_MINUTOS = int(os.getenv('CHAT_RECONCILIACAO_INTERVALO_MINUTOS', '60'))
+
+
+def reconciliar_contadores_nao_lidas() -> int:
+    """
+    Reconstrói os contadores de não lidas de todas as participações.
+
+    Returns:
+        Quantidade de contadores corrigidos
+    """
+    corrigidos = chat_participante_repo.reconstruir_contadores_nao_lidas()
+    if corrigidos:
+        logger.warning(f"Contadores de não lidas divergentes corrigidos: {corrigidos}")
+    else:
+        logger.debug("Contadores de não lidas consistentes")
+    return corrigidos
+
+
+async def _executar_periodicamente(intervalo_segundos: float) -> None:
+    """Laço da reconciliação periódica (roda fora do event loop)."""
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        try:
+            await executar_em_thread(reconciliar_contadores_nao_lidas)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao reconciliar contadores de não lidas: {e}")
+
+
+def iniciar_reconciliacao_periodica(
+    intervalo_minutos: int = CHAT_RECONCILIACAO_INTERVALO_MINUTOS
+) -> Optional[asyncio.Task]:
+    """
+    Agenda a reconciliação periódica no event loop atual.
+
+    Args:
+        intervalo_minutos: Intervalo entre execuções (0 desativa)
+
+    Returns:
+        Task agendada ou None se desativada
+    """
+    if intervalo_minutos <= 0:
+        return None
+    logger.info(f"Reconciliação de não lidas agendada a cada {intervalo_minutos} min")
+    return asyncio.create_task(_executar_periodicamente(intervalo_minutos * 60))
@@ -1,9 +1,14 @@
 from passlib.context import CryptContext
+import os
 import secrets
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from util.datetime_util import agora
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Custo do bcrypt: hashes com custo diferente são regerados no próximo login
+SENHA_BCRYPT_ROUNDS = int(os.getenv('SENHA_BCRYPT_ROUNDS', '12'))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=SENHA_BCRYPT_ROUNDS)
 
 
 def criar_hash_senha(senha: str) -> str:
@@ -16,6 +21,17 @@ def verificar_senha(senha_plana: str, senha_hash: str) -> bool:
     return pwd_context.verify(senha_plana, senha_hash)
 
 
+def verificar_e_atualizar_senha(senha_plana: str, senha_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha e, se o hash usa parâmetros antigos, gera um novo.
+
+    Returns:
+        Tupla (senha_correta, novo_hash). novo_hash é None se o hash atual
+        já segue os parâmetros do pwd_context ou se a senha está incorreta.
+    """
+    return pwd_context.verify_and_update(senha_plana, senha_hash)
+
+
 def gerar_token_redefinicao() -> str:
     """Gera token seguro para redefinição de senha"""
     return secrets.token_urlsafe(32)
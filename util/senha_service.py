@@ -0,0 +1,218 @@
+"""
+Serviço assíncrono de senhas.
+
+O bcrypt custa centenas de milissegundos de CPU por hash/verificação.
+Chamado diretamente de um handler `async def`, trava o event loop do
+worker (inclusive streams SSE do chat) durante cada login. Este módulo
+executa hash e verificação em um pool de processos limitado, com limite
+de operações simultâneas e métricas de fila, e devolve o novo hash quando
+o pwd_context exige rehash (ex: SENHA_BCRYPT_ROUNDS alterado).
+
+Uso:
+    from util.senha_service import servico_senha
+
+    correta, novo_hash = await servico_senha.verificar_e_atualizar(senha, usuario.senha)
+
+Configuração (.env):
+    SENHA_EXECUTOR=processos|threads
+    SENHA_WORKERS=2
+    SENHA_CONCORRENCIA_MAXIMA=0  (0 = igual a SENHA_WORKERS)
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+
+from util import security
+from util.logger_config import logger
+
+
+SENHA_EXECUTOR = os.getenv('SENHA_EXECUTOR', 'processos').lower()
+SENHA_WORKERS = int(os.getenv('SENHA_WORKERS', '2'))
+SENHA_CONCORRENCIA_MAXIMA = int(os.getenv('SENHA_CONCORRENCIA_MAXIMA', '0'))
+
+
+def _executar_medindo(func: Callable, *args) -> Tuple[Any, float]:
+    """Executa a função no worker e retorna (resultado, duração em segundos)."""
+    inicio = time.perf_counter()
+    resultado = func(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+class ServicoSenha:
+    """
+    Hash e verificação de senhas fora do event loop.
+
+    Operações além de `max_concorrentes` aguardam em um semáforo (tempo
+    contabilizado como espera na fila), então o pool nunca acumula mais
+    tarefas do que consegue executar. O pool é criado sob demanda (e
+    recriado após encerrar() ou após a morte de um processo).
+
+    Processos usam o contexto "forkserver": os workers nascem de um
+    servidor com util.security pré-carregado, sem herdar threads e locks
+    do processo da aplicação.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = SENHA_WORKERS,
+        max_concorrentes: int = SENHA_CONCORRENCIA_MAXIMA,
+        executor: str = SENHA_EXECUTOR
+    ):
+        if max_workers <= 0:
+            raise ValueError("max_workers deve ser positivo")
+
+        self.max_workers = max_workers
+        self.max_concorrentes = max_concorrentes if max_concorrentes > 0 else max_workers
+        if executor not in ("processos", "threads"):
+            logger.warning(f"[Senha] Executor '{executor}' desconhecido, usando processos")
+            executor = "processos"
+        self.tipo_executor = executor
+
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        # Um semáforo por event loop (asyncio.Semaphore pertence a um loop)
+        self._semaforos: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        # Métricas
+        self._aguardando = 0
+        self._em_execucao = 0
+        self._maior_fila = 0
+        self._concluidas = 0
+        self._falhas = 0
+        self._rehashes = 0
+        self._espera_total = 0.0
+        self._espera_maxima = 0.0
+        self._execucao_total = 0.0
+
+    def _obter_executor(self) -> Executor:
+        """Cria o pool sob demanda (e após encerrar())."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.tipo_executor == "threads":
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers, thread_name_prefix="senha"
+                        )
+                    else:
+                        contexto = multiprocessing.get_context("forkserver")
+                        contexto.set_forkserver_preload(["util.security"])
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers, mp_context=contexto
+                        )
+        return self._executor
+
+    def _obter_semaforo(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self.max_concorrentes)
+        return semaforo
+
+    async def _submeter(self, func: Callable, *args) -> Tuple[Any, float]:
+        """Submete ao pool, recriando-o uma vez se um processo morreu."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._obter_executor(), _executar_medindo, func, *args)
+        except BrokenProcessPool:
+            logger.error("[Senha] Pool de processos quebrado, recriando")
+            self.encerrar(aguardar=False)
+            return await loop.run_in_executor(self._obter_executor(), _executar_medindo, func, *args)
+
+    async def _executar(self, func: Callable, *args) -> Any:
+        """Executa a função no pool respeitando o limite de concorrência."""
+        enfileirada_em = time.monotonic()
+        self._aguardando += 1
+        self._maior_fila = max(self._maior_fila, self._aguardando)
+
+        semaforo = self._obter_semaforo()
+        try:
+            await semaforo.acquire()
+        except BaseException:
+            self._aguardando -= 1
+            raise
+
+        espera = time.monotonic() - enfileirada_em
+        self._aguardando -= 1
+        self._em_execucao += 1
+        self._espera_total += espera
+        self._espera_maxima = max(self._espera_maxima, espera)
+
+        sucesso = False
+        try:
+            resultado, duracao = await self._submeter(func, *args)
+            self._execucao_total += duracao
+            sucesso = True
+            return resultado
+        finally:
+            semaforo.release()
+            self._em_execucao -= 1
+            self._concluidas += 1
+            if not sucesso:
+                self._falhas += 1
+
+    async def gerar_hash(self, senha: str) -> str:
+        """Cria o hash da senha no pool."""
+        return await self._executar(security.criar_hash_senha, senha)
+
+    async def verificar(self, senha_plana: str, senha_hash: str) -> bool:
+        """Verifica se a senha corresponde ao hash (no pool)."""
+        return await self._executar(security.verificar_senha, senha_plana, senha_hash)
+
+    async def verificar_e_atualizar(self, senha_plana: str, senha_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica a senha e gera novo hash se os parâmetros do bcrypt mudaram.
+
+        O rehash acontece na mesma tarefa do pool (a senha plana só está
+        disponível no login). Cabe ao chamador gravar o novo hash.
+
+        Returns:
+            Tupla (senha_correta, novo_hash ou None)
+        """
+        correta, novo_hash = await self._executar(
+            security.verificar_e_atualizar_senha, senha_plana, senha_hash
+        )
+        if novo_hash:
+            self._rehashes += 1
+        return correta, novo_hash
+
+    def encerrar(self, aguardar: bool = True) -> None:
+        """Encerra o pool (um novo é criado na próxima chamada)."""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=aguardar, cancel_futures=not aguardar)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas do serviço.
+
+        Returns:
+            Dicionário com fila, execuções, rehashes e tempos de espera/execução
+        """
+        return {
+            "executor": self.tipo_executor,
+            "max_workers": self.max_workers,
+            "max_concorrentes": self.max_concorrentes,
+            "fila_pendentes": self._aguardando,
+            "em_execucao": self._em_execucao,
+            "maior_fila": self._maior_fila,
+            "concluidas": self._concluidas,
+            "falhas": self._falhas,
+            "rehashes": self._rehashes,
+            "espera_media_ms": round(self._espera_total / self._concluidas * 1000, 3) if self._concluidas else 0,
+            "espera_maxima_ms": round(self._espera_maxima * 1000, 3),
+            "execucao_media_ms": round(self._execucao_total / self._concluidas * 1000, 3) if self._concluidas else 0,
+        }
+
+
+# Instância global
+servico_senha = ServicoSenha()
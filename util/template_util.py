@@ -15,6 +15,8 @@ from util.flash_messages import obter_mensagens
 from util.config import APP_NAME, VERSION, TOAST_AUTO_HIDE_DELAY_MS
 from util.csrf_protection import obter_token_csrf, CSRF_FORM_FIELD
 from util.config_cache import config
+from util.foto_util import obter_caminho_foto_usuario
+from util.asset_util import asset_url
 
 
 def formatar_data_br(
@@ -130,17 +132,22 @@ def formatar_hora(data: Union[datetime, None]) -> str:
     return ""
 
 
-def foto_usuario(id: int) -> str:
+def foto_usuario(id: int, tamanho: Optional[int] = None) -> str:
     """
     Retorna o caminho da foto do usuário para uso em templates.
 
+    Uso no template: {{ usuario.id|foto_usuario }} (foto completa) ou
+    {{ usuario.id|foto_usuario(64) }} (menor variante com pelo menos 64px;
+    para avatares de 32px em telas de alta densidade, peça 64).
+
     Args:
         id: ID do usuário
+        tamanho: Tamanho de exibição em pixels (None para a foto completa)
 
     Returns:
         String com caminho da foto (ex: /static/img/usuarios/000001.jpg)
     """
-    return f"/static/img/usuarios/{id:06d}.jpg"
+    return obter_caminho_foto_usuario(id, tamanho)
 
 
 def csrf_input(request: Optional[Request] = None) -> str:
@@ -166,7 +173,7 @@ def criar_templates() -> Jinja2Templates:
     Cria instância de Jinja2Templates com configurações customizadas.
 
     Configura o ambiente Jinja2 com:
-    - Funções globais (obter_mensagens, csrf_input)
+    - Funções globais (obter_mensagens, csrf_input, asset_url)
     - Variáveis globais (APP_NAME, VERSION)
     - Filtros customizados (data_br, data_hora_br, foto_usuario)
 
@@ -198,6 +205,9 @@ def criar_templates() -> Jinja2Templates:
     # Uso no template: {{ csrf_input(request) }}
     env.globals['csrf_input'] = csrf_input
 
+    # URLs versionadas por conteúdo: {{ asset_url('css/custom.css') }}
+    env.globals['asset_url'] = asset_url
+
     # Adicionar filtros customizados
     env.filters['data_br'] = formatar_data_br
     env.filters['foto_usuario'] = foto_usuario